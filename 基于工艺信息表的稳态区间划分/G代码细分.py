@@ -1,474 +1,18 @@
-import math
-import re
 import os
-import time
-import chardet
-from pathlib import Path
+import multiprocessing
+import queue
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from collections import defaultdict
-import threading
+import arc_subdivider
+import background_tasks
+import process_pool_runner
+import subdivision_cache
+
+# 日志级别选项对应的 ArcSubdivider 日志级别
+LOG_LEVELS = {'简洁': arc_subdivider.LOG_WARNING, '详细': arc_subdivider.LOG_INFO, '调试': arc_subdivider.LOG_DEBUG}
+# 日志缓冲区写入文本框的间隔（毫秒）
+LOG_FLUSH_MS = 100
 
-class ArcSubdivider:
-    def __init__(self, angular_resolution=1.0, log_message=None):
-        self.angular_resolution = angular_resolution
-        # 独立跟踪每个轴的位置
-        self.axis_pos = defaultdict(float)
-        # 独立跟踪每个轴最后更新的位置
-        self.last_axis_update = defaultdict(float)
-        self.arc_plane = 'G17'
-        self.distance_mode = 'G90'
-        self.feed_rate = None
-        self.output_lines = []
-        self.log_message = log_message or (lambda msg: None)
-        self.last_motion_command = None
-        self.current_line_number = None  # 当前处理的行号
-        
-    def parse_gcode_line(self, line):
-        """解析G代码行 - 改进版本，正确处理带行号的指令和模态命令"""
-        # 移除注释
-        clean_line = re.sub(r'\(.*?\)', '', line).strip()
-        if not clean_line:
-            return None, None, {}  # 返回 (行号, 命令, 参数)
-        
-        # 初始化行号和指令部分
-        line_number = None
-        command_part = clean_line
-        
-        # 处理带行号的指令
-        if clean_line.startswith('N') and re.match(r'^N\d+', clean_line):
-            # 分离行号和指令
-            parts = re.split(r'\s+', clean_line, 1)
-            line_number = parts[0].strip()
-            if len(parts) > 1:
-                command_part = parts[1].strip()
-            else:
-                command_part = ""
-        
-        # 分割指令 - 改进处理模态命令
-        parts = re.findall(r'([A-Z][0-9\.\+\-]*)', command_part)
-        if not parts:
-            return line_number, None, {}
-        
-        # 检查是否是G/M命令还是轴参数
-        command = None
-        params = {}
-        for part in parts:
-            if part[0].isalpha() and len(part) > 1:
-                axis = part[0]
-                # 如果是G或M命令
-                if axis in ['G', 'M']:
-                    command = part
-                else:  # 轴参数
-                    try:
-                        value_str = part[1:]
-                        if value_str.endswith('.'):
-                            value_str += '0'
-                        value = float(value_str)
-                        params[axis] = value
-                    except ValueError:
-                        self.log_message(f"无法解析参数: {part}")
-        return line_number, command, params
-    
-    def update_axis_position(self, params):
-        """更新各轴位置 - 独立更新每个轴"""
-        changes = []
-        for axis, value in params.items():
-            if axis in ['X', 'Y', 'Z']:  # 只处理坐标轴
-                # 记录该轴最后更新的位置
-                old_value = self.last_axis_update[axis]
-                
-                if self.distance_mode == 'G90':  # 绝对坐标
-                    self.axis_pos[axis] = value
-                    self.last_axis_update[axis] = value
-                    if abs(old_value - value) > 0.001:
-                        changes.append(f"{axis}: {old_value:.4f} → {value:.4f}")
-                else:  # 增量坐标
-                    new_value = self.axis_pos[axis] + value
-                    self.axis_pos[axis] = new_value
-                    self.last_axis_update[axis] = new_value
-                    changes.append(f"{axis}: +{value:.4f} → {new_value:.4f}")
-        
-        if changes:
-            self.log_message("位置更新: " + ", ".join(changes))
-    
-    def get_arc_start_point(self):
-        """获取圆弧起点位置 - 使用每个轴最后独立更新的值"""
-        start_point = {
-            'X': self.last_axis_update['X'],
-            'Y': self.last_axis_update['Y'],
-            'Z': self.last_axis_update['Z']
-        }
-        return start_point
-    
-    def calculate_arc_center_ij(self, end_x, end_y, i_offset, j_offset, arc_command):
-        """计算I/J格式圆弧圆心"""
-        # 获取起点
-        start_point = self.get_arc_start_point()
-        start_x = start_point['X']
-        start_y = start_point['Y']
-        
-        # I/J是相对于起点的偏移量
-        center_x = start_x + i_offset
-        center_y = start_y + j_offset
-        
-        # 计算半径
-        radius = math.sqrt(i_offset**2 + j_offset**2)
-        
-        self.log_message(f"I/J圆弧: 起点({start_x:.4f}, {start_y:.4f}), 终点({end_x:.4f}, {end_y:.4f}), I={i_offset:.4f}, J={j_offset:.4f}")
-        self.log_message(f"圆心: ({center_x:.4f}, {center_y:.4f}), 半径={radius:.4f}")
-        
-        # 验证终点到圆心的距离
-        end_radius = math.sqrt((end_x - center_x)**2 + (end_y - center_y)**2)
-        radius_diff = abs(end_radius - radius)
-        
-        if radius_diff > 0.01:  # 允许10微米误差
-            self.log_message(f"警告: 终点半径={end_radius:.4f}与起点半径={radius:.4f}不匹配，误差={radius_diff:.6f}")
-        
-        return center_x, center_y, radius
-    
-    def calculate_arc_center(self, end_x, end_y, radius, arc_command):
-        """计算圆弧圆心 - 修复圆心方向错误问题"""
-        # 获取当前所有轴的最近位置作为起点
-        start_point = self.get_arc_start_point()
-        start_x = start_point['X']
-        start_y = start_point['Y']
-        
-        self.log_message(f"R格式圆弧: 起点({start_x:.4f}, {start_y:.4f}), 终点({end_x:.4f}, {end_y:.4f}), R={radius:.4f}, {arc_command}")
-        
-        # 检查起点终点是否重合
-        if abs(start_x - end_x) < 0.001 and abs(start_y - end_y) < 0.001:
-            self.log_message("警告: 圆弧起点和终点重合，无法计算圆心")
-            return None
-        
-        # 计算弦长
-        dx = end_x - start_x
-        dy = end_y - start_y
-        chord_length = math.sqrt(dx**2 + dy**2)
-        
-        # 检查半径有效性
-        if chord_length > 2 * abs(radius):
-            self.log_message(f"几何错误: 弦长={chord_length:.4f} > 直径={2*abs(radius):.4f}")
-            return None
-        
-        # 计算弦的中点
-        mid_x = (start_x + end_x) / 2
-        mid_y = (start_y + end_y) / 2
-        
-        # 计算弦的垂直距离
-        actual_radius = abs(radius)
-        height = math.sqrt(actual_radius**2 - (chord_length/2)**2)
-        
-        # 计算垂直于弦的单位向量
-        # 弦的方向向量: (dx, dy)
-        # 垂直向量(右手): (dy, -dx) 或 (-dy, dx)
-        perp_length = chord_length
-        
-        # 根据G2/G3和半径符号确定圆心位置
-        # G2顺时针: 圆心在弦的右侧(刀具视角)
-        # G3逆时针: 圆心在弦的左侧(刀具视角)
-        # 负半径: 取大圆弧(>180度),圆心在另一侧
-        
-        if arc_command in ['G2', 'G02']:  # 顺时针
-            # 标准情况: 圆心在右侧
-            perp_x = dy / perp_length
-            perp_y = -dx / perp_length
-            if radius < 0:  # 大圆弧，圆心翻转到左侧
-                perp_x = -perp_x
-                perp_y = -perp_y
-        else:  # G3/G03 逆时针
-            # 标准情况: 圆心在左侧
-            perp_x = -dy / perp_length
-            perp_y = dx / perp_length
-            if radius < 0:  # 大圆弧，圆心翻转到右侧
-                perp_x = -perp_x
-                perp_y = -perp_y
-        
-        # 计算圆心位置
-        center_x = mid_x + height * perp_x
-        center_y = mid_y + height * perp_y
-        
-        # 验证半径
-        calc_radius_start = math.sqrt((start_x - center_x)**2 + (start_y - center_y)**2)
-        calc_radius_end = math.sqrt((end_x - center_x)**2 + (end_y - center_y)**2)
-        radius_diff_start = abs(calc_radius_start - actual_radius)
-        radius_diff_end = abs(calc_radius_end - actual_radius)
-        
-        if radius_diff_start > 0.001 or radius_diff_end > 0.001:  # 允许1微米误差
-            self.log_message(f"半径验证失败: 起点半径={calc_radius_start:.4f}, 终点半径={calc_radius_end:.4f}, 指定半径={actual_radius:.4f}")
-            self.log_message(f"起点误差={radius_diff_start:.6f}, 终点误差={radius_diff_end:.6f}")
-            # 不返回None，继续使用计算的圆心（可能是数值精度问题）
-        
-        self.log_message(f"圆心计算: ({center_x:.4f}, {center_y:.4f}), 半径={actual_radius:.4f}")
-        return center_x, center_y
-    
-    def subdivide_arc(self, end_x, end_y, params, command):
-        """细分圆弧为多个点 - 支持R格式和I/J格式"""
-        if self.arc_plane != 'G17':  # 仅支持XY平面
-            self.log_message(f"警告: 当前仅支持G17(XY平面)圆弧细分,检测到{self.arc_plane},跳过细分")
-            return []
-        
-        arc_command = command  # 统一变量名
-        start_point = self.get_arc_start_point()
-        start_x = start_point['X']
-        start_y = start_point['Y']
-        
-        # 检查起点终点是否重合
-        if abs(start_x - end_x) < 0.001 and abs(start_y - end_y) < 0.001:
-            self.log_message("警告: 圆弧起点和终点重合，无法细分")
-            return []
-        
-        # 判断使用I/J格式还是R格式
-        if 'I' in params or 'J' in params:
-            # I/J格式
-            i_offset = params.get('I', 0.0)
-            j_offset = params.get('J', 0.0)
-            result = self.calculate_arc_center_ij(end_x, end_y, i_offset, j_offset, arc_command)
-            if result is None:
-                self.log_message("无法计算I/J格式圆弧圆心")
-                return []
-            cx, cy, start_radius = result
-        elif 'R' in params:
-            # R格式
-            radius = params['R']
-            center = self.calculate_arc_center(end_x, end_y, radius, arc_command)
-            if center is None:
-                self.log_message("无法计算R格式圆弧圆心")
-                return []
-            cx, cy = center
-            start_radius = abs(radius)
-        else:
-            self.log_message("错误: 圆弧指令缺少R或I/J参数")
-            return []
-        
-        # 计算起点和终点角度
-        start_angle = math.atan2(start_y - cy, start_x - cx)
-        end_angle = math.atan2(end_y - cy, end_x - cx)
-        
-        # 计算角度变化（不使用normalize，直接处理）
-        angle_diff = end_angle - start_angle
-        
-        # 调整圆弧方向
-        if arc_command in ['G2', 'G02']:  # 顺时针
-            if angle_diff > 0:
-                angle_diff -= 2 * math.pi
-            angle_change = angle_diff  # 保持负值表示顺时针
-        else:  # G3/G03 逆时针
-            if angle_diff < 0:
-                angle_diff += 2 * math.pi
-            angle_change = angle_diff  # 保持正值表示逆时针
-        
-        # 计算细分点数量
-        total_angle = abs(angle_change)
-        resolution_rad = math.radians(self.angular_resolution)
-        num_points = max(2, int(total_angle / resolution_rad) + 1)
-        
-        # 检查是否需要细分：如果角度小于等于分辨率，或接近分辨率(含容差)，不进行细分
-        if total_angle <= resolution_rad + 1e-9:
-            self.log_message(f"圆弧角度({math.degrees(total_angle):.4f}度)小于等于分辨率({self.angular_resolution}度)，不细分")
-            return None  # 返回None表示不需要细分
-        
-        angle_step = angle_change / (num_points - 1)
-        
-        # 生成中间点（优化：只保留必要的点）
-        points = []
-        for i in range(1, num_points):
-            angle = start_angle + i * angle_step
-            px = cx + start_radius * math.cos(angle)
-            py = cy + start_radius * math.sin(angle)
-            # 四舍五入到3位小数，减少文件大小
-            points.append((round(px, 3), round(py, 3)))
-        
-        self.log_message(f"圆弧细分成功: 生成{len(points)}个点")
-        return points
-    
-    # 在 generate_g1_lines 方法中确保输出F值
-    def generate_g1_lines(self, base_line_number, points, feed_changed):
-        """生成G1指令 - 使用原始行号加小数部分，仅在进给变化时输出F"""
-        lines = []
-        current_z = self.last_axis_update.get('Z', None)
-        
-        # 优化：只在第一个点输出Z和F值，后续点省略
-        for i, point in enumerate(points):
-            x, y = point
-            # 生成带小数部分的行号（如果有原始行号）
-            if base_line_number:
-                # 移除原始行号的"N"前缀
-                base_num = base_line_number[1:] if base_line_number.startswith('N') else base_line_number
-                # 添加小数部分
-                line_num = f"N{base_num}.{i+1}"
-                line = f"{line_num} G1 X{x:.3f} Y{y:.3f}"
-            else:
-                # 如果没有行号，直接生成指令
-                line = f"G1 X{x:.3f} Y{y:.3f}"
-            
-            # 只在第一个点添加Z和F值，减少文件大小
-            if i == 0:
-                if current_z is not None:
-                    line += f" Z{current_z:.3f}"
-                    
-                # 仅当进给速度有变化时输出F
-                if feed_changed and self.feed_rate is not None:
-                    line += f" F{self.feed_rate:.1f}"
-                
-            lines.append(line)
-        
-        return lines
-    
-    def process_gcode_path(self, input_path, output_path):
-        """处理G代码文件路径 - 独立跟踪各轴位置"""
-        start_time = time.time()
-        
-        input_path = Path(input_path)
-        output_path = Path(output_path)
-        
-        if not input_path.exists():
-            raise FileNotFoundError(f"输入文件不存在: {input_path}")
-        
-        self.output_lines = []
-        # 初始化各轴位置
-        self.axis_pos = defaultdict(float)
-        self.last_axis_update = defaultdict(float)
-        for axis in ['X', 'Y', 'Z']:
-            self.axis_pos[axis] = 0.0
-            self.last_axis_update[axis] = 0.0
-        
-        self.arc_plane = 'G17'
-        self.distance_mode = 'G90'
-        self.feed_rate = None
-        self.last_motion_command = None
-        self.current_line_number = None
-        
-        # 检测文件编码
-        with open(input_path, 'rb') as f:
-            raw_data = f.read(4096)
-            result = chardet.detect(raw_data)
-            file_encoding = result.get('encoding') if result else 'gbk'
-        
-        file_encoding = (result or {}).get('encoding') or 'gbk'
-        confidence = (result or {}).get('confidence', 0)
-        self.log_message(f"检测到文件编码: {file_encoding} (置信度: {confidence:.2f})")
-        
-        # 处理文件
-        with open(input_path, 'r', encoding=file_encoding, errors='replace') as f:
-            for line in f:
-                self.process_line(line)
-        
-        # 写入输出文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for line in self.output_lines:
-                f.write(line + '\n')
-        
-        # 性能统计
-        elapsed_time = time.time() - start_time
-        input_size = os.path.getsize(input_path) / 1024 / 1024  # MB
-        output_size = os.path.getsize(output_path) / 1024 / 1024  # MB
-        self.log_message(f"\n处理完成！")
-        self.log_message(f"处理时间: {elapsed_time:.2f}秒")
-        self.log_message(f"输入文件大小: {input_size:.2f}MB")
-        self.log_message(f"输出文件大小: {output_size:.2f}MB")
-        self.log_message(f"压缩比: {output_size/input_size:.2f}x")
-        
-        return output_path
-    
-    # 在 process_line 方法中确保模态F值被正确处理
-    def process_line(self, line):
-        """处理单行G代码 - 使用原始行号加小数部分，保留模态F值"""
-        original_line = line.strip()
-        
-        # 保留注释和空行
-        if not original_line or original_line.startswith('(') or original_line.startswith('%'):
-            self.output_lines.append(original_line)
-            return
-        
-        # 处理带行号的指令
-        line_number, command, params = self.parse_gcode_line(original_line)
-        self.current_line_number = line_number  # 保存当前行号
-        
-        # 处理模态命令:如果只有参数没有命令,使用上一次的运动命令
-        if command is None and params and self.last_motion_command in ['G0', 'G00', 'G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
-            command = self.last_motion_command
-            # 安全检查:如果是圆弧命令但缺少圆弧参数,不使用模态命令
-            if command in ['G2', 'G02', 'G3', 'G03'] and 'R' not in params and 'I' not in params and 'J' not in params:
-                self.log_message(f"警告: 圆弧模态命令缺少R/I/J参数,跳过: {original_line}")
-                command = None
-        
-        # 处理F值(模态值)
-        prev_feed = self.feed_rate
-        feed_changed = False
-        if 'F' in params:
-            new_feed = params['F']
-            feed_changed = (prev_feed is None) or (abs(new_feed - prev_feed) > 1e-6)
-            self.feed_rate = new_feed
-            self.log_message(f"设置进给速率: F{self.feed_rate:.1f}")
-        
-        # 处理特殊命令
-        if command in ['G17', 'G18', 'G19']:
-            self.arc_plane = command
-            self.log_message(f"设置加工平面: {command}")
-            self.output_lines.append(original_line)
-            return
-        
-        if command in ['G90', 'G91']:
-            self.distance_mode = command
-            self.log_message(f"设置距离模式: {command}")
-            self.output_lines.append(original_line)
-            return
-        
-        # 处理移动命令
-        if command in ['G0', 'G00', 'G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
-            self.last_motion_command = command
-            
-            # 如果是圆弧指令
-            if command in ['G2', 'G02', 'G3', 'G03']:
-                # 获取圆弧参数（不更新位置）
-                end_x = params.get('X', self.last_axis_update['X'])
-                end_y = params.get('Y', self.last_axis_update['Y'])
-                
-                # 检查是否有圆弧参数（R或I/J）
-                has_arc_params = 'R' in params or 'I' in params or 'J' in params
-                
-                if not has_arc_params:
-                    self.log_message("错误: 圆弧指令缺少R或I/J参数")
-                    self.output_lines.append(original_line)
-                    # 圆弧指令执行后更新位置
-                    self.update_axis_position(params)
-                    return
-                
-                self.log_message(f"处理圆弧指令: {original_line}")
-                points = self.subdivide_arc(end_x, end_y, params, command)
-                if points is not None and len(points) > 0:
-                    # 有细分点，使用原始行号生成细分指令（保留F值）
-                    g1_lines = self.generate_g1_lines(self.current_line_number, points, feed_changed)
-                    self.output_lines.extend(g1_lines)
-                    
-                    # 圆弧细分后更新位置到终点
-                    update_params = {'X': end_x, 'Y': end_y}
-                    if 'Z' in params:
-                        update_params['Z'] = params['Z']
-                    self.update_axis_position(update_params)
-                else:
-                    # 不需要细分或无法细分，保留原指令
-                    if points is None:
-                        self.log_message("圆弧不需要细分，保留原指令")
-                    else:
-                        self.log_message("圆弧细分失败，保留原指令")
-                    self.output_lines.append(original_line)
-                    # 圆弧指令执行后更新位置
-                    self.update_axis_position(params)
-            else:
-                # 直线移动，保留原指令
-                self.output_lines.append(original_line)
-                # 直线指令执行后更新位置
-                self.update_axis_position(params)
-            return
-        
-        # 其他指令处理
-        self.output_lines.append(original_line)
-        # 其他指令也可能更新位置（如G92等）
-        if params:
-            self.update_axis_position(params)
-            
 class GCodeSubdividerApp:
     def __init__(self, root):
         self.root = root
@@ -571,6 +115,17 @@ class GCodeSubdividerApp:
         filter_entry.pack(side=tk.LEFT, padx=5)
         ttk.Label(filter_frame, text="(多个后缀用分号分隔)").pack(side=tk.LEFT)
         
+        # 并行进程数（每个文件在一个工作进程中细分）
+        workers_frame = ttk.Frame(self.batch_frame)
+        workers_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(workers_frame, text="并行进程数:").pack(side=tk.LEFT)
+        self.batch_workers = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(workers_frame, from_=1, to=max(os.cpu_count() or 1, 1) * 2,
+                    textvariable=self.batch_workers, width=5).pack(side=tk.LEFT, padx=5)
+        self.batch_runner = None  # 正在运行的批量处理进程池
+        self.file_task = None  # 正在运行的单文件处理任务（background_tasks.BackgroundTask）
+        
         # 设置区域
         settings_frame = ttk.LabelFrame(main_frame, text="处理设置")
         settings_frame.pack(fill=tk.X, pady=10)
@@ -585,6 +140,22 @@ class GCodeSubdividerApp:
         resolution_entry.pack(side=tk.LEFT, padx=5)
         ttk.Label(resolution_frame, text="(推荐3-10度)").pack(side=tk.LEFT, padx=5)
         
+        # 细分方式：固定角度，或按弦高误差由半径决定每段角度
+        chord_frame = ttk.Frame(settings_frame)
+        chord_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(chord_frame, text="细分方式:", width=15).pack(side=tk.LEFT)
+        self.subdivision_mode = tk.StringVar(value="angle")
+        ttk.Radiobutton(chord_frame, text="固定角度", variable=self.subdivision_mode, value="angle").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(chord_frame, text="弦高误差", variable=self.subdivision_mode, value="chord").pack(side=tk.LEFT, padx=5)
+        ttk.Label(chord_frame, text="弦高误差(mm):").pack(side=tk.LEFT, padx=(15, 0))
+        self.chord_tolerance = tk.DoubleVar(value=0.001)
+        ttk.Entry(chord_frame, textvariable=self.chord_tolerance, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(chord_frame, text="最短段长(mm):").pack(side=tk.LEFT, padx=(10, 0))
+        self.min_segment_length = tk.DoubleVar(value=0.0)
+        ttk.Entry(chord_frame, textvariable=self.min_segment_length, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(chord_frame, text="(0为不限制)").pack(side=tk.LEFT)
+        
         # 日志级别
         log_frame = ttk.Frame(settings_frame)
         log_frame.pack(fill=tk.X, pady=5)
@@ -595,12 +166,24 @@ class GCodeSubdividerApp:
         log_combo['values'] = ('简洁', '详细', '调试')
         log_combo.pack(side=tk.LEFT, padx=5)
         
+        # 细分结果缓存（同一程序、同一参数再次处理时直接取出）
+        cache_frame = ttk.Frame(settings_frame)
+        cache_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(cache_frame, text="细分缓存:", width=15).pack(side=tk.LEFT)
+        self.use_cache = tk.BooleanVar(value=True)
+        ttk.Checkbutton(cache_frame, text="使用细分缓存", variable=self.use_cache).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cache_frame, text="清空缓存", command=self.clear_cache).pack(side=tk.LEFT, padx=10)
+        ttk.Label(cache_frame, text=f"({subdivision_cache.DEFAULT_CACHE_DIR})").pack(side=tk.LEFT)
+        
         # 操作按钮
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=20)
         
         self.process_btn = ttk.Button(button_frame, text="处理文件", command=self.start_processing)
         self.process_btn.pack(side=tk.LEFT, padx=10)
+        self.cancel_btn = ttk.Button(button_frame, text="取消", command=self.cancel_processing, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="清除日志", command=self.clear_log).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="打开输出目录", command=self.open_output_dir).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="退出", command=root.quit).pack(side=tk.LEFT, padx=10)
@@ -626,6 +209,10 @@ class GCodeSubdividerApp:
         status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        # 日志先进入队列，由定时器批量写入文本框（处理线程也可安全调用 log_message）
+        self.log_queue = queue.SimpleQueue()
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+        
         # 绑定事件
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.processing_mode.trace_add("write", self.toggle_processing_mode)
@@ -645,20 +232,18 @@ class GCodeSubdividerApp:
     
     def format_angle_suffix(self, angle):
         """格式化角度后缀：整数直接显示，小数用'p'代替小数点"""
-        # 检查是否为整数（包括5.0这种情况）
-        if float(angle).is_integer():
-            return f"_{int(angle)}"
-        else:
-            # 将浮点数转换为字符串并用'p'替换小数点
-            angle_str = f"{angle:.4f}".rstrip('0').rstrip('.')
-            return f"_{angle_str.replace('.', 'p')}"
-
+        return arc_subdivider.format_angle_suffix(angle)
     
     def get_output_filename(self, input_path, resolution):
-        """生成带角度后缀的输出文件名"""
-        input_path = Path(input_path)
-        suffix = self.format_angle_suffix(resolution)
-        return input_path.parent / f"{input_path.stem}_subdivided{suffix}{input_path.suffix}"
+        """生成带角度后缀（弦高误差模式为弦高误差后缀）的输出文件名"""
+        return arc_subdivider.get_output_filename(input_path, resolution,
+                                                  chord_tolerance=self.chord_options()['chord_tolerance'])
+    
+    def chord_options(self):
+        """当前细分方式对应的 ArcSubdivider 参数（固定角度模式时 chord_tolerance 为 None）"""
+        if self.subdivision_mode.get() != "chord":
+            return {'chord_tolerance': None, 'min_segment_length': 0.0}
+        return {'chord_tolerance': self.chord_tolerance.get(), 'min_segment_length': self.min_segment_length.get()}
     
     def toggle_processing_mode(self, *args):
         """切换单文件/批量处理模式"""
@@ -772,12 +357,41 @@ class GCodeSubdividerApp:
                     messagebox.showinfo("信息", "请先设置输入路径或输出目录")
     
     def log_message(self, message):
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        self.status_var.set(message)
-        self.root.update()
+        """记录一条日志（只放入队列，由 flush_log 批量显示）"""
+        self.log_queue.put(message)
+    
+    def flush_log(self):
+        """把队列中积累的日志一次插入文本框，然后重新定时"""
+        messages = []
+        try:
+            while True:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if messages:
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+            self.status_var.set(messages[-1])
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+    
+    def selected_log_level(self):
+        """界面选择的日志级别"""
+        return LOG_LEVELS.get(self.log_level.get(), arc_subdivider.LOG_INFO)
+    
+    def selected_cache(self):
+        """界面勾选使用缓存时返回 SubdivisionCache，否则返回 None"""
+        if not self.use_cache.get():
+            return None
+        return subdivision_cache.SubdivisionCache()
+    
+    def clear_cache(self):
+        """删除全部细分缓存条目"""
+        cache = subdivision_cache.SubdivisionCache()
+        count = len(cache.entries())
+        cache.clear()
+        self.log_message(f"已清空细分缓存: {count} 个条目（{cache.cache_dir}）")
     
     def start_processing(self):
         """开始处理文件（单文件或批量）"""
@@ -788,7 +402,7 @@ class GCodeSubdividerApp:
             self.process_batch()
     
     def process_file(self):
-        """处理单个文件"""
+        """处理单个文件（在单独的工作进程中细分，界面保持响应，可取消）"""
         input_file = self.input_path.get()
         output_file = self.output_path.get()
         resolution = self.resolution.get()
@@ -803,22 +417,61 @@ class GCodeSubdividerApp:
             self.output_path.set(str(output_file))
         
         try:
+            chord_options = self.chord_options()
             self.log_message(f"开始处理文件: {input_file}")
             self.log_message(f"输出路径: {output_file}")
-            self.log_message(f"使用分辨率: {resolution}度")
+            if chord_options['chord_tolerance'] is not None:
+                self.log_message(f"使用弦高误差: {chord_options['chord_tolerance']}mm（对比基准分辨率: {resolution}度）")
+            else:
+                self.log_message(f"使用分辨率: {resolution}度")
             
-            # 处理文件
-            subdivider = ArcSubdivider(angular_resolution=resolution, log_message=self.log_message)
-            output_path = subdivider.process_gcode_path(input_file, output_file)
+            # 在主线程读取全部设置，工作进程只接收可 pickle 的参数
+            options = dict(angular_resolution=resolution, log_level=self.selected_log_level(),
+                           cache=self.selected_cache(), **chord_options)
             
-            self.log_message("处理成功! 文件已保存")
-            messagebox.showinfo("成功", f"处理完成!\n输出文件: {output_path}")
+            # 显示进度条（按已读取的输入字节数）
+            self.progress.pack(pady=5, fill=tk.X)
+            self.progress["value"] = 0
+            self.progress["maximum"] = 100
+            
+            # 禁用处理按钮，启用取消按钮（结束后自动恢复）
+            self.file_task = background_tasks.run_in_background(
+                self.root, arc_subdivider.subdivide_task, input_file, str(output_file), options,
+                on_done=self.finish_file, on_error=self.file_failed, on_progress=self.update_file_progress,
+                on_log=self.log_message, on_cancelled=self.file_cancelled,
+                disable=[self.process_btn], enable=[self.cancel_btn], use_process=True)
         except Exception as e:
-            error_msg = f"处理失败: {str(e)}"
-            self.log_message(error_msg)
-            messagebox.showerror("错误", error_msg)
-            import traceback
-            traceback.print_exc()
+            self.file_failed(str(e), "")
+    
+    def finish_file(self, result):
+        """单文件处理完成"""
+        self.file_task = None
+        self.progress.pack_forget()
+        self.log_message("处理成功! 文件已保存（取自细分缓存）" if result['cached'] else "处理成功! 文件已保存")
+        messagebox.showinfo("成功", f"处理完成!\n输出文件: {result['output']}")
+    
+    def file_failed(self, message, details):
+        """单文件处理失败"""
+        self.file_task = None
+        self.progress.pack_forget()
+        error_msg = f"处理失败: {message}"
+        self.log_message(error_msg)
+        if details:
+            # 工作进程的异常堆栈写入日志框，便于排查
+            self.log_message(details.rstrip())
+        messagebox.showerror("错误", error_msg)
+    
+    def file_cancelled(self):
+        """单文件处理已取消（不完整的输出文件已删除）"""
+        self.file_task = None
+        self.progress.pack_forget()
+        self.log_message("已取消处理")
+        self.status_var.set("已取消")
+    
+    def update_file_progress(self, fraction, text=None):
+        """按已读取的输入字节比例更新进度条"""
+        if fraction is not None:
+            self.progress["value"] = fraction * 100
     
     def process_batch(self):
         """批量处理多个文件或目录"""
@@ -837,9 +490,12 @@ class GCodeSubdividerApp:
         
         # 获取文件列表
         file_paths = []
+        input_root = None
         if os.path.isdir(input_path):
             # 处理目录
             input_dir = input_path
+            # 输出保留相对输入目录的子路径，不同子目录下的同名文件互不覆盖
+            input_root = input_dir
             self.log_message(f"开始批量处理目录: {input_dir}")
             self.log_message(f"输出目录: {output_dir}")
             self.log_message(f"文件后缀: {', '.join(file_extensions)}")
@@ -860,6 +516,19 @@ class GCodeSubdividerApp:
             messagebox.showinfo("信息", "没有找到符合条件的文件")
             return
         
+        # 在主线程读取全部设置，工作进程只接收可 pickle 的参数
+        options = dict(angular_resolution=resolution, log_level=self.selected_log_level(),
+                       cache=self.selected_cache(), **self.chord_options())
+        
+        # 多个文件写到同一输出文件时会在并行处理中互相覆盖，拒绝处理
+        collisions = arc_subdivider.output_collisions(file_paths, output_dir, options, input_root)
+        if collisions:
+            for files in collisions:
+                self.log_message(f"输出文件名冲突: {', '.join(files)}")
+            messagebox.showerror("错误", f"有 {sum(len(files) for files in collisions)} 个文件的输出文件名相同"
+                                         f"（不同目录下的同名文件），请分开处理或选择包含它们的上级目录")
+            return
+        
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
@@ -867,76 +536,120 @@ class GCodeSubdividerApp:
         self.progress.pack(pady=5, fill=tk.X)
         self.progress["value"] = 0
         self.progress["maximum"] = len(file_paths)
-        
-        # 禁用处理按钮
+        try:
+            max_workers = max(1, int(self.batch_workers.get()))
+        except (tk.TclError, ValueError):
+            max_workers = None
+        
+        self.batch_runner = process_pool_runner.FilePoolRunner(
+            file_paths, arc_subdivider.subdivide_file, (output_dir, options, input_root),
+            max_workers=max_workers, error_log_dir=output_dir)
+        self.batch_stats = {}
+        self.batch_counts = {'success': 0, 'fail': 0, 'cancelled': 0}
+        self.log_message(f"共 {len(file_paths)} 个文件，使用 {self.batch_runner.worker_count} 个进程并行处理")
+        self.status_var.set(f"处理中: 0/{len(file_paths)}")
+        
+        # 禁用处理按钮，启用取消按钮
         self.process_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
         
-        # 在单独的线程中处理批量任务
-        threading.Thread(target=self.run_batch_processing, args=(file_paths, output_dir, resolution), daemon=True).start()
+        self.batch_runner.start()
+        self.root.after(100, self.poll_batch_results)
+    
+    def cancel_processing(self):
+        """取消单文件或批量处理：未开始的文件不再处理，正在处理的文件尽快停止并删除不完整的输出"""
+        if self.file_task is not None and not self.file_task.cancel_requested:
+            self.file_task.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.log_message("正在取消处理...")
+            self.status_var.set("正在取消...")
+        if self.batch_runner is not None and not self.batch_runner.cancelled:
+            self.batch_runner.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.log_message("正在取消批量处理...")
+            self.status_var.set("正在取消...")
     
-    def run_batch_processing(self, file_paths, output_dir, resolution):
-        """执行批量处理任务 - 优化内存使用"""
-        total_files = len(file_paths)
-        success_count = 0
-        fail_count = 0
-        
-        for i, input_file in enumerate(file_paths):
-            # 每个文件使用新的ArcSubdivider实例
-            subdivider = None
+    def poll_batch_results(self):
+        """定时读取进程池返回的结果，更新进度、计数与日志"""
+        runner = self.batch_runner
+        if runner is None:
+            return
+        total_files = len(runner)
+        counts = self.batch_counts
+        while True:
             try:
-                # 更新进度和状态
-                self.status_var.set(f"处理中: {i+1}/{total_files} - {os.path.basename(input_file)}")
-                self.progress["value"] = i
-                self.root.update()
-                
-                # 创建带角度后缀的输出文件名
-                output_file = self.get_output_filename(input_file, resolution)
-                output_file = os.path.join(output_dir, output_file.name)
-                
-                # 处理文件 - 为每个文件创建新的实例
-                self.log_message(f"\n处理文件 {i+1}/{total_files}: {os.path.basename(input_file)}")
-                subdivider = ArcSubdivider(angular_resolution=resolution, log_message=self.log_message)
-                output_path = subdivider.process_gcode_path(input_file, output_file)
-                
-                self.log_message(f"处理成功: {output_path}")
-                success_count += 1
-                
-                # 显式删除实例以释放内存
-                del subdivider
-                subdivider = None
-                
-                # 强制垃圾回收
-                import gc
-                gc.collect()
-                
-            except Exception as e:
-                self.log_message(f"处理失败: {os.path.basename(input_file)} - {str(e)}")
-                fail_count += 1
-                
-                # 确保实例被删除
-                if subdivider is not None:
-                    del subdivider
-                    subdivider = None
-        
-        # 更新进度条完成
-        self.progress["value"] = total_files
-        self.status_var.set(f"批量处理完成! 成功: {success_count}, 失败: {fail_count}")
+                message = runner.results.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == 'finished':
+                self.finish_batch(cancelled=message[1])
+                return
+            
+            input_file = message[1]
+            name = os.path.basename(input_file)
+            if kind == 'done':
+                result = message[2]
+                stats = result['stats']
+                for key, value in stats.items():
+                    self.batch_stats[key] = self.batch_stats.get(key, 0) + value
+                counts['success'] += 1
+                source = "，取自缓存" if result.get('cached') else ""
+                self.log_message(f"处理成功: {name}（{result['seconds']:.2f}秒{source}，细分圆弧 {stats['arcs_subdivided']} 个，"
+                                 f"生成点 {stats['points']} 个）-> {result['output']}")
+                if stats['warnings']:
+                    self.log_message(f"  {name}: {stats['warnings']} 条警告")
+            elif kind == 'cancelled':
+                counts['cancelled'] += 1
+                self.log_message(f"已取消: {name}")
+            else:
+                counts['fail'] += 1
+                self.log_message(message[2])
+            
+            finished_files = counts['success'] + counts['fail'] + counts['cancelled']
+            self.progress["value"] = finished_files
+            self.status_var.set(f"处理中: {finished_files}/{total_files} - {name}")
+        self.root.after(100, self.poll_batch_results)
+    
+    def finish_batch(self, cancelled):
+        """批量处理结束：恢复按钮并显示摘要"""
+        runner = self.batch_runner
+        self.batch_runner = None
+        counts = self.batch_counts
+        total_files = len(runner)
+        # 取消时尚未开始的文件不会返回结果
+        skipped = total_files - counts['success'] - counts['fail'] - counts['cancelled']
         
-        # 显示摘要
-        summary = f"\n批量处理完成!\n总文件数: {total_files}\n成功: {success_count}\n失败: {fail_count}"
+        self.progress["value"] = total_files
+        title = "批量处理已取消" if cancelled else "批量处理完成"
+        self.status_var.set(f"{title}! 成功: {counts['success']}, 失败: {counts['fail']}")
+        
+        summary = (f"\n{title}!\n总文件数: {total_files}\n成功: {counts['success']}\n失败: {counts['fail']}\n"
+                   f"细分圆弧: {self.batch_stats.get('arcs_subdivided', 0)}\n生成点: {self.batch_stats.get('points', 0)}")
+        if cancelled:
+            summary += f"\n中途取消: {counts['cancelled']}\n未处理: {skipped}"
+        if counts['fail']:
+            summary += f"\n错误记录: {runner.error_log_path}"
         self.log_message(summary)
-        messagebox.showinfo("批量处理完成", summary)
+        messagebox.showinfo(title, summary)
         
         # 恢复处理按钮
         self.process_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
         # 隐藏进度条
         self.progress.pack_forget()
         
     def on_close(self):
         """窗口关闭时的处理"""
+        if self.batch_runner is not None:
+            self.batch_runner.cancel()
+        if self.file_task is not None:
+            self.file_task.cancel()
         self.root.destroy()
 
 if __name__ == "__main__":
+    # 打包后的程序启动进程池工作进程时需要
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = GCodeSubdividerApp(root)
     root.mainloop()
@@ -3,24 +3,25 @@ from tkinter import filedialog, messagebox, ttk
 import math
 import re
 import os
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
 import numpy as np
-import matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import collections
-import pandas as pd
 from typing import List, Tuple, Union
 from datetime import datetime
 # 在文件开头添加
 import sys
 import os
 import gc
-from scipy.signal import butter, filtfilt
-import chardet
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
+import multiprocessing
+import queue
+import threading
+import lazy_imports
+import steady_state_engine
+import range_query
+import parameter_sweep
+import channel_cache
+import pit_builder
+import plot_decimation
+import chart_interaction
+import background_tasks
 
 
 # 判断是否在打包环境中运行
@@ -34,21 +35,38 @@ else:
 # 设置黑体字体路径
 simhei_path = os.path.join(base_dir, 'SimHei.ttf')
 
-# 检查字体文件是否存在
-if os.path.exists(simhei_path):
-    # 添加字体到matplotlib
-    import matplotlib.font_manager as fm
-    fm.fontManager.addfont(simhei_path)
-    
-    # 设置matplotlib使用中文字体
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['font.sans-serif'] = ['SimHei']
-    plt.rcParams['axes.unicode_minus'] = False
-else:
-    print(f"警告: 字体文件 {simhei_path} 未找到，将使用系统默认字体")
-# 设置matplotlib使用中文字体
-matplotlib.rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体
-matplotlib.rcParams['axes.unicode_minus'] = False    # 解决负号显示问题
+_fonts_configured = False
+
+
+def _configure_matplotlib(module):
+    """首次导入任一 matplotlib 相关模块时注册中文字体（只执行一次）"""
+    global _fonts_configured
+    if _fonts_configured:
+        return
+    _fonts_configured = True
+    if not os.path.exists(simhei_path):
+        print(f"警告: 字体文件 {simhei_path} 未找到，将使用系统默认字体")
+    # 设置matplotlib使用中文字体（黑体），解决负号显示问题
+    pit_plots.configure_fonts(simhei_path)
+
+
+def _configure_pandas(module):
+    """首次导入 pandas 时减少内存使用与链式赋值警告"""
+    module.options.mode.chained_assignment = None  # 禁用链式赋值警告
+    module.options.display.float_format = '{:.6f}'.format
+
+
+# 重量级依赖延迟到首次使用时导入：matplotlib 在图表首次显示时，
+# pandas 只用于 Excel/CSV 读取，scipy 只用于低通滤波
+plt = lazy_imports.lazy("matplotlib.pyplot", _configure_matplotlib)
+matplotlib = lazy_imports.lazy("matplotlib", _configure_matplotlib)
+backend_tkagg = lazy_imports.lazy("matplotlib.backends.backend_tkagg", _configure_matplotlib)
+pit_plots = lazy_imports.lazy("pit_plots", _configure_matplotlib)
+batch_pipeline = lazy_imports.lazy("batch_pipeline", _configure_matplotlib)
+figure_export = lazy_imports.lazy("figure_export", _configure_matplotlib)
+interval_artists = lazy_imports.lazy("interval_artists", _configure_matplotlib)
+pd = lazy_imports.lazy("pandas", _configure_pandas)
+scipy_signal = lazy_imports.lazy("scipy.signal")
 
 class MillingAnalysisTool:
     def __init__(self, root):
@@ -90,7 +108,7 @@ class MillingAnalysisTool:
         self.p_rated = tk.DoubleVar(value=0.0)    # 额定功率 P_rated (W), 0 表示不启用硬约束
         self.z_impedance = tk.DoubleVar(value=120.0)  # 阻抗系数 Z(s) (W/(mm³/s))
         self.data = []  # 存储处理后的数据
-        self.figures = []  # 存储图表对象
+        self.figures = pit_plots.LazyFigures()  # 图表（首次查看时构建）
         self.current_figure_index = 0  # 当前显示的图表索引
         self.figure_names = []  # 图表名称列表
         self.min_length = tk.IntVar(value=100)  # 最小区间长度
@@ -99,6 +117,7 @@ class MillingAnalysisTool:
         self.currents = None  # 电流数据
         self.cumulative_time = None  # 累计时间
         self.intervals = None  # 稳态区间
+        self.steady_engine = "vectorized"  # 稳态区间划分计算引擎（loop / vectorized，结果一致）
         self.processed_file_path = ""  # 处理后的文件路径
         self.processed_data_dir = None  # 添加这个实例变量
         self.batch_files = []  # 存储批量处理的文件列表
@@ -123,6 +142,8 @@ class MillingAnalysisTool:
         self.steady_threshold = tk.DoubleVar(value=0.2)  # 稳态区间划分的波动阈值
         self.actual_current_threshold = tk.DoubleVar(value=0.2)  # 实际电流稳态区间划分的波动阈值
         self.batch_threshold = tk.DoubleVar(value=0.2)  # 批量处理的波动阈值
+        self.batch_workers = tk.IntVar(value=os.cpu_count() or 1)  # 批量处理的并行进程数
+        self.batch_runner = None  # 正在运行的批量处理流水线
         
         # 添加滤波相关变量
         self.cutoff_freq = tk.DoubleVar(value=0.1)  # 截止频率
@@ -131,6 +152,13 @@ class MillingAnalysisTool:
         # 添加MRR稳态区间划分相关变量
         self.mrr_min_length = tk.DoubleVar(value=10.0)  # MRR稳态区间最小行程长度 (mm)
         self.enable_mrr_steady = tk.BooleanVar(value=True)  # 是否启用MRR稳态区间划分
+        self.expand_arcs = tk.BooleanVar(value=False)  # 生成工艺信息表时直接展开G2/G3圆弧
+        self.arc_resolution = tk.DoubleVar(value=5.0)  # 圆弧展开的每段角度 (度)
+        self.export_full_resolution = tk.BooleanVar(value=False)  # 导出图片时使用全部样本（不降采样）
+        self.export_rasterize_dense = tk.BooleanVar(value=False)  # SVG 中栅格化点数很多的曲线
+        self.export_queue = None  # 后台导出队列（首次导出时创建）
+        self._export_polling = False
+        self.background_task = None  # 正在运行的后台任务（加载、分析、一键处理，同一时间只运行一个）
         self.mrr_intervals = []  # 存储MRR稳态区间
         self.filtered_data = None  # 滤波后的数据
         self.is_filtered = False  # 滤波状态标志
@@ -167,9 +195,8 @@ class MillingAnalysisTool:
         # 创建界面
         self.create_data_processing_tab()
         # self.create_steady_state_tab()  # 已合并到工艺信息分析页
-        # 初始化图表
-        self.init_figures()
-        self.optimize_processing()  # 添加性能优化
+        # 图表在预览区首次显示时才创建（届时才导入 matplotlib），窗口可以先显示出来
+        self.create_when_shown(self.data_figure_frame, self.create_preview_figures)
         
         # 添加窗口大小变化监听器
         self.root.bind("<Configure>", self.on_window_resize)
@@ -418,9 +445,20 @@ class MillingAnalysisTool:
         analyze_btn = ttk.Button(button_frame, text="运行分析", command=self.analyze_actual_load_data)
         analyze_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=20, ipady=5)
         
+        sweep_btn = ttk.Button(button_frame, text="参数扫描", command=self.show_parameter_sweep_dialog)
+        sweep_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=20, ipady=5)
+        
         save_btn = ttk.Button(button_frame, text="保存结果", command=self.save_actual_load_results)
         save_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=20, ipady=5)
         
+        self.actual_load_cancel_btn = ttk.Button(button_frame, text="取消", command=self.cancel_background_task, state=tk.DISABLED)
+        self.actual_load_cancel_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=10, ipady=5)
+        # 加载数据在后台运行时禁用的按钮
+        self.actual_load_action_buttons = [load_btn, filter_btn, analyze_btn, sweep_btn, save_btn]
+        
+        ttk.Checkbutton(button_frame, text="导出完整分辨率", variable=self.export_full_resolution).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(button_frame, text="SVG栅格化密集曲线", variable=self.export_rasterize_dense).pack(side=tk.LEFT, padx=5)
+        
         # 状态栏
         self.status_var_actual_load = tk.StringVar()
         self.status_var_actual_load.set("就绪")
@@ -452,7 +490,7 @@ class MillingAnalysisTool:
         self.ax_actual_load.set_facecolor('white')
         
         # 创建画布并确保完全填充父框架
-        self.canvas_actual_load = FigureCanvasTkAgg(self.fig_actual_load, master=self.actual_load_figure_frame)
+        self.canvas_actual_load = backend_tkagg.FigureCanvasTkAgg(self.fig_actual_load, master=self.actual_load_figure_frame)
         canvas_widget = self.canvas_actual_load.get_tk_widget()
         canvas_widget.pack(fill=tk.BOTH, expand=True, padx=0, pady=0)
         
@@ -460,7 +498,7 @@ class MillingAnalysisTool:
         canvas_widget.configure(relief=tk.FLAT, bd=0)
         
         # 添加导航工具栏，固定在底部
-        self.toolbar_actual_load = NavigationToolbar2Tk(self.canvas_actual_load, self.actual_load_figure_frame)
+        self.toolbar_actual_load = backend_tkagg.NavigationToolbar2Tk(self.canvas_actual_load, self.actual_load_figure_frame)
         self.toolbar_actual_load.update()
         self.toolbar_actual_load.pack(side=tk.BOTTOM, fill=tk.X)
         
@@ -490,6 +528,8 @@ class MillingAnalysisTool:
         self.actual_load_unique_line_numbers = []
         self.actual_load_intervals = []
         self.actual_load_interval_values = []
+        self.actual_load_range_index = None  # 原始数据的区间查询索引
+        self.filtered_range_index = None  # 滤波数据的区间查询索引
         # 稳态分析的程序行号和点数索引
         self.steady_line_numbers = []
         self.steady_point_indices = []
@@ -651,6 +691,7 @@ class MillingAnalysisTool:
         data_len = len(analysis_data)
         line_len = len(self.actual_load_line_numbers)
         point_len = len(self.actual_load_point_indices)
+        index = self.get_actual_load_range_index()
         
         for i, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
             # 索引边界保护
@@ -662,6 +703,9 @@ class MillingAnalysisTool:
                 continue  # 跳过异常区间
             
             try:
+                # 计算区间平均值
+                self.actual_load_interval_values.append(index.mean(start_idx, end_idx))
+                
                 # 获取程序行号和行内索引
                 start_ln = self.actual_load_line_numbers[start_idx]
                 start_point_idx = self.actual_load_point_indices[start_idx]
@@ -683,6 +727,14 @@ class MillingAnalysisTool:
         if not self.actual_load_interval_values:
             self.actual_load_result_text.insert(tk.END, "\n未能生成有效区间，请检查阈值设置或重新加载数据。\n")
 
+    def get_actual_load_range_index(self):
+        """获取当前分析数据（原始或滤波后）的区间查询索引，数据变化后自动重建"""
+        if self.is_filtered and self.filtered_data is not None:
+            self.filtered_range_index = range_query.index_for(self.filtered_data, self.filtered_range_index)
+            return self.filtered_range_index
+        self.actual_load_range_index = range_query.index_for(self.actual_load_data, self.actual_load_range_index)
+        return self.actual_load_range_index
+
     def plot_steady_intervals(self, data_type):
         """绘制稳态区间"""
         self.ax_actual_load.clear()
@@ -698,15 +750,15 @@ class MillingAnalysisTool:
             return
         
         # 绘制所有数据点
-        self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data,
-                                 '-', color='#1f77b4', linewidth=2.5, label=f'{self.get_data_source_name()}值', 
-                                 alpha=0.9, zorder=5)
+        plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data,
+                                                  '-', color='#1f77b4', linewidth=2.5, label=f'{self.get_data_source_name()}值', 
+                                                  alpha=0.9, zorder=5)
         
         # 如果有滤波数据，也绘制滤波后的数据
         if self.is_filtered and self.filtered_data is not None:
-            self.ax_actual_load.plot(self.actual_load_x_positions, self.filtered_data,
-                                     '-', color='#ff7f0e', linewidth=3.0, label='滤波后数据', 
-                                     alpha=0.95, zorder=6)
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.filtered_data,
+                                                      '-', color='#ff7f0e', linewidth=3.0, label='滤波后数据', 
+                                                      alpha=0.95, zorder=6)
         
         # 标记稳态区间 - 使用清晰的配色
         if self.actual_load_intervals:
@@ -721,20 +773,16 @@ class MillingAnalysisTool:
                 '#ffddcc',  # 淡橙
                 '#ddffcc',  # 淡草绿
             ]
-            for idx, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
-                if start_idx < 0 or end_idx >= len(self.actual_load_x_positions):
-                    continue
-                start_x = self.actual_load_x_positions[start_idx]
-                end_x = self.actual_load_x_positions[end_idx]
-                color = interval_colors[idx % len(interval_colors)]
-                self.ax_actual_load.axvspan(start_x, end_x, alpha=0.5, color=color, 
-                                           edgecolor='black', linewidth=1.5, zorder=1)
-                
-                # 添加边界线
-                self.ax_actual_load.axvline(x=start_x, color='red', linewidth=2.0, alpha=0.7, 
-                                           linestyle='--', zorder=4)
-                self.ax_actual_load.axvline(x=end_x, color='red', linewidth=2.0, alpha=0.7, 
-                                           linestyle='--', zorder=4)
+            # 全部区间的色块与边界线各画成一个集合
+            starts, ends, ids = interval_artists.interval_x_ranges(self.actual_load_intervals,
+                                                                   self.actual_load_x_positions)
+            colors = interval_artists.cycle_colors(interval_colors, ids)
+            interval_artists.span_collection(self.ax_actual_load, starts, ends, colors, alpha=0.5,
+                                             linewidth=1.5, zorder=1)
+            
+            # 添加边界线
+            interval_artists.boundary_collection(self.ax_actual_load, np.concatenate([starts, ends]), 'red',
+                                                 linewidth=2.0, alpha=0.7, linestyle='--', zorder=4)
         
         # 重新绘制分割线（确保它们在所有操作后保持显示）
         self.redraw_segment_lines()
@@ -858,7 +906,8 @@ class MillingAnalysisTool:
             
             if i == segment_index:
                 # 当前分析的分段，使用高亮显示
-                self.ax_actual_load.plot(
+                plot_decimation.plot(
+                    self.ax_actual_load,
                     self.actual_load_x_positions[start_idx:end_idx], 
                     self.actual_load_data[start_idx:end_idx],
                     '-', color='#00d4ff', linewidth=3.0, alpha=1.0, 
@@ -867,7 +916,8 @@ class MillingAnalysisTool:
                 
                 # 如果有滤波数据，也高亮显示
                 if self.is_filtered and self.filtered_data is not None:
-                    self.ax_actual_load.plot(
+                    plot_decimation.plot(
+                        self.ax_actual_load,
                         self.actual_load_x_positions[start_idx:end_idx], 
                         self.filtered_data[start_idx:end_idx],
                         '-', color='#ff00ff', linewidth=3.0, alpha=1.0, 
@@ -875,7 +925,8 @@ class MillingAnalysisTool:
                     )
             else:
                 # 其他分段，使用较淡的显示
-                self.ax_actual_load.plot(
+                plot_decimation.plot(
+                    self.ax_actual_load,
                     self.actual_load_x_positions[start_idx:end_idx], 
                     self.actual_load_data[start_idx:end_idx],
                     '-', color='#556677', linewidth=1.2, alpha=0.4, zorder=2
@@ -887,21 +938,16 @@ class MillingAnalysisTool:
                 '#00ff41', '#ff3366', '#ffff00', '#00ffff', 
                 '#ff9500', '#9d00ff', '#00ff9d', '#ff006e',
             ]
-            for idx, (start_idx, end_idx) in enumerate(intervals):
-                if start_idx < 0 or end_idx >= len(self.actual_load_x_positions):
-                    continue
-                start_x = self.actual_load_x_positions[start_idx]
-                end_x = self.actual_load_x_positions[end_idx]
-                color = interval_colors[idx % len(interval_colors)]
-                self.ax_actual_load.axvspan(start_x, end_x, alpha=0.18, color=color, 
-                                          edgecolor=color, linewidth=2.0, zorder=1,
-                                          label='稳态区间' if idx == 0 else "")
-                
-                # 添加更清晰明亮的纵向边界线
-                self.ax_actual_load.axvline(x=start_x, color=color, linewidth=2.5, alpha=0.9, 
-                                           linestyle='--', zorder=4)
-                self.ax_actual_load.axvline(x=end_x, color=color, linewidth=2.5, alpha=0.9, 
-                                           linestyle='--', zorder=4)
+            # 全部区间的色块与边界线各画成一个集合
+            starts, ends, ids = interval_artists.interval_x_ranges(intervals, self.actual_load_x_positions)
+            colors = interval_artists.cycle_colors(interval_colors, ids)
+            interval_artists.span_collection(self.ax_actual_load, starts, ends, colors, alpha=0.18,
+                                             linewidth=2.0, zorder=1, label='稳态区间')
+            
+            # 添加更清晰明亮的纵向边界线
+            interval_artists.boundary_collection(self.ax_actual_load, np.concatenate([starts, ends]),
+                                                 np.concatenate([colors, colors]), linewidth=2.5, alpha=0.9,
+                                                 linestyle='--', zorder=4)
         
         # 高亮当前分析的分段范围
         seg_start_x = self.actual_load_x_positions[current_segment['start_idx']]
@@ -995,52 +1041,35 @@ class MillingAnalysisTool:
             return
         
         # 绘制全部数据点 - 使用科技感霓虹配色
-        self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data,
-                                 '-', color='#00d4ff', linewidth=2.5, alpha=0.9, 
-                                 label=f'{self.get_data_source_name()}值', zorder=5)
+        plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data,
+                                                  '-', color='#00d4ff', linewidth=2.5, alpha=0.9, 
+                                                  label=f'{self.get_data_source_name()}值', zorder=5)
         
         # 如果有滤波数据，也绘制滤波后的数据
         if self.is_filtered and self.filtered_data is not None:
-            self.ax_actual_load.plot(self.actual_load_x_positions, self.filtered_data,
-                                     '-', color='#ff00ff', linewidth=3.0, alpha=0.95, 
-                                     label='滤波后数据', zorder=6)
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.filtered_data,
+                                                      '-', color='#ff00ff', linewidth=3.0, alpha=0.95, 
+                                                      label='滤波后数据', zorder=6)
         
-        # 绘制所有分段的稳态区间高亮背景和边界线
-        legend_added = set()  # 避免重复的图例
+        # 绘制所有分段的稳态区间高亮背景和边界线（图例中各只出现一次）
         
         # 使用高对比度霓虹配色
         interval_colors = [
             '#00ff41', '#ff3366', '#ffff00', '#00ffff', 
             '#ff9500', '#9d00ff', '#00ff9d', '#ff006e',
         ]
-        interval_idx = 0
-        for i, segment in enumerate(self.segments):
-            # 绘制该分段的稳态区间
-            if 'intervals' in segment and segment['intervals']:
-                for start_interval, end_interval in segment['intervals']:
-                    if start_interval < 0 or end_interval >= len(self.actual_load_x_positions):
-                        continue
-                    start_x = self.actual_load_x_positions[start_interval]
-                    end_x = self.actual_load_x_positions[end_interval]
-                    
-                    color = interval_colors[interval_idx % len(interval_colors)]
-                    interval_idx += 1
-                    # 绘制稳态区间的背景高亮
-                    self.ax_actual_load.axvspan(start_x, end_x, alpha=0.18, color=color,
-                                              edgecolor=color, linewidth=2.0, zorder=1,
-                                              label='稳态区间' if '稳态区间' not in legend_added else "")
-                    legend_added.add('稳态区间')
-                    
-                    # 绘制纵向边界线 - 使用霓虹虚线样式
-                    # 起始边界线
-                    self.ax_actual_load.axvline(x=start_x, color=color, linestyle='--', 
-                                              linewidth=2.5, alpha=0.9, zorder=4,
-                                              label='稳态区间边界' if '稳态区间边界' not in legend_added else "")
-                    
-                    # 结束边界线
-                    self.ax_actual_load.axvline(x=end_x, color=color, linestyle='--', 
-                                              linewidth=2.5, alpha=0.9, zorder=4)
-                    legend_added.add('稳态区间边界')
+        all_intervals = [interval for segment in self.segments for interval in (segment.get('intervals') or [])]
+        starts, ends, _ = interval_artists.interval_x_ranges(all_intervals, self.actual_load_x_positions)
+        if len(starts):
+            # 颜色按有效区间的顺序循环；全部区间的色块与边界线各画成一个集合
+            colors = interval_artists.cycle_colors(interval_colors, np.arange(len(starts)))
+            interval_artists.span_collection(self.ax_actual_load, starts, ends, colors, alpha=0.18,
+                                             linewidth=2.0, zorder=1, label='稳态区间')
+            
+            # 纵向边界线 - 使用霓虹虚线样式
+            interval_artists.boundary_collection(self.ax_actual_load, np.concatenate([starts, ends]),
+                                                 np.concatenate([colors, colors]), linewidth=2.5, alpha=0.9,
+                                                 linestyle='--', zorder=4, label='稳态区间边界')
         
         # 重新绘制分割线
         self.redraw_segment_lines()
@@ -1180,8 +1209,8 @@ class MillingAnalysisTool:
         try:
             nyq = 0.5 * fs  # 奈奎斯特频率
             normal_cutoff = cutoff / nyq
-            b, a = butter(order, normal_cutoff, btype='low', analog=False)
-            y = filtfilt(b, a, data)
+            b, a = scipy_signal.butter(order, normal_cutoff, btype='low', analog=False)
+            y = scipy_signal.filtfilt(b, a, data)
             return y
         except ImportError:
             # 如果scipy不可用，使用简单的移动平均滤波
@@ -1193,7 +1222,7 @@ class MillingAnalysisTool:
 
     def apply_filter(self):
         """应用低通滤波器到数据"""
-        if not hasattr(self, 'actual_load_data') or not self.actual_load_data:
+        if not self.has_actual_load_data():
             messagebox.showwarning("无数据", "请先加载数据文件")
             return
         
@@ -1226,10 +1255,10 @@ class MillingAnalysisTool:
             self.ax_actual_load.clear()
             
             # 绘制原始数据和滤波后的数据
-            self.ax_actual_load.plot(self.actual_load_x_positions, data_array, 
-                                    'b-', linewidth=0.5, alpha=0.7, label='原始数据')
-            self.ax_actual_load.plot(self.actual_load_x_positions, filtered_data, 
-                                    'r-', linewidth=1.5, label='滤波后数据')
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, data_array, 
+                                                     'b-', linewidth=0.5, alpha=0.7, label='原始数据')
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, filtered_data, 
+                                                     'r-', linewidth=1.5, label='滤波后数据')
             
             # 根据数据源设置标题和标签
             data_source = self.data_source_var.get()
@@ -1327,10 +1356,8 @@ class MillingAnalysisTool:
         self.actual_load_result_text.insert(tk.END, "分析结果将显示在这里...")
 
     def load_actual_load_data(self):
-        """加载实际负载数据"""
+        """加载实际负载数据（读取与建索引在后台线程中进行，完成后绘制预览）"""
 
-        self.filtered_data = None  # 兼容
-        self.is_filtered = False
         file_path = self.actual_load_input_path.get()
         
         if not file_path:
@@ -1341,251 +1368,246 @@ class MillingAnalysisTool:
             messagebox.showerror("错误", f"文件不存在: {file_path}")
             return
         
-        try:
-            # 根据文件扩展名选择不同的读取方式
-            if file_path.endswith('.xlsx'):
-                # 读取Excel文件
-                df = pd.read_excel(file_path, header=None)
+        if self.is_task_running():
+            return
+        
+        self.filtered_data = None  # 兼容
+        self.is_filtered = False
+        # 后台线程不能读取 tk 变量，先取出设置
+        encoding_choice = self.actual_load_encoding_var.get()
+        data_source = self.data_source_var.get()
+        source_name = self.get_data_source_name()
+        
+        self.status_var_actual_load.set(f"正在加载 {os.path.basename(file_path)}...")
+        self.run_task(self.actual_load_data_task, file_path, encoding_choice, data_source, source_name,
+                      status_var=self.status_var_actual_load, action_buttons=self.actual_load_action_buttons,
+                      cancel_button=self.actual_load_cancel_btn, on_done=self.show_actual_load_data,
+                      error_title="加载错误", error_text="加载数据时发生错误", failed_text="加载失败")
+
+    def actual_load_data_task(self, context, file_path, encoding_choice, data_source, source_name):
+        """
+        后台读取实际负载采集文件（不访问界面控件）
+
+        返回:
+            dict：数据、行号、区间索引、x 轴位置等，由 show_actual_load_data 显示
+        """
+        # 读取采集文件：旁路缓存有效时直接映射缓存数组，否则解析文本并写入缓存
+        separator = ',' if file_path.endswith('.csv') else '\t'
+        
+        def report_progress(bytes_done, total_bytes):
+            context.check_cancelled()
+            context.progress(bytes_done / total_bytes if total_bytes else None)
+        
+        def parse_capture():
+            if not file_path.endswith('.xlsx'):
+                # 文本/CSV 文件按二进制块流式解析，直接写入数值数组
+                if encoding_choice == "auto":
+                    encoding = self.detect_file_encoding(file_path)
+                else:
+                    encoding = encoding_choice
+                if channel_cache.is_byte_parsable(encoding):
+                    return channel_cache.parse_capture_file(file_path, encoding, separator,
+                                                            progress_callback=report_progress)
+            
+            content, encoding = self.read_actual_load_content(file_path, encoding_choice)
+            context.check_cancelled()
+            return channel_cache.parse_capture_lines(content.split('\n'), separator, encoding)
+        
+        context.progress(0.0, f"正在读取 {os.path.basename(file_path)}...")
+        capture = channel_cache.load_capture(file_path, encoding_choice, parse_capture)
+        context.check_cancelled()
+        
+        if not capture.channel_info or capture.num_samples == 0:
+            raise ValueError("文件格式不正确，缺少必要的标签")
+        
+        # 根据选择的数据源查找对应数据列的位置
+        target_col, line_number_col = capture.find_columns(data_source)
+        
+        if target_col == -1 or line_number_col == -1:
+            raise ValueError(f"文件中未找到{source_name}或程序行号信息")
+        
+        # 提取数据列（剔除无法解析的采样点），并记录每个数据点在其行内的索引
+        data, line_numbers = channel_cache.select_channels(capture, target_col, line_number_col)
+        
+        if len(data) == 0:
+            raise ValueError("未能提取有效数据")
+        
+        # 构建区间查询索引，后续区间统计均为O(1)查询
+        context.progress(None, "正在建立区间索引...")
+        range_index = range_query.RangeQueryIndex(data)
+        context.check_cancelled()
+        
+        # 计算x轴位置: 行号 + 行内索引/行内总数（所有行号相同时即均匀分布在[N, N+1)内）
+        point_indices, x_positions = channel_cache.line_positions(line_numbers)
+        
+        return {
+            'file_path': file_path,
+            'capture': capture,
+            'data': data,
+            'line_numbers': line_numbers,
+            'range_index': range_index,
+            'point_indices': point_indices,
+            'x_positions': x_positions,
+            'unique_line_numbers': np.unique(line_numbers).tolist(),
+            'data_source': data_source,
+            'source_name': source_name,
+        }
+
+    def show_actual_load_data(self, loaded):
+        """显示 actual_load_data_task 读取的数据并绘制预览"""
+        file_path = loaded['file_path']
+        capture = loaded['capture']
+        encoding = capture.encoding
+        source_name = loaded['source_name']
+        self.actual_load_data = loaded['data']
+        self.actual_load_line_numbers = loaded['line_numbers']
+        self.actual_load_range_index = loaded['range_index']
+        self.actual_load_point_indices = loaded['point_indices']
+        self.actual_load_x_positions = loaded['x_positions']
+        unique_line_numbers = loaded['unique_line_numbers']
+        
+        # 显示数据摘要
+        cache_note = "（读取缓存）" if capture.from_cache else ""
+        self.status_var_actual_load.set(f"成功加载{source_name}数据: {len(self.actual_load_data)}个数据点{cache_note}")
+        self.actual_load_result_text.delete(1.0, tk.END)
+        self.actual_load_result_text.insert(tk.END, f"数据文件: {os.path.basename(file_path)}\n")
+        if not file_path.endswith('.xlsx') and not file_path.endswith('.csv'):
+            self.actual_load_result_text.insert(tk.END, f"文件编码: {encoding}\n")
+        self.actual_load_result_text.insert(tk.END, f"数据点数: {len(self.actual_load_data)}\n")
+        if capture.parse_stats:
+            stats = capture.parse_stats
+            self.actual_load_result_text.insert(tk.END, f"解析速度: {stats['mb_per_s']:.1f} MB/s ({stats['bytes'] / (1 << 20):.1f} MB, {stats['seconds']:.2f} 秒)\n")
+        self.actual_load_result_text.insert(tk.END, f"{source_name}范围: {np.min(self.actual_load_data):.2f} - {np.max(self.actual_load_data):.2f}\n")
+        self.actual_load_result_text.insert(tk.END, f"程序行号范围: {np.min(self.actual_load_line_numbers):.0f} - {np.max(self.actual_load_line_numbers):.0f}\n")
+        
+        # 绘制原始数据预览 - 改为折线图
+        self.ax_actual_load.clear()
+        
+        # 使用plot而不是scatter，按顺序连接点成线
+        plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data, 'b-', linewidth=1.0)
+        
+        # 根据数据源设置标题和标签
+        data_source = loaded['data_source']
+        if data_source == "current":
+            title = '负载电流数据预览'
+            ylabel = '电流 (A)'
+        elif data_source == "vgpro_power":
+            title = 'VGpro功率数据预览'
+            ylabel = '功率'
+        else:  # huazhong_power
+            title = '华中模块功率数据预览'
+            ylabel = '功率'
+        
+        self.ax_actual_load.set_title(title)
+        self.ax_actual_load.set_xlabel('程序行号位置')
+        self.ax_actual_load.set_ylabel(ylabel)
+        
+        # 设置横轴刻度标签
+        if len(unique_line_numbers) == 1:
+            # 只有一个行号，显示该行号和下一个行号
+            n = unique_line_numbers[0]
+            self.ax_actual_load.set_xticks([n, n+0.5, n+1])
+            self.ax_actual_load.set_xticklabels([f"{n:.0f}", f"{n+0.5:.1f}", f"{n+1:.0f}"])
+        elif len(unique_line_numbers) > 20:
+            # 如果行号太多，只显示部分标签
+            step = max(1, len(unique_line_numbers) // 10)
+            tick_positions = range(0, len(unique_line_numbers), step)
+            tick_labels = [str(unique_line_numbers[i]) for i in tick_positions]
+            self.ax_actual_load.set_xticks(tick_positions)
+            self.ax_actual_load.set_xticklabels(tick_labels, rotation=45)
+        else:
+            self.ax_actual_load.set_xticks(range(len(unique_line_numbers)))
+            self.ax_actual_load.set_xticklabels([str(ln) for ln in unique_line_numbers], rotation=45)
+        
+        self.ax_actual_load.grid(True, linestyle='--', alpha=0.7)
+        self.canvas_actual_load.draw()
+        
+        # 设置图表交互功能
+        self.setup_chart_interactions()
+        
+        # 保存映射关系供后续使用
+        self.actual_load_unique_line_numbers = unique_line_numbers
+
+    def read_actual_load_content(self, file_path, encoding_choice=None):
+        """读取实际负载采集文件的文本内容
+        
+        参数:
+            encoding_choice: 编码选择（"auto" 为自动检测），None 表示取界面上的选择；
+                             在后台线程中调用时需传入
+        返回:
+            (文本内容, 文件编码)，Excel/CSV 文件经 pandas 读取时编码为 None
+        """
+        encoding = None
+        if encoding_choice is None:
+            encoding_choice = self.actual_load_encoding_var.get()
+        # 根据文件扩展名选择不同的读取方式
+        if file_path.endswith('.xlsx'):
+            # 读取Excel文件
+            df = pd.read_excel(file_path, header=None)
+            
+            # 将DataFrame转换为字符串列表，模拟文本文件的行
+            content_lines = []
+            for i in range(len(df)):
+                row = df.iloc[i].values
+                # 将行转换为字符串，用制表符分隔
+                line = '\t'.join([str(x) for x in row if pd.notna(x)])
+                content_lines.append(line)
+            
+            content = '\n'.join(content_lines)
+        elif file_path.endswith('.csv'):
+            # 读取CSV文件 - 改进CSV文件解析
+            try:
+                # 尝试自动检测分隔符
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    sample = f.read(4096)
+                
+                # 检测分隔符
+                if ',' in sample and '\t' not in sample:
+                    sep = ','
+                elif '\t' in sample and ',' not in sample:
+                    sep = '\t'
+                else:
+                    # 如果都有，优先使用逗号
+                    sep = ','
                 
-                # 将DataFrame转换为字符串列表，模拟文本文件的行
+                # 读取CSV文件
+                df = pd.read_csv(file_path, sep=sep, header=None, engine='python')
+                
+                # 将DataFrame转换为字符串列表
                 content_lines = []
                 for i in range(len(df)):
                     row = df.iloc[i].values
-                    # 将行转换为字符串，用制表符分隔
-                    line = '\t'.join([str(x) for x in row if pd.notna(x)])
+                    # 将行转换为字符串，使用检测到的分隔符
+                    line = sep.join([str(x) for x in row if pd.notna(x)])
                     content_lines.append(line)
                 
                 content = '\n'.join(content_lines)
-            elif file_path.endswith('.csv'):
-                # 读取CSV文件 - 改进CSV文件解析
-                try:
-                    # 尝试自动检测分隔符
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        sample = f.read(4096)
-                    
-                    # 检测分隔符
-                    if ',' in sample and '\t' not in sample:
-                        sep = ','
-                    elif '\t' in sample and ',' not in sample:
-                        sep = '\t'
-                    else:
-                        # 如果都有，优先使用逗号
-                        sep = ','
-                    
-                    # 读取CSV文件
-                    df = pd.read_csv(file_path, sep=sep, header=None, engine='python')
-                    
-                    # 将DataFrame转换为字符串列表
-                    content_lines = []
-                    for i in range(len(df)):
-                        row = df.iloc[i].values
-                        # 将行转换为字符串，使用检测到的分隔符
-                        line = sep.join([str(x) for x in row if pd.notna(x)])
-                        content_lines.append(line)
-                    
-                    content = '\n'.join(content_lines)
-                except Exception as e:
-                    # 如果读取失败，尝试使用原始文本方式
-                    encoding_choice = self.actual_load_encoding_var.get()
-                    if encoding_choice == "auto":
-                        encoding = self.detect_file_encoding(file_path)
-                    else:
-                        encoding = encoding_choice
-                    
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-            else:
-                # 确定文件编码
-                encoding_choice = self.actual_load_encoding_var.get()
+            except Exception as e:
+                # 如果读取失败，尝试使用原始文本方式
                 if encoding_choice == "auto":
                     encoding = self.detect_file_encoding(file_path)
                 else:
                     encoding = encoding_choice
                 
-                # 读取文本文件内容
                 with open(file_path, 'r', encoding=encoding) as f:
                     content = f.read()
-            
-            # 按行分割内容
-            lines = content.split('\n')
-            
-            # 收集ChannelInfo行和ChannelData行
-            channel_info_lines = []
-            channel_data_lines = []
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("<ChannelInfo>"):
-                    channel_info_lines.append(line)
-                elif line.startswith("<ChannelData>"):
-                    channel_data_lines.append(line)
-            
-            if not channel_info_lines or not channel_data_lines:
-                messagebox.showerror("错误", "文件格式不正确，缺少必要的标签")
-                return
-            
-            # 根据选择的数据源确定要提取的列
-            data_source = self.data_source_var.get()
-            
-            # 查找对应数据列的位置
-            target_col = -1
-            line_number_col = -1
-            
-            for i, line in enumerate(channel_info_lines):
-                # 分割ChannelInfo行的字段
-                if file_path.endswith('.csv'):
-                    # CSV文件使用逗号分隔
-                    fields = line.split(',')
-                else:
-                    # 其他文件使用制表符分隔
-                    fields = line.split('\t')
-                
-                # 第三个字段是通道名称（索引3），第六个字段是寄存器编号（索引6）
-                if len(fields) > 5:
-                    channel_name = fields[3].strip('<> ')
-                    register_number = fields[6].strip('<> ')
-                    
-                    if data_source == "current" and channel_name == '负载电流':
-                        target_col = i
-                    elif data_source == "vgpro_power" and register_number == '432':
-                        target_col = i
-                    elif data_source == "huazhong_power" and register_number == '108':
-                        target_col = i
-                    elif channel_name == '程序行号':
-                        line_number_col = i
-            
-            if target_col == -1 or line_number_col == -1:
-                messagebox.showerror("错误", f"文件中未找到{self.get_data_source_name()}或程序行号信息")
-                return
-            
-            # 解析数据
-            self.actual_load_data = []
-            self.actual_load_line_numbers = []
-            self.actual_load_point_indices = []  # 记录每个数据点在其行内的索引
-            
-            # 记录每行的数据点数量
-            line_point_counts = {}
-            
-            for line in channel_data_lines:
-                if file_path.endswith('.csv'):
-                    # CSV文件使用逗号分隔
-                    values = line.split(',')
-                else:
-                    # 其他文件使用制表符分隔
-                    values = line.split('\t')
-                    
-                if len(values) > max(target_col, line_number_col):
-                    try:
-                        # ChannelData行的第一个字段是<ChannelData>标签，数据从第二个字段开始
-                        # 所以列索引需要+1
-                        target_value = float(values[target_col + 1])
-                        line_number = float(values[line_number_col + 1])
-                        self.actual_load_data.append(target_value)
-                        self.actual_load_line_numbers.append(line_number)
-                        
-                        # 记录行内索引
-                        if line_number not in line_point_counts:
-                            line_point_counts[line_number] = 0
-                        else:
-                            line_point_counts[line_number] += 1
-                        
-                        self.actual_load_point_indices.append(line_point_counts[line_number])
-                    except (ValueError, IndexError):
-                        continue
-            
-            if not self.actual_load_data:
-                messagebox.showerror("错误", "未能提取有效数据")
-                return
-            
-            # 显示数据摘要
-            self.status_var_actual_load.set(f"成功加载{self.get_data_source_name()}数据: {len(self.actual_load_data)}个数据点")
-            self.actual_load_result_text.delete(1.0, tk.END)
-            self.actual_load_result_text.insert(tk.END, f"数据文件: {os.path.basename(file_path)}\n")
-            if not file_path.endswith('.xlsx') and not file_path.endswith('.csv'):
-                self.actual_load_result_text.insert(tk.END, f"文件编码: {encoding}\n")
-            self.actual_load_result_text.insert(tk.END, f"数据点数: {len(self.actual_load_data)}\n")
-            self.actual_load_result_text.insert(tk.END, f"{self.get_data_source_name()}范围: {min(self.actual_load_data):.2f} - {max(self.actual_load_data):.2f}\n")
-            self.actual_load_result_text.insert(tk.END, f"程序行号范围: {min(self.actual_load_line_numbers):.0f} - {max(self.actual_load_line_numbers):.0f}\n")
-            
-            # 计算x轴位置
-            unique_line_numbers = sorted(set(self.actual_load_line_numbers))
-            self.actual_load_x_positions = []
-            
-            if len(unique_line_numbers) == 1:
-                # 所有行号相同，均匀分布在[N, N+1)区间内
-                n = unique_line_numbers[0]
-                total_points = len(self.actual_load_line_numbers)
-                for i in range(total_points):
-                    # 在[N, N+1)区间内均匀分布
-                    self.actual_load_x_positions.append(n + i / total_points)
-            else:
-                # 为每个数据点计算唯一的x坐标: 行号 + 行内索引/行内总数
-                # 统计每个行号的总点数
-                line_point_counts = {}
-                for ln in self.actual_load_line_numbers:
-                    line_point_counts[ln] = line_point_counts.get(ln, 0) + 1
-                
-                # 为每个数据点计算x坐标
-                for i in range(len(self.actual_load_line_numbers)):
-                    ln = self.actual_load_line_numbers[i]
-                    pt_idx = self.actual_load_point_indices[i]
-                    total_pts = line_point_counts[ln]
-                    
-                    # x坐标 = 行号 + (行内索引 / 行内总数)
-                    x_pos = ln + pt_idx / total_pts
-                    self.actual_load_x_positions.append(x_pos)
-            
-            # 绘制原始数据预览 - 改为折线图
-            self.ax_actual_load.clear()
-            
-            # 使用plot而不是scatter，按顺序连接点成线
-            self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data, 'b-', linewidth=1.0)
-            
-            # 根据数据源设置标题和标签
-            data_source = self.data_source_var.get()
-            if data_source == "current":
-                title = '负载电流数据预览'
-                ylabel = '电流 (A)'
-            elif data_source == "vgpro_power":
-                title = 'VGpro功率数据预览'
-                ylabel = '功率'
-            else:  # huazhong_power
-                title = '华中模块功率数据预览'
-                ylabel = '功率'
-            
-            self.ax_actual_load.set_title(title)
-            self.ax_actual_load.set_xlabel('程序行号位置')
-            self.ax_actual_load.set_ylabel(ylabel)
-            
-            # 设置横轴刻度标签
-            if len(unique_line_numbers) == 1:
-                # 只有一个行号，显示该行号和下一个行号
-                n = unique_line_numbers[0]
-                self.ax_actual_load.set_xticks([n, n+0.5, n+1])
-                self.ax_actual_load.set_xticklabels([f"{n:.0f}", f"{n+0.5:.1f}", f"{n+1:.0f}"])
-            elif len(unique_line_numbers) > 20:
-                # 如果行号太多，只显示部分标签
-                step = max(1, len(unique_line_numbers) // 10)
-                tick_positions = range(0, len(unique_line_numbers), step)
-                tick_labels = [str(unique_line_numbers[i]) for i in tick_positions]
-                self.ax_actual_load.set_xticks(tick_positions)
-                self.ax_actual_load.set_xticklabels(tick_labels, rotation=45)
+        else:
+            # 确定文件编码
+            if encoding_choice == "auto":
+                encoding = self.detect_file_encoding(file_path)
             else:
-                self.ax_actual_load.set_xticks(range(len(unique_line_numbers)))
-                self.ax_actual_load.set_xticklabels([str(ln) for ln in unique_line_numbers], rotation=45)
-            
-            self.ax_actual_load.grid(True, linestyle='--', alpha=0.7)
-            self.canvas_actual_load.draw()
-            
-            # 设置图表交互功能
-            self.setup_chart_interactions()
-            
-            # 保存映射关系供后续使用
-            self.actual_load_unique_line_numbers = unique_line_numbers
+                encoding = encoding_choice
             
-        except Exception as e:
-            messagebox.showerror("加载错误", f"加载数据时发生错误:\n{str(e)}")
-            self.status_var_actual_load.set("加载失败")
+            # 读取文本文件内容
+            with open(file_path, 'r', encoding=encoding) as f:
+                content = f.read()
+        
+        return content, encoding
+
+    def has_actual_load_data(self):
+        """是否已加载实际负载数据（数据可能为列表或 NumPy 数组）"""
+        data = getattr(self, 'actual_load_data', None)
+        return data is not None and len(data) > 0
 
     def get_data_source_name(self):
         """获取当前数据源的名称"""
@@ -1599,7 +1621,7 @@ class MillingAnalysisTool:
 
     def analyze_actual_load_data(self):
         """分析实际负载数据"""
-        if not hasattr(self, 'actual_load_data') or not self.actual_load_data:
+        if not self.has_actual_load_data():
             messagebox.showwarning("无数据", "请先加载数据文件")
             return
         
@@ -1621,50 +1643,23 @@ class MillingAnalysisTool:
                 analysis_data = self.actual_load_data
                 data_type = "原始"
             
-            # 应用稳态区间划分算法 - 修改为按照程序行号顺序
-            # 首先按照程序行号对数据进行排序
-            sorted_indices = np.argsort(self.actual_load_line_numbers)
-            sorted_values = np.asarray(analysis_data)[sorted_indices]
-            sorted_line_numbers = np.asarray(self.actual_load_line_numbers)[sorted_indices]
-            
-            # 在排序后的数据上应用稳态区间划分
-            raw_intervals = self.find_steady_state_intervals(
-                sorted_values, 
-                min_len, 
+            # 应用稳态区间划分算法 - 按照程序行号顺序（排序后划分，再映射回原始索引）
+            reduce_interval = self.reduce_interval_actual_load.get()
+            self.actual_load_intervals = steady_state_engine.line_ordered_intervals(
+                analysis_data,
+                self.actual_load_line_numbers,
+                min_len,
                 threshold,
                 absolute_threshold,
-                adaptive=False,  # 禁用自适应，严格按照用户设置的阈值
-                respect_user_thresholds=True  # 尊重用户设置的阈值
+                reduce_interval=reduce_interval,
+                engine=self.steady_engine
             )
-            # 新增：再次检查并处理区间重叠（确保双重保护）
-            intervals = self.adjust_overlapping_intervals(raw_intervals, overlap_tolerance=10)
-            
-            # 将区间索引转换回原始数据索引
-            original_intervals = []
-            for start_idx, end_idx in intervals:
-                original_start = sorted_indices[start_idx]
-                original_end = sorted_indices[end_idx]
-                original_intervals.append((original_start, original_end))
             
-            # 确保区间按照程序行号顺序排列
-            original_intervals.sort(key=lambda x: self.actual_load_line_numbers[x[0]])
-            
-            if not original_intervals:
+            if not self.actual_load_intervals:
                 messagebox.showinfo("结果", "未找到稳态区间")
                 self.status_var_actual_load.set("未找到稳态区间")
                 return
             
-            # 根据复选框决定是否缩减区间
-            reduce_interval = self.reduce_interval_actual_load.get()
-            self.actual_load_intervals = []
-            for (start_idx, end_idx) in original_intervals:
-                if reduce_interval and end_idx - start_idx >= 2:
-                    adjusted_start = start_idx + 1
-                    adjusted_end = end_idx - 1
-                    self.actual_load_intervals.append((adjusted_start, adjusted_end))
-                else:
-                    self.actual_load_intervals.append((start_idx, end_idx))
-            
             # 保存当前区间供手动合并使用
             self.current_intervals = self.actual_load_intervals.copy()
             
@@ -1685,6 +1680,210 @@ class MillingAnalysisTool:
             messagebox.showerror("分析错误", f"分析过程中发生错误:\n{str(e)}")
             self.status_var_actual_load.set("分析失败")
 
+    def get_sorted_analysis_data(self):
+        """返回按程序行号排序后的分析数据（滤波后优先），与运行分析时使用的数据一致"""
+        if self.is_filtered and self.filtered_data is not None:
+            analysis_data = self.filtered_data
+        else:
+            analysis_data = self.actual_load_data
+        sorted_indices = np.argsort(self.actual_load_line_numbers)
+        return np.asarray(analysis_data, dtype=np.float64)[sorted_indices]
+
+    def show_parameter_sweep_dialog(self):
+        """参数扫描窗口：批量评估最小区间长度/波动阈值/绝对波动阈值组合，以表格和热力图显示"""
+        if not self.has_actual_load_data():
+            messagebox.showwarning("无数据", "请先加载数据文件")
+            return
+        
+        sweep_window = tk.Toplevel(self.root)
+        sweep_window.title("稳态区间参数扫描")
+        sweep_window.geometry("1100x700")
+        sweep_window.transient(self.root)
+        
+        # 参数网格输入
+        grid_frame = ttk.LabelFrame(sweep_window, text="参数网格（逗号分隔，或 起点:终点:步长）", padding="10")
+        grid_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        current_min_len = self.actual_load_min_length.get()
+        min_length_grid = tk.StringVar(value=f"{max(1, current_min_len // 2)},{current_min_len},{current_min_len * 2}")
+        rel_grid = tk.StringVar(value="0.05:0.30:0.05")
+        abs_grid = tk.StringVar(value="0.02:0.10:0.02")
+        
+        ttk.Label(grid_frame, text="最小区间长度:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(grid_frame, textvariable=min_length_grid, width=20).grid(row=0, column=1, padx=5, sticky=tk.W)
+        ttk.Label(grid_frame, text="波动阈值:").grid(row=0, column=2, sticky=tk.W, padx=(10, 0))
+        ttk.Entry(grid_frame, textvariable=rel_grid, width=20).grid(row=0, column=3, padx=5, sticky=tk.W)
+        ttk.Label(grid_frame, text="绝对波动阈值:").grid(row=0, column=4, sticky=tk.W, padx=(10, 0))
+        ttk.Entry(grid_frame, textvariable=abs_grid, width=20).grid(row=0, column=5, padx=5, sticky=tk.W)
+        
+        run_button = ttk.Button(grid_frame, text="开始扫描")
+        run_button.grid(row=0, column=6, padx=10)
+        
+        # 热力图显示选项
+        view_frame = ttk.Frame(sweep_window)
+        view_frame.pack(fill=tk.X, padx=10)
+        
+        metric_names = list(parameter_sweep.SWEEP_METRICS.values())
+        metric_var = tk.StringVar(value=parameter_sweep.SWEEP_METRICS["coverage"])
+        heatmap_min_length = tk.StringVar()
+        
+        ttk.Label(view_frame, text="热力图指标:").pack(side=tk.LEFT)
+        metric_combobox = ttk.Combobox(view_frame, textvariable=metric_var, values=metric_names, 
+                                       state="readonly", width=12)
+        metric_combobox.pack(side=tk.LEFT, padx=5)
+        ttk.Label(view_frame, text="最小区间长度:").pack(side=tk.LEFT, padx=(10, 0))
+        min_length_combobox = ttk.Combobox(view_frame, textvariable=heatmap_min_length, values=[], 
+                                           state="readonly", width=8)
+        min_length_combobox.pack(side=tk.LEFT, padx=5)
+        ttk.Label(view_frame, text="提示: 双击表格行可将该组参数应用到分析参数", 
+                  foreground='gray').pack(side=tk.LEFT, padx=10)
+        
+        # 结果表格（左）与热力图（右）
+        content_frame = ttk.Frame(sweep_window)
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        table_frame = ttk.Frame(content_frame)
+        table_frame.pack(side=tk.LEFT, fill=tk.BOTH)
+        
+        columns = ('最小区间长度', '波动阈值', '绝对波动阈值', '区间数', '覆盖率', '平均变异系数')
+        result_tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=20)
+        for col in columns:
+            result_tree.heading(col, text=col)
+            result_tree.column(col, width=80, anchor=tk.CENTER)
+        tree_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=result_tree.yview)
+        result_tree.configure(yscrollcommand=tree_scrollbar.set)
+        result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        figure_frame = ttk.Frame(content_frame)
+        figure_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        heatmap_fig = plt.figure(figsize=(6, 5), dpi=100)
+        heatmap_fig.add_subplot(111)
+        heatmap_canvas = backend_tkagg.FigureCanvasTkAgg(heatmap_fig, master=figure_frame)
+        heatmap_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        status_var = tk.StringVar(value="设置参数网格后点击“开始扫描”")
+        ttk.Label(sweep_window, textvariable=status_var, relief=tk.SUNKEN, anchor=tk.W).pack(side=tk.BOTTOM, fill=tk.X)
+        
+        sweep_state = {'result': None}
+        
+        def draw_heatmap(event=None):
+            result = sweep_state['result']
+            if result is None or not heatmap_min_length.get():
+                return
+            metric = next(key for key, name in parameter_sweep.SWEEP_METRICS.items() 
+                          if name == metric_var.get())
+            matrix, rel_values, abs_values = parameter_sweep.heatmap_grid(
+                result, metric, int(heatmap_min_length.get()))
+            
+            heatmap_fig.clear()
+            ax = heatmap_fig.add_subplot(111)
+            image = ax.imshow(matrix, origin='lower', aspect='auto', cmap='viridis')
+            heatmap_fig.colorbar(image, ax=ax, label=metric_var.get())
+            ax.set_xticks(range(len(abs_values)))
+            ax.set_xticklabels([f"{v:g}" for v in abs_values])
+            ax.set_yticks(range(len(rel_values)))
+            ax.set_yticklabels([f"{v:g}" for v in rel_values])
+            ax.set_xlabel('绝对波动阈值')
+            ax.set_ylabel('波动阈值')
+            ax.set_title(f"{metric_var.get()}（最小区间长度 = {heatmap_min_length.get()}）")
+            
+            # 单元格标注数值（网格较小时）
+            if matrix.size <= 100:
+                for i in range(matrix.shape[0]):
+                    for j in range(matrix.shape[1]):
+                        value = matrix[i, j]
+                        if np.isfinite(value):
+                            text = f"{value:.0f}" if metric == 'interval_count' else f"{value:.3f}"
+                            ax.text(j, i, text, ha='center', va='center', color='white', fontsize=8)
+            heatmap_canvas.draw_idle()
+        
+        def show_result(result):
+            sweep_state['result'] = result
+            result_tree.delete(*result_tree.get_children())
+            for row in result.itertuples(index=False):
+                mean_cv = f"{row.mean_cv:.4f}" if np.isfinite(row.mean_cv) else "-"
+                result_tree.insert('', tk.END, values=(
+                    row.min_length, f"{row.relative_threshold:g}", f"{row.absolute_threshold:g}",
+                    row.interval_count, f"{row.coverage:.2%}", mean_cv))
+            
+            min_length_values = [str(v) for v in sorted(result['min_length'].unique())]
+            min_length_combobox['values'] = min_length_values
+            if heatmap_min_length.get() not in min_length_values:
+                heatmap_min_length.set(min_length_values[len(min_length_values) // 2])
+            draw_heatmap()
+        
+        def run_sweep():
+            try:
+                min_lengths = parameter_sweep.parse_grid(min_length_grid.get(), cast=int)
+                rel_values = parameter_sweep.parse_grid(rel_grid.get())
+                abs_values = parameter_sweep.parse_grid(abs_grid.get())
+            except ValueError as e:
+                messagebox.showwarning("参数错误", f"参数网格格式错误:\n{str(e)}", parent=sweep_window)
+                return
+            if min(min_lengths) < 1:
+                messagebox.showwarning("参数错误", "最小区间长度必须大于0", parent=sweep_window)
+                return
+            
+            data = self.get_sorted_analysis_data()
+            reduce_interval = self.reduce_interval_actual_load.get()
+            combinations = len(min_lengths) * len(rel_values) * len(abs_values)
+            status_var.set(f"正在扫描 {combinations} 组参数...")
+            run_button.config(state=tk.DISABLED)
+            
+            # 在后台线程中计算，界面通过 after 轮询结果
+            results = queue.Queue()
+            
+            def worker():
+                try:
+                    start_time = datetime.now()
+                    result = parameter_sweep.sweep_parameters(
+                        data, min_lengths, rel_values, abs_values, reduce_interval=reduce_interval)
+                    elapsed = (datetime.now() - start_time).total_seconds()
+                    results.put(('result', result, elapsed))
+                except Exception as e:
+                    results.put(('error', str(e), None))
+            
+            def poll():
+                if not sweep_window.winfo_exists():
+                    return
+                try:
+                    kind, payload, elapsed = results.get_nowait()
+                except queue.Empty:
+                    sweep_window.after(100, poll)
+                    return
+                run_button.config(state=tk.NORMAL)
+                if kind == 'error':
+                    status_var.set("扫描失败")
+                    messagebox.showerror("扫描错误", f"参数扫描过程中发生错误:\n{payload}", parent=sweep_window)
+                    return
+                show_result(payload)
+                status_var.set(f"扫描完成：{combinations} 组参数，耗时 {elapsed:.2f} 秒")
+            
+            threading.Thread(target=worker, daemon=True).start()
+            sweep_window.after(100, poll)
+        
+        def apply_selected(event=None):
+            selection = result_tree.selection()
+            if not selection:
+                return
+            values = result_tree.item(selection[0], 'values')
+            self.actual_load_min_length.set(int(values[0]))
+            self.actual_current_threshold.set(float(values[1]))
+            self.absolute_threshold.set(float(values[2]))
+            self.status_var_actual_load.set(
+                f"已应用扫描参数: 最小区间长度={values[0]}, 波动阈值={values[1]}, 绝对波动阈值={values[2]}")
+        
+        def on_close():
+            plt.close(heatmap_fig)
+            sweep_window.destroy()
+        
+        run_button.config(command=run_sweep)
+        metric_combobox.bind("<<ComboboxSelected>>", draw_heatmap)
+        min_length_combobox.bind("<<ComboboxSelected>>", draw_heatmap)
+        result_tree.bind("<Double-1>", apply_selected)
+        sweep_window.protocol("WM_DELETE_WINDOW", on_close)
+
     def save_actual_load_results(self):
         """保存实际负载分析结果"""
         if not hasattr(self, 'actual_load_intervals') or not self.actual_load_intervals:
@@ -1708,8 +1907,8 @@ class MillingAnalysisTool:
             base_name = f"actual_{self.data_source_var.get()}_steady_intervals"
             png_path = os.path.join(save_dir, f"{base_name}.png")
             svg_path = os.path.join(save_dir, f"{base_name}.svg")
-            self.fig_actual_load.savefig(png_path, dpi=600, bbox_inches='tight', format='png')
-            self.fig_actual_load.savefig(svg_path, bbox_inches='tight', format='svg')
+            self.export_figures([(self.fig_actual_load, png_path, svg_path)], self.status_var_actual_load,
+                                f"结果已保存到: {save_dir}")
             
             # 保存区间数据
             txt_path = os.path.join(save_dir, f"actual_{self.data_source_var.get()}_steady_intervals.txt")
@@ -1740,10 +1939,9 @@ class MillingAnalysisTool:
                     # 使用新格式保存区间
                     f.write(f"{start_idx}\t{end_idx}\t{start_ln:.0f}.{start_point_idx}\t{end_ln:.0f}.{end_point_idx}\t{length_points}\n")
             
-            self.status_var_actual_load.set(f"结果已保存到: {save_dir}")
             messagebox.showinfo("保存成功", 
                             f"分析结果已保存到:\n{save_dir}\n\n" +
-                            f"• 稳态区间图: {os.path.basename(fig_path)}\n" +
+                            f"• 稳态区间图: {os.path.basename(png_path)}（后台导出中，完成后状态栏提示）\n" +
                             f"• 区间数据文件: {os.path.basename(txt_path)}")
             
         except Exception as e:
@@ -1753,17 +1951,29 @@ class MillingAnalysisTool:
         """优化处理性能"""
         # 禁用matplotlib的交互模式
         plt.ioff()
-        
-        # 减少pandas内存使用
-        if 'pandas' in sys.modules:
-            pd.options.mode.chained_assignment = None  # 禁用链式赋值警告
-            pd.options.display.float_format = '{:.6f}'.format
+
         
         # 优化matplotlib配置
         matplotlib.rcParams['path.simplify'] = True
         matplotlib.rcParams['path.simplify_threshold'] = 1.0
         matplotlib.rcParams['agg.path.chunksize'] = 10000
     
+    def create_when_shown(self, widget, create):
+        """widget 首次显示（<Map>）后在空闲时调用 create，用于延迟创建标签页图表"""
+        def on_map(event):
+            if event.widget is widget:
+                widget.unbind('<Map>', bind_id)
+                self.root.after_idle(create)
+        bind_id = widget.bind('<Map>', on_map, add='+')
+
+    def create_preview_figures(self):
+        """创建工艺信息分析页的预览图表（只执行一次）"""
+        if getattr(self, 'canvas_data', None) is not None:
+            return
+        self.optimize_processing()  # 添加性能优化
+        self.init_figures()
+        self.adjust_figure_sizes()
+
     def init_figures(self):
         """初始化图表 - 科技感深色主题，自适应全屏显示"""
         # 获取实际窗口大小
@@ -1797,7 +2007,7 @@ class MillingAnalysisTool:
             pass
         
         # 创建画布（在清空旧控件之后）
-        self.canvas_data = FigureCanvasTkAgg(self.fig_data, master=self.data_figure_frame)
+        self.canvas_data = backend_tkagg.FigureCanvasTkAgg(self.fig_data, master=self.data_figure_frame)
         canvas_widget = self.canvas_data.get_tk_widget()
         canvas_widget.grid(row=0, column=0, sticky="nsew")
         canvas_widget.configure(relief=tk.FLAT, bd=0)
@@ -1998,6 +2208,13 @@ class MillingAnalysisTool:
         ttk.Entry(param_frame, textvariable=self.mrr_min_length, width=10).grid(row=7, column=3, padx=6, sticky="ew", pady=(6, 0))
         ttk.Label(param_frame, text="(将MRR恒定的连续段划为稳态区间)", foreground="#666666").grid(row=7, column=4, columnspan=3, sticky="w", pady=(6, 0))
 
+        # Row 6：圆弧展开（直接读入未细分的程序，按解析弧长计算行程）
+        ttk.Label(param_frame, text="圆弧解析展开:").grid(row=8, column=0, sticky="w", pady=(6, 0))
+        ttk.Checkbutton(param_frame, text="启用", variable=self.expand_arcs).grid(row=8, column=1, sticky="w", pady=(6, 0))
+        ttk.Label(param_frame, text="每段角度(度):").grid(row=8, column=2, sticky="w", pady=(6, 0))
+        ttk.Entry(param_frame, textvariable=self.arc_resolution, width=10).grid(row=8, column=3, padx=6, sticky="ew", pady=(6, 0))
+        ttk.Label(param_frame, text="(无需先用G代码细分工具处理)", foreground="#666666").grid(row=8, column=4, columnspan=3, sticky="w", pady=(6, 0))
+
         # 让输入框列在窗口变化时能拉伸
         for c in range(7):
             if c in (1, 2, 3, 4, 5, 6):
@@ -2012,7 +2229,8 @@ class MillingAnalysisTool:
         # 操作按钮（只保留一个“保存所有图表”）
         button_frame = ttk.Frame(controls)
         button_frame.grid(row=3, column=0, sticky="ew", pady=(0, 2))
-        ttk.Button(button_frame, text="⚡ 一键处理", command=self.one_click_process, style='Primary.TButton').pack(side=tk.LEFT, padx=(0, 10))
+        self.one_click_btn = ttk.Button(button_frame, text="⚡ 一键处理", command=self.one_click_process, style='Primary.TButton')
+        self.one_click_btn.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="💾 保存所有图表", command=lambda: self.save_all_plots(silent=False), style='Tech.TButton').pack(side=tk.LEFT)
 
         # ===== 预览区 =====
@@ -2222,6 +2440,14 @@ class MillingAnalysisTool:
         save_btn = ttk.Button(button_frame, text="保存结果", command=self.save_results)
         save_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=20, ipady=5)
         
+        self.steady_cancel_btn = ttk.Button(button_frame, text="取消", command=self.cancel_background_task, state=tk.DISABLED)
+        self.steady_cancel_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=10, ipady=5)
+        # 稳态分析在后台运行时禁用的按钮
+        self.steady_action_buttons = [load_btn, analyze_btn, save_btn]
+        
+        ttk.Checkbutton(button_frame, text="导出完整分辨率", variable=self.export_full_resolution).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(button_frame, text="SVG栅格化密集曲线", variable=self.export_rasterize_dense).pack(side=tk.LEFT, padx=5)
+        
         reset_view_btn = ttk.Button(button_frame, text="重置视图", command=self.reset_steady_chart_view)
         reset_view_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=20, ipady=5)
         
@@ -2409,6 +2635,11 @@ class MillingAnalysisTool:
         ttk.Label(calc_frame, text="毛坯材料:").grid(row=4, column=4, sticky=tk.W, padx=5)
         ttk.Entry(calc_frame, textvariable=self.batch_blank_material, width=15).grid(row=4, column=5, padx=5, sticky=tk.W)
         
+        ttk.Label(calc_frame, text="圆弧解析展开:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Checkbutton(calc_frame, text="启用", variable=self.expand_arcs).grid(row=5, column=1, sticky=tk.W)
+        ttk.Label(calc_frame, text="每段角度(度):").grid(row=5, column=2, sticky=tk.W, padx=5)
+        ttk.Entry(calc_frame, textvariable=self.arc_resolution, width=10).grid(row=5, column=3, padx=5, sticky=tk.W)
+        
         # 分析参数
         analysis_frame = ttk.LabelFrame(param_frame, text="分析参数")
         analysis_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -2448,8 +2679,15 @@ class MillingAnalysisTool:
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=10)
         
-        process_btn = ttk.Button(button_frame, text="开始批量处理", command=self.batch_process_files, style="Accent.TButton")
-        process_btn.pack(padx=5, pady=5, ipadx=30, ipady=5)
+        ttk.Label(button_frame, text="并行进程数:").pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Spinbox(button_frame, from_=1, to=max(1, os.cpu_count() or 1),
+                    textvariable=self.batch_workers, width=5).pack(side=tk.LEFT)
+        
+        self.batch_process_btn = ttk.Button(button_frame, text="开始批量处理", command=self.batch_process_files, style="Accent.TButton")
+        self.batch_process_btn.pack(side=tk.LEFT, padx=5, pady=5, ipadx=30, ipady=5)
+        
+        self.batch_cancel_btn = ttk.Button(button_frame, text="取消", command=self.cancel_batch_process, state=tk.DISABLED)
+        self.batch_cancel_btn.pack(side=tk.LEFT, padx=5, pady=5)
         
         # 状态栏
         self.status_var_batch = tk.StringVar()
@@ -2531,46 +2769,6 @@ class MillingAnalysisTool:
         else:
             messagebox.showwarning("无处理结果", "尚未处理任何文件或处理文件已不存在")
     
-    def parse_gcode_line(self, line):
-        """解析G代码行"""
-        tokens = line.strip().split()
-        if len(tokens) < 7:
-            return None
-        
-        # 提取前6个字段
-        ap = tokens[3]
-        ae = tokens[4]
-        feed_rate = tokens[5]
-        
-        # 合并剩余的字段作为G代码内容
-        gcode_content = ' '.join(tokens[6:])
-        
-        # 提取转速S值（保留小数部分）
-        s_value = None
-        s_match = re.search(r'S(\d+\.?\d*)', gcode_content)
-        if s_match:
-            try:
-                s_value = float(s_match.group(1))
-            except ValueError:
-                s_value = None
-        
-        return ap, ae, feed_rate, gcode_content, s_value
-    
-    def extract_coordinates(self, gcode_content, prev_coords):
-        """提取坐标值"""
-        # 默认使用上一行的坐标值
-        x, y, z = prev_coords
-        
-        # 使用正则表达式提取坐标值
-        if match := re.search(r'X([-+]?\d*\.?\d+)', gcode_content):
-            x = float(match.group(1))
-        if match := re.search(r'Y([-+]?\d*\.?\d+)', gcode_content):
-            y = float(match.group(1))
-        if match := re.search(r'Z([-+]?\d*\.?\d+)', gcode_content):
-            z = float(match.group(1))
-        
-        return x, y, z
-    
     def calculate_distance(self, prev_coords, current_coords):
         """计算距离"""
         if prev_coords is None:  # 第一行没有前一行
@@ -2582,11 +2780,6 @@ class MillingAnalysisTool:
         
         return math.sqrt(dx**2 + dy**2 + dz**2)
     
-    def extract_n_value(self, gcode_content):
-        """提取N值（行号标识），保留小数部分"""
-        # 修改正则表达式以匹配带小数的N值
-        match = re.search(r'^N\d+\.?\d*', gcode_content)
-        return match.group(0) if match else "N0"
     def calculate_additional_columns(self, ap, ae, feed_rate, s, current_s, p_idle, z_impedance):
         """计算新增列：加工时间(t), dMRV, MRR, Z(s), P_pred
 
@@ -2636,19 +2829,37 @@ class MillingAnalysisTool:
             messagebox.showerror("错误", f"文件不存在: {input_file}")
             return
         
+        if self.is_task_running():
+            return
+        
+        try:
+            save_dir, output_file = self.pit_output_paths(input_file)
+            settings = self.pit_settings()
+        except tk.TclError as e:
+            messagebox.showerror("参数错误", f"参数格式不正确:\n{str(e)}")
+            return
+        
+        # 第一步：在后台线程中处理数据生成工艺信息表
+        self.status_var_data.set("正在处理数据...")
+        self.run_task(self.pit_file_task, input_file, output_file, settings,
+                      status_var=self.status_var_data, action_buttons=[self.one_click_btn],
+                      on_done=lambda table: self.show_one_click_result(table, save_dir, output_file),
+                      error_title="处理错误", error_text="处理过程中发生错误", failed_text="处理失败")
+
+    def pit_file_task(self, context, input_file, output_file, settings):
+        """后台生成工艺信息表文件（不访问界面控件），返回 PitTable"""
+        context.progress(None, f"正在处理 {os.path.basename(input_file)}...")
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        return self.build_pit_file(input_file, output_file, settings)
+
+    def show_one_click_result(self, table, save_dir, output_file):
+        """一键处理的后两步：生成并显示图表"""
+        self.processed_data_dir = save_dir
+        self.processed_file_path = output_file
+        self.data = table
         try:
-            # 第一步：处理数据生成工艺信息表
-            self.status_var_data.set("正在处理数据...")
-            self.root.update()
-            
-            success = self.process_single_file(input_file, save_plots=False, do_steady_analysis=False)
-            
-            if not success:
-                return
-            
             # 第二步：生成图表（不保存）
             self.status_var_data.set("正在生成图表...")
-            self.root.update()
             
             self.generate_plots(save=False)  # 不自动保存图表
             
@@ -2698,187 +2909,23 @@ class MillingAnalysisTool:
             return False
         
         try:
-            # 准备数据
-            s_values = [d['s'] for d in self.data]
-            ap_values = [d['ap'] for d in self.data]
-            ae_values = [d['ae'] for d in self.data]
-            dMRV_values = [d['dMRV'] for d in self.data]
-            MRR_values = [d['MRR'] for d in self.data]
-            P_values = [d['P'] for d in self.data]
-            n_values = [d['N_str'] for d in self.data]  # 获取N列数据
-            
-            # 计算累计行程
-            cumulative_s = np.cumsum(s_values)
-            
-            # 清除之前的图表
-            self.figures = []
-            
-            # 辅助函数：在顶部添加N轴，与行程s对应
-            def add_n_axis(ax, x_values):
-                twin = ax.twiny()
-                twin.set_xlim(ax.get_xlim())
-                max_ticks = 12
-                step = max(1, len(n_values) // max_ticks)
-                tick_indices = list(range(0, len(n_values), step))
-                tick_positions = [x_values[i] for i in tick_indices]
-                twin.set_xticks(tick_positions)
-                twin.set_xticklabels([n_values[i] for i in tick_indices], rotation=45, ha='left', fontsize=8)
-                twin.set_xlabel('指令行号 N')
-                twin.grid(False)
-                return twin
-
-            # 1. ap-s/N 图 - 使用阶梯图显示，每行在其行程区间内保持恒定 - 白色背景
-            fig1, ax1 = plt.subplots(figsize=(16, 9), dpi=100)
-            fig1.patch.set_facecolor('white')
-            ax1.set_facecolor('white')
-            
-            # 使用step函数，where='post'表示在区间内保持值不变
-            ax1.step(cumulative_s, ap_values, color='black', linewidth=0.8, where='post', zorder=5)
-            ax1.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax1.set_ylabel('切深 ap (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax1.tick_params(labelsize=13, colors='#333333')
-            
-            # 应用样式和调整范围
-            ax1.set_title('切深变化', fontsize=18, fontweight='bold', color='#333333', pad=15)
-            ax1.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
-            x_min, x_max = ax1.get_xlim()
-            y_min, y_max = ax1.get_ylim()
-            x_range, y_range = x_max - x_min, y_max - y_min
-            ax1.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
-            ax1.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
-            add_n_axis(ax1, cumulative_s)
-            fig1.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
-            self.figures.append(fig1)
-            
-            # 2. ae-s/N 图 - 阶梯图 - 白色背景
-            fig2, ax2 = plt.subplots(figsize=(16, 9), dpi=100)
-            fig2.patch.set_facecolor('white')
-            ax2.set_facecolor('white')
-            
-            ax2.step(cumulative_s, ae_values, color='black', linewidth=0.8, where='post', zorder=5)
-            ax2.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax2.set_ylabel('切宽 ae (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax2.tick_params(labelsize=13, colors='#333333')
-            
-            ax2.set_title('切宽变化', fontsize=18, fontweight='bold', color='#333333', pad=15)
-            ax2.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
-            x_min, x_max = ax2.get_xlim()
-            y_min, y_max = ax2.get_ylim()
-            x_range, y_range = x_max - x_min, y_max - y_min
-            ax2.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
-            ax2.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
-            add_n_axis(ax2, cumulative_s)
-            fig2.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
-            self.figures.append(fig2)
-            
-            # 3. MRR-s/N 图 - 阶梯图 - 白色背景
-            fig3, ax3 = plt.subplots(figsize=(16, 9), dpi=100)
-            fig3.patch.set_facecolor('white')
-            ax3.set_facecolor('white')
-            
-            ax3.step(cumulative_s, MRR_values, color='black', linewidth=0.8, where='post', zorder=5)
-            ax3.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax3.set_ylabel('材料去除率 MRR (mm$^3$/s)', fontsize=14, fontweight='bold', color='#333333')
-            ax3.tick_params(labelsize=13, colors='#333333')
-            
-            ax3.set_title('材料去除率', fontsize=18, fontweight='bold', color='#333333', pad=15)
-            ax3.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
-            x_min, x_max = ax3.get_xlim()
-            y_min, y_max = ax3.get_ylim()
-            x_range, y_range = x_max - x_min, y_max - y_min
-            ax3.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
-            ax3.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
-            add_n_axis(ax3, cumulative_s)
-            fig3.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
-            self.figures.append(fig3)
-            
-            # 4. P-s/N 图 - 阶梯图 - 白色背景
-            fig4, ax4 = plt.subplots(figsize=(16, 9), dpi=100)
-            fig4.patch.set_facecolor('white')
-            ax4.set_facecolor('white')
-            
-            ax4.step(cumulative_s, P_values, color='black', linewidth=0.8, where='post', zorder=5)
-            ax4.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
-            ax4.set_ylabel('功率 P (W)', fontsize=14, fontweight='bold', color='#333333')
-            ax4.tick_params(labelsize=13, colors='#333333')
-            
-            ax4.set_title('主轴功率预测', fontsize=18, fontweight='bold', color='#333333', pad=15)
-            ax4.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
-            x_min, x_max = ax4.get_xlim()
-            y_min, y_max = ax4.get_ylim()
-            x_range, y_range = x_max - x_min, y_max - y_min
-            ax4.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
-            ax4.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
-            add_n_axis(ax4, cumulative_s)
-            fig4.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
-            self.figures.append(fig4)
+            # 准备数据（工艺信息表按列存放，直接取列）
+            series = pit_plots.plot_series(self.data)
             
             # 5. MRR稳态区间划分图 - 如果启用
+            mrr_intervals = None
             if self.enable_mrr_steady.get():
                 self.mrr_intervals = self.partition_mrr_steady_intervals(
-                    MRR_values, s_values, cumulative_s, n_values
+                    series['MRR'], series['s'], series['cumulative_s'], series['N']
                 )
-                
-                # 生成MRR稳态区间图 - 白色背景
-                fig5, ax5 = plt.subplots(figsize=(16, 9), dpi=100)
-                fig5.patch.set_facecolor('white')
-                ax5.set_facecolor('white')
-
-                # 标记稳态区间 - 显示全部区间（包括MRR为0的区间）
-                cut_intervals = self.mrr_intervals  # 不再过滤，显示全部区间
-                n_iv = len(cut_intervals)
-
-                                # 显示全部区间：相邻区间交替高对比颜色（亮蓝/亮橙）
-                interval_colors = ['#00A3FF', '#FF6A00']
-                for idx, interval in enumerate(cut_intervals):
-                    c = interval_colors[idx % 2]
-                    # 关键：给极窄区间加边框线，避免“看不见”
-                    ax5.axvspan(interval['start_s'], interval['end_s'],
-                               alpha=0.42, facecolor=c,
-                               edgecolor=c, linewidth=0.35, zorder=0)
-
-# 绘制MRR曲线（在区间上方）- 使用黑色细线，zorder=10 确保在最上层
-                ax5.step(cumulative_s, MRR_values, color='black', linewidth=0.8, 
-                        where='post', label='MRR', zorder=10)
-                
-                ax5.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
-                ax5.set_ylabel('材料去除率 MRR (mm$^3$/s)', fontsize=14, fontweight='bold', color='#333333')
-                ax5.tick_params(labelsize=13, colors='#333333')
-                
-                # 配置图例
-                legend = ax5.legend(loc='upper right', fontsize=13, framealpha=0.9, shadow=True)
-                legend.get_frame().set_facecolor('white')
-                legend.get_frame().set_edgecolor('#333333')
-                legend.get_frame().set_linewidth(1.5)
-                for text in legend.get_texts():
-                    text.set_color('#333333')
-                
-                # 设置标题和调整布局
-                ax5.set_title(f'MRR稳态区间划分 (共{len(self.mrr_intervals)}个区间)', 
-                             fontsize=18, fontweight='bold', color='#333333', pad=15)
-                # 关键：网格设置为zorder=-1，确保在最底层
-                ax5.grid(True, alpha=0.3, linestyle='--', linewidth=0.5, zorder=-1)
-                
-                # 关键：强制设置Y轴范围，留出上下10%的余量，防止图形顶格
-                if MRR_values:
-                    mrr_min = min(MRR_values)
-                    mrr_max = max(MRR_values)
-                    mrr_range = mrr_max - mrr_min if mrr_max > mrr_min else 1
-                    ax5.set_ylim(mrr_min - mrr_range * 0.1, mrr_max + mrr_range * 0.1)
-                
-                # 调整X轴范围
-                x_min, x_max = ax5.get_xlim()
-                x_range = x_max - x_min
-                ax5.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
-                
-                add_n_axis(ax5, cumulative_s)
-                fig5.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
-                self.figures.append(fig5)
+                mrr_intervals = self.mrr_intervals
+            
+            # 1-4. ap/ae/MRR/P-s/N 阶梯图 - 白色背景；各图在首次查看时才构建
+            self.figures.close()
+            self.figures = pit_plots.pit_figures(series, mrr_intervals)
             
             # 更新图表名称列表与下拉选择
-            self.figure_names = ["切深变化 (ap-s)", "切宽变化 (ae-s)", "材料去除率 (MRR-s)", "主轴功率预测 (P-s)"]
-            if self.enable_mrr_steady.get():
-                self.figure_names.append("MRR稳态区间划分")
+            self.figure_names = self.figures.names
             self.figure_selector["values"] = self.figure_names
             if self.figure_names:
                 self.figure_selector.current(0)
@@ -2912,13 +2959,13 @@ class MillingAnalysisTool:
         for widget in self.data_figure_frame.winfo_children():
             widget.destroy()
 
-        fig = self.figures[index]
+        fig = self.figures.figure(index)
         self._current_preview_fig = fig  # 供缩放等交互使用
 
         # 默认取主轴（缩放时会同步作用到同一Figure的其它轴）
         self.ax_data = fig.axes[0] if getattr(fig, 'axes', None) else None
 
-        self.canvas_data = FigureCanvasTkAgg(fig, master=self.data_figure_frame)
+        self.canvas_data = backend_tkagg.FigureCanvasTkAgg(fig, master=self.data_figure_frame)
         canvas_widget = self.canvas_data.get_tk_widget()
         canvas_widget.grid(row=0, column=0, sticky="nsew")
         canvas_widget.configure(relief=tk.FLAT, bd=0)
@@ -2968,43 +3015,20 @@ class MillingAnalysisTool:
             # 使用之前创建的目录
             save_dir = self.processed_data_dir
             
-            # 定义图表文件名 - 修改为行程域，添加ap和ae
-            filenames = [
-                "ap_s",   # 切深
-                "ae_s",   # 切宽
-                "MRR_s",  # 材料去除率
-                "P_s",     # 功率
-                "MRR_steady_intervals"  # MRR稳态区间（如果启用）
-            ]
-            
-            # 保存所有图表 - 同时保存高DPI的PNG和矢量SVG格式
-            for i, fig in enumerate(self.figures):
-                if i < len(filenames):  # 确保不超出文件名列表范围
-                    # 保存高清PNG (用于预览)
-                    png_path = os.path.join(save_dir, f"{filenames[i]}.png")
-                    fig.savefig(png_path, dpi=600, bbox_inches='tight', format='png')
-                    
-                    # 保存SVG矢量图 (可无损缩放)
-                    svg_path = os.path.join(save_dir, f"{filenames[i]}.svg")
-                    fig.savefig(svg_path, bbox_inches='tight', format='svg')
+            # 保存所有图表（行程域 ap/ae/MRR/P，以及MRR稳态区间）- 同时保存高DPI的PNG和矢量SVG格式
+            # 图表在后台工作进程中逐张构建并保存，不占用界面线程，也不在内存中同时保留全部图表
+            jobs = [(build, os.path.join(save_dir, f"{filename}.png"), os.path.join(save_dir, f"{filename}.svg"))
+                    for filename, build in self.figures.sources]
+            self.export_figures(jobs, self.status_var_data, f"所有图表已保存到: {save_dir}",
+                                notify=not silent)
             
             # 如果有MRR稳态区间，保存区间数据
             if self.mrr_intervals:
-                intervals_txt_path = os.path.join(save_dir, "MRR_steady_intervals.txt")
-                with open(intervals_txt_path, 'w', encoding='utf-8') as f:
-                    f.write("# MRR稳态区间划分结果\n")
-                    f.write(f"# 最小行程长度: {self.mrr_min_length.get()} mm\n")
-                    f.write(f"# 总区间数: {len(self.mrr_intervals)}\n")
-                    f.write("#" + "="*80 + "\n")
-                    f.write("# 区间\t起始行号\t结束行号\t起始行程(mm)\t结束行程(mm)\t长度(mm)\tMRR(mm³/s)\n")
-                    for i, interval in enumerate(self.mrr_intervals, 1):
-                        f.write(f"{i}\t{interval['start_n']}\t{interval['end_n']}\t"
-                               f"{interval['start_s']:.3f}\t{interval['end_s']:.3f}\t"
-                               f"{interval['length']:.3f}\t{interval['mrr']:.6f}\n")
+                pit_plots.write_mrr_intervals(os.path.join(save_dir, "MRR_steady_intervals.txt"),
+                                              self.mrr_intervals, self.mrr_min_length.get())
             
             if not silent:
-                self.status_var_data.set(f"所有图表已保存到: {save_dir}")
-                messagebox.showinfo("保存成功", f"所有图表已自动保存到:\n{save_dir}")
+                self.status_var_data.set(f"正在后台导出 {len(jobs)} 张图表到: {save_dir}")
             
             return True
         
@@ -3038,53 +3062,9 @@ class MillingAnalysisTool:
         :param n_values: 指令行号列表
         :return: 稳态区间列表
         """
-        min_length = self.mrr_min_length.get()  # 最小行程长度
-        intervals = []
-        
-        if not MRR_values or len(MRR_values) == 0:
-            return intervals
-        
-        # 将累计行程转换为列表（如果是numpy数组）
-        if isinstance(cumulative_s, np.ndarray):
-            cumulative_s = cumulative_s.tolist()
-        
-        i = 0
-        while i < len(MRR_values):
-            current_mrr = MRR_values[i]
-            start_idx = i
-            start_s = cumulative_s[i] - s_values[i] if i > 0 else 0  # 该行起始位置
-            
-            # 查找MRR完全相同的连续区域 - 使用浮点数近似比较
-            j = i + 1
-            while j < len(MRR_values):
-                # 使用浮点数近似比较，容差为 1e-5
-                if abs(MRR_values[j] - current_mrr) < 1e-5:
-                    j += 1
-                else:
-                    break
-            
-            end_idx = j - 1
-            end_s = cumulative_s[end_idx]  # 该区域结束位置
-            
-            # 计算该区间的行程长度
-            interval_length = end_s - start_s
-            
-            # 如果区间长度大于等于最小长度，则保存该区间
-            if interval_length >= min_length:
-                intervals.append({
-                    'start_idx': start_idx,
-                    'end_idx': end_idx,
-                    'start_s': start_s,
-                    'end_s': end_s,
-                    'length': interval_length,
-                    'mrr': current_mrr,
-                    'start_n': n_values[start_idx],
-                    'end_n': n_values[end_idx]
-                })
-            
-            i = j
-        
-        return intervals
+        return pit_plots.partition_mrr_steady_intervals(
+            MRR_values, s_values, cumulative_s, n_values, self.mrr_min_length.get()
+        )
     
     def update_nav_buttons(self):
         """更新导航按钮状态"""
@@ -3115,21 +3095,99 @@ class MillingAnalysisTool:
         
     def detect_file_encoding(self,file_path):
         """使用 Python 内置方法检测文件编码"""
-        # 常见编码列表，按优先级排序
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin1', 'iso-8859-1', 'cp1252']
+        return channel_cache.detect_encoding(file_path)
+ 
+    def export_figures(self, jobs, status_var, done_text, notify=False):
+        """
+        在后台进程中保存高清PNG（600dpi）和矢量SVG，立即返回
+
+        参数:
+            jobs: [(Figure 或构建函数, PNG路径, SVG路径), ...]；Figure 在此刻做快照，之后的改动不影响导出
+            status_var: 全部完成后显示 done_text（有失败时显示错误）的状态变量
+            notify: 全部完成后是否弹出提示
+        降采样曲线按600dpi重新降采样，勾选“导出完整分辨率”时使用全部样本；
+        勾选“SVG栅格化密集曲线”时点数很多的曲线在SVG中栅格化
+        """
+        if self.export_queue is None:
+            self.export_queue = figure_export.ExportQueue(font_path=simhei_path)
+        rasterize_points = figure_export.RASTERIZE_POINTS if self.export_rasterize_dense.get() else None
+        remaining = [len(jobs)]
+        errors = []
+
+        def on_done(error, paths):
+            if error:
+                errors.append(error)
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+            if errors:
+                status_var.set(errors[0])
+                messagebox.showerror("导出错误", "\n".join(errors))
+            else:
+                status_var.set(done_text)
+                if notify:
+                    messagebox.showinfo("保存成功", done_text)
+
+        for source, png_path, svg_path in jobs:
+            self.export_queue.submit(source, png_path, svg_path, 600, self.export_full_resolution.get(),
+                                     rasterize_points, on_done)
+        if not self._export_polling:
+            self._export_polling = True
+            self.root.after(200, self._poll_exports)
+
+    def _poll_exports(self):
+        """轮询后台导出的完成通知，全部完成后停止轮询"""
+        if self.export_queue.poll():
+            self.root.after(200, self._poll_exports)
+        else:
+            self._export_polling = False
+    
+    def is_task_running(self):
+        """是否有后台任务正在运行（运行中时提示用户）"""
+        if self.background_task is not None and not self.background_task.finished:
+            messagebox.showinfo("提示", "有任务正在运行，请等待完成或先取消")
+            return True
+        return False
+    
+    def run_task(self, func, *args, status_var, action_buttons=(), cancel_button=None, on_done=None,
+                 error_title="错误", error_text="处理时发生错误", failed_text="处理失败"):
+        """
+        在后台线程中执行 func(context, *args)，界面保持响应
+
+        参数:
+            status_var: 显示进度、失败与取消信息的状态变量
+            action_buttons: 运行期间禁用的按钮；cancel_button: 运行期间启用的取消按钮
+            on_done(result): 完成后在界面线程中显示结果
+            error_title, error_text: 出错时的提示框标题与说明；failed_text: 出错后的状态栏文字
+        """
+        status_text = [status_var.get()]  # 最近一次进度文字（只报告比例时沿用）
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    # 尝试读取文件内容
-                    f.read(1024)  # 只读取前1024字节进行测试
-                return encoding
-            except UnicodeDecodeError:
-                continue
+        def on_progress(fraction, text):
+            text = status_text[0] = text or status_text[0]
+            status_var.set(f"{text} {fraction:.0%}" if fraction is not None else text)
         
-        # 如果所有编码都失败，返回默认编码
-        return 'utf-8'
- 
+        def on_error(message, details):
+            status_var.set(failed_text)
+            messagebox.showerror(error_title, f"{error_text}:\n{message}")
+        
+        def show_result(result):
+            # 显示结果（绘图等）出错时与后台出错一样提示
+            try:
+                if on_done is not None:
+                    on_done(result)
+            except Exception as e:
+                on_error(str(e), "")
+        
+        self.background_task = background_tasks.run_in_background(
+            self.root, func, *args, on_done=show_result, on_error=on_error, on_progress=on_progress,
+            on_cancelled=lambda: status_var.set("已取消"),
+            disable=action_buttons, enable=[cancel_button] if cancel_button is not None else ())
+    
+    def cancel_background_task(self):
+        """请求取消正在运行的后台任务"""
+        if self.background_task is not None and not self.background_task.finished:
+            self.background_task.cancel()
+    
     def save_steady_results(self, save_dir):
         """保存稳态分析结果到指定目录"""
         if not self.intervals:
@@ -3146,14 +3204,13 @@ class MillingAnalysisTool:
             # 1. 单独保存时域稳态区间图 - 同时保存PNG和SVG
             fig_time_png = os.path.join(save_dir, "steady_state_time_domain.png")
             fig_time_svg = os.path.join(save_dir, "steady_state_time_domain.svg")
-            self.fig_steady_time.savefig(fig_time_png, dpi=600, bbox_inches='tight', format='png')
-            self.fig_steady_time.savefig(fig_time_svg, bbox_inches='tight', format='svg')
             
-            # 2. 单独保存指令域稳态区间图 - 同时保存PNG和SVG
+            # 2. 单独保存指令域稳态区间图 - 同时保存PNG和SVG（两张图在后台并行导出）
             fig_n_png = os.path.join(save_dir, "steady_state_n_domain.png")
             fig_n_svg = os.path.join(save_dir, "steady_state_n_domain.svg")
-            self.fig_steady_n.savefig(fig_n_png, dpi=600, bbox_inches='tight', format='png')
-            self.fig_steady_n.savefig(fig_n_svg, bbox_inches='tight', format='svg')
+            self.export_figures([(self.fig_steady_time, fig_time_png, fig_time_svg),
+                                 (self.fig_steady_n, fig_n_png, fig_n_svg)],
+                                self.status_var_steady, f"结果已保存到: {save_dir}")
             
             # 3. 保存区间数据
             txt_path = os.path.join(save_dir, "steady_intervals.txt")
@@ -3317,7 +3374,7 @@ class MillingAnalysisTool:
             fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
             
             # 时间域电流预览
-            ax1.plot(np.asarray(self.cumulative_time), np.asarray(self.currents), 'b-', linewidth=1.0)
+            plot_decimation.plot(ax1, np.asarray(self.cumulative_time), np.asarray(self.currents), 'b-', linewidth=1.0)
             ax1.set_title('时间域电流原始数据预览')
             ax1.set_xlabel('时间 (秒)')
             ax1.set_ylabel('电流 (A)')
@@ -3325,7 +3382,7 @@ class MillingAnalysisTool:
             
             # 指令域电流预览
             positions = range(len(self.n_values))
-            ax2.plot(positions, np.asarray(self.currents), 'g-', linewidth=1.0)
+            plot_decimation.plot(ax2, positions, np.asarray(self.currents), 'g-', linewidth=1.0)
             ax2.set_title('指令域电流原始数据预览')
             ax2.set_xlabel('指令行号索引')
             ax2.set_ylabel('电流 (A)')
@@ -3379,7 +3436,8 @@ class MillingAnalysisTool:
                            relative_threshold: float = 0.2,
                            absolute_threshold: float = 0.05,
                            adaptive: bool = True,
-                           respect_user_thresholds: bool = True) -> List[Tuple[int, int]]:
+                           respect_user_thresholds: bool = True,
+                           engine: str = None) -> List[Tuple[int, int]]:
         """
         从电流序列中提取稳态区间（使用自适应阈值和局部数据特性分析）
         
@@ -3390,243 +3448,35 @@ class MillingAnalysisTool:
             absolute_threshold: 绝对阈值（窗口内所有值都必须小于此值）
             adaptive: 是否启用自适应算法
             respect_user_thresholds: 是否尊重用户设置的阈值（True时不对绝对阈值设上限）
+            engine: 计算引擎，"loop" 或 "vectorized"，默认使用 self.steady_engine
         
         返回:
             稳态区间列表，每个区间为元组(start_index, end_index)
         """
-        n = len(currents)
-        if n == 0:
-            return []
-            
-        # 数据预分析 - 计算整体统计特征
-        data_array = np.asarray(currents)
-        global_mean = np.mean(data_array)
-        global_std = np.std(data_array)
-        global_range = np.max(data_array) - np.min(data_array)
-        noise_level = self.estimate_noise_level(data_array)
-        
-
-        
-        # 如果启用自适应模式，基于数据特性调整阈值参数
-        if adaptive:
-            # 针对噪声水平较高的数据，适当放宽阈值
-            if noise_level > 0.1 * global_mean:
-                relative_threshold = min(0.3, relative_threshold * 1.5)
-                if respect_user_thresholds:
-                    # 如果尊重用户阈值，不设上限
-                    absolute_threshold = absolute_threshold * 1.5
-                else:
-                    absolute_threshold = min(0.2, absolute_threshold * 1.5)
-            
-            # 针对数据范围很小的情况，减小绝对阈值
-            if global_range < 0.2 * global_mean:
-                if respect_user_thresholds:
-                    # 如果尊重用户阈值，不能小于用户设置的原始值
-                    adjusted_threshold = min(absolute_threshold, global_range * 0.3)
-                    absolute_threshold = max(absolute_threshold, adjusted_threshold)
-                else:
-                    absolute_threshold = min(absolute_threshold, global_range * 0.3)
-            
-            # 针对数据范围很大的情况，使用分段相对阈值
-            use_segmented_thresholds = (global_range > 0.5 * global_mean)
-        else:
-            use_segmented_thresholds = False
-        
-        left = 0
-        intervals = []
-        
-        while left < n:
-            current_sum = 0.0
-            min_deque = collections.deque()
-            max_deque = collections.deque()
-            right = left
-            
-            # 直接使用用户设置的阈值，不进行任何调整
-            local_relative_threshold = relative_threshold
-            local_absolute_threshold = absolute_threshold
-            
-            if adaptive and use_segmented_thresholds:
-                # 计算局部数据特性（前100个点或剩余点）
-                local_window = min(100, n - left)
-                if local_window > 10:  # 确保有足够的点进行分析
-                    local_data = data_array[left:left+local_window]
-                    local_mean = np.mean(local_data)
-                    local_std = np.std(local_data)
-                    local_noise = self.estimate_noise_level(local_data)
-                    
-                    # 根据局部特性动态调整阈值
-                    # 1. 局部噪声较高时增加阈值
-                    if local_noise > 0.05 * local_mean:
-                        noise_factor = min(2.0, 1.0 + local_noise / local_mean)
-                        local_relative_threshold *= noise_factor
-                        if respect_user_thresholds:
-                            # 如果尊重用户阈值，只允许增加绝对阈值，不能减小
-                            local_absolute_threshold = max(absolute_threshold, local_absolute_threshold * noise_factor)
-                        else:
-                            local_absolute_threshold *= noise_factor
-                    
-                    # 2. 局部标准差较小时减小阈值
-                    if local_std < 0.1 * local_mean:
-                        local_relative_threshold = max(0.05, local_relative_threshold * 0.7)
-                        if respect_user_thresholds:
-                            # 如果尊重用户阈值，不减小绝对阈值
-                            local_absolute_threshold = max(absolute_threshold, local_absolute_threshold * 0.7)
-                        else:
-                            local_absolute_threshold = max(0.01, local_absolute_threshold * 0.7)
-                    
-                    # 3. 确保阈值在合理范围内
-                    local_relative_threshold = min(0.4, max(0.05, local_relative_threshold))
-                    if respect_user_thresholds:
-                        # 如果尊重用户阈值，确保不小于用户设置的原始值
-                        local_absolute_threshold = max(absolute_threshold, local_absolute_threshold)
-                    else:
-                        # 原来的限制逻辑
-                        local_absolute_threshold = min(0.5, max(0.01, local_absolute_threshold))
-                    
-
-            
-            # 扩展右指针直到窗口不满足条件
-            while right < n:
-                c = currents[right]
-                current_sum += c
-                
-                # 维护最小值双端队列（单调递增）
-                while min_deque and min_deque[-1] > c:
-                    min_deque.pop()
-                min_deque.append(c)
-                
-                # 维护最大值双端队列（单调递减）
-                while max_deque and max_deque[-1] < c:
-                    max_deque.pop()
-                max_deque.append(c)
-                
-                length = right - left + 1
-                mean = current_sum / length
-                
-                # 检查波动条件 - 使用自适应阈值
-                min_val = min_deque[0]
-                max_val = max_deque[0]
-                range_val = max_val - min_val
-                
-                # 严格使用用户设置的阈值，不进行任何调整
-                temp_rel_threshold = local_relative_threshold
-                temp_abs_threshold = local_absolute_threshold
-                
-                # 旧的自适应长度调整（已禁用）
-                # if adaptive and length > min_length * 2:
-                #     length_factor = min(1.5, 1.0 + (length - min_length) / (10 * min_length))
-                #     temp_rel_threshold = local_relative_threshold * length_factor
-                #     temp_abs_threshold = local_absolute_threshold * length_factor
-                
-                # 条件1: 相对波动不超过阈值
-                condition1 = (min_val >= (1 - temp_rel_threshold) * mean and 
-                            max_val <= (1 + temp_rel_threshold) * mean)
-                
-                # 条件2: 绝对波动不超过阈值
-                condition2 = (max_val <= temp_abs_threshold)
-                
-                # 满足任一条件即可
-                if condition1 or condition2:
-                    right += 1  # 满足条件继续扩展
-                else:
-                    break  # 不满足条件时跳出
-            
-            # 记录有效区间（[left, right-1]）
-            if right - left >= min_length:
-                intervals.append((left, right - 1))
-            
-            # 移动左指针到第一个不满足点的位置
-            left = right
-        
-        # 后处理 - 合并接近的区间
-        if adaptive and intervals:
-            # 区间合并处理 - 根据数据特性调整合并距离
-            merge_distance = max(1, int(min_length * 0.2))  # 默认合并距离
-            
-            # 如果噪声水平高，适当增加合并距离
-            if noise_level > 0.05 * global_mean:
-                merge_distance = max(2, int(min_length * 0.3))
-                
-            intervals = self.merge_close_intervals(intervals, merge_distance)
-        
-        # 处理区间重叠
-        intervals = self.adjust_overlapping_intervals(intervals, overlap_tolerance=10)
-        return intervals
+        return steady_state_engine.find_steady_state_intervals(
+            currents,
+            min_length,
+            relative_threshold,
+            absolute_threshold,
+            adaptive=adaptive,
+            respect_user_thresholds=respect_user_thresholds,
+            engine=engine or self.steady_engine
+        )
         
     def estimate_noise_level(self, data):
         """估计数据的噪声水平，使用相邻点差值的标准差"""
-        if len(data) < 3:
-            return 0
-        
-        # 计算相邻点差值
-        diffs = np.abs(np.diff(data))
-        
-        # 使用相邻差值的标准差作为噪声估计
-        return np.std(diffs)
+        return steady_state_engine.estimate_noise_level(data)
         
     def merge_close_intervals(self, intervals, max_gap):
         """合并间隔小于或等于max_gap的相邻区间"""
-        if not intervals or len(intervals) < 2:
-            return intervals
-            
-        # 按起始位置排序
-        intervals.sort(key=lambda x: x[0])
-        
-        merged = []
-        current_start, current_end = intervals[0]
-        
-        for next_start, next_end in intervals[1:]:
-            if next_start - current_end <= max_gap + 1:
-                # 合并区间
-                current_end = max(current_end, next_end)
-            else:
-                # 保存当前区间，开始新区间
-                merged.append((current_start, current_end))
-                current_start, current_end = next_start, next_end
-                
-        # 添加最后一个区间
-        merged.append((current_start, current_end))
-        
-        return merged
+        return steady_state_engine.merge_close_intervals(intervals, max_gap)
 
     def adjust_overlapping_intervals(self, intervals, overlap_tolerance=10):
         """
         调整重叠的区间边界，消除重叠
         前一个区间终点前移overlap_tolerance点，后一个区间起点后移overlap_tolerance点
         """
-        if not intervals or len(intervals) < 2:
-            return intervals
-        
-        adjusted = []
-        adjusted.append(intervals[0])
-        
-        for i in range(1, len(intervals)):
-            prev_start, prev_end = adjusted[-1]
-            curr_start, curr_end = intervals[i]
-            
-            # 检查是否存在重叠
-            if prev_end >= curr_start:
-                # 计算重叠长度
-                overlap_length = prev_end - curr_start + 1
-                
-                # 调整前一个区间的终点
-                adjust_amount = min(overlap_tolerance, overlap_length)
-                new_prev_end = max(prev_start, prev_end - adjust_amount)
-                
-                # 调整当前区间的起点
-                new_curr_start = min(curr_end, curr_start + adjust_amount)
-                
-                # 确保调整后的区间仍然有效
-                if new_prev_end >= prev_start and new_curr_start <= curr_end:
-                    adjusted[-1] = (prev_start, new_prev_end)
-                    adjusted.append((new_curr_start, curr_end))
-                else:
-                    # 如果调整无效，保持原区间
-                    adjusted.append((curr_start, curr_end))
-            else:
-                adjusted.append((curr_start, curr_end))
-        
-        return adjusted
+        return steady_state_engine.adjust_overlapping_intervals(intervals, overlap_tolerance)
 
     def convert_n_interval(self, start_n, end_n):
         """将行号区间转换为整数形式 [N34.18, N40.2] -> [N35, N39]"""
@@ -3644,65 +3494,102 @@ class MillingAnalysisTool:
             # 如果转换失败，返回原始值
             return start_n, end_n
     
-    def analyze_data(self):
-        """分析数据"""
+    def analyze_data(self, background=True):
+        """分析数据（区间划分默认在后台线程中进行，完成后显示结果与图表；background 为 False 时同步执行）"""
         if self.currents is None or self.cumulative_time is None or self.n_values is None:
             messagebox.showwarning("无数据", "请先加载完整数据文件")
             return
         
         try:
             min_len = self.min_length.get()
-            if min_len < 1:
-                messagebox.showwarning("参数错误", "最小区间长度必须大于0")
-                return
-            
             # 获取波动阈值
             threshold = self.steady_threshold.get()
             absolute_threshold = self.absolute_threshold.get()  # 获取绝对阈值
-            
-            # 应用稳态区间划分算法 - 修改为按照程序行号顺序
-            # 首先按照程序行号对数据进行排序
-            n_array = np.asarray(self.n_values)
-            sorted_indices = np.argsort(n_array)
-            sorted_currents = np.asarray(self.currents)[sorted_indices]
-            sorted_line_numbers = n_array[sorted_indices]
-
-            # 在排序后的数据上应用稳态区间划分
-            raw_intervals = self.find_steady_state_intervals(
-                sorted_currents, 
-                min_len, 
-                threshold,
-                absolute_threshold,  # 传递绝对阈值
-                adaptive=False,  # 禁用自适应，严格按照用户设置的阈值
-                respect_user_thresholds=True  # 尊重用户设置的阈值
-            )
-            # 新增：再次检查并处理区间重叠（确保双重保护）
-            raw_intervals = self.adjust_overlapping_intervals(raw_intervals, overlap_tolerance=10)
-            # 将区间索引转换回原始数据索引
-            original_intervals = []
-            for start_idx, end_idx in raw_intervals:
-                original_start = sorted_indices[start_idx]
-                original_end = sorted_indices[end_idx]
-                original_intervals.append((original_start, original_end))
-
-            # 确保区间按照程序行号顺序排列
-            original_intervals.sort(key=lambda x: self.n_values[x[0]].item())
-
-            if not original_intervals:
-                messagebox.showinfo("结果", "未找到稳态区间")
-                self.status_var_steady.set("未找到稳态区间")
-                return
+        except tk.TclError as e:
+            messagebox.showerror("参数错误", f"参数格式不正确:\n{str(e)}")
+            return
+        if min_len < 1:
+            messagebox.showwarning("参数错误", "最小区间长度必须大于0")
+            return
+        
+        # 根据复选框决定是否缩减区间
+        reduce_interval = self.reduce_interval_steady.get()
+        if not background:
+            intervals = self.compute_steady_intervals(np.asarray(self.currents), np.asarray(self.n_values),
+                                                      min_len, threshold, absolute_threshold, reduce_interval)
+            self.show_steady_intervals(intervals, reduce_interval)
+            return
+        
+        if self.is_task_running():
+            return
+        
+        self.status_var_steady.set("正在划分稳态区间...")
+        self.run_task(self.steady_intervals_task, np.asarray(self.currents), np.asarray(self.n_values),
+                      min_len, threshold, absolute_threshold, reduce_interval,
+                      status_var=self.status_var_steady, action_buttons=self.steady_action_buttons,
+                      cancel_button=self.steady_cancel_btn,
+                      on_done=lambda intervals: self.show_steady_intervals(intervals, reduce_interval),
+                      error_title="分析错误", error_text="分析过程中发生错误", failed_text="分析失败")
+
+    def steady_intervals_task(self, context, *args):
+        """后台划分稳态区间，参数同 compute_steady_intervals"""
+        intervals = self.compute_steady_intervals(*args)
+        # 取消请求在划分期间到达时丢弃结果
+        context.check_cancelled()
+        return intervals
 
-            # 根据复选框决定是否缩减区间
-            reduce_interval = self.reduce_interval_steady.get()
-            self.intervals = []
-            for (start_idx, end_idx) in original_intervals:
-                if reduce_interval and end_idx - start_idx >= 2:
-                    adjusted_start = start_idx + 1
-                    adjusted_end = end_idx - 1
-                    self.intervals.append((adjusted_start, adjusted_end))
-                else:
-                    self.intervals.append((start_idx, end_idx))
+    def compute_steady_intervals(self, currents, n_array, min_len, threshold, absolute_threshold, reduce_interval):
+        """
+        划分稳态区间（不访问界面控件）：按程序行号排序后划分，再换算回原始数据索引
+
+        返回:
+            [(起始索引, 结束索引), ...]，按程序行号顺序排列
+        """
+        # 应用稳态区间划分算法 - 修改为按照程序行号顺序
+        # 首先按照程序行号对数据进行排序
+        sorted_indices = np.argsort(n_array)
+        sorted_currents = currents[sorted_indices]
+
+        # 在排序后的数据上应用稳态区间划分
+        raw_intervals = self.find_steady_state_intervals(
+            sorted_currents, 
+            min_len, 
+            threshold,
+            absolute_threshold,  # 传递绝对阈值
+            adaptive=False,  # 禁用自适应，严格按照用户设置的阈值
+            respect_user_thresholds=True  # 尊重用户设置的阈值
+        )
+        # 新增：再次检查并处理区间重叠（确保双重保护）
+        raw_intervals = self.adjust_overlapping_intervals(raw_intervals, overlap_tolerance=10)
+        # 将区间索引转换回原始数据索引
+        original_intervals = []
+        for start_idx, end_idx in raw_intervals:
+            original_start = sorted_indices[start_idx]
+            original_end = sorted_indices[end_idx]
+            original_intervals.append((original_start, original_end))
+
+        # 确保区间按照程序行号顺序排列
+        original_intervals.sort(key=lambda x: n_array[x[0]].item())
+
+        intervals = []
+        for (start_idx, end_idx) in original_intervals:
+            if reduce_interval and end_idx - start_idx >= 2:
+                adjusted_start = start_idx + 1
+                adjusted_end = end_idx - 1
+                intervals.append((adjusted_start, adjusted_end))
+            else:
+                intervals.append((start_idx, end_idx))
+        return intervals
+
+    def show_steady_intervals(self, intervals, reduce_interval):
+        """显示 steady_intervals_task 划分的稳态区间：结果文本与时间域/指令域图表"""
+        if not intervals:
+            messagebox.showinfo("结果", "未找到稳态区间")
+            self.status_var_steady.set("未找到稳态区间")
+            return
+        
+        try:
+            self.intervals = intervals
 
             # 更新结果文本
             self.result_text.delete(1.0, tk.END)
@@ -3733,50 +3620,12 @@ class MillingAnalysisTool:
                                     f"[{start_n_int}, {end_n_int}]\t" +  # 使用处理后的行号
                                     f"{length_points}\t\t{duration:.2f}s\n")
             
-            # 清理预览图并替换为稳态区间图
+            # 清理预览图并替换为稳态区间图（与批量处理共用同一绘图函数，曲线按屏幕降采样）
             self.ax_steady_time.clear()
-            ax1 = self.ax_steady_time
-            ax1.plot(np.asarray(self.cumulative_time), np.asarray(self.currents), 'b-', linewidth=1.0, label='电流值')
-            interval_colors = ['#2ecc71', '#f39c12', '#3498db', '#9b59b6', '#e74c3c']
-            for idx, (start_idx, end_idx) in enumerate(self.intervals):
-                start_time = self.cumulative_time[start_idx]
-                end_time = self.cumulative_time[end_idx]
-                color = interval_colors[idx % len(interval_colors)]
-                ax1.axvspan(start_time, end_time, alpha=0.35, color=color, # type: ignore
-                           edgecolor=color, linewidth=0.8)
-            ax1.set_title('时间域稳态区间')
-            ax1.set_xlabel('时间 (秒)')
-            ax1.set_ylabel('电流 (A)')
-            self.cap_y_axis(ax1, [self.currents])
-            ax1.grid(True, linestyle='--', alpha=0.7)
-            ax1.legend(loc='upper right')
-            
-            # 指令域图表
             self.ax_steady_n.clear()
-            ax2 = self.ax_steady_n
-            positions = range(len(self.n_values))
-            ax2.plot(positions, np.asarray(self.currents), 'g-', linewidth=1.0, label='电流值')
-            for idx, (start_idx, end_idx) in enumerate(self.intervals):
-                end_idx = min(end_idx, len(self.n_values)-1)
-                color = interval_colors[idx % len(interval_colors)]
-                ax2.axvspan(start_idx, end_idx, alpha=0.35, color=color, 
-                           edgecolor=color, linewidth=0.8)
-            ax2.set_title('指令域稳态区间')
-            ax2.set_xlabel('指令行号索引')
-            ax2.set_ylabel('电流 (A)')
-            self.cap_y_axis(ax2, [self.currents])
-            if len(self.n_values) > 100:
-                step = max(1, len(self.n_values) // 20)
-                tick_positions = positions[::step]
-                visible_labels = [self.n_values[min(i, len(self.n_values)-1)] for i in tick_positions]
-                ax2.set_xticks(tick_positions)
-                ax2.set_xticklabels(visible_labels, rotation=45, ha='right', fontsize=8)
-            else:
-                ax2.set_xticks(positions)
-                visible_labels = [self.n_values[min(i, len(self.n_values)-1)] for i in positions]
-                ax2.set_xticklabels(visible_labels, rotation=45, ha='right', fontsize=8)
-            ax2.grid(True, linestyle='--', alpha=0.7)
-            ax2.legend(loc='upper right')
+            batch_pipeline.draw_steady_axes(self.ax_steady_time, self.ax_steady_n, self.cumulative_time,
+                                            self.currents, self.n_values, self.intervals,
+                                            plot=plot_decimation.plot)
             
             # 重绘画布
             self.canvas_steady_time.draw()
@@ -3818,14 +3667,13 @@ class MillingAnalysisTool:
             # 1. 单独保存时域稳态区间图 - 同时保存PNG和SVG
             fig_time_png = os.path.join(save_dir, "steady_state_time_domain.png")
             fig_time_svg = os.path.join(save_dir, "steady_state_time_domain.svg")
-            self.fig_steady_time.savefig(fig_time_png, dpi=600, bbox_inches='tight', format='png')
-            self.fig_steady_time.savefig(fig_time_svg, bbox_inches='tight', format='svg')
             
-            # 2. 单独保存指令域稳态区间图 - 同时保存PNG和SVG
+            # 2. 单独保存指令域稳态区间图 - 同时保存PNG和SVG（两张图在后台并行导出）
             fig_n_png = os.path.join(save_dir, "steady_state_n_domain.png")
             fig_n_svg = os.path.join(save_dir, "steady_state_n_domain.svg")
-            self.fig_steady_n.savefig(fig_n_png, dpi=600, bbox_inches='tight', format='png')
-            self.fig_steady_n.savefig(fig_n_svg, bbox_inches='tight', format='svg')
+            self.export_figures([(self.fig_steady_time, fig_time_png, fig_time_svg),
+                                 (self.fig_steady_n, fig_n_png, fig_n_svg)],
+                                self.status_var_steady, f"结果已保存到: {save_dir}")
             
             # 3. 保存区间数据
             txt_path = os.path.join(save_dir, "steady_intervals.txt")
@@ -3844,170 +3692,98 @@ class MillingAnalysisTool:
                     # 使用新格式保存区间
                     f.write(f"{start_idx}\t{end_idx}\t{start_ln:.0f}.{start_point_idx}\t{end_ln:.0f}.{end_point_idx}\t{length_points}\n")
             
-            self.status_var_steady.set(f"结果已保存到: {save_dir}")
             messagebox.showinfo("保存成功", 
                               f"分析结果已保存到:\n{save_dir}\n\n" +
-                              f"• 时域稳态区间图: {os.path.basename(fig_time_path)}\n" +
-                              f"• 指令域稳态区间图: {os.path.basename(fig_n_path)}\n" +
+                              f"• 时域稳态区间图: {os.path.basename(fig_time_png)}（后台导出中）\n" +
+                              f"• 指令域稳态区间图: {os.path.basename(fig_n_png)}（后台导出中）\n" +
                               f"• 区间数据文件: {os.path.basename(txt_path)}")
             
         except Exception as e:
             messagebox.showerror("保存错误", f"保存结果时发生错误:\n{str(e)}")
                   
+    def pit_arc_options(self):
+        """圆弧解析展开参数（传给 pit_builder.build_pit），未启用时为 None"""
+        if not self.expand_arcs.get():
+            return None
+        return {'angular_resolution': self.arc_resolution.get()}
+    
+    def pit_output_paths(self, input_file, base_save_dir=None):
+        """
+        工艺信息表的保存目录与输出文件路径
+
+        返回:
+            (保存目录, 输出文件路径)；未指定 base_save_dir 时保存在输入文件所在目录下
+        """
+        # 确定保存目录
+        if base_save_dir:
+            save_dir = os.path.join(base_save_dir, "processed_" + os.path.splitext(os.path.basename(input_file))[0])
+        else:
+            save_dir = os.path.join(os.path.dirname(input_file), "processed_" + os.path.splitext(os.path.basename(input_file))[0])
+        
+        output_filename = f"processed_{os.path.basename(input_file)}"
+        return save_dir, os.path.join(save_dir, output_filename)
+    
+    def pit_settings(self, batch=False):
+        """从界面读取生成工艺信息表的参数（batch 为 True 时使用批量处理页的原点、快移速度与材料）"""
+        if batch:
+            origin = (
+                self.batch_origin_x.get(),
+                self.batch_origin_y.get(),
+                self.batch_origin_z.get()
+            )
+            rapid_speed_xy = self.batch_rapid_speed_xy.get()
+            rapid_speed_z = self.batch_rapid_speed_z.get()
+            tool_diameter = self.batch_tool_diameter.get()
+            workpiece_material = self.batch_workpiece_material.get()
+            blank_material = self.batch_blank_material.get()
+        else:
+            origin = (
+                self.origin_x.get(),
+                self.origin_y.get(),
+                self.origin_z.get()
+            )
+            rapid_speed_xy = self.rapid_speed_xy.get()
+            rapid_speed_z = self.rapid_speed_z.get()
+            tool_diameter = self.tool_diameter.get()
+            workpiece_material = self.workpiece_material.get()
+            blank_material = self.blank_material.get()
+        return {
+            "origin": origin,
+            "rapid_speed_xy": rapid_speed_xy,
+            "rapid_speed_z": rapid_speed_z,
+            "s_base": self.s_base.get(),
+            "p_idle": self.p_idle.get(),
+            "z_impedance": self.z_impedance.get(),
+            "arc_options": self.pit_arc_options(),
+            "tool_diameter": tool_diameter,
+            "workpiece_material": workpiece_material,
+            "blank_material": blank_material,
+        }
+    
+    def build_pit_file(self, input_file, output_file, settings):
+        """按 pit_settings 的参数生成工艺信息表并写出文件（不访问界面控件，可在后台线程中调用），返回 PitTable"""
+        # 整个文件一次性读入，由 pit_builder 按列批量构建并写出工艺信息表
+        with open(input_file, 'r') as infile:
+            text = infile.read()
+        table = pit_builder.build_pit(
+            text, settings["origin"], settings["rapid_speed_xy"], settings["rapid_speed_z"],
+            settings["s_base"], settings["p_idle"], settings["z_impedance"], settings["arc_options"]
+        )
+        del text
+        with open(output_file, 'w') as outfile:
+            pit_builder.write_pit(outfile, table, settings["tool_diameter"],
+                                  settings["workpiece_material"], settings["blank_material"])
+        return table
+    
     def process_single_file(self, input_file, save_plots=False, do_steady_analysis=False, base_save_dir=None, min_length=None):
-        """处理单个文件的核心逻辑"""
+        """处理单个文件的核心逻辑（在界面线程中同步执行）"""
         try:
-            # 确定保存目录
-            if base_save_dir:
-                save_dir = os.path.join(base_save_dir, "processed_" + os.path.splitext(os.path.basename(input_file))[0])
-            else:
-                save_dir = os.path.join(os.path.dirname(input_file), "processed_" + os.path.splitext(os.path.basename(input_file))[0])
-            
+            save_dir, output_file = self.pit_output_paths(input_file, base_save_dir)
             self.processed_data_dir = save_dir
-            os.makedirs(save_dir, exist_ok=True)
-            
-            output_filename = f"processed_{os.path.basename(input_file)}"
-            output_file = os.path.join(save_dir, output_filename)
             self.processed_file_path = output_file
+            os.makedirs(save_dir, exist_ok=True)
             
-            if base_save_dir:
-                origin = (
-                    self.batch_origin_x.get(),
-                    self.batch_origin_y.get(),
-                    self.batch_origin_z.get()
-                )
-                rapid_speed_xy = self.batch_rapid_speed_xy.get()
-                rapid_speed_z = self.batch_rapid_speed_z.get()
-            else:
-                origin = (
-                    self.origin_x.get(),
-                    self.origin_y.get(),
-                    self.origin_z.get()
-                )
-                rapid_speed_xy = self.rapid_speed_xy.get()
-                rapid_speed_z = self.rapid_speed_z.get()
-            
-            if base_save_dir:  # 批量处理
-                tool_diameter = self.batch_tool_diameter.get()
-                workpiece_material = self.batch_workpiece_material.get()
-                blank_material = self.batch_blank_material.get()
-            else:  # 单个文件处理
-                tool_diameter = self.tool_diameter.get()
-                workpiece_material = self.workpiece_material.get()
-                blank_material = self.blank_material.get()
-            
-            # 直接打开文件处理（移除行数统计）
-            with open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
-                # 添加材料信息作为表头注释
-                outfile.write(f"# 刀具直径(mm): {tool_diameter}\n")
-                outfile.write(f"# 刀具材料: {workpiece_material}\n")
-                outfile.write(f"# 毛坯材料: {blank_material}\n")
-                header = "ap\t\t ae\t\t F\t\t N\t\t X\t\t Y\t\t Z\t\t s(行程)\t\t t(时间)\t\t dMRV\t\t MRR\t\t S(转速)\t\t K(扭矩系数)\t\t T(扭矩)\t\t P(功率)"
-                outfile.write(header + "\n")
-                
-                prev_coords = origin
-                current_coords = origin
-                data = []
-                s_base = self.s_base.get()
-                p_idle = self.p_idle.get()
-                z_impedance = self.z_impedance.get()
-                current_s = s_base
-                current_feed = 0.0
-                current_move_type = "rapid"  # 从机床原点开始，初始为快速移动
-                
-                for line_num, line in enumerate(infile):
-                    parsed = self.parse_gcode_line(line)
-                    if not parsed:
-                        continue
-                        
-                    ap, ae, feed_rate, gcode_content, s_value = parsed
-                    
-                    # 更新转速
-                    if s_value is not None:
-                        current_s = s_value
-                    
-                    # 更新进给速度
-                    if feed_rate and float(feed_rate) > 0:
-                        current_feed = float(feed_rate)
-                    
-                    n_value = self.extract_n_value(gcode_content)
-                    
-                    # 提取当前坐标
-                    current_coords = self.extract_coordinates(gcode_content, prev_coords)
-                    
-                    # 计算行程距离
-                    s = self.calculate_distance(prev_coords, current_coords)
-                    
-                    # 确定移动类型
-                    if "G0" in gcode_content or "G00" in gcode_content:
-                        current_move_type = "rapid"
-                    elif any(gcode in gcode_content for gcode in ["G1", "G01", "G2", "G02", "G3", "G03"]):
-                        current_move_type = "cutting"
-                    
-                    # 根据移动类型计算时间
-                    if current_move_type == "rapid":
-                        dx = current_coords[0] - prev_coords[0]
-                        dy = current_coords[1] - prev_coords[1]
-                        dz = current_coords[2] - prev_coords[2]
-                        
-                        dist_xy = math.sqrt(dx**2 + dy**2)
-                        dist_z = abs(dz)
-                        
-                        if dist_xy > 0 and dist_z == 0:
-                            t_val = dist_xy / (rapid_speed_xy / 60.0)
-                        elif dist_xy == 0 and dist_z > 0:
-                            t_val = dist_z / (rapid_speed_z / 60.0)
-                        elif dist_xy > 0 and dist_z > 0:
-                            t_val_xy = dist_xy / (rapid_speed_xy / 60.0)
-                            t_val_z = dist_z / (rapid_speed_z / 60.0)
-                            t_val = max(t_val_xy, t_val_z)
-                        else:
-                            t_val = 0.0
-                    else:
-                        t_val = s / (current_feed / 60.0) if current_feed > 0 and s > 0 else 0.0
-                    
-                    # 计算工艺参数（仅切削移动）
-                    if current_move_type == "cutting":
-                        t_val, dmrv_val, mrr_val, z_val, p_power = self.calculate_additional_columns(
-                            ap, ae, current_feed, s, current_s, p_idle, z_impedance
-                        )
-                    else:
-                        dmrv_val = 0.0
-                        mrr_val = 0.0
-                        z_val = z_impedance
-                        p_power = p_idle
-                    
-                    # 学术版：K(扭矩系数)和T(扭矩)设为占位值，因为采用Z(s)阻抗系数模型
-                    k_val = 0.0
-                    t_torque = 0.0
-                    
-                    # 写入处理后的数据
-                    line_data = (
-                        f"{ap}\t\t{ae}\t\t{current_feed:.1f}\t\t{n_value}\t\t"
-                        f"{current_coords[0]:.4f}\t\t{current_coords[1]:.4f}\t\t{current_coords[2]:.4f}\t\t"
-                        f"{s:.6f}\t\t{t_val:.6f}\t\t{dmrv_val:.6f}\t\t{mrr_val:.6f}\t\t"
-                        f"{current_s:.1f}\t\t{k_val:.6f}\t\t{t_torque:.6f}\t\t{p_power:.6f}"
-                    )
-                    outfile.write(line_data + "\n")
-                    
-                    data.append({
-                        's': s,
-                        't': t_val,
-                        'ap': float(ap),
-                        'ae': float(ae),
-                        'dMRV': dmrv_val,
-                        'MRR': mrr_val,
-                        'S': current_s,
-                        'Z': z_val,
-                        'P': p_power,
-                        'type': current_move_type,
-                        'N_str': n_value  # 存储N列字符串值
-                    })
-                    
-                    # 更新上一行坐标
-                    prev_coords = current_coords
-                
-                self.data = data
+            self.data = self.build_pit_file(input_file, output_file, self.pit_settings(batch=bool(base_save_dir)))
                 
             if save_plots:
                 self.generate_plots(save=True)
@@ -4016,7 +3792,7 @@ class MillingAnalysisTool:
                 self.steady_input_path.set(output_file)
                 self.load_data()
                 self.min_length.set(min_length or self.min_length.get())
-                self.analyze_data()
+                self.analyze_data(background=False)
                 self.save_steady_results(save_dir)
             
             return True
@@ -4025,11 +3801,15 @@ class MillingAnalysisTool:
             raise Exception(f"处理文件 {input_file} 时出错: {str(e)}")
         
     def batch_process_files(self):
-        """批量处理多个文件 - 优化版本"""
+        """批量处理多个文件 - 多进程流水线，每个工作进程独立完成一个文件的全部步骤"""
         if not self.batch_files:
             messagebox.showwarning("无文件", "请先添加要处理的文件")
             return
         
+        if self.batch_runner is not None:
+            messagebox.showinfo("正在处理", "批量处理正在进行中")
+            return
+        
         min_length = self.min_length.get()
         if min_length < 1:
             messagebox.showwarning("参数错误", "最小区间长度必须大于0")
@@ -4041,67 +3821,100 @@ class MillingAnalysisTool:
             output_dir = os.path.dirname(first_file)
             self.output_dir_var.set(output_dir)
         
-        total_files = len(self.batch_files)
+        settings = {
+            "origin": (self.batch_origin_x.get(), self.batch_origin_y.get(), self.batch_origin_z.get()),
+            "rapid_speed_xy": self.batch_rapid_speed_xy.get(),
+            "rapid_speed_z": self.batch_rapid_speed_z.get(),
+            "s_base": self.s_base.get(),
+            "p_idle": self.p_idle.get(),
+            "z_impedance": self.z_impedance.get(),
+            "tool_diameter": self.batch_tool_diameter.get(),
+            "workpiece_material": self.batch_workpiece_material.get(),
+            "blank_material": self.batch_blank_material.get(),
+            "arc_options": self.pit_arc_options(),
+            "enable_mrr_steady": self.enable_mrr_steady.get(),
+            "mrr_min_length": self.mrr_min_length.get(),
+            "min_length": min_length,
+            "relative_threshold": self.batch_threshold.get(),
+            "absolute_threshold": self.absolute_threshold.get(),
+            "reduce_interval": self.reduce_interval_steady.get(),
+            "engine": self.steady_engine,
+            "font_path": simhei_path,
+        }
         
         try:
-            self.batch_progress_var.set(0)
-            self.status_var_batch.set(f"开始批量处理 {total_files} 个文件...")
-            
-            # 禁用UI更新以提高性能
-            self.root.config(cursor="watch")
-            self.root.update()
-            
-            for idx, input_file in enumerate(self.batch_files):
-                # 更新进度
-                progress = (idx + 1) / total_files * 100
-                self.batch_progress_var.set(progress)
-                self.status_var_batch.set(f"处理文件 {idx+1}/{total_files}: {os.path.basename(input_file)}")
-                
-                # 强制更新UI
-                self.root.update_idletasks()
-                
-                try:
-                    # 处理当前文件
-                    self.process_single_file(
-                        input_file, 
-                        save_plots=True, 
-                        do_steady_analysis=True,
-                        base_save_dir=output_dir,
-                        min_length=min_length
-                    )
-                except Exception as e:
-                    # 记录错误但继续处理其他文件
-                    error_msg = f"文件 {os.path.basename(input_file)} 处理失败: {str(e)}"
-                    self.status_var_batch.set(error_msg)
-                    with open(os.path.join(output_dir, "batch_errors.log"), "a") as log:
-                        log.write(f"{datetime.now()}: {error_msg}\n")
-                
-                # 清理内存 - 关键优化点
-                self.data = []  # 清空数据缓存
-                self.figures = []  # 释放图表内存
-                plt.close('all')  # 关闭所有matplotlib图形
-                
-                # 强制垃圾回收
-                gc.collect()
-            # 恢复UI状态
+            max_workers = max(1, int(self.batch_workers.get()))
+        except (tk.TclError, ValueError):
+            max_workers = None
+        runner = batch_pipeline.BatchPipelineRunner(
+            self.batch_files, output_dir, settings, max_workers=max_workers)
+        total_files = len(runner)
+        stats = {"done": 0, "errors": 0}
+        
+        def finish_batch(cancelled):
+            self.batch_runner = None
             self.root.config(cursor="")
+            self.batch_process_btn.config(state=tk.NORMAL)
+            self.batch_cancel_btn.config(state=tk.DISABLED)
+            processed = stats["done"] + stats["errors"]
+            if cancelled:
+                self.status_var_batch.set(f"批量处理已取消，已完成 {processed}/{total_files} 个文件")
+                return
             self.batch_progress_var.set(100)
             self.status_var_batch.set(f"批量处理完成! 共处理 {total_files} 个文件")
-            
-            # 显示完成消息
             messagebox.showinfo("批量处理完成", 
-                             f"成功处理 {total_files} 个文件!\n" 
+                             f"成功处理 {stats['done']} 个文件，失败 {stats['errors']} 个!\n" 
                              f"结果已保存到: {output_dir}\n" 
-                             f"错误日志: {os.path.join(output_dir, 'batch_errors.log')}")
+                             f"错误日志: {runner.error_log_path}")
+        
+        def poll_results():
+            try:
+                while True:
+                    message = runner.results.get_nowait()
+                    if message[0] == 'finished':
+                        finish_batch(message[1])
+                        return
+                    if message[0] == 'done':
+                        stats["done"] += 1
+                        self.status_var_batch.set(
+                            f"已完成 {os.path.basename(message[1])} "
+                            f"({stats['done'] + stats['errors']}/{total_files})")
+                    else:
+                        # 错误已由流水线写入 batch_errors.log，继续处理其他文件
+                        stats["errors"] += 1
+                        self.status_var_batch.set(message[2])
+                    self.batch_progress_var.set((stats["done"] + stats["errors"]) / total_files * 100)
+            except queue.Empty:
+                pass
+            self.root.after(100, poll_results)
         
+        try:
+            self.batch_progress_var.set(0)
+            self.status_var_batch.set(f"开始批量处理 {total_files} 个文件（{runner.worker_count} 个进程）...")
+            self.root.config(cursor="watch")
+            self.batch_process_btn.config(state=tk.DISABLED)
+            self.batch_cancel_btn.config(state=tk.NORMAL)
+            self.batch_runner = runner
+            runner.start()
+            self.root.after(100, poll_results)
         except Exception as e:
+            self.batch_runner = None
             self.root.config(cursor="")
+            self.batch_process_btn.config(state=tk.NORMAL)
+            self.batch_cancel_btn.config(state=tk.DISABLED)
             messagebox.showerror("批量处理错误", f"批量处理过程中发生错误:\n{str(e)}")
             self.status_var_batch.set("批量处理失败")
+    
+    def cancel_batch_process(self):
+        """取消批量处理：尚未开始的文件不再处理，正在处理的文件完成后结束"""
+        if self.batch_runner is not None:
+            self.batch_runner.cancel()
+            self.batch_cancel_btn.config(state=tk.DISABLED)
+            self.status_var_batch.set("正在取消，等待处理中的文件完成...")
 
     def toggle_segment_mode(self):
         """切换区间分割模式"""
-        if not hasattr(self, 'actual_load_data') or not self.actual_load_data:
+        if not self.has_actual_load_data():
             messagebox.showwarning("无数据", "请先加载数据文件")
             self.segment_mode.set(False)
             return
@@ -4279,7 +4092,7 @@ class MillingAnalysisTool:
     
     def analyze_segments(self):
         """创建分段并更新界面"""
-        if not hasattr(self, 'actual_load_data') or not self.actual_load_data:
+        if not self.has_actual_load_data():
             messagebox.showwarning("无数据", "请先加载数据文件")
             return
         
@@ -4899,17 +4712,6 @@ class MillingAnalysisTool:
         if event.inaxes != self.ax_actual_load:
             return
         
-        # 获取当前坐标轴范围
-        cur_xlim = self.ax_actual_load.get_xlim()
-        cur_ylim = self.ax_actual_load.get_ylim()
-        
-        # 获取鼠标在数据坐标中的位置
-        xdata = event.xdata
-        ydata = event.ydata
-        
-        if xdata is None or ydata is None:
-            return
-        
         # 根据滚轮方向确定缩放方向
         if event.button == 'up':
             # 放大
@@ -4920,18 +4722,8 @@ class MillingAnalysisTool:
         else:
             return
         
-        # 只缩放x轴（横向缩放）
-        new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-        
-        relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
-        
-        new_xlim = [xdata - new_width * (1 - relx), xdata + new_width * relx]
-        
-        # 应用新的坐标轴范围（只改变x轴）
-        self.ax_actual_load.set_xlim(new_xlim)
-        
-        # 重绘图表
-        self.canvas_actual_load.draw()
+        # 以鼠标位置为中心只缩放x轴（横向缩放）；连续滚动合并为每帧一次 blit 重绘
+        chart_interaction.view_for(self.canvas_actual_load).zoom(event, scale_factor)
     
     def on_data_scroll_zoom(self, event):
         """数据处理标签页图表缩放：
@@ -4946,7 +4738,6 @@ class MillingAnalysisTool:
             return
 
         # 允许无 self.data 的情况下也能缩放（只要图已经渲染出来）
-        base_ax = self.ax_data if self.ax_data in fig.axes else fig.axes[0]
 
         key = (getattr(event, 'key', '') or '')
         key_l = key.lower()
@@ -4968,44 +4759,20 @@ class MillingAnalysisTool:
         else:
             return
 
-        # 鼠标所在数据坐标
-        xdata = event.xdata
-        ydata = event.ydata
-
-        # X轴缩放
-        if zoom_x and xdata is not None:
-            cur_xlim = base_ax.get_xlim()
-            new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-            relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0]) if (cur_xlim[1] - cur_xlim[0]) != 0 else 0.5
-            new_xlim = [xdata - new_width * (1 - relx), xdata + new_width * relx]
-            for ax in fig.axes:
-                try:
-                    ax.set_xlim(new_xlim)
-                except Exception:
-                    pass
-
-        # Y轴缩放（只对当前inaxes与共享y轴的轴生效通常更合理，但这里先简单对base_ax应用）
-        if zoom_y and ydata is not None:
-            cur_ylim = event.inaxes.get_ylim()
-            new_height = (cur_ylim[1] - cur_ylim[0]) * scale_factor
-            rely = (cur_ylim[1] - ydata) / (cur_ylim[1] - cur_ylim[0]) if (cur_ylim[1] - cur_ylim[0]) != 0 else 0.5
-            new_ylim = [ydata - new_height * (1 - rely), ydata + new_height * rely]
-            try:
-                event.inaxes.set_ylim(new_ylim)
-            except Exception:
-                pass
-
+        # X轴以鼠标位置为中心缩放并同步到同一Figure的所有轴，Y轴只缩放鼠标所在的轴；
+        # 连续滚动合并为每帧一次 blit 重绘
         try:
-            self.canvas_data.draw_idle()
+            chart_interaction.view_for(self.canvas_data).zoom(event, scale_factor, axes=fig.axes, x=zoom_x, y=zoom_y)
         except Exception:
             pass
 
     def reset_chart_view(self):
         """重置图表视图到原始范围"""
         if self.original_xlim is not None and self.original_ylim is not None:
-            self.ax_actual_load.set_xlim(self.original_xlim)
-            self.ax_actual_load.set_ylim(self.original_ylim)
-            self.canvas_actual_load.draw()
+            # 丢弃尚未应用的滚轮范围，立即完整重绘
+            view = chart_interaction.view_for(self.canvas_actual_load)
+            view.set_view(self.ax_actual_load, self.original_xlim, self.original_ylim)
+            view.flush()
             self.status_var_actual_load.set("图表视图已重置")
         else:
             messagebox.showinfo("提示", "没有可重置的视图范围，请先加载数据")
@@ -5052,17 +4819,6 @@ class MillingAnalysisTool:
     
     def _handle_chart_scroll(self, event, ax, canvas):
         """通用的图表滚轮缩放处理函数"""
-        # 获取当前坐标轴范围
-        cur_xlim = ax.get_xlim()
-        cur_ylim = ax.get_ylim()
-        
-        # 获取鼠标在数据坐标中的位置
-        xdata = event.xdata
-        ydata = event.ydata
-        
-        if xdata is None or ydata is None:
-            return
-        
         # 根据滚轮方向确定缩放方向
         if event.button == 'up':
             # 放大
@@ -5073,37 +4829,23 @@ class MillingAnalysisTool:
         else:
             return
         
-        # 计算新的坐标轴范围
-        new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-        new_height = (cur_ylim[1] - cur_ylim[0]) * scale_factor
-        
-        relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
-        rely = (cur_ylim[1] - ydata) / (cur_ylim[1] - cur_ylim[0])
-        
-        new_xlim = [xdata - new_width * (1 - relx), xdata + new_width * relx]
-        new_ylim = [ydata - new_height * (1 - rely), ydata + new_height * rely]
-        
-        # 设置新的坐标轴范围
-        ax.set_xlim(new_xlim)
-        ax.set_ylim(new_ylim)
-        
-        # 重绘图表
-        canvas.draw()
+        # 以鼠标位置为中心同时缩放x、y轴；连续滚动合并为每帧一次 blit 重绘
+        chart_interaction.view_for(canvas).zoom(event, scale_factor, y=True)
     
     def reset_steady_chart_view(self):
         """重置稳态图表的视图范围"""
         try:
             # 重置时域图表
             if hasattr(self, 'original_steady_time_xlim') and hasattr(self, 'original_steady_time_ylim'):
-                self.ax_steady_time.set_xlim(self.original_steady_time_xlim)
-                self.ax_steady_time.set_ylim(self.original_steady_time_ylim)
-                self.canvas_steady_time.draw()
+                view = chart_interaction.view_for(self.canvas_steady_time)
+                view.set_view(self.ax_steady_time, self.original_steady_time_xlim, self.original_steady_time_ylim)
+                view.flush()
             
             # 重置指令域图表
             if hasattr(self, 'original_steady_n_xlim') and hasattr(self, 'original_steady_n_ylim'):
-                self.ax_steady_n.set_xlim(self.original_steady_n_xlim)
-                self.ax_steady_n.set_ylim(self.original_steady_n_ylim)
-                self.canvas_steady_n.draw()
+                view = chart_interaction.view_for(self.canvas_steady_n)
+                view.set_view(self.ax_steady_n, self.original_steady_n_xlim, self.original_steady_n_ylim)
+                view.flush()
             
             messagebox.showinfo("成功", "稳态图表视图已重置")
         except Exception as e:
@@ -5185,7 +4927,7 @@ class MillingAnalysisTool:
 
             # 1) 工艺信息分析页：当前预览图（以及缓存图）统一跟随预览区域大小
             if hasattr(self, 'figures') and self.figures:
-                for fig in self.figures:
+                for fig in self.figures.open_figures():
                     try:
                         dpi = float(fig.get_dpi()) if fig.get_dpi() else 100.0
                     except Exception:
@@ -5254,6 +4996,8 @@ def optimize_memory():
     sys.stdout = open(os.devnull, 'w') if not sys.stdout else sys.stdout
 
 if __name__ == "__main__":
+    # 打包后的程序启动进程池工作进程时需要
+    multiprocessing.freeze_support()
     optimize_memory()
     root = tk.Tk()
     
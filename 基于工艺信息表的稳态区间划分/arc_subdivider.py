@@ -0,0 +1,918 @@
+"""
+G代码圆弧细分（不依赖 tkinter）
+
+ArcSubdivider 将 G2/G3 圆弧按角度分辨率细分为 G1 直线段，独立跟踪各轴位置，
+保留行号、模态进给和其他指令。界面（G代码细分.py）与命令行（smif_cli.py）共用。
+
+输出边处理边经 BufferedLineWriter 写入文件，内存占用与输出文件大小无关；
+处理进度按已读取的输入字节数通过 progress_callback 报告。
+
+细分方式：
+    - 固定角度（默认）：每段圆心角不超过 angular_resolution 度
+    - 弦高误差：给出 chord_tolerance（最大弦高误差）时按半径计算每段圆心角，大半径圆弧
+      用更少的点、小半径圆弧保证精度；可选 min_segment_length 限制最短段长。
+      汇总中报告相对固定角度模式少生成的点数
+
+缓存：给出 cache（subdivision_cache.SubdivisionCache）时按输入内容、细分参数与
+SUBDIVIDER_VERSION 查找已有的细分结果，命中时直接放到输出路径，不再细分。
+
+日志分级：逐行消息（位置更新、圆心计算、进给变化等）为 LOG_DEBUG，默认不输出也不格式化；
+每个文件结束时以 LOG_INFO 输出汇总计数（细分圆弧数、未细分圆弧数、生成点数等）。
+"""
+import io
+import math
+import os
+import time
+from pathlib import Path
+from collections import defaultdict
+
+import numpy as np
+
+import gcode_tokenizer
+
+
+# 细分输出格式版本，参与细分缓存的键；输出内容有变化时递增
+SUBDIVIDER_VERSION = 1
+
+
+def format_angle_suffix(angle):
+    """格式化角度后缀：整数直接显示，小数用'p'代替小数点"""
+    # 检查是否为整数（包括5.0这种情况）
+    if float(angle).is_integer():
+        return f"_{int(angle)}"
+    else:
+        # 将浮点数转换为字符串并用'p'替换小数点
+        angle_str = f"{angle:.4f}".rstrip('0').rstrip('.')
+        return f"_{angle_str.replace('.', 'p')}"
+
+
+def format_chord_suffix(chord_tolerance):
+    """格式化弦高误差后缀，如 0.001 → _chord0p001"""
+    tolerance_str = f"{chord_tolerance:.6f}".rstrip('0').rstrip('.')
+    return f"_chord{tolerance_str.replace('.', 'p')}"
+
+
+def get_output_filename(input_path, resolution, output_dir=None, chord_tolerance=None):
+    """生成带角度后缀（弦高误差模式为弦高误差后缀）的输出文件名，默认与输入文件同目录"""
+    input_path = Path(input_path)
+    if chord_tolerance is not None:
+        suffix = format_chord_suffix(chord_tolerance)
+    else:
+        suffix = format_angle_suffix(resolution)
+    parent = Path(output_dir) if output_dir else input_path.parent
+    return parent / f"{input_path.stem}_subdivided{suffix}{input_path.suffix}"
+
+
+def chord_segment_count(radius, sweep, chord_tolerance, min_segment_length=0.0):
+    """
+    按弦高误差计算圆弧的分段数
+
+    每段圆心角 θ 满足弦高 r·(1 - cos(θ/2)) ≤ chord_tolerance；给出 min_segment_length 时
+    每段弦长 2r·sin(θ/2) 不小于该值（最短段长优先，分段数可能因此减少）。
+
+    参数:
+        radius: 圆弧半径
+        sweep: 圆心角（弧度，取绝对值）
+        chord_tolerance: 最大弦高误差（与坐标同单位）
+        min_segment_length: 最短段长，0 表示不限制
+
+    返回:
+        分段数（至少为1）
+    """
+    sweep = abs(sweep)
+    if radius <= chord_tolerance:
+        max_step = math.pi
+    else:
+        max_step = min(math.pi, 2 * math.acos(1 - chord_tolerance / radius))
+    segments = max(1, math.ceil(sweep / max_step - 1e-9))
+    if min_segment_length and min_segment_length > 0:
+        if min_segment_length >= 2 * radius:
+            return 1
+        min_step = 2 * math.asin(min_segment_length / (2 * radius))
+        segments = min(segments, max(1, int(sweep / min_step + 1e-9)))
+    return segments
+
+
+# 少于该点数的圆弧直接用字符串模板格式化（数组拼接的固定开销此时更大）
+_VECTOR_FORMAT_MIN_POINTS = 32
+# 超出该绝对值的坐标不走数组拼接（避免 int64 溢出和浮点精度问题）
+_VECTOR_FORMAT_MAX_ABS = 1e9
+
+
+def _build_digit_table():
+    """
+    0-9999 的四位 ASCII 数字查找表，形状 (30000, 4)，0 字节表示空位：
+        [0, 10000)      补零的四位数字（"0042"）
+        [10000, 20000)  去掉前导零（"  42"，0 为 "   0"）
+        [20000, 30000)  去掉前导零且 0 为全空（用于更高位的数字组）
+    """
+    padded = np.frombuffer("".join(f"{i:04d}" for i in range(10000)).encode('ascii'),
+                           dtype=np.uint8).reshape(10000, 4)
+    lengths = np.array([len(str(i)) for i in range(10000)])
+    stripped = padded.copy()
+    stripped[np.arange(4) < (4 - lengths)[:, None]] = 0
+    blank_zero = stripped.copy()
+    blank_zero[0] = 0
+    return np.vstack([padded, stripped, blank_zero])
+
+
+_DIGITS4 = _build_digit_table()
+# 同一张表按每项4字节整体存取，一维 take 比二维花式索引快得多
+_DIGIT_WORDS = _DIGITS4.view(np.uint32).ravel()
+
+
+def _lookup_digits(index):
+    """按查找表下标取四位数字，返回形状 (n, 4) 的 uint8 数组"""
+    return _DIGIT_WORDS.take(index).view(np.uint8).reshape(-1, 4)
+
+
+def _put_digits(out, start, width, values, blank_zero=False):
+    """把非负整数数组写为 out[:, start:start + width] 中右对齐的 ASCII 数字，前导位置为 0 字节"""
+    if width <= 4:
+        out[:, start:start + width] = _lookup_digits(values + (20000 if blank_zero else 10000))[:, 4 - width:]
+        return
+    # 超过四位时按四位一组从低位写起；更高位全为 0 的数字组去掉前导零
+    high = values // 10000
+    low = values - high * 10000
+    out[:, start + width - 4:start + width] = _lookup_digits(low + np.where(high > 0, 0, 20000 if blank_zero else 10000))
+    _put_digits(out, start, width - 4, high, blank_zero=True)
+
+
+def _milli_units(values):
+    """
+    把浮点数组的绝对值按 "%.3f" 的舍入规则转换为千分位整数
+
+    返回:
+        int64 数组；含非有限值或超出范围时返回 None
+    """
+    if not np.all(np.isfinite(values)) or np.max(np.abs(values)) >= _VECTOR_FORMAT_MAX_ABS:
+        return None
+    scaled = np.abs(values) * 1000.0
+    milli = np.rint(scaled)
+    # 乘法的舍入误差可能让恰在 .5 附近的值取整到另一侧，这些值改用逐个格式化得到精确结果
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * np.spacing(scaled)
+    for i in np.flatnonzero(near_half):
+        milli[i] = int(f"{abs(values[i]):.3f}".replace('.', ''))
+    return milli.astype(np.int64)
+
+
+def format_g1_rows(xy, first_index=1, line_prefix=None):
+    """
+    批量生成 "G1 X... Y..." 指令行（以换行符连接，末尾不带换行符），
+    坐标与 f"{v:.3f}" 的结果逐字相同（含 "-0.000" 这类负零）
+
+    全部行先按列写入一个定宽字节矩阵（空位为 0 字节），删除空位后一次解码。
+
+    参数:
+        xy: 坐标数组，形状 (n, 2)
+        first_index: 第一行的细分序号
+        line_prefix: 行号前缀（如 "N120"），给出时每行以 "<前缀>.<序号> " 开头
+
+    返回:
+        字符串；坐标超出可精确处理的范围时返回 None
+    """
+    count = len(xy)
+    coords = []
+    for axis in range(2):
+        milli = _milli_units(xy[:, axis])
+        if milli is None:
+            return None
+        integer_part = milli // 1000
+        coords.append((np.signbit(xy[:, axis]), integer_part, milli - integer_part * 1000,
+                       len(str(int(integer_part.max())))))
+
+    # 行模板："<前缀>.<序号> G1 X<符号><整数>.<小数> Y<符号><整数>.<小数>\n"，数字位先留空（0 字节）
+    template = bytearray()
+    if line_prefix is not None:
+        indices = np.arange(first_index, first_index + count, dtype=np.int64)
+        index_width = len(str(int(indices[-1])))
+        template += f"{line_prefix}.".encode('utf-8')
+        index_start = len(template)
+        template += bytes(index_width) + b" "
+    fields = []
+    for name, (negative, integer_part, fraction, width) in zip((b"G1 X", b" Y"), coords):
+        template += name
+        fields.append((len(template), negative, integer_part, fraction, width))
+        template += bytes(1 + width) + b"." + bytes(3)
+    template += b"\n"
+
+    out = np.empty((count, len(template)), dtype=np.uint8)
+    out[:] = np.frombuffer(bytes(template), dtype=np.uint8)
+    if line_prefix is not None:
+        _put_digits(out, index_start, index_width, indices)
+    for col, negative, integer_part, fraction, width in fields:
+        out[negative, col] = ord('-')
+        _put_digits(out, col + 1, width, integer_part)
+        out[:, col + width + 2:col + width + 5] = _lookup_digits(fraction)[:, 1:]
+    # 删除空位（0 字节）和最后一个换行符后解码
+    flat = out.ravel()
+    return flat[flat != 0][:-1].tobytes().decode('utf-8')
+
+
+# 日志级别（数值与标准库 logging 相同）
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_WARNING = 30
+
+# 写出缓冲区上限（字符数），超过即写入文件
+DEFAULT_BUFFER_CHARS = 4 * 1024 * 1024
+# 每处理这么多输入行检查一次进度
+_PROGRESS_CHECK_LINES = 1024
+
+
+class BufferedLineWriter:
+    """按行写出文本：缓冲区累计超过 buffer_chars 个字符时整块写入文件，内存占用有固定上限"""
+
+    def __init__(self, file, buffer_chars=DEFAULT_BUFFER_CHARS):
+        """
+        file: 以文本模式打开的输出文件
+        buffer_chars: 缓冲区上限（字符数）
+        """
+        self.file = file
+        self.buffer_chars = buffer_chars
+        self._parts = []
+        self._size = 0
+
+    def write_line(self, text):
+        """写入一行（text 也可以是以换行符连接的多行，末尾不带换行符）"""
+        self._parts.append(text)
+        self._size += len(text) + 1
+        if self._size >= self.buffer_chars:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区内容写入文件"""
+        if self._parts:
+            self._parts.append("")
+            self.file.write("\n".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+class ArcSubdivider:
+    def __init__(self, angular_resolution=1.0, log_message=None, progress_callback=None,
+                 buffer_chars=DEFAULT_BUFFER_CHARS, log_level=LOG_INFO,
+                 chord_tolerance=None, min_segment_length=0.0, cache=None):
+        """
+        angular_resolution: 角度分辨率（度）；弦高误差模式下只作为统计对比的基准
+        chord_tolerance: 最大弦高误差（mm），给出时按弦高误差细分（None 为固定角度模式）
+        min_segment_length: 弦高误差模式的最短段长（mm），0 表示不限制
+        log_message: 日志回调 log_message(消息)，只接收级别不低于 log_level 的消息
+        log_level: 日志级别，LOG_DEBUG 时输出逐行的处理细节
+        progress_callback: 进度回调 progress_callback(已读取字节数, 输入文件总字节数)
+        buffer_chars: 输出缓冲区上限（字符数）
+        cache: 细分结果缓存（subdivision_cache.SubdivisionCache），None 表示不使用缓存
+        """
+        self.angular_resolution = angular_resolution
+        self.chord_tolerance = chord_tolerance
+        self.min_segment_length = min_segment_length
+        # 独立跟踪每个轴的位置
+        self.axis_pos = defaultdict(float)
+        # 独立跟踪每个轴最后更新的位置
+        self.last_axis_update = defaultdict(float)
+        self.arc_plane = 'G17'
+        self.distance_mode = 'G90'
+        self.feed_rate = None
+        self.log_message = log_message or (lambda msg: None)
+        self.log_level = log_level
+        # 逐行的调试消息只在开启时格式化，关闭时日志开销接近零
+        self.debug_enabled = log_message is not None and log_level <= LOG_DEBUG
+        self.stats = self._empty_stats()
+        self.progress_callback = progress_callback
+        self.buffer_chars = buffer_chars
+        self.cache = cache
+        self.cache_hit = False  # 最近一次 process_gcode_path 是否命中缓存
+        self.last_motion_command = None
+        self.current_line_number = None  # 当前处理的行号
+        
+    @staticmethod
+    def _empty_stats():
+        """每个文件的处理计数"""
+        return {'lines': 0, 'arcs_subdivided': 0, 'arcs_unsplit': 0, 'arcs_failed': 0,
+                'points': 0, 'points_fixed_angle': 0, 'warnings': 0}
+
+    def cache_params(self):
+        """影响细分输出的参数（缓存键的一部分）"""
+        return {'angular_resolution': self.angular_resolution, 'chord_tolerance': self.chord_tolerance,
+                'min_segment_length': self.min_segment_length}
+
+    def log(self, level, message):
+        """按级别输出日志；警告同时计入 stats['warnings']"""
+        if level >= LOG_WARNING:
+            self.stats['warnings'] += 1
+        if level >= self.log_level:
+            self.log_message(message)
+
+    def parse_gcode_line(self, line):
+        """
+        解析G代码行，返回 (行号, 命令, 参数)
+
+        分词由 gcode_tokenizer.tokenize_line 完成；一行有多个G/M指令时取最后一个
+        """
+        line_number, commands, params, invalid = gcode_tokenizer.tokenize_line(line)
+        for word in invalid:
+            self.log(LOG_WARNING, f"无法解析参数: {word}")
+        return line_number, (commands[-1] if commands else None), params
+    
+    def update_axis_position(self, params):
+        """更新各轴位置 - 独立更新每个轴"""
+        changes = [] if self.debug_enabled else None
+        for axis, value in params.items():
+            if axis in ['X', 'Y', 'Z']:  # 只处理坐标轴
+                # 记录该轴最后更新的位置
+                old_value = self.last_axis_update[axis]
+                
+                if self.distance_mode == 'G90':  # 绝对坐标
+                    self.axis_pos[axis] = value
+                    self.last_axis_update[axis] = value
+                    if changes is not None and abs(old_value - value) > 0.001:
+                        changes.append(f"{axis}: {old_value:.4f} → {value:.4f}")
+                else:  # 增量坐标
+                    new_value = self.axis_pos[axis] + value
+                    self.axis_pos[axis] = new_value
+                    self.last_axis_update[axis] = new_value
+                    if changes is not None:
+                        changes.append(f"{axis}: +{value:.4f} → {new_value:.4f}")
+        
+        if changes:
+            self.log_message("位置更新: " + ", ".join(changes))
+    
+    def get_arc_start_point(self):
+        """获取圆弧起点位置 - 使用每个轴最后独立更新的值"""
+        start_point = {
+            'X': self.last_axis_update['X'],
+            'Y': self.last_axis_update['Y'],
+            'Z': self.last_axis_update['Z']
+        }
+        return start_point
+    
+    def calculate_arc_center_ij(self, end_x, end_y, i_offset, j_offset, arc_command):
+        """计算I/J格式圆弧圆心"""
+        # 获取起点
+        start_point = self.get_arc_start_point()
+        start_x = start_point['X']
+        start_y = start_point['Y']
+        
+        # I/J是相对于起点的偏移量
+        center_x = start_x + i_offset
+        center_y = start_y + j_offset
+        
+        # 计算半径
+        radius = math.sqrt(i_offset**2 + j_offset**2)
+        
+        if self.debug_enabled:
+            self.log_message(f"I/J圆弧: 起点({start_x:.4f}, {start_y:.4f}), 终点({end_x:.4f}, {end_y:.4f}), I={i_offset:.4f}, J={j_offset:.4f}")
+            self.log_message(f"圆心: ({center_x:.4f}, {center_y:.4f}), 半径={radius:.4f}")
+        
+        # 验证终点到圆心的距离
+        end_radius = math.sqrt((end_x - center_x)**2 + (end_y - center_y)**2)
+        radius_diff = abs(end_radius - radius)
+        
+        if radius_diff > 0.01:  # 允许10微米误差
+            self.log(LOG_WARNING, f"警告: 终点半径={end_radius:.4f}与起点半径={radius:.4f}不匹配，误差={radius_diff:.6f}")
+        
+        return center_x, center_y, radius
+    
+    def calculate_arc_center(self, end_x, end_y, radius, arc_command):
+        """计算圆弧圆心 - 修复圆心方向错误问题"""
+        # 获取当前所有轴的最近位置作为起点
+        start_point = self.get_arc_start_point()
+        start_x = start_point['X']
+        start_y = start_point['Y']
+        
+        if self.debug_enabled:
+            self.log_message(f"R格式圆弧: 起点({start_x:.4f}, {start_y:.4f}), 终点({end_x:.4f}, {end_y:.4f}), R={radius:.4f}, {arc_command}")
+        
+        # 检查起点终点是否重合
+        if abs(start_x - end_x) < 0.001 and abs(start_y - end_y) < 0.001:
+            self.log(LOG_WARNING, "警告: 圆弧起点和终点重合，无法计算圆心")
+            return None
+        
+        # 计算弦长
+        dx = end_x - start_x
+        dy = end_y - start_y
+        chord_length = math.sqrt(dx**2 + dy**2)
+        
+        # 检查半径有效性
+        if chord_length > 2 * abs(radius):
+            self.log(LOG_WARNING, f"几何错误: 弦长={chord_length:.4f} > 直径={2*abs(radius):.4f}")
+            return None
+        
+        # 计算弦的中点
+        mid_x = (start_x + end_x) / 2
+        mid_y = (start_y + end_y) / 2
+        
+        # 计算弦的垂直距离
+        actual_radius = abs(radius)
+        height = math.sqrt(actual_radius**2 - (chord_length/2)**2)
+        
+        # 计算垂直于弦的单位向量
+        # 弦的方向向量: (dx, dy)
+        # 垂直向量(右手): (dy, -dx) 或 (-dy, dx)
+        perp_length = chord_length
+        
+        # 根据G2/G3和半径符号确定圆心位置
+        # G2顺时针: 圆心在弦的右侧(刀具视角)
+        # G3逆时针: 圆心在弦的左侧(刀具视角)
+        # 负半径: 取大圆弧(>180度),圆心在另一侧
+        
+        if arc_command in ['G2', 'G02']:  # 顺时针
+            # 标准情况: 圆心在右侧
+            perp_x = dy / perp_length
+            perp_y = -dx / perp_length
+            if radius < 0:  # 大圆弧，圆心翻转到左侧
+                perp_x = -perp_x
+                perp_y = -perp_y
+        else:  # G3/G03 逆时针
+            # 标准情况: 圆心在左侧
+            perp_x = -dy / perp_length
+            perp_y = dx / perp_length
+            if radius < 0:  # 大圆弧，圆心翻转到右侧
+                perp_x = -perp_x
+                perp_y = -perp_y
+        
+        # 计算圆心位置
+        center_x = mid_x + height * perp_x
+        center_y = mid_y + height * perp_y
+        
+        # 验证半径
+        calc_radius_start = math.sqrt((start_x - center_x)**2 + (start_y - center_y)**2)
+        calc_radius_end = math.sqrt((end_x - center_x)**2 + (end_y - center_y)**2)
+        radius_diff_start = abs(calc_radius_start - actual_radius)
+        radius_diff_end = abs(calc_radius_end - actual_radius)
+        
+        if radius_diff_start > 0.001 or radius_diff_end > 0.001:  # 允许1微米误差
+            self.log(LOG_WARNING, f"半径验证失败: 起点半径={calc_radius_start:.4f}, 终点半径={calc_radius_end:.4f}, 指定半径={actual_radius:.4f}")
+            if LOG_WARNING >= self.log_level:
+                self.log_message(f"起点误差={radius_diff_start:.6f}, 终点误差={radius_diff_end:.6f}")
+            # 不返回None，继续使用计算的圆心（可能是数值精度问题）
+        
+        if self.debug_enabled:
+            self.log_message(f"圆心计算: ({center_x:.4f}, {center_y:.4f}), 半径={actual_radius:.4f}")
+        return center_x, center_y
+    
+    def subdivide_arc(self, end_x, end_y, params, command):
+        """细分圆弧为多个点 - 支持R格式和I/J格式"""
+        if self.arc_plane != 'G17':  # 仅支持XY平面
+            self.log(LOG_WARNING, f"警告: 当前仅支持G17(XY平面)圆弧细分,检测到{self.arc_plane},跳过细分")
+            return []
+        
+        arc_command = command  # 统一变量名
+        start_point = self.get_arc_start_point()
+        start_x = start_point['X']
+        start_y = start_point['Y']
+        
+        # 检查起点终点是否重合
+        if abs(start_x - end_x) < 0.001 and abs(start_y - end_y) < 0.001:
+            self.log(LOG_WARNING, "警告: 圆弧起点和终点重合，无法细分")
+            return []
+        
+        # 判断使用I/J格式还是R格式
+        if 'I' in params or 'J' in params:
+            # I/J格式
+            i_offset = params.get('I', 0.0)
+            j_offset = params.get('J', 0.0)
+            result = self.calculate_arc_center_ij(end_x, end_y, i_offset, j_offset, arc_command)
+            if result is None:
+                self.log(LOG_WARNING, "无法计算I/J格式圆弧圆心")
+                return []
+            cx, cy, start_radius = result
+        elif 'R' in params:
+            # R格式
+            radius = params['R']
+            center = self.calculate_arc_center(end_x, end_y, radius, arc_command)
+            if center is None:
+                self.log(LOG_WARNING, "无法计算R格式圆弧圆心")
+                return []
+            cx, cy = center
+            start_radius = abs(radius)
+        else:
+            self.log(LOG_WARNING, "错误: 圆弧指令缺少R或I/J参数")
+            return []
+        
+        # 计算起点和终点角度
+        start_angle = math.atan2(start_y - cy, start_x - cx)
+        end_angle = math.atan2(end_y - cy, end_x - cx)
+        
+        # 计算角度变化（不使用normalize，直接处理）
+        angle_diff = end_angle - start_angle
+        
+        # 调整圆弧方向
+        if arc_command in ['G2', 'G02']:  # 顺时针
+            if angle_diff > 0:
+                angle_diff -= 2 * math.pi
+            angle_change = angle_diff  # 保持负值表示顺时针
+        else:  # G3/G03 逆时针
+            if angle_diff < 0:
+                angle_diff += 2 * math.pi
+            angle_change = angle_diff  # 保持正值表示逆时针
+        
+        # 计算细分点数量
+        total_angle = abs(angle_change)
+        resolution_rad = math.radians(self.angular_resolution)
+        num_points = max(2, int(total_angle / resolution_rad) + 1)
+        # 检查是否需要细分：如果角度小于等于分辨率，或接近分辨率(含容差)，不进行细分
+        fixed_angle_split = total_angle > resolution_rad + 1e-9
+        # 固定角度模式下该圆弧的细分点数，用于弦高误差模式的统计对比
+        self.stats['points_fixed_angle'] += num_points - 1 if fixed_angle_split else 0
+        
+        if self.chord_tolerance is not None:
+            # 弦高误差模式：分段数由半径决定
+            segments = chord_segment_count(start_radius, total_angle, self.chord_tolerance, self.min_segment_length)
+            if segments <= 1:
+                if self.debug_enabled:
+                    self.log_message(f"圆弧弦高误差不超过{self.chord_tolerance}mm(半径={start_radius:.4f})，不细分")
+                return None
+            num_points = segments + 1
+        elif not fixed_angle_split:
+            if self.debug_enabled:
+                self.log_message(f"圆弧角度({math.degrees(total_angle):.4f}度)小于等于分辨率({self.angular_resolution}度)，不细分")
+            return None  # 返回None表示不需要细分
+        
+        angle_step = angle_change / (num_points - 1)
+        
+        # 一次性计算全部中间点的角度与坐标（不含起点，含终点）
+        # 坐标不在此处取整：输出时按3位小数格式化，结果与先取整再格式化相同
+        angles = start_angle + np.arange(1, num_points) * angle_step
+        points = np.empty((num_points - 1, 2))
+        np.cos(angles, out=points[:, 0])
+        np.sin(angles, out=points[:, 1])
+        points *= start_radius
+        points[:, 0] += cx
+        points[:, 1] += cy
+        
+        if self.debug_enabled:
+            self.log_message(f"圆弧细分成功: 生成{len(points)}个点")
+        return points
+    
+    def format_g1_block(self, base_line_number, points, feed_changed):
+        """
+        把细分点批量格式化为多行G1指令 - 使用原始行号加小数部分，仅在进给变化时输出F
+        
+        参数:
+            base_line_number: 原始行号（如 "N120"），没有行号时为 None
+            points: 细分点数组，形状 (n, 2)，每行为 (X, Y)
+            feed_changed: 本行是否改变了进给速度
+        
+        返回:
+            以换行符连接的 n 行G1指令（末尾不带换行符）
+        """
+        points = np.asarray(points, dtype=float)
+        count = len(points)
+        if count == 0:
+            return ""
+        
+        # 只在第一个点输出Z和F值，后续点省略
+        first_suffix = ""
+        current_z = self.last_axis_update.get('Z', None)
+        if current_z is not None:
+            first_suffix += f" Z{current_z:.3f}"
+        # 仅当进给速度有变化时输出F
+        if feed_changed and self.feed_rate is not None:
+            first_suffix += f" F{self.feed_rate:.1f}"
+        first_suffix = first_suffix.replace('%', '%%')
+        
+        line_prefix = None
+        if base_line_number:
+            # 生成带小数部分的行号：移除原始行号的"N"前缀后添加序号
+            base_num = base_line_number[1:] if base_line_number.startswith('N') else base_line_number
+            line_prefix = f"N{base_num}"
+            line_format = f"N{base_num.replace('%', '%%')}.%d G1 X%.3f Y%.3f"
+        else:
+            # 如果没有行号，直接生成指令
+            line_format = "G1 X%.3f Y%.3f"
+        
+        # 点数较多时，第一行单独格式化（带Z/F），其余各行用字节矩阵一次拼接
+        if count >= _VECTOR_FORMAT_MIN_POINTS:
+            rest = format_g1_rows(points[1:], 2, line_prefix)
+            if rest is not None:
+                first_values = tuple(points[0].tolist())
+                if line_prefix is not None:
+                    first_values = (1,) + first_values
+                return (line_format + first_suffix) % first_values + "\n" + rest
+        
+        # 整段模板一次格式化，避免逐点拼接字符串
+        if line_prefix is not None:
+            values = np.empty((count, 3))
+            values[:, 0] = np.arange(1, count + 1)
+            values[:, 1:] = points
+        else:
+            values = points
+        template = line_format + first_suffix + ("\n" + line_format) * (count - 1)
+        return template % tuple(values.ravel().tolist())
+    
+    def generate_g1_lines(self, base_line_number, points, feed_changed):
+        """生成G1指令列表（每个细分点一行），格式同 format_g1_block"""
+        block = self.format_g1_block(base_line_number, points, feed_changed)
+        return block.split('\n') if block else []
+    
+    def process_gcode_path(self, input_path, output_path):
+        """处理G代码文件路径 - 独立跟踪各轴位置"""
+        start_time = time.time()
+        
+        input_path = Path(input_path)
+        output_path = Path(output_path)
+        
+        if not input_path.exists():
+            raise FileNotFoundError(f"输入文件不存在: {input_path}")
+        
+        # 初始化各轴位置
+        self.axis_pos = defaultdict(float)
+        self.last_axis_update = defaultdict(float)
+        for axis in ['X', 'Y', 'Z']:
+            self.axis_pos[axis] = 0.0
+            self.last_axis_update[axis] = 0.0
+        
+        self.arc_plane = 'G17'
+        self.distance_mode = 'G90'
+        self.feed_rate = None
+        self.last_motion_command = None
+        self.current_line_number = None
+        self.stats = self._empty_stats()
+        self.cache_hit = False
+        
+        # 先查缓存：命中时不再检测编码和细分
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(input_path, self.cache_params(), SUBDIVIDER_VERSION)
+            cached_stats = self.cache.fetch(cache_key, output_path)
+            if cached_stats is not None:
+                self.stats.update(cached_stats)
+                self.cache_hit = True
+                if self.progress_callback is not None:
+                    total_bytes = os.path.getsize(input_path)
+                    self.progress_callback(total_bytes, total_bytes)
+                self.log(LOG_INFO, f"命中细分缓存（{time.time() - start_time:.3f}秒）: {output_path}")
+                return output_path
+        
+        # 检测文件编码（chardet 只在处理文件时导入，不拖慢界面启动）
+        import chardet
+        with open(input_path, 'rb') as f:
+            raw_data = f.read(4096)
+            result = chardet.detect(raw_data)
+            file_encoding = result.get('encoding') if result else 'gbk'
+        
+        file_encoding = (result or {}).get('encoding') or 'gbk'
+        confidence = (result or {}).get('confidence', 0)
+        self.log(LOG_INFO, f"检测到文件编码: {file_encoding} (置信度: {confidence:.2f})")
+        
+        # 逐行处理并立即写出；进度按底层二进制文件已读取的字节数计算
+        total_bytes = os.path.getsize(input_path)
+        # 已有的输出文件可能与缓存条目硬链接，先删除再写，避免就地改写缓存内容
+        if output_path.exists() and not output_path.samefile(input_path):
+            output_path.unlink()
+        try:
+            with open(input_path, 'rb') as raw, \
+                    io.TextIOWrapper(raw, encoding=file_encoding, errors='replace') as f, \
+                    open(output_path, 'w', encoding='utf-8') as out:
+                writer = BufferedLineWriter(out, self.buffer_chars)
+                line_count = 0
+                for line_count, line in enumerate(f, 1):
+                    for output in self.process_line(line):
+                        writer.write_line(output)
+                    if self.progress_callback is not None and line_count % _PROGRESS_CHECK_LINES == 0:
+                        self.progress_callback(raw.tell(), total_bytes)
+                writer.flush()
+                self.stats['lines'] = line_count
+        except BaseException:
+            # 处理失败时不留下不完整的输出文件
+            if output_path.exists():
+                output_path.unlink()
+            raise
+        if self.progress_callback is not None:
+            self.progress_callback(total_bytes, total_bytes)
+        if cache_key is not None:
+            self.cache.store(cache_key, output_path, dict(self.stats))
+        
+        # 性能统计
+        elapsed_time = time.time() - start_time
+        input_size = os.path.getsize(input_path) / 1024 / 1024  # MB
+        output_size = os.path.getsize(output_path) / 1024 / 1024  # MB
+        stats = self.stats
+        if LOG_INFO >= self.log_level:
+            self.log_message("\n处理完成！")
+            self.log_message(f"处理时间: {elapsed_time:.2f}秒")
+            self.log_message(f"输入行数: {stats['lines']}")
+            self.log_message(f"细分圆弧: {stats['arcs_subdivided']} 段，生成 {stats['points']} 个点")
+            self.log_message(f"未细分圆弧（无需细分）: {stats['arcs_unsplit']} 段")
+            if self.chord_tolerance is not None:
+                saved = stats['points_fixed_angle'] - stats['points']
+                ratio = saved / stats['points_fixed_angle'] * 100 if stats['points_fixed_angle'] else 0.0
+                limit = f"，最短段长 {self.min_segment_length}mm" if self.min_segment_length else ""
+                self.log_message(f"弦高误差 {self.chord_tolerance}mm{limit}: 相对固定角度 {self.angular_resolution}度 "
+                                 f"少生成 {saved} 个点（{ratio:.1f}%）")
+            if stats['arcs_failed'] or stats['warnings']:
+                self.log_message(f"细分失败圆弧: {stats['arcs_failed']} 段，警告: {stats['warnings']} 条")
+            self.log_message(f"输入文件大小: {input_size:.2f}MB")
+            self.log_message(f"输出文件大小: {output_size:.2f}MB")
+            self.log_message(f"压缩比: {output_size/input_size:.2f}x")
+        
+        return output_path
+    
+    # 在 process_line 方法中确保模态F值被正确处理
+    def process_line(self, line):
+        """
+        处理单行G代码 - 使用原始行号加小数部分，保留模态F值
+        
+        生成器：依次产出输出行；圆弧细分结果作为一项产出（以换行符连接的多行，末尾不带换行符）
+        """
+        original_line = line.strip()
+        
+        # 保留注释和空行
+        if not original_line or original_line.startswith('(') or original_line.startswith('%'):
+            yield original_line
+            return
+        
+        # 处理带行号的指令
+        line_number, command, params = self.parse_gcode_line(original_line)
+        self.current_line_number = line_number  # 保存当前行号
+        
+        # 处理模态命令:如果只有参数没有命令,使用上一次的运动命令
+        if command is None and params and self.last_motion_command in ['G0', 'G00', 'G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
+            command = self.last_motion_command
+            # 安全检查:如果是圆弧命令但缺少圆弧参数,不使用模态命令
+            if command in ['G2', 'G02', 'G3', 'G03'] and 'R' not in params and 'I' not in params and 'J' not in params:
+                self.log(LOG_WARNING, f"警告: 圆弧模态命令缺少R/I/J参数,跳过: {original_line}")
+                command = None
+        
+        # 处理F值(模态值)
+        prev_feed = self.feed_rate
+        feed_changed = False
+        if 'F' in params:
+            new_feed = params['F']
+            feed_changed = (prev_feed is None) or (abs(new_feed - prev_feed) > 1e-6)
+            self.feed_rate = new_feed
+            if self.debug_enabled:
+                self.log_message(f"设置进给速率: F{self.feed_rate:.1f}")
+        
+        # 处理特殊命令
+        if command in ['G17', 'G18', 'G19']:
+            self.arc_plane = command
+            if self.debug_enabled:
+                self.log_message(f"设置加工平面: {command}")
+            yield original_line
+            return
+        
+        if command in ['G90', 'G91']:
+            self.distance_mode = command
+            if self.debug_enabled:
+                self.log_message(f"设置距离模式: {command}")
+            yield original_line
+            return
+        
+        # 处理移动命令
+        if command in ['G0', 'G00', 'G1', 'G01', 'G2', 'G02', 'G3', 'G03']:
+            self.last_motion_command = command
+            
+            # 如果是圆弧指令
+            if command in ['G2', 'G02', 'G3', 'G03']:
+                # 获取圆弧参数（不更新位置）
+                end_x = params.get('X', self.last_axis_update['X'])
+                end_y = params.get('Y', self.last_axis_update['Y'])
+                
+                # 检查是否有圆弧参数（R或I/J）
+                has_arc_params = 'R' in params or 'I' in params or 'J' in params
+                
+                if not has_arc_params:
+                    self.stats['arcs_failed'] += 1
+                    self.log(LOG_WARNING, "错误: 圆弧指令缺少R或I/J参数")
+                    yield original_line
+                    # 圆弧指令执行后更新位置
+                    self.update_axis_position(params)
+                    return
+                
+                if self.debug_enabled:
+                    self.log_message(f"处理圆弧指令: {original_line}")
+                points = self.subdivide_arc(end_x, end_y, params, command)
+                if points is not None and len(points) > 0:
+                    # 有细分点，使用原始行号生成细分指令（保留F值）
+                    # 整段细分指令作为一项产出（写出时逐项加换行符，与逐行产出等价）
+                    self.stats['arcs_subdivided'] += 1
+                    self.stats['points'] += len(points)
+                    yield self.format_g1_block(self.current_line_number, points, feed_changed)
+                    
+                    # 圆弧细分后更新位置到终点
+                    update_params = {'X': end_x, 'Y': end_y}
+                    if 'Z' in params:
+                        update_params['Z'] = params['Z']
+                    self.update_axis_position(update_params)
+                else:
+                    # 不需要细分或无法细分，保留原指令
+                    if points is None:
+                        self.stats['arcs_unsplit'] += 1
+                        if self.debug_enabled:
+                            self.log_message("圆弧不需要细分，保留原指令")
+                    else:
+                        self.stats['arcs_failed'] += 1
+                        self.log(LOG_WARNING, "圆弧细分失败，保留原指令")
+                    yield original_line
+                    # 圆弧指令执行后更新位置
+                    self.update_axis_position(params)
+            else:
+                # 直线移动，保留原指令
+                yield original_line
+                # 直线指令执行后更新位置
+                self.update_axis_position(params)
+            return
+        
+        # 其他指令处理
+        yield original_line
+        # 其他指令也可能更新位置（如G92等）
+        if params:
+            self.update_axis_position(params)
+
+
+def batch_output_filename(input_file, output_dir, options, input_root=None):
+    """
+    批量处理中一个文件的输出路径
+
+    参数:
+        input_file: G 代码文件路径
+        output_dir: 输出目录，文件名与单文件处理一致（带角度或弦高误差后缀）
+        options: 同 subdivide_file
+        input_root: 遍历的输入目录；给出时保留文件相对该目录的子路径，
+                    不同子目录下的同名文件不会写到同一个输出文件
+
+    返回:
+        输出文件路径（Path）
+    """
+    if input_root is not None:
+        relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(input_file)),
+                                       os.path.abspath(input_root))
+        if relative_dir != os.curdir:
+            output_dir = os.path.join(output_dir, relative_dir)
+    return get_output_filename(input_file, options.get('angular_resolution', 1.0), output_dir,
+                               options.get('chord_tolerance'))
+
+
+def output_collisions(input_files, output_dir, options, input_root=None):
+    """
+    找出批量处理中会写到同一个输出文件的输入文件
+
+    返回:
+        分组列表，每组为映射到同一输出路径的输入文件（至少两个）
+    """
+    groups = {}
+    for input_file in input_files:
+        output_file = batch_output_filename(input_file, output_dir, options, input_root)
+        key = os.path.normcase(os.path.abspath(output_file))
+        groups.setdefault(key, []).append(input_file)
+    return [files for files in groups.values() if len(files) > 1]
+
+
+def subdivide_file(input_file, output_dir, options, input_root=None):
+    """
+    细分一个文件（批量处理的工作进程任务，可在进程池中执行）
+
+    参数:
+        input_file: G 代码文件路径
+        output_dir: 输出目录，文件名与单文件处理一致（带角度或弦高误差后缀）
+        options: ArcSubdivider 的参数字典（angular_resolution、chord_tolerance、
+                 min_segment_length、cache 等，需可 pickle）
+        input_root: 遍历的输入目录，给出时输出保留相对该目录的子路径（见 batch_output_filename）
+
+    返回:
+        dict：output（输出文件路径）、stats（处理计数）、seconds（处理耗时）、cached（是否命中缓存）
+
+    在 process_pool_runner 的工作进程中执行时，批量处理取消后抛出 TaskCancelled，
+    并删除不完整的输出文件。
+    """
+    import process_pool_runner
+
+    def check_cancel(bytes_done, total_bytes):
+        # 最后一次回调时输出已完整写出，不再取消
+        if bytes_done < total_bytes and process_pool_runner.cancel_requested():
+            raise process_pool_runner.TaskCancelled(input_file)
+
+    start = time.perf_counter()
+    output_file = batch_output_filename(input_file, output_dir, options, input_root)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    subdivider = ArcSubdivider(progress_callback=check_cancel, **options)
+    subdivider.process_gcode_path(input_file, output_file)
+    return {'output': str(output_file), 'stats': dict(subdivider.stats),
+            'seconds': time.perf_counter() - start, 'cached': subdivider.cache_hit}
+
+
+def subdivide_task(context, input_file, output_file, options):
+    """
+    细分单个文件（界面的后台任务，见 background_tasks；可在单独的工作进程中执行）
+
+    参数:
+        context: background_tasks.TaskContext，用于报告进度与日志、检查取消请求
+        input_file, output_file: 输入与输出文件路径
+        options: 同 subdivide_file（不含 log_message 与 progress_callback）
+
+    返回:
+        dict：output（输出文件路径）、stats（处理计数）、cached（是否命中缓存）
+
+    取消后抛出 TaskCancelled，并删除不完整的输出文件。
+    """
+    def report_progress(bytes_done, total_bytes):
+        # 最后一次回调时输出已完整写出，不再取消
+        if bytes_done < total_bytes:
+            context.check_cancelled()
+        context.progress(bytes_done / total_bytes if total_bytes else 1.0)
+
+    subdivider = ArcSubdivider(log_message=context.log, progress_callback=report_progress, **options)
+    output_path = subdivider.process_gcode_path(input_file, output_file)
+    return {'output': str(output_path), 'stats': dict(subdivider.stats), 'cached': subdivider.cache_hit}
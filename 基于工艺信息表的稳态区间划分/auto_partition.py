@@ -0,0 +1,726 @@
+"""
+实际负载自动稳态区间划分（不依赖 tkinter / matplotlib）
+
+AutoIntervalPartitioner 封装"一键全自动划分"的全部步骤：自动参数标定、候选区间生成、
+合并/裁边/扩边以及按覆盖率合并。界面中的灵敏度、区间模式、覆盖率等设置作为构造参数传入，
+因此既可在界面线程中调用，也可在进程池的工作进程中调用。
+
+BatchPartitionRunner 将多个刀具的数据放入一块共享内存，由进程池（process_pool_runner）并行划分，
+结果通过队列逐个返回，供界面用 root.after 轮询显示进度。
+"""
+import collections
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import process_pool_runner
+import range_query
+
+
+class AutoIntervalPartitioner:
+    """自动稳态区间划分器，参数含义与 ActualLoadAnalysis 中的同名属性一致"""
+
+    def __init__(self, auto_sensitivity=1.0, interval_mode='large_coverage', target_coverage=0.90,
+                 max_merge_gap_ratio=0.02, aggressive_merge_gap_ratio=0.10, expand_ratio_for_coverage=1.0):
+        self.auto_sensitivity = auto_sensitivity
+        self.interval_mode = interval_mode
+        self.target_coverage = target_coverage
+        self.max_merge_gap_ratio = max_merge_gap_ratio
+        self.aggressive_merge_gap_ratio = aggressive_merge_gap_ratio
+        self.expand_ratio_for_coverage = expand_ratio_for_coverage
+
+    def settings(self):
+        """返回构造参数字典，用于在工作进程中重建划分器"""
+        return dict(
+            auto_sensitivity=self.auto_sensitivity,
+            interval_mode=self.interval_mode,
+            target_coverage=self.target_coverage,
+            max_merge_gap_ratio=self.max_merge_gap_ratio,
+            aggressive_merge_gap_ratio=self.aggressive_merge_gap_ratio,
+            expand_ratio_for_coverage=self.expand_ratio_for_coverage,
+        )
+
+    def estimate_noise_level(self, data):
+        """估计数据的噪声水平，使用相邻点差值的标准差"""
+        if len(data) < 3:
+            return 0
+        diffs = np.abs(np.diff(data))
+        return np.std(diffs)
+
+    # ========== 自动参数标定与自动分析方法 ==========
+
+    def auto_calibrate_params(self, data):
+        """自动参数标定 - 从数据自身估计合适的阈值和最小区间长度（改进版）
+
+        参数:
+            data: 数据序列（列表或numpy数组）
+
+        返回:
+            dict: 包含 abs_thr, rel_thr, min_len, slope_thr 的字典
+        """
+        y = np.asarray(data)
+        if len(y) < 10:
+            # 数据太少，返回默认值
+            return dict(abs_thr=0.05, rel_thr=0.05, min_len=min(100, len(y)//2), slope_thr=0.01)
+
+        # 改进的噪声估计：使用分位数方法更鲁棒
+        dy = np.diff(y)
+        if len(dy) > 4:
+            # 使用第10和第90百分位数之间的差值估计噪声范围
+            p10, p90 = np.percentile(np.abs(dy), [10, 90])
+            # 使用MAD方法
+            mad_dy = np.median(np.abs(dy - np.median(dy)))
+            # 综合两种方法
+            sigma_d = max(1.4826 * mad_dy, (p90 - p10) / 2.56) if mad_dy > 1e-9 else np.std(dy)
+        else:
+            sigma_d = np.std(dy)
+
+        if sigma_d < 1e-9:
+            sigma_d = 1e-9
+
+        # 使用数据的中位数而非绝对值的中位数，更准确反映信号强度
+        med_y = np.median(y)
+        if abs(med_y) < 1e-9:
+            med_y = np.mean(np.abs(y))
+            if med_y < 1e-9:
+                med_y = 1e-9
+
+        # 获取灵敏度参数（用户可通过UI调整）
+        # 为了让滑块标度为1时不显得过于灵敏，使用对原始灵敏度的平滑映射：
+        # effective_s = 1 + 0.5*(s_raw - 1)
+        # 这样滑块偏离1时对阈值的影响减弱一半，用户仍可通过扩大滑块范围进行调节
+        s_raw = self.auto_sensitivity
+        try:
+            s_raw = float(s_raw)
+        except Exception:
+            s_raw = 1.0
+        # 新映射：使得滑块为1时的实际灵敏度为0.5
+        # effective_s = 0.5 * s_raw
+        effective_s = 0.5 * s_raw
+        # 防止过小或为0
+        s = max(0.1, effective_s)
+
+        # 自适应阈值系数：根据数据的变异系数(CV)调整
+        cv = sigma_d / (abs(med_y) + 1e-9)
+        # CV越大，说明数据波动越大，需要放宽阈值
+        k_abs_adaptive = 3.0 + min(2.0, cv * 10)  # 3.0-5.0之间自适应
+        k_rel_adaptive = 4.0 + min(3.0, cv * 15)  # 4.0-7.0之间自适应
+
+        # 计算绝对阈值
+        abs_thr = (k_abs_adaptive / s) * sigma_d
+
+        # 计算相对阈值
+        rel_thr = np.clip((k_rel_adaptive / s) * (sigma_d / abs(med_y)), 0.015, 0.35)
+
+        # 改进的最小区间长度估计
+        run_mask = np.abs(dy) <= sigma_d * 1.5  # 使用稍宽松的阈值统计run-length
+        runs = []
+        cnt = 1
+        for i in range(len(run_mask)):
+            if run_mask[i]:
+                cnt += 1
+            else:
+                if cnt > 1:  # 只记录有效的run
+                    runs.append(cnt)
+                cnt = 1
+        if cnt > 1:
+            runs.append(cnt)
+
+        program_length = len(y)
+
+        # 更智能的最小区间长度计算
+        if len(runs) > 10:
+            # 使用run-length的统计信息
+            stat_min_len = int(np.percentile(runs, 60))  # 降低到P60
+            # 根据程序长度和run统计动态调整
+            adaptive_factor = np.clip(0.8 + (program_length / 100000), 0.8, 2.0)
+            min_len_base = int(stat_min_len * adaptive_factor)
+        else:
+            # 如果run统计不够，使用基于程序长度的估计
+            # 短程序用更小的比例，长程序用更大的比例
+            if program_length < 10000:
+                percentage = 0.01  # 1%
+            elif program_length < 50000:
+                percentage = 0.012  # 1.2%
+            else:
+                percentage = 0.015  # 1.5%
+            min_len_base = int(program_length * percentage)
+
+        # 动态边界：根据程序长度设置
+        if program_length < 5000:
+            min_bound = 50
+            max_bound = 500
+        elif program_length < 20000:
+            min_bound = 100
+            max_bound = 800
+        elif program_length < 100000:
+            min_bound = 200
+            max_bound = 1200
+        else:
+            min_bound = 300
+            max_bound = 2000
+
+        min_len = int(np.clip(min_len_base, min_bound, max_bound))
+
+        # 斜率阈值：也需要根据数据特征自适应
+        slope_thr = (1.5 * k_abs_adaptive / s) * sigma_d
+
+        return dict(abs_thr=abs_thr, rel_thr=rel_thr, min_len=min_len, slope_thr=slope_thr)
+
+    def propose_intervals_auto(self, data, abs_thr, rel_thr, min_len, slope_thr):
+        """候选生成 - 无依赖版本，基于滑窗平稳性判定 + 贪心扩张
+
+        参数:
+            data: 数据序列
+            abs_thr: 绝对阈值
+            rel_thr: 相对阈值
+            min_len: 最小区间长度
+            slope_thr: 斜率阈值
+
+        返回:
+            List[Tuple[int, int]]: 稳态区间列表
+        """
+        y = np.asarray(data)
+        n = len(y)
+        if n == 0:
+            return []
+
+        intervals = []
+        left = 0
+
+        while left < n:
+            min_deque = collections.deque()
+            max_deque = collections.deque()
+            right = left
+            sum_y = 0.0
+            # 线性回归增量统计
+            sum_x = sum_x2 = sum_xy = 0.0
+
+            while right < n:
+                val = y[right]
+                sum_y += val
+
+                # 更新队列
+                while min_deque and min_deque[-1] > val:
+                    min_deque.pop()
+                while max_deque and max_deque[-1] < val:
+                    max_deque.pop()
+                min_deque.append(val)
+                max_deque.append(val)
+
+                # 增量回归（x用索引）
+                x = right - left + 1
+                sum_x += x
+                sum_x2 += x * x
+                sum_xy += x * val
+
+                length = right - left + 1
+                mean = sum_y / length
+                rng = max_deque[0] - min_deque[0]
+
+                # slope ~ (n*sum_xy - sum_x*sum_y)/(n*sum_x2 - sum_x^2)
+                denom = (length * sum_x2 - sum_x * sum_x)
+                if abs(denom) > 1e-9:
+                    slope = abs((length * sum_xy - sum_x * sum_y) / denom)
+                else:
+                    slope = 0.0
+
+                cond_abs = rng <= abs_thr
+                cond_rel = rng <= rel_thr * max(1e-9, abs(mean))
+                cond_slp = slope <= slope_thr
+
+                if (cond_abs or cond_rel) and cond_slp:
+                    right += 1
+                else:
+                    break
+
+            if right - left >= min_len:
+                intervals.append((left, right - 1))
+
+            left = max(right, left + 1)
+
+        # 记录原始检测到的小区间（在任何后处理前）
+        raw_intervals = intervals.copy()
+
+        # 区间统计查询索引，供裁边与扩边复用
+        index = range_query.RangeQueryIndex(y)
+
+        # 合并近邻 & 去重重叠（复用已有方法）
+        if intervals:
+            # 动态计算合并间隙：根据最小区间长度和数据特征
+            # 对于稳态区间，小间隙应该被合并
+            max_gap = max(1, int(0.15 * min_len))  # 从20%降至15%，更积极地合并
+            intervals = self.merge_close_intervals(intervals, max_gap, min_len)
+            intervals = self.adjust_overlapping_intervals(intervals, overlap_tolerance=10)
+
+            # 自动裁边（使用适中的阈值，避免过度裁剪）
+            trimmed = []
+            for s, e in intervals:
+                rs, re = self.reduce_interval_boundaries(
+                    data=y, start=s, end=e,
+                    threshold=rel_thr * 0.7,  # 从0.6提高到0.7，减少过度裁剪
+                    abs_threshold=abs_thr * 0.7,  # 从0.6提高到0.7
+                    index=index
+                )
+                if re - rs + 1 >= min_len:
+                    trimmed.append((rs, re))
+            intervals = trimmed
+
+        # 如果识别到很多短小区间，尝试按更大粒度分组并扩展区间边界
+        # 目的：当算法捕获到许多只覆盖波峰的小区间时，合并为更符合人工标注的大区块
+        try:
+            if intervals:
+                avg_len = np.mean([e - s + 1 for s, e in intervals])
+                # 条件：平均区间长度小于2倍最小长度且区间数量较多
+                if avg_len < 2 * min_len and len(intervals) >= 3:
+                    # 计算自适应分组间隙（受程序长度影响）
+                    group_gap = max(int(0.2 * min_len), int(0.005 * n), 50)
+                    # 进一步限制最大组间隙，避免全局合并
+                    group_gap = min(group_gap, int(0.5 * n))
+                    intervals = self.group_intervals_into_blocks(intervals, group_gap)
+
+                    # 对每个分组扩展边界，尝试包含低谷区域使平均功率更接近真实
+                    expanded = []
+                    for s, e in intervals:
+                        rs, re = self.expand_block_edges(y, s, e, max_expand=int(0.5 * min_len),
+                                                         rel_thr=rel_thr, abs_thr=abs_thr, index=index)
+                        # 保证扩展后仍满足最小长度要求
+                        if re - rs + 1 >= min_len:
+                            expanded.append((rs, re))
+                        else:
+                            expanded.append((s, e))
+                    intervals = expanded
+        except Exception:
+            # 若任何步骤异常，保留之前的 intervals
+            pass
+
+        # 计算有效灵敏度（与 auto_calibrate_params 保持一致的映射）
+        try:
+            s_raw = float(self.auto_sensitivity)
+        except Exception:
+            s_raw = 1.0
+        # 映射与 auto_calibrate_params 保持一致：滑块1对应effective_s=0.5
+        effective_s = 0.5 * s_raw
+
+        # 如果用户希望保留所有检测到的小区间（更敏感模式），直接返回 raw_intervals
+        mode = getattr(self, 'interval_mode', 'large_coverage')
+        if mode == 'all_small':
+            # 只保留满足最小长度的原始区间，并按起点排序
+            filtered = [iv for iv in raw_intervals if iv[1] - iv[0] + 1 >= min_len]
+            filtered.sort(key=lambda x: x[0])
+            return filtered
+
+        # large_coverage 模式：在已有处理的基础上，如果覆盖率仍然低，尝试按覆盖率合并
+        if mode == 'large_coverage':
+            total_cov = 0
+            if intervals:
+                total_cov = sum(e - s + 1 for s, e in intervals) / float(n)
+            # 如果覆盖率低于目标，逐步合并最近的区间直到达到目标或没有更多可合并的间隙
+            target = getattr(self, 'target_coverage', 0.65)
+            # 当灵敏度较高（effective_s >= 1），降低合并目标以避免过度合并
+            if effective_s >= 1.0:
+                # 高灵敏度时，只尝试达到较低的覆盖率上限
+                merge_target = max(0.2, target * 0.6)
+            else:
+                # 低灵敏度时，允许接近目标覆盖率
+                merge_target = target
+
+            if total_cov < merge_target and intervals:
+                # 传入灵敏度因子（倒数）以控制合并/扩展的激进程度
+                sensitivity_factor = max(0.2, 1.0 / effective_s)
+                intervals = self.merge_intervals_until_coverage(intervals, n, merge_target, getattr(self, 'max_merge_gap_ratio', 0.02), sensitivity_factor)
+
+        return intervals
+
+    def merge_close_intervals(self, intervals, max_gap, min_length=1):
+        """合并间隔小于或等于max_gap的相邻区间，并过滤掉小于min_length的区间"""
+        if not intervals or len(intervals) < 2:
+            # 过滤单个区间的长度
+            return [iv for iv in intervals if (iv[1] - iv[0] + 1) >= min_length]
+
+        # 按起始位置排序
+        intervals.sort(key=lambda x: x[0])
+
+        merged = []
+        current_start, current_end = intervals[0]
+
+        for next_start, next_end in intervals[1:]:
+            if next_start - current_end <= max_gap + 1:
+                # 合并区间
+                current_end = max(current_end, next_end)
+            else:
+                # 保存当前区间（仅保存满足最小长度的区间）
+                if current_end - current_start + 1 >= min_length:
+                    merged.append((current_start, current_end))
+                current_start, current_end = next_start, next_end
+
+        # 添加最后一个区间（仅当满足最小长度时）
+        if current_end - current_start + 1 >= min_length:
+            merged.append((current_start, current_end))
+
+        return merged
+
+    def adjust_overlapping_intervals(self, intervals, overlap_tolerance=10):
+        """调整重叠的区间边界，消除重叠"""
+        if not intervals or len(intervals) < 2:
+            return intervals
+        intervals.sort(key=lambda x: x[0])
+        adjusted = []
+        for interval in intervals:
+            curr_start, curr_end = interval
+            if not adjusted:
+                adjusted.append((curr_start, curr_end))
+                continue
+            prev_start, prev_end = adjusted[-1]
+            if curr_start <= prev_end:
+                overlap_midpoint = (prev_end + curr_start) // 2
+                new_prev_end = overlap_midpoint
+                new_curr_start = overlap_midpoint + 1
+                prev_valid = (new_prev_end >= prev_start)
+                curr_valid = (new_curr_start <= curr_end)
+                if prev_valid and curr_valid:
+                    adjusted[-1] = (prev_start, new_prev_end)
+                    adjusted.append((new_curr_start, curr_end))
+                elif prev_valid and not curr_valid:
+                    adjusted[-1] = (prev_start, new_prev_end)
+                elif not prev_valid and curr_valid:
+                    adjusted[-1] = (new_curr_start, curr_end)
+                else:
+                    prev_length = prev_end - prev_start + 1
+                    curr_length = curr_end - curr_start + 1
+                    if curr_length > prev_length:
+                        adjusted[-1] = (curr_start, curr_end)
+            else:
+                adjusted.append((curr_start, curr_end))
+        validated = []
+        for start, end in adjusted:
+            if start <= end:
+                validated.append((start, end))
+        return validated
+
+    def group_intervals_into_blocks(self, intervals, max_gap):
+        """将多个短小且彼此接近的区间分组为更大的区块。
+
+        intervals: 已排序或未排序的区间列表 [(s,e),...]
+        max_gap: 当两个区间之间的间隙 <= max_gap 时，将它们视为同一组
+        返回合并后的区块列表
+        """
+        if not intervals:
+            return []
+        intervals = sorted(intervals, key=lambda x: x[0])
+        grouped = []
+        cur_s, cur_e = intervals[0]
+        for s, e in intervals[1:]:
+            gap = s - cur_e - 1
+            if gap <= max_gap:
+                # 合并到当前区块
+                cur_e = max(cur_e, e)
+            else:
+                grouped.append((cur_s, cur_e))
+                cur_s, cur_e = s, e
+        grouped.append((cur_s, cur_e))
+        return grouped
+
+    def expand_block_edges(self, data, start, end, max_expand=100, rel_thr=0.05, abs_thr=0.05, index=None):
+        """在不显著增加波动范围的前提下向外扩展区块边界。
+
+        data: numpy array
+        start,end: 原区块索引
+        max_expand: 单侧最大扩展点数
+        rel_thr, abs_thr: 扩展时允许的相对/绝对波动阈值（与propose_intervals_auto传入的一致）
+        index: data 的区间查询索引（RangeQueryIndex），未提供时临时构建
+        返回扩展后的 (new_start, new_end)
+        """
+        n = len(data)
+        new_s, new_e = start, end
+        if index is None:
+            index = range_query.RangeQueryIndex(data)
+
+        # 向左扩展
+        left_expand = 0
+        for i in range(1, max_expand+1):
+            idx = start - i
+            if idx < 0:
+                break
+            seg_mean = index.mean(idx, new_e)
+            seg_rng = index.range(idx, new_e)
+            cond_rel = (seg_rng <= rel_thr * max(1e-9, abs(seg_mean)))
+            cond_abs = (seg_rng <= abs_thr)
+            if cond_rel or cond_abs:
+                new_s = idx
+                left_expand += 1
+            else:
+                break
+
+        # 向右扩展
+        right_expand = 0
+        for i in range(1, max_expand+1):
+            idx = end + i
+            if idx >= n:
+                break
+            seg_mean = index.mean(new_s, idx)
+            seg_rng = index.range(new_s, idx)
+            cond_rel = (seg_rng <= rel_thr * max(1e-9, abs(seg_mean)))
+            cond_abs = (seg_rng <= abs_thr)
+            if cond_rel or cond_abs:
+                new_e = idx
+                right_expand += 1
+            else:
+                break
+
+        return max(0, new_s), min(n-1, new_e)
+
+    def merge_intervals_until_coverage(self, intervals, data_len, target_coverage, max_merge_gap_ratio=0.02, sensitivity_factor=1.0):
+        """按覆盖率合并区间：优先合并间隙最小的相邻区间，直到达到目标覆盖率或无法继续合并。
+
+        intervals: List[(s,e)] 已排序或未排序
+        data_len: 数据总长度
+        target_coverage: 目标覆盖率，0-1
+        max_merge_gap_ratio: 允许合并的最大间隙比例（相对于数据长度），用于避免跨越巨大空白
+        返回合并后的区间列表
+        """
+        if not intervals:
+            return []
+
+        intervals = sorted(intervals, key=lambda x: x[0])
+
+        def coverage(iv_list):
+            return sum(e - s + 1 for s, e in iv_list) / float(max(1, data_len))
+
+        cur_cov = coverage(intervals)
+        # 根据灵敏度调整允许的合并间隙（灵敏度因子>1时更容易合并）
+        allowed_gap = max(1, int(max_merge_gap_ratio * data_len * sensitivity_factor))
+
+        # 防止过度跨域合并，设置一个硬限制（最大允许合并间隙倍数）
+        max_allowed_gap = max(allowed_gap, int(0.01 * data_len))
+        # 根据灵敏度缩放上限
+        max_allowed_gap = int(max(max_allowed_gap, allowed_gap * 10 * sensitivity_factor))
+
+        # 逐步合并最小间隙的相邻区间（第一阶段：保守合并）
+        while cur_cov < target_coverage and len(intervals) > 1:
+            # 计算相邻间隙
+            gaps = []  # (gap, idx)
+            for i in range(len(intervals) - 1):
+                s1, e1 = intervals[i]
+                s2, e2 = intervals[i + 1]
+                gap = s2 - e1 - 1
+                gaps.append((gap, i))
+
+            # 找到最小间隙对
+            gaps.sort(key=lambda x: x[0])
+            if not gaps:
+                break
+
+            smallest_gap, idx = gaps[0]
+
+            # 如果最小间隙太大（超过阈值的若干倍），停止合并以避免合并不相干区域
+            if smallest_gap > max_allowed_gap:
+                break
+
+            # 合并 idx 和 idx+1
+            s1, e1 = intervals[idx]
+            s2, e2 = intervals[idx + 1]
+            new_iv = (s1, e2)
+
+            # 重建列表
+            new_list = intervals[:idx] + [new_iv] + intervals[idx + 2:]
+            intervals = new_list
+
+            # 更新覆盖率
+            cur_cov = coverage(intervals)
+
+        # 如果第一阶段仍未达到目标，进入第二阶段：更激进的合并与扩展
+        if cur_cov < target_coverage:
+            # 允许更大的间隙进行合并（使用对象属性的aggressive比例作为建议）
+            try:
+                aggressive_ratio = getattr(self, 'aggressive_merge_gap_ratio', max_merge_gap_ratio * 2)
+            except Exception:
+                aggressive_ratio = max_merge_gap_ratio * 2
+            # 激进阶段也遵循灵敏度因子
+            max_allowed_gap = max(1, int(aggressive_ratio * data_len * sensitivity_factor))
+
+            # 继续合并最小间隙对，但不超过新的阈值
+            while cur_cov < target_coverage and len(intervals) > 1:
+                # 重新计算相邻间隙并选择最小的
+                gaps = []
+                for i in range(len(intervals) - 1):
+                    s1, e1 = intervals[i]
+                    s2, e2 = intervals[i + 1]
+                    gap = s2 - e1 - 1
+                    gaps.append((gap, i))
+
+                if not gaps:
+                    break
+                gaps.sort(key=lambda x: x[0])
+                smallest_gap, idx = gaps[0]
+                if smallest_gap > max_allowed_gap:
+                    break
+
+                # 合并邻区
+                s1, e1 = intervals[idx]
+                s2, e2 = intervals[idx + 1]
+                new_iv = (s1, e2)
+                intervals = intervals[:idx] + [new_iv] + intervals[idx + 2:]
+                cur_cov = coverage(intervals)
+
+            # 如果仍未满足覆盖率，尝试扩展每个区间的边界以包含更多点
+            if cur_cov < target_coverage:
+                try:
+                    expand_ratio = getattr(self, 'expand_ratio_for_coverage', 0.5)
+                except Exception:
+                    expand_ratio = 0.5
+
+                # 估计每侧最大扩展点数（基于平均区间长度或min_len），并按灵敏度放缩
+                avg_len = int(np.mean([e - s + 1 for s, e in intervals])) if intervals else 0
+                # 在低灵敏度时允许更大扩展；sensitivity_factor>1 表示更容易合并/扩展
+                max_expand = max(1, int(expand_ratio * max(avg_len, int(0.01 * data_len)) * sensitivity_factor))
+
+                expanded = []
+                for s, e in intervals:
+                    # 直接按最大扩展步数向外扩展（每侧扩展 max_expand 点），然后裁边到数据范围
+                    new_s = max(0, s - max_expand)
+                    new_e = min(data_len - 1, e + max_expand)
+                    expanded.append((new_s, new_e))
+
+                # 合并可能重叠的扩展区间
+                intervals = self.merge_close_intervals(expanded, max_gap=0, min_length=1)
+                cur_cov = coverage(intervals)
+
+        return intervals
+
+    def reduce_interval_boundaries(self, data, start, end, threshold, abs_threshold, index=None):
+        """缩减区间边界以获得更紧密的稳态区间 - 使用与copy3相同的算法
+
+        index: data 的区间查询索引（RangeQueryIndex），提供时直接查询区间均值
+        """
+        if end <= start:
+            return start, end
+
+        window_data = np.asarray(data[start:end+1], dtype=np.float64)
+        mean_val = index.mean(start, end) if index is not None else np.mean(window_data)
+
+        # 计算每个点到均值的偏差
+        abs_dev = np.abs(window_data - mean_val)
+        if abs(mean_val) > 1e-10:
+            rel_dev = abs_dev / abs(mean_val)
+        else:
+            rel_dev = np.zeros_like(abs_dev)
+        close_points = np.flatnonzero((rel_dev <= threshold * 0.5) & (abs_dev <= abs_threshold * 0.5))
+
+        # 从起点开始缩减 - 找到第一个偏差较小的点
+        # 从终点开始缩减 - 找到最后一个偏差较小的点
+        new_start = start
+        new_end = end
+        if close_points.size:
+            new_start = start + int(close_points[0])
+            new_end = start + int(close_points[-1])
+
+        # 确保起点不大于终点
+        if new_start > new_end:
+            new_start = start
+            new_end = end
+
+        return new_start, new_end
+
+    def partition(self, data):
+        """自动标定参数并划分区间；未找到区间时降低灵敏度（×0.8）再试一次
+
+        返回:
+            (区间列表, 最后一次使用的参数字典)
+        """
+        params = self.auto_calibrate_params(data)
+        ivs = self.propose_intervals_auto(
+            data,
+            params['abs_thr'],
+            params['rel_thr'],
+            params['min_len'],
+            params['slope_thr']
+        )
+
+        if not ivs:
+            original_sensitivity = self.auto_sensitivity
+            self.auto_sensitivity = original_sensitivity * 0.8
+            try:
+                params = self.auto_calibrate_params(data)
+                ivs = self.propose_intervals_auto(
+                    data,
+                    params['abs_thr'],
+                    params['rel_thr'],
+                    params['min_len'],
+                    params['slope_thr']
+                )
+            finally:
+                self.auto_sensitivity = original_sensitivity
+
+        return ivs, params
+
+
+def _partition_shared_tool(key, shm_name, offset, length, settings):
+    """工作进程入口：从共享内存读取单个刀具的数据并自动划分
+
+    返回:
+        (区间列表, 各区间均值列表)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray((length,), dtype=np.float64, buffer=shm.buf, offset=offset * 8)
+        ivs, _ = AutoIntervalPartitioner(**settings).partition(data)
+        index = range_query.RangeQueryIndex(data)
+        values = [index.mean(s, e) for s, e in ivs if 0 <= s <= e < length]
+        ivs = [(int(s), int(e)) for s, e in ivs]
+        # 释放对共享内存的所有引用后才能关闭
+        del data, index
+    finally:
+        shm.close()
+    return ivs, values
+
+
+class BatchPartitionRunner(process_pool_runner.FilePoolRunner):
+    """在进程池中并行划分多个刀具（进程池与结果队列由 process_pool_runner.FilePoolRunner 管理）
+
+    所有刀具数据一次性拷入同一块共享内存，工作进程按偏移量直接读取，不经过 pickle。
+    每完成一个刀具就向 results 队列放入一条消息：
+        ('done', key, (区间列表, 区间均值列表))
+        ('error', key, 错误信息)
+        ('finished', 是否已取消)   —— 所有任务结束、共享内存释放后的最后一条消息
+    """
+
+    def __init__(self, tool_arrays, settings, max_workers=None):
+        """
+        tool_arrays: {key: 一维数据数组}，key 需可 pickle（如 (program_id, tool_key)）
+        settings: AutoIntervalPartitioner 的构造参数字典
+        max_workers: 工作进程数，None 表示使用 CPU 核数
+        """
+        super().__init__(list(tool_arrays), _partition_shared_tool, max_workers=max_workers)
+        self.tool_arrays = tool_arrays
+        self.settings = settings
+        self._shm = None
+        self._slices = {}
+
+    def start(self):
+        """拷贝数据到共享内存并提交全部任务（立即返回）"""
+        if self.files:
+            total = sum(len(arr) for arr in self.tool_arrays.values())
+            self._shm = shared_memory.SharedMemory(create=True, size=max(8, total * 8))
+            buffer = np.ndarray((total,), dtype=np.float64, buffer=self._shm.buf)
+            offset = 0
+            for key, arr in self.tool_arrays.items():
+                buffer[offset:offset + len(arr)] = arr
+                self._slices[key] = (offset, len(arr))
+                offset += len(arr)
+            del buffer
+        super().start()
+
+    def task_args_for(self, key):
+        offset, length = self._slices[key]
+        return self._shm.name, offset, length, self.settings
+
+    def error_message(self, key, error):
+        return str(error)
+
+    def _finish(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        super()._finish()
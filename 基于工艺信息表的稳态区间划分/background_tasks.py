@@ -0,0 +1,196 @@
+"""
+界面后台任务（不导入 tkinter：只使用传入的 root.after 与控件的 cget/config）
+
+读取采集文件、稳态分析、生成工艺信息表、G 代码细分等耗时操作放在后台线程或进程中执行，
+界面线程只负责显示：
+    1. run_in_background 把任务函数 func(context, *args) 提交到后台线程（默认）或单独的工作进程，
+       并在运行期间禁用相关控件（例如“加载数据”“运行分析”按钮）、启用取消按钮
+    2. 任务函数通过 context.progress / context.log 报告进度与日志，在适当位置调用
+       context.check_cancelled()，取消后抛出 TaskCancelled 提前结束（协作式取消）
+    3. 界面每 POLL_MS 毫秒用 root.after 读取消息队列，在界面线程中调用
+       on_progress / on_log / on_done / on_error / on_cancelled，结束后恢复控件状态
+
+任务函数不能操作界面控件或读取 tk 变量：所需设置在提交前读出并作为参数传入，
+结果由 on_done 在界面线程中显示。进程模式（use_process=True）适合持有 GIL 的纯 Python
+计算（如逐行细分 G 代码），此时任务函数需为模块级函数，参数与返回值需可 pickle。
+"""
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+
+from process_pool_runner import TaskCancelled
+
+
+# 轮询间隔（毫秒），约 60Hz
+POLL_MS = 16
+# 任务端进度消息的最小间隔（秒）：更频繁的进度报告被合并
+PROGRESS_INTERVAL = 1 / 60
+
+
+class TaskContext:
+    """传给任务函数的上下文：报告进度与日志、检查取消请求（线程与进程模式通用，可 pickle）"""
+
+    def __init__(self, messages, cancel_event):
+        self._messages = messages
+        self._cancel_event = cancel_event
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        """是否已请求取消"""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """已请求取消时抛出 TaskCancelled"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, fraction=None, text=None):
+        """
+        报告进度
+
+        参数:
+            fraction: 完成比例（0~1），None 表示无法估计（只更新 text）
+            text: 状态文字，None 表示不变
+        带文字或完成（fraction 为 1）的进度总是发出，其余按 PROGRESS_INTERVAL 合并。
+        """
+        now = time.monotonic()
+        if text is None and fraction is not None and fraction < 1 and \
+                now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self._messages.put(('progress', fraction, text))
+
+    def log(self, message):
+        """发送一条日志（界面线程中由 on_log 显示）"""
+        self._messages.put(('log', message))
+
+
+def _run(func, args, context):
+    """在后台线程或工作进程中执行任务，把结果放入消息队列"""
+    try:
+        result = func(context, *args)
+    except TaskCancelled:
+        context._messages.put(('cancelled',))
+    except Exception as e:
+        context._messages.put(('error', str(e) or type(e).__name__, traceback.format_exc()))
+    else:
+        context._messages.put(('done', result))
+
+
+class BackgroundTask:
+    """后台任务句柄：在界面线程中轮询消息并调用回调"""
+
+    def __init__(self, root, func, args, use_process, callbacks, disable, enable, poll_ms):
+        self.root = root
+        self.name = getattr(func, '__name__', 'task')
+        self.finished = False
+        self._callbacks = callbacks
+        self._poll_ms = poll_ms
+        if use_process:
+            messages, cancel_event = multiprocessing.Queue(), multiprocessing.Event()
+        else:
+            messages, cancel_event = queue.Queue(), threading.Event()
+        self._messages = messages
+        self._cancel_event = cancel_event
+        self.context = TaskContext(messages, cancel_event)
+
+        # 记录控件原来的状态，结束后恢复
+        self._controls = []
+        for widgets, state in ((disable, 'disabled'), (enable, 'normal')):
+            for widget in widgets:
+                self._controls.append((widget, str(widget.cget('state')) or 'normal'))
+                widget.config(state=state)
+
+        if use_process:
+            self._worker = multiprocessing.Process(target=_run, args=(func, args, self.context), daemon=True)
+        else:
+            self._worker = threading.Thread(target=_run, args=(func, args, self.context), daemon=True)
+        self._worker.start()
+        self.root.after(self._poll_ms, self._poll)
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """请求取消（任务下次调用 check_cancelled 时结束）"""
+        self._cancel_event.set()
+
+    def _drain(self, timeout=None):
+        """读取队列中的全部消息：日志与进度立即回调，返回结束消息（没有时为 None）"""
+        progress = None
+        final = None
+        while final is None:
+            try:
+                message = self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                # 同一次轮询中的多条进度只显示最后一条（文字取最后一次非空的）
+                text = message[2] if message[2] is not None else (progress[1] if progress else None)
+                progress = (message[1], text)
+            elif message[0] == 'log':
+                self._call('on_log', message[1])
+            else:
+                final = message
+        if progress is not None:
+            self._call('on_progress', *progress)
+        return final
+
+    def _poll(self):
+        final = self._drain()
+        is_process = isinstance(self._worker, multiprocessing.Process)
+        if final is None and is_process and not self._worker.is_alive():
+            # 进程已退出：结果可能刚刚写入队列，再等一下；仍没有结果说明进程异常退出（例如被系统终止）
+            final = self._drain(timeout=0.5) or \
+                ('error', f"后台进程异常退出（退出码 {self._worker.exitcode}）", '')
+        if final is None:
+            self.root.after(self._poll_ms, self._poll)
+            return
+
+        self.finished = True
+        if is_process:
+            self._worker.join()
+        for widget, state in self._controls:
+            try:
+                widget.config(state=state)
+            except Exception:
+                pass  # 控件已销毁
+        if final[0] == 'done':
+            self._call('on_done', final[1])
+        elif final[0] == 'cancelled':
+            self._call('on_cancelled')
+        else:
+            self._call('on_error', final[1], final[2])
+
+    def _call(self, name, *args):
+        callback = self._callbacks.get(name)
+        if callback is not None:
+            callback(*args)
+
+
+def run_in_background(root, func, *args, on_done=None, on_error=None, on_progress=None, on_log=None,
+                      on_cancelled=None, disable=(), enable=(), use_process=False, poll_ms=POLL_MS):
+    """
+    在后台执行 func(context, *args)，立即返回
+
+    参数:
+        root: Tk 根窗口（用于 after 轮询）
+        on_done(result): 正常结束
+        on_error(message, traceback_text): 抛出异常
+        on_progress(fraction, text): 进度（fraction 为 None 时只有文字）
+        on_log(message): 日志
+        on_cancelled(): 因取消而结束
+        disable: 运行期间禁用的控件；enable: 运行期间启用的控件（如取消按钮），结束后均恢复原状态
+        use_process: 为 True 时在单独的工作进程中执行
+        poll_ms: 轮询间隔（毫秒）
+
+    返回:
+        BackgroundTask（cancel() 请求取消）
+    """
+    callbacks = {'on_done': on_done, 'on_error': on_error, 'on_progress': on_progress, 'on_log': on_log,
+                 'on_cancelled': on_cancelled}
+    return BackgroundTask(root, func, args, use_process, callbacks, list(disable), list(enable), poll_ms)
@@ -0,0 +1,283 @@
+"""
+多文件批量处理流水线（不依赖 tkinter；图表在工作进程中用 Agg 画布离屏绘制）
+
+每个文件由一个工作进程独立完成全部步骤：
+    G代码 → 工艺信息表（pit_builder）
+    → 行程域图表与MRR稳态区间（pit_plots）
+    → 功率曲线稳态区间划分（steady_state_engine）→ 稳态区间图表与区间数据
+
+BatchPipelineRunner 把文件列表分发到进程池（process_pool_runner.FilePoolRunner），结果通过
+队列逐个返回；主进程只汇总进度并写 batch_errors.log，界面用 root.after 轮询队列更新进度。
+"""
+import os
+
+import matplotlib
+from matplotlib.figure import Figure
+import numpy as np
+
+import interval_artists
+import pit_builder
+import pit_plots
+import process_pool_runner
+import steady_state_engine
+
+
+ERROR_LOG_NAME = process_pool_runner.ERROR_LOG_NAME
+# 稳态区间色块的循环调色板
+STEADY_INTERVAL_COLORS = ['#2ecc71', '#f39c12', '#3498db', '#9b59b6', '#e74c3c']
+
+# process_file 的默认设置，界面传入的设置字典覆盖其中的同名项
+DEFAULT_SETTINGS = {
+    "origin": (0.0, 0.0, 0.0),
+    "rapid_speed_xy": 10000.0,
+    "rapid_speed_z": 10000.0,
+    "s_base": 6000.0,
+    "p_idle": 0.0,
+    "z_impedance": 0.0,
+    "tool_diameter": "",
+    "workpiece_material": "",
+    "blank_material": "",
+    "arc_options": None,
+    "enable_mrr_steady": True,
+    "mrr_min_length": 10.0,
+    "min_length": 100,
+    "relative_threshold": 0.2,
+    "absolute_threshold": 0.05,
+    "reduce_interval": True,
+    "engine": "vectorized",
+    "dpi": 600,
+    "font_path": None,
+}
+
+
+def output_paths(input_file, output_dir, save_dir=None):
+    """返回 (结果目录, 工艺信息表路径)，与界面单文件处理的命名一致；save_dir 指定时使用该结果目录"""
+    if save_dir is None:
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        save_dir = os.path.join(output_dir, "processed_" + stem)
+    return save_dir, os.path.join(save_dir, f"processed_{os.path.basename(input_file)}")
+
+
+def unique_save_dirs(files, output_dir):
+    """
+    为每个文件分配互不相同的结果目录
+
+    不同目录下的同名文件默认会得到同一个 processed_<文件名> 目录，并行处理时互相覆盖；
+    重复的目录依次加 _2、_3 … 后缀。
+
+    返回:
+        {文件路径: 结果目录}
+    """
+    save_dirs = {}
+    used = set()
+    for input_file in files:
+        base_dir = output_paths(input_file, output_dir)[0]
+        save_dir = base_dir
+        suffix = 2
+        while os.path.normcase(save_dir) in used:
+            save_dir = f"{base_dir}_{suffix}"
+            suffix += 1
+        used.add(os.path.normcase(save_dir))
+        save_dirs[input_file] = save_dir
+    return save_dirs
+
+
+def n_numbers(n_strings):
+    """把 "N34.18" 形式的行号转换为数值数组（无法解析时为 NaN）"""
+    values = np.full(len(n_strings), np.nan)
+    for i, text in enumerate(n_strings):
+        try:
+            values[i] = float(str(text).lstrip('N'))
+        except ValueError:
+            pass
+    return values
+
+
+def point_indices(line_numbers):
+    """计算每个数据点在其程序行号内的序号（从1开始）"""
+    counts = {}
+    indices = []
+    for line_number in line_numbers:
+        key = int(line_number) if np.isfinite(line_number) else -1
+        counts[key] = counts.get(key, 0) + 1
+        indices.append(counts[key])
+    return indices
+
+
+def _cap_y_axis(ax, values):
+    """限制纵向高度不超过数据最高的1.2倍"""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return
+    y_max = np.nanmax(values)
+    y_min = np.nanmin(values)
+    if y_max > 0:
+        y_upper = y_max * 1.2
+        y_lower = y_min if y_min < y_upper else y_upper * 0.8
+        ax.set_ylim(y_lower, y_upper)
+
+
+def draw_steady_axes(ax_time, ax_n, cumulative_time, values, n_labels, intervals, plot=None):
+    """
+    在给定坐标轴上绘制时间域与指令域稳态区间图（界面与批量处理共用）
+
+    参数:
+        cumulative_time: 各数据点的累计时间（时间域横轴）
+        values: 各数据点的电流/功率值
+        n_labels: 各数据点的程序行号（指令域横轴刻度标签）
+        intervals: [(起始索引, 结束索引), ...]；全部区间色块画成一个集合
+        plot: 绘制曲线的函数 plot(ax, x, y, *args, **kwargs)，None 表示 ax.plot（完整分辨率）；
+              界面传入 plot_decimation.plot
+    """
+    if plot is None:
+        def plot(ax, *args, **kwargs):
+            return ax.plot(*args, **kwargs)
+    values = np.asarray(values)
+    last = len(n_labels) - 1
+
+    plot(ax_time, np.asarray(cumulative_time), values, 'b-', linewidth=1.0, label='电流值')
+    starts, ends, ids = interval_artists.interval_x_ranges(intervals, cumulative_time)
+    interval_artists.span_collection(ax_time, starts, ends,
+                                     interval_artists.cycle_colors(STEADY_INTERVAL_COLORS, ids),
+                                     alpha=0.35, linewidth=0.8)
+    ax_time.set_title('时间域稳态区间')
+    ax_time.set_xlabel('时间 (秒)')
+    ax_time.set_ylabel('电流 (A)')
+    _cap_y_axis(ax_time, values)
+    ax_time.grid(True, linestyle='--', alpha=0.7)
+    ax_time.legend(loc='upper right')
+
+    positions = range(len(n_labels))
+    plot(ax_n, positions, values, 'g-', linewidth=1.0, label='电流值')
+    if len(intervals):
+        bounds = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+        interval_artists.span_collection(ax_n, bounds[:, 0], np.minimum(bounds[:, 1], last),
+                                         interval_artists.cycle_colors(STEADY_INTERVAL_COLORS,
+                                                                       np.arange(len(bounds))),
+                                         alpha=0.35, linewidth=0.8)
+    ax_n.set_title('指令域稳态区间')
+    ax_n.set_xlabel('指令行号索引')
+    ax_n.set_ylabel('电流 (A)')
+    _cap_y_axis(ax_n, values)
+    tick_positions = positions[::max(1, len(n_labels) // 20)] if len(n_labels) > 100 else positions
+    ax_n.set_xticks(tick_positions)
+    ax_n.set_xticklabels([n_labels[i] for i in tick_positions], rotation=45, ha='right', fontsize=8)
+    ax_n.grid(True, linestyle='--', alpha=0.7)
+    ax_n.legend(loc='upper right')
+
+
+def build_steady_figures(cumulative_time, values, n_strings, intervals):
+    """构建时间域与指令域稳态区间图，返回 (时间域图, 指令域图)"""
+    fig_time = Figure(figsize=(16, 9), dpi=100)
+    fig_n = Figure(figsize=(16, 9), dpi=100)
+    draw_steady_axes(fig_time.add_subplot(111), fig_n.add_subplot(111),
+                     cumulative_time, values, n_strings, intervals)
+    return fig_time, fig_n
+
+
+def write_steady_intervals(path, intervals, line_numbers, indices):
+    """保存稳态区间数据：起始/结束索引、程序行号.点索引、长度(点)"""
+    last = len(line_numbers) - 1
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# 稳态区间划分结果\n")
+        f.write("# 起始索引\t结束索引\t起始程序行号.点索引\t结束程序行号.点索引\t长度(点)\n")
+        for start_idx, end_idx in intervals:
+            end = min(end_idx, last)
+            f.write(f"{start_idx}\t{end_idx}\t{line_numbers[start_idx]:.0f}.{indices[start_idx]}\t"
+                    f"{line_numbers[end]:.0f}.{indices[end]}\t{end - start_idx + 1}\n")
+
+
+def process_file(input_file, output_dir, settings, save_dir=None):
+    """
+    完成一个 G 代码文件的全部批量处理步骤
+
+    参数:
+        input_file: G 代码文件路径
+        output_dir: 输出根目录，结果写入其下的 processed_<文件名> 目录
+        settings: 设置字典，键见 DEFAULT_SETTINGS
+        save_dir: 指定的结果目录（见 unique_save_dirs），None 表示 processed_<文件名>
+
+    返回:
+        dict：rows（工艺信息表行数）、mrr_intervals、steady_intervals、save_dir
+    """
+    options = dict(DEFAULT_SETTINGS, **settings)
+    save_dir, output_file = output_paths(input_file, output_dir, save_dir)
+    os.makedirs(save_dir, exist_ok=True)
+
+    # 1. 工艺信息表
+    with open(input_file, 'r') as infile:
+        text = infile.read()
+    table = pit_builder.build_pit(
+        text, options["origin"], options["rapid_speed_xy"], options["rapid_speed_z"],
+        options["s_base"], options["p_idle"], options["z_impedance"], options["arc_options"]
+    )
+    del text
+    with open(output_file, 'w') as outfile:
+        pit_builder.write_pit(outfile, table, options["tool_diameter"],
+                              options["workpiece_material"], options["blank_material"])
+    summary = {"rows": len(table), "mrr_intervals": 0, "steady_intervals": 0, "save_dir": save_dir}
+    if not len(table):
+        return summary
+
+    # 2. 行程域图表与MRR稳态区间
+    series = pit_plots.plot_series(table)
+    for i, (filename, _) in enumerate(pit_plots.PIT_FIGURES):
+        pit_plots.save_figure(pit_plots.build_step_figure(series, i), save_dir, filename, options["dpi"])
+    if options["enable_mrr_steady"]:
+        mrr_intervals = pit_plots.partition_mrr_steady_intervals(
+            series['MRR'], series['s'], series['cumulative_s'], series['N'], options["mrr_min_length"])
+        pit_plots.save_figure(pit_plots.build_mrr_interval_figure(series, mrr_intervals),
+                              save_dir, pit_plots.MRR_STEADY_FIGURE[0], options["dpi"])
+        if mrr_intervals:
+            pit_plots.write_mrr_intervals(os.path.join(save_dir, "MRR_steady_intervals.txt"),
+                                          mrr_intervals, options["mrr_min_length"])
+        summary["mrr_intervals"] = len(mrr_intervals)
+
+    # 3. 功率曲线稳态区间划分
+    power = table.column('P')
+    line_numbers = n_numbers(series['N'])
+    intervals = steady_state_engine.line_ordered_intervals(
+        power, line_numbers, options["min_length"], options["relative_threshold"],
+        options["absolute_threshold"], options["reduce_interval"], options["engine"])
+    if intervals:
+        fig_time, fig_n = build_steady_figures(np.cumsum(table.column('t')), power, series['N'], intervals)
+        pit_plots.save_figure(fig_time, save_dir, "steady_state_time_domain", options["dpi"])
+        pit_plots.save_figure(fig_n, save_dir, "steady_state_n_domain", options["dpi"])
+        write_steady_intervals(os.path.join(save_dir, "steady_intervals.txt"),
+                               intervals, line_numbers, point_indices(line_numbers))
+    summary["steady_intervals"] = len(intervals)
+    return summary
+
+
+def _init_worker(font_path):
+    """工作进程初始化：使用 Agg 后端并注册中文字体"""
+    matplotlib.use("Agg")
+    pit_plots.configure_fonts(font_path)
+
+
+class BatchPipelineRunner(process_pool_runner.FilePoolRunner):
+    """在进程池中并行处理多个 G 代码文件（每个文件执行 process_file）
+
+    每完成一个文件就向 results 队列放入一条消息：
+        ('done', 文件路径, process_file 的返回值)
+        ('error', 文件路径, 错误信息)     —— 同时追加到输出目录的 batch_errors.log
+        ('finished', 是否已取消)          —— 所有任务结束后的最后一条消息
+    """
+
+    def __init__(self, files, output_dir, settings, max_workers=None):
+        """
+        files: G 代码文件路径列表（重复的路径只处理一次）
+        output_dir: 输出根目录
+        settings: process_file 的设置字典（需可 pickle）
+        max_workers: 工作进程数，None 表示使用 CPU 核数
+        """
+        super().__init__(list(dict.fromkeys(files)), process_file, (output_dir, settings), max_workers=max_workers,
+                         initializer=_init_worker, initargs=(settings.get("font_path"),),
+                         error_log_dir=output_dir)
+        self.output_dir = output_dir
+        self.settings = settings
+        # 不同目录下的同名文件分到不同的结果目录，避免并行处理时互相覆盖
+        self.save_dirs = unique_save_dirs(self.files, output_dir)
+
+    def task_args_for(self, input_file):
+        return self.task_args + (self.save_dirs[input_file],)
@@ -0,0 +1,537 @@
+"""
+ChannelInfo/ChannelData 采集文件的列式解析与二进制缓存（不依赖 tkinter / matplotlib）
+
+解析：
+    parse_capture_file 按固定大小的二进制块流式读取文件，在块内用 NumPy 定位
+    <ChannelData> 行与字段，只转换需要的通道（负载电流、G寄存器432、X寄存器108、
+    程序行号），写入预分配、按需扩容的数组，峰值内存接近输出数组大小，
+    并统计解析吞吐（MB/s）
+
+缓存：
+    首次打开采集文件时解析文本，并把解析出的通道保存为类型化数组，写入与原文件
+    同目录的旁路缓存目录 <文件名>.smifcache/：
+        channels.npy - float64 数组，形状为 (通道数, 采样点数)，无法解析的值记为 NaN
+        meta.json    - 缓存键（路径、大小、修改时间、内容摘要、读取方式）、
+                       ChannelInfo 元数据与各行数组对应的通道序号
+
+    再次打开时只校验缓存键，数组通过 np.load(mmap_mode='r') 映射，不重新读取文本，
+    也不会为整文件数据再分配一份内存。
+
+    内容摘要只对文件头、中、尾各 1 MiB 取样计算，避免每次打开都完整读取大文件；
+    配合文件大小与修改时间（纳秒）共同判断缓存是否过期。
+"""
+import codecs
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+
+CACHE_SUFFIX = ".smifcache"
+CACHE_VERSION = 2
+
+DATA_SOURCES = ("current", "vgpro_power", "huazhong_power")
+
+# 内容摘要的取样块大小
+_SAMPLE_SIZE = 1 << 20
+
+# 流式解析的读取块大小
+_CHUNK_SIZE = 4 << 20
+
+# 批量转换时单个数值字段的最大长度，超出时逐个转换
+_MAX_TOKEN = 32
+# 批量转换失败时二分到该大小后逐个转换
+_CONVERT_BLOCK = 64
+
+_INFO_TAG = b"<ChannelInfo>"
+_DATA_TAG = b"<ChannelData>"
+_WHITESPACE = np.frombuffer(b" \t\r\x0b\x0c", dtype=np.uint8)
+
+
+def find_columns(channel_info, data_source):
+    """
+    按数据源查找目标通道与程序行号通道的列索引
+
+    参数:
+        channel_info: 每个 ChannelInfo 行的字段列表
+        data_source: "current"（负载电流）、"vgpro_power"（G寄存器432）
+                     或 "huazhong_power"（X寄存器108）
+
+    返回:
+        (目标列索引, 程序行号列索引)，未找到时为 -1
+    """
+    target_col = -1
+    line_number_col = -1
+    for i, fields in enumerate(channel_info):
+        # 第三个字段是通道名称（索引3），第六个字段是寄存器编号（索引6）
+        if len(fields) > 5:
+            channel_name = fields[3].strip('<> ')
+            register_number = fields[6].strip('<> ') if len(fields) > 6 else ''
+
+            if data_source == "current" and channel_name == '负载电流':
+                target_col = i
+            elif data_source == "vgpro_power" and register_number == '432':
+                target_col = i
+            elif data_source == "huazhong_power" and register_number == '108':
+                target_col = i
+            elif channel_name == '程序行号':
+                line_number_col = i
+    return target_col, line_number_col
+
+
+def capture_columns(channel_info):
+    """返回任一数据源可能用到的通道序号（升序）"""
+    columns = set()
+    for data_source in DATA_SOURCES:
+        columns.update(find_columns(channel_info, data_source))
+    columns.discard(-1)
+    return sorted(columns)
+
+
+class ChannelCapture:
+    """一次采集中解析出的通道数据与 ChannelInfo 元数据"""
+
+    def __init__(self, channel_info, channels, separator, encoding=None, columns=None,
+                 from_cache=False, parse_stats=None):
+        self.channel_info = channel_info  # 每个 ChannelInfo 行的字段列表
+        self.channels = channels          # (通道数, 采样点数) 的 float64 数组
+        self.columns = list(columns) if columns is not None else list(range(len(channels)))
+        self.separator = separator
+        self.encoding = encoding
+        self.from_cache = from_cache
+        self.parse_stats = parse_stats    # 解析统计：字节数、耗时、吞吐（MB/s）
+
+    @property
+    def num_samples(self):
+        return self.channels.shape[1]
+
+    def find_columns(self, data_source):
+        """按数据源查找目标通道与程序行号通道的列索引（ChannelInfo 序号），未找到时为 -1"""
+        return find_columns(self.channel_info, data_source)
+
+    def channel(self, column):
+        """按 ChannelInfo 序号取出通道数据"""
+        return self.channels[self.columns.index(column)]
+
+
+def parse_capture_lines(lines, separator, encoding=None):
+    """
+    从文本行解析 ChannelInfo/ChannelData，所需通道转换为 float64 数组
+
+    ChannelData 行的第一个字段是 <ChannelData> 标签，第 i 个通道的值位于第 i+1 个字段。
+    """
+    channel_info = []
+    data_lines = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("<ChannelInfo>"):
+            channel_info.append(line.split(separator))
+        elif line.startswith("<ChannelData>"):
+            data_lines.append(line)
+
+    columns = capture_columns(channel_info)
+    channels = np.full((len(columns), len(data_lines)), np.nan)
+    for row, line in enumerate(data_lines):
+        values = line.split(separator)
+        for k, col in enumerate(columns):
+            try:
+                channels[k, row] = float(values[col + 1])
+            except (ValueError, IndexError):
+                continue
+
+    return ChannelCapture(channel_info, channels, separator, encoding, columns)
+
+
+def is_byte_parsable(encoding):
+    """编码是否与 ASCII 兼容（标签、分隔符、数字均为单字节），可直接按字节解析"""
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    if name == 'utf-8-sig':
+        return True
+    probe = "<ChannelData>\t,.-+0123456789eE\n"
+    try:
+        return probe.encode(encoding) == probe.encode('ascii')
+    except UnicodeError:
+        return False
+
+
+class _RowBuffer:
+    """按行追加的 float64 缓冲区，按估计容量预分配，不足时原地扩容"""
+
+    def __init__(self, num_columns, capacity):
+        self.data = np.empty((max(1, capacity), num_columns))
+        self.size = 0
+
+    def append(self, rows):
+        need = self.size + len(rows)
+        if need > len(self.data):
+            self.data.resize((max(need, int(len(self.data) * 1.5)), self.data.shape[1]),
+                             refcheck=False)
+        self.data[self.size:need] = rows
+        self.size = need
+
+    def finish(self):
+        """截断到实际行数，返回 (通道数, 采样点数) 的视图"""
+        self.data.resize((self.size, self.data.shape[1]), refcheck=False)
+        return self.data.T
+
+
+def _starts_with(buf, starts, ends, tag):
+    """判断各行（buf[starts:ends]）是否以 tag 开头"""
+    tag = np.frombuffer(tag, dtype=np.uint8)
+    result = np.zeros(len(starts), dtype=bool)
+    candidates = np.flatnonzero(ends - starts >= len(tag))
+    if candidates.size:
+        heads = buf[starts[candidates, None] + np.arange(len(tag))]
+        result[candidates] = (heads == tag).all(axis=1)
+    return result
+
+
+def _convert_tokens(tokens, values, index):
+    """批量转换 tokens 写入 values[index]；失败时二分定位非法字段，小块内逐个转换"""
+    try:
+        values[index] = tokens.astype(np.float64)
+        return
+    except ValueError:
+        pass
+    if len(tokens) <= _CONVERT_BLOCK:
+        for k, token in zip(index, tokens):
+            try:
+                values[k] = float(token)
+            except ValueError:
+                continue
+        return
+    half = len(tokens) // 2
+    _convert_tokens(tokens[:half], values, index[:half])
+    _convert_tokens(tokens[half:], values, index[half:])
+
+
+def _tokens_to_float(buf, token_starts, token_ends):
+    """
+    把 buf 中的一组字段批量转换为 float64
+
+    字段按定长复制为字节矩阵后一次性 astype；空字段、超长字段或含非法字符的
+    字段逐个 float()，无法解析的值记为 NaN。
+    """
+    lengths = token_ends - token_starts
+    values = np.full(len(token_starts), np.nan)
+    usable = np.flatnonzero((lengths > 0) & (lengths <= _MAX_TOKEN))
+    if usable.size:
+        width = int(lengths[usable].max())
+        offsets = np.arange(width)
+        index = np.minimum(token_starts[usable, None] + offsets, len(buf) - 1)
+        matrix = buf[index]
+        matrix[offsets >= lengths[usable, None]] = 0
+        _convert_tokens(matrix.view(f'S{width}').ravel(), values, usable)
+    for k in np.flatnonzero(lengths > _MAX_TOKEN):
+        try:
+            values[k] = float(bytes(buf[token_starts[k]:token_ends[k]]))
+        except ValueError:
+            continue
+    return values
+
+
+def _parse_data_rows(buf, starts, ends, columns, sep):
+    """
+    解析一批 ChannelData 行中指定通道的数值
+
+    参数:
+        buf: 数据块（uint8 数组）
+        starts, ends: 各数据行在 buf 中的起止位置（ends 不含换行符）
+        columns: 需要的通道序号，第 i 个通道位于行内第 i+1 个字段
+
+    返回:
+        (行数, 通道数) 的 float64 数组，缺失或无法解析的值为 NaN
+    """
+    seps = np.flatnonzero(buf == sep)
+    first = np.searchsorted(seps, starts)
+    count = np.searchsorted(seps, ends) - first
+    last_sep = len(seps) - 1
+
+    rows = np.full((len(starts), len(columns)), np.nan)
+    for k, col in enumerate(columns):
+        field = col + 1
+        present = np.flatnonzero(count >= field)
+        if not present.size:
+            continue
+        token_starts = seps[np.minimum(first[present] + field - 1, last_sep)] + 1
+        has_next = count[present] >= field + 1
+        token_ends = np.where(has_next, seps[np.minimum(first[present] + field, last_sep)],
+                              ends[present])
+        rows[present, k] = _tokens_to_float(buf, token_starts, token_ends)
+    return rows
+
+
+def parse_capture_file(file_path, encoding, separator, chunk_size=_CHUNK_SIZE, progress_callback=None):
+    """
+    按二进制块流式解析 ChannelInfo/ChannelData 文件
+
+    每个数据块内用 NumPy 定位换行符与分隔符，只转换任一数据源会用到的通道。
+    要求编码与 ASCII 兼容（见 is_byte_parsable），ChannelInfo 行按 encoding 解码，
+    且位于数据行之前（采集文件的表头）。
+    progress_callback 不为 None 时每个数据块后调用 progress_callback(已读取字节数, 文件总字节数)，
+    回调抛出的异常（例如取消）会中止解析。
+
+    返回:
+        ChannelCapture，parse_stats 中包含字节数、耗时与吞吐（MB/s）
+    """
+    start_time = time.perf_counter()
+    file_size = os.path.getsize(file_path)
+    text_encoding = 'utf-8' if codecs.lookup(encoding).name == 'utf-8-sig' else encoding
+    sep = ord(separator)
+
+    channel_info = []
+    columns = None
+    buffer = None
+
+    def handle_block(block):
+        nonlocal columns, buffer
+        buf = np.frombuffer(block, dtype=np.uint8)
+        newlines = np.flatnonzero(buf == 10)
+        starts = np.concatenate(([0], newlines + 1))
+        ends = np.concatenate((newlines, [len(buf)]))
+
+        # 行首有空白时与原文本解析一样先去掉（这类行很少，逐行处理）
+        nonempty = np.flatnonzero(ends > starts)
+        for k in nonempty[np.isin(buf[starts[nonempty]], _WHITESPACE)]:
+            line = block[starts[k]:ends[k]]
+            starts[k] += len(line) - len(line.lstrip())
+
+        for k in np.flatnonzero(_starts_with(buf, starts, ends, _INFO_TAG)):
+            line = block[starts[k]:ends[k]].strip()
+            channel_info.append(line.decode(text_encoding, errors='replace').split(separator))
+
+        data_lines = np.flatnonzero(_starts_with(buf, starts, ends, _DATA_TAG))
+        if not data_lines.size:
+            return
+        if columns is None:
+            # 遇到第一批数据行时确定需要的通道，并按文件大小估计行数预分配
+            columns = capture_columns(channel_info)
+            line_length = int(ends[data_lines[0]] - starts[data_lines[0]]) + 1
+            buffer = _RowBuffer(len(columns), int(file_size / line_length * 1.05))
+        if columns:
+            buffer.append(_parse_data_rows(buf, starts[data_lines], ends[data_lines], columns, sep))
+
+    with open(file_path, 'rb') as f:
+        leftover = f.read(len(codecs.BOM_UTF8))
+        if leftover == codecs.BOM_UTF8 and text_encoding == 'utf-8':
+            leftover = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            block = leftover + chunk
+            cut = block.rfind(b'\n')
+            if cut < 0:
+                leftover = block
+                continue
+            leftover = block[cut + 1:]
+            handle_block(block[:cut])
+            if progress_callback is not None:
+                progress_callback(f.tell(), file_size)
+        if leftover:
+            handle_block(leftover)
+
+    if buffer is None:
+        columns = capture_columns(channel_info)
+        channels = np.zeros((len(columns), 0))
+    else:
+        channels = buffer.finish()
+
+    elapsed = time.perf_counter() - start_time
+    parse_stats = {
+        'bytes': file_size,
+        'seconds': elapsed,
+        'mb_per_s': file_size / (1 << 20) / elapsed if elapsed > 0 else float('inf'),
+    }
+    return ChannelCapture(channel_info, channels, separator, encoding, columns,
+                          parse_stats=parse_stats)
+
+
+def cache_dir_for(file_path):
+    """返回采集文件对应的旁路缓存目录"""
+    return os.path.abspath(file_path) + CACHE_SUFFIX
+
+
+def file_fingerprint(file_path):
+    """计算缓存键中的文件指纹：大小、修改时间（纳秒）与取样内容摘要"""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(stat.st_size).encode())
+    with open(file_path, 'rb') as f:
+        for offset in sorted({0, max(0, stat.st_size // 2 - _SAMPLE_SIZE // 2),
+                              max(0, stat.st_size - _SAMPLE_SIZE)}):
+            f.seek(offset)
+            digest.update(f.read(_SAMPLE_SIZE))
+    return {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': digest.hexdigest(),
+    }
+
+
+def load_cached_capture(file_path, read_mode):
+    """
+    读取有效的缓存，缓存不存在或已过期时返回 None
+
+    参数:
+        read_mode: 读取方式标识（如编码选择），与建立缓存时不同则视为过期
+    """
+    cache_dir = cache_dir_for(file_path)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if (meta.get('version') != CACHE_VERSION or meta.get('read_mode') != read_mode
+                or meta.get('key') != file_fingerprint(file_path)):
+            return None
+        channels = np.load(os.path.join(cache_dir, 'channels.npy'), mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if channels.ndim != 2 or channels.shape[0] != len(meta['columns']):
+        return None
+    return ChannelCapture(meta['channel_info'], channels, meta['separator'],
+                          meta.get('encoding'), meta['columns'], from_cache=True)
+
+
+def save_capture_cache(file_path, capture, read_mode):
+    """
+    写入旁路缓存，目录不可写时静默跳过
+
+    先写数组再写 meta.json，meta.json 存在即表示缓存完整。
+
+    返回:
+        是否写入成功
+    """
+    cache_dir = cache_dir_for(file_path)
+    meta = {
+        'version': CACHE_VERSION,
+        'read_mode': read_mode,
+        'key': file_fingerprint(file_path),
+        'separator': capture.separator,
+        'encoding': capture.encoding,
+        'channel_info': capture.channel_info,
+        'columns': capture.columns,
+    }
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        tmp_path = os.path.join(cache_dir, f'channels.{os.getpid()}.tmp.npy')
+        np.save(tmp_path, np.asarray(capture.channels, dtype=np.float64))
+        os.replace(tmp_path, os.path.join(cache_dir, 'channels.npy'))
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + '.tmp', meta_path)
+    except OSError:
+        return False
+    return True
+
+
+# 自动检测编码时依次尝试的编码，与界面一致
+DETECT_ENCODINGS = ('utf-8', 'gbk', 'gb2312', 'latin1', 'iso-8859-1', 'cp1252')
+
+
+def detect_encoding(file_path):
+    """依次尝试常见编码读取文件开头，返回第一个可解码的编码（均失败时为 utf-8）"""
+    for encoding in DETECT_ENCODINGS:
+        try:
+            with open(file_path, 'r', encoding=encoding) as f:
+                f.read(1024)  # 只读取前1024字符进行测试
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'utf-8'
+
+
+def load_capture(file_path, read_mode, parse):
+    """
+    读取采集文件：缓存有效时直接映射缓存，否则调用 parse() 解析并写入缓存
+
+    参数:
+        read_mode: 读取方式标识，参与缓存键
+        parse: 无参回调，返回 ChannelCapture
+
+    返回:
+        ChannelCapture；from_cache 表示是否来自缓存
+    """
+    capture = load_cached_capture(file_path, read_mode)
+    if capture is not None:
+        return capture
+    capture = parse()
+    if capture.channel_info and capture.num_samples:
+        save_capture_cache(file_path, capture, read_mode)
+    return capture
+
+
+def read_capture(file_path, encoding="auto"):
+    """
+    读取文本/CSV 采集文件（带旁路缓存），供不依赖界面的调用方使用
+
+    参数:
+        encoding: 文件编码，"auto" 表示自动检测；同时作为缓存键中的读取方式
+
+    返回:
+        ChannelCapture
+    """
+    separator = ',' if file_path.endswith('.csv') else '\t'
+
+    def parse():
+        file_encoding = detect_encoding(file_path) if encoding == "auto" else encoding
+        if is_byte_parsable(file_encoding):
+            return parse_capture_file(file_path, file_encoding, separator)
+        with open(file_path, 'r', encoding=file_encoding) as f:
+            return parse_capture_lines(f.read().split('\n'), separator, file_encoding)
+
+    return load_capture(file_path, encoding, parse)
+
+
+def select_channels(capture, target_col, line_number_col):
+    """
+    取出目标通道与程序行号通道，剔除任一通道无法解析的采样点
+
+    全部采样点均有效时直接返回缓存数组的视图，不复制数据。
+
+    返回:
+        (目标通道数组, 程序行号数组)
+    """
+    target = capture.channel(target_col)
+    line_numbers = capture.channel(line_number_col)
+    valid = ~(np.isnan(target) | np.isnan(line_numbers))
+    if valid.all():
+        return target, line_numbers
+    return np.asarray(target[valid]), np.asarray(line_numbers[valid])
+
+
+def line_positions(line_numbers):
+    """
+    计算每个采样点在其程序行内的序号与横轴位置
+
+    横轴位置 = 行号 + 行内序号 / 该行采样点总数，使同一行的采样点在 [N, N+1) 内均匀分布。
+
+    返回:
+        (行内序号数组, 横轴位置数组)
+    """
+    line_numbers = np.asarray(line_numbers)
+    n = len(line_numbers)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    order = np.argsort(line_numbers, kind='stable')
+    sorted_lines = line_numbers[order]
+    group_start = np.r_[True, sorted_lines[1:] != sorted_lines[:-1]]
+    group_id = np.cumsum(group_start) - 1
+    first_index = np.flatnonzero(group_start)
+    counts = np.diff(np.r_[first_index, n])
+
+    point_indices = np.empty(n, dtype=np.int64)
+    point_indices[order] = np.arange(n) - first_index[group_id]
+    totals = np.empty(n, dtype=np.int64)
+    totals[order] = counts[group_id]
+    return point_indices, line_numbers + point_indices / totals
@@ -0,0 +1,207 @@
+"""
+图表滚轮缩放与拖动平移的视图更新（不依赖 tkinter，只使用 matplotlib 画布接口）
+
+滚轮和鼠标移动事件往往成串到达，每个事件都调用 canvas.draw() 会让整个图形
+（刻度、几百个 axvspan、曲线）反复重绘。ChartView 把事件合并为每帧一次更新：
+
+    1. 事件处理函数只调用 zoom / set_view 登记新的坐标范围，并启动一帧（FRAME_MS）的定时器；
+       同一帧内的多个滚轮刻度在登记的范围上累积
+    2. 帧定时器到期时统一 set_xlim / set_ylim（降采样曲线随之按新的可见范围重新降采样，
+       见 plot_decimation），然后 blit：一串事件的第一帧把坐标轴内的曲线、色块等
+       设为 animated 并完整绘制一次，缓存不含它们的背景；之后每帧只恢复背景、
+       重画这些艺术家并 blit 坐标轴区域
+    3. 最后一个事件之后 SETTLE_MS 仍无新事件时取消 animated 并完整重绘，刻度与网格随之更新
+
+画布在一串事件中间被其他代码完整重绘时（例如重新绘图），立即结束 blit 状态。
+"""
+import weakref
+
+
+# 帧间隔（毫秒）：一帧内的多个事件合并为一次更新
+FRAME_MS = 16
+# 最后一个事件之后完整重绘的等待时间（毫秒）
+SETTLE_MS = 200
+
+# 画布 -> ChartView
+_views = weakref.WeakKeyDictionary()
+
+
+def view_for(canvas):
+    """返回画布对应的 ChartView（首次调用时创建）"""
+    view = _views.get(canvas)
+    if view is None:
+        view = _views[canvas] = ChartView(canvas)
+    return view
+
+
+def _zoomed(lim, center, scale):
+    """以 center 为中心把范围 lim 缩放 scale 倍"""
+    return (center - (center - lim[0]) * scale, center + (lim[1] - center) * scale)
+
+
+class ChartView:
+    """合并滚轮/拖动事件并用 blit 重绘的视图更新器（每个画布一个）"""
+
+    def __init__(self, canvas, frame_ms=FRAME_MS, settle_ms=SETTLE_MS):
+        self.canvas = canvas
+        self.frame_ms = frame_ms
+        self.settle_ms = settle_ms
+        self._pending = {}        # 坐标轴 -> [xlim, ylim]，尚未应用的范围（None 表示不变）
+        self._frame_timer = None
+        self._settle_timer = None
+        self._background = None   # 一串事件中缓存的背景（None 表示未处于 blit 状态）
+        self._animated = {}       # blit 的坐标轴 -> 设为 animated 的艺术家（按 zorder 排序）
+        self._own_draw = False
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def get_xlim(self, ax):
+        """坐标轴的 x 范围（含已登记、尚未应用的范围）"""
+        pending = self._pending.get(ax)
+        return pending[0] if pending and pending[0] is not None else ax.get_xlim()
+
+    def get_ylim(self, ax):
+        """坐标轴的 y 范围（含已登记、尚未应用的范围）"""
+        pending = self._pending.get(ax)
+        return pending[1] if pending and pending[1] is not None else ax.get_ylim()
+
+    def event_data(self, ax, event):
+        """
+        事件位置在登记范围下的数据坐标（线性坐标轴）
+
+        event.xdata / ydata 按已应用的范围计算，同一帧内连续滚轮缩放时需用本方法。
+        返回:
+            (x, y)，事件不在 ax 内时返回 None
+        """
+        if event.inaxes is not ax or event.x is None or event.y is None:
+            return None
+        bbox = ax.bbox
+        (x0, x1), (y0, y1) = self.get_xlim(ax), self.get_ylim(ax)
+        return (x0 + (event.x - bbox.x0) / bbox.width * (x1 - x0),
+                y0 + (event.y - bbox.y0) / bbox.height * (y1 - y0))
+
+    def set_view(self, ax, xlim=None, ylim=None):
+        """登记坐标轴的新范围，在下一帧统一应用并重绘"""
+        pending = self._pending.setdefault(ax, [None, None])
+        if xlim is not None:
+            pending[0] = tuple(xlim)
+        if ylim is not None:
+            pending[1] = tuple(ylim)
+        if self._frame_timer is None:
+            self._frame_timer = self._single_shot(self.frame_ms, self._on_frame)
+        if self._settle_timer is not None:
+            self._settle_timer.stop()
+        self._settle_timer = self._single_shot(self.settle_ms, self._on_settle)
+
+    def zoom(self, event, scale, axes=None, x=True, y=False):
+        """
+        以鼠标位置为中心缩放
+
+        参数:
+            event: 滚轮事件（event.inaxes 为鼠标所在坐标轴）
+            scale: 缩放倍数（小于 1 放大）
+            axes: 同步缩放 x 范围的坐标轴列表，None 表示只缩放 event.inaxes
+            x, y: 是否缩放 x / y 范围（y 只作用于 event.inaxes）
+        返回:
+            是否登记了新范围
+        """
+        ax = event.inaxes
+        position = self.event_data(ax, event) if ax is not None else None
+        if position is None:
+            return False
+        if x:
+            xlim = _zoomed(self.get_xlim(ax), position[0], scale)
+            for target in (axes or [ax]):
+                self.set_view(target, xlim=xlim)
+        if y:
+            self.set_view(ax, ylim=_zoomed(self.get_ylim(ax), position[1], scale))
+        return True
+
+    def flush(self):
+        """立即应用登记的范围并完整重绘（用于重置视图等一次性操作）"""
+        self._stop_timers()
+        self._apply_pending()
+        self._end_blit()
+        self.canvas.draw_idle()
+
+    def _single_shot(self, interval, callback):
+        timer = self.canvas.new_timer(interval=interval)
+        timer.single_shot = True
+        timer.add_callback(callback)
+        timer.start()
+        return timer
+
+    def _stop_timers(self):
+        for timer in (self._frame_timer, self._settle_timer):
+            if timer is not None:
+                timer.stop()
+        self._frame_timer = self._settle_timer = None
+
+    def _apply_pending(self):
+        pending, self._pending = self._pending, {}
+        for ax, (xlim, ylim) in pending.items():
+            if xlim is not None:
+                ax.set_xlim(xlim)
+            if ylim is not None:
+                ax.set_ylim(ylim)
+        return list(pending)
+
+    def _on_frame(self):
+        self._frame_timer = None
+        changed = self._apply_pending()
+        if not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return
+        if self._background is None or any(ax not in self._animated for ax in changed):
+            self._begin_blit(changed)
+        self._blit()
+
+    def _begin_blit(self, changed):
+        """把坐标轴内的艺术家设为 animated，完整绘制一次并缓存背景"""
+        self._end_blit()
+        for ax in self.canvas.figure.axes:
+            if ax not in changed:
+                continue
+            artists = [*ax.lines, *ax.patches, *ax.collections, *ax.texts]
+            if ax.get_legend() is not None:
+                artists.append(ax.get_legend())
+            artists = [artist for artist in artists if not artist.get_animated()]
+            for artist in artists:
+                artist.set_animated(True)
+            self._animated[ax] = sorted(artists, key=lambda artist: artist.get_zorder())
+        self._own_draw = True
+        try:
+            self.canvas.draw()
+        finally:
+            self._own_draw = False
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        for ax, artists in self._animated.items():
+            for artist in artists:
+                ax.draw_artist(artist)
+            self.canvas.blit(ax.bbox)
+
+    def _end_blit(self):
+        for artists in self._animated.values():
+            for artist in artists:
+                artist.set_animated(False)
+        self._animated = {}
+        self._background = None
+
+    def _on_settle(self):
+        self._settle_timer = None
+        if self._frame_timer is not None:
+            # 仍有未应用的范围：等这一帧完成后再完整重绘
+            self._settle_timer = self._single_shot(self.frame_ms, self._on_settle)
+            return
+        if self._background is not None:
+            self._end_blit()
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        # 其他代码完整重绘了画布：缓存的背景失效，animated 的艺术家需恢复正常绘制
+        if self._own_draw or self._background is None:
+            return
+        self._end_blit()
+        self.canvas.draw_idle()
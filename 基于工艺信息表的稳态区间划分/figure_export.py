@@ -0,0 +1,170 @@
+"""
+图表后台导出（不依赖 tkinter）
+
+600dpi PNG 加 SVG 的保存在界面线程中往往需要几十秒。ExportQueue 在界面线程中只做一次快照：
+    - 已显示的 Figure：pickle 整个图形（曲线原始样本、区间色块、坐标范围等，不含画布）
+    - 尚未构建的图表：直接传可 pickle 的构建函数（例如 pit_plots.LazyFigures 的构建函数）
+工作进程据此得到一个独立的 Figure，用 Agg 渲染并写出文件，界面用 root.after 调用 poll()
+取回完成通知。多个导出任务在进程池中并行执行。
+
+rasterize_points 不为 None 时，SVG 中顶点数不少于该值的曲线与集合栅格化为嵌入图像
+（其余元素仍为矢量），文件大小不再随样本数增长。
+"""
+import os
+import pickle
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import pit_plots
+import plot_decimation
+
+
+DEFAULT_DPI = 600
+# 建议的栅格化阈值：顶点数不少于该值的曲线/集合在 SVG 中栅格化
+RASTERIZE_POINTS = 20000
+# SVG 中栅格化部分的分辨率
+SVG_RASTER_DPI = 300
+
+
+def snapshot(fig):
+    """图形快照（pickle 字节串，不含画布与界面回调）"""
+    return pickle.dumps(fig, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _vertex_count(artist):
+    if hasattr(artist, 'get_xydata'):
+        return len(artist.get_xydata())
+    return sum(len(path.vertices) for path in artist.get_paths())
+
+
+def rasterize_dense(fig, min_points):
+    """把顶点数不少于 min_points 的曲线与集合设为栅格化，返回被设置的艺术家数"""
+    count = 0
+    for ax in fig.axes:
+        for artist in [*ax.lines, *ax.collections]:
+            if _vertex_count(artist) >= min_points:
+                artist.set_rasterized(True)
+                count += 1
+    return count
+
+
+def render(source, png_path=None, svg_path=None, dpi=DEFAULT_DPI, full_resolution=False,
+           rasterize_points=None):
+    """
+    渲染并保存一张图表（工作进程中执行，也可直接调用）
+
+    参数:
+        source: snapshot 的返回值，或无参数、返回 Figure 的构建函数
+        png_path, svg_path: 输出路径，None 表示不输出该格式
+        dpi: PNG 分辨率；降采样曲线按该分辨率重新降采样
+        full_resolution: 为 True 时降采样曲线换回全部原始样本
+        rasterize_points: SVG 栅格化阈值（顶点数），None 表示全部保持矢量
+
+    返回:
+        写出的文件路径列表
+    """
+    fig = pickle.loads(source) if isinstance(source, bytes) else source()
+    FigureCanvasAgg(fig)
+    # 快照可能取自滚轮缩放的 blit 过程中，animated 的艺术家不会被 savefig 绘制
+    for artist in fig.findobj(lambda artist: artist.get_animated()):
+        artist.set_animated(False)
+
+    written = []
+    with plot_decimation.export_view(fig, dpi, full_resolution):
+        if png_path:
+            fig.savefig(png_path, dpi=dpi, bbox_inches='tight', format='png')
+            written.append(png_path)
+        if svg_path:
+            svg_dpi = 'figure'
+            if rasterize_points is not None and rasterize_dense(fig, rasterize_points):
+                svg_dpi = min(dpi, SVG_RASTER_DPI)
+            fig.savefig(svg_path, dpi=svg_dpi, bbox_inches='tight', format='svg')
+            written.append(svg_path)
+    fig.clear()
+    return written
+
+
+def _init_worker(font_path):
+    """工作进程初始化：使用 Agg 后端并注册中文字体"""
+    matplotlib.use("Agg")
+    pit_plots.configure_fonts(font_path)
+
+
+class ExportQueue:
+    """在进程池中并行导出图表；进程池在第一次提交时创建，之后一直复用"""
+
+    def __init__(self, max_workers=None, font_path=None):
+        """
+        max_workers: 工作进程数，None 表示 CPU 核数（最多 4 个）
+        font_path: 中文字体文件路径（工作进程中注册）
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.font_path = font_path
+        self.results = queue.Queue()  # (on_done, 错误信息或 None, 写出的文件路径列表)
+        self._executor = None
+        self._pending = 0
+
+    @property
+    def pending(self):
+        """尚未完成的导出任务数"""
+        return self._pending
+
+    def submit(self, source, png_path=None, svg_path=None, dpi=DEFAULT_DPI, full_resolution=False,
+               rasterize_points=None, on_done=None):
+        """
+        提交一张图表的导出（立即返回）
+
+        参数:
+            source: Figure（在此处做快照），或可 pickle 的构建函数
+            on_done: 完成后在 poll() 中调用 on_done(错误信息或 None, 写出的文件路径列表)
+            其余参数同 render
+        """
+        if hasattr(source, 'savefig'):
+            source = snapshot(source)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(self.font_path,))
+        paths = [path for path in (png_path, svg_path) if path]
+        executor = self._executor
+        future = executor.submit(render, source, png_path, svg_path, dpi, full_resolution, rasterize_points)
+        self._pending += 1
+
+        def done(future):
+            try:
+                self.results.put((on_done, None, future.result()))
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool) and self._executor is executor:
+                    # 工作进程异常退出（例如内存不足）后进程池不能再用，下次提交时重新创建
+                    self._executor = None
+                names = ", ".join(os.path.basename(path) for path in paths)
+                self.results.put((on_done, f"导出 {names} 失败: {str(e)}", paths))
+
+        future.add_done_callback(done)
+        return future
+
+    def poll(self):
+        """
+        在界面线程中调用：处理已完成的导出并调用各自的 on_done
+
+        返回:
+            尚未完成的导出任务数
+        """
+        while True:
+            try:
+                on_done, error, paths = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if on_done is not None:
+                on_done(error, paths)
+        return self._pending
+
+    def shutdown(self, wait=True):
+        """关闭进程池（wait 为 True 时等待已提交的导出完成）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,218 @@
+"""
+G 代码分词（不依赖 tkinter / matplotlib）
+
+G 代码细分工具（ArcSubdivider）与工艺信息表构建（pit_builder）共用本模块：
+
+    tokenize_line  - 单行分词：一个预编译正则一次扫描得到行号 N、G/M 指令与其余地址字的数值
+    tokenize_text  - 整个工艺信息文件一次分词为列数组（ap/ae/F、N、X/Y/Z/S 等），
+                     地址字语法与 tokenize_line 相同，每行结果一致
+    tokenize_file  - 读入文件后调用 tokenize_text
+    benchmark      - 微基准：逐行分词与整文件分词的每秒行数
+
+命令行微基准:
+    python gcode_tokenizer.py program.nc --repeat 5
+"""
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+
+
+# 地址字语法（逐行与整文件分词共用）：括号注释整体跳过（不产生分组，也不跨行），
+# 其余为 "字母 + 数值字符" 的地址字
+_WORD_GRAMMAR = r'\([^)\n]*\)|([A-Z])([0-9.+\-]*)'
+# 单行分词的主正则
+_LINE_WORD_PATTERN = re.compile(_WORD_GRAMMAR)
+# 整文件分词的主正则：同一语法另加换行分支，用于把地址字映射回行号
+_TEXT_WORD_PATTERN = re.compile(_WORD_GRAMMAR + r'|(\n)')
+
+# 至少 7 个字段的行：第 4-6 个字段为 ap/ae/F，其余为 G 代码内容（行尾空白不影响后续匹配）
+_PIT_LINE_PATTERN = re.compile(
+    r'^[^\S\n]*\S+[^\S\n]+\S+[^\S\n]+\S+[^\S\n]+(\S+)[^\S\n]+(\S+)[^\S\n]+(\S+)[^\S\n]+(\S[^\n]*)',
+    re.MULTILINE)
+
+# 运动指令与加工平面（写法与 ArcSubdivider 识别的指令一致）
+MOTION_CODES = {'G0': 0, 'G00': 0, 'G1': 1, 'G01': 1, 'G2': 2, 'G02': 2, 'G3': 3, 'G03': 3}
+PLANE_CODES = {'G17': 17, 'G18': 18, 'G19': 19}
+
+
+def _word_value(value):
+    """地址字数值：以小数点结尾的按补 0 解析（"5." 为 5.0），无法解析时返回 None"""
+    try:
+        return float(value + '0' if value.endswith('.') else value)
+    except ValueError:
+        return None
+
+
+def tokenize_line(line):
+    """
+    单行 G 代码分词
+
+    参数:
+        line: 一行 G 代码（可含括号注释）
+
+    返回:
+        (行号, 指令列表, 参数字典, 无法解析的地址字列表)
+        行号为行首的 N 字（如 "N120"、"N3.1"），没有时为 None；
+        指令列表为按出现顺序的 G/M 字（如 ["G17", "G90"]）；
+        参数字典为其余地址字的数值（同一字母后出现的覆盖先出现的），
+        以小数点结尾的数值按补 0 解析（"X5." 为 5.0）
+    """
+    line_number = None
+    commands = []
+    params = {}
+    invalid = []
+    first = True
+    for letter, value in _LINE_WORD_PATTERN.findall(line):
+        # 注释与只有字母的地址字不计
+        if not value:
+            continue
+        if letter == 'G' or letter == 'M':
+            commands.append(letter + value)
+        elif first and letter == 'N' and value[0].isdigit():
+            line_number = 'N' + value
+        else:
+            number = _word_value(value)
+            if number is None:
+                invalid.append(letter + value)
+            else:
+                params[letter] = number
+        first = False
+    return line_number, commands, params, invalid
+
+
+def _last_per_line(line_ids, values, num_lines, default):
+    """每行最后一个匹配的值（line_ids 按出现顺序排列），未给出的行为 default"""
+    column = np.full(num_lines, default, dtype=values.dtype)
+    if len(line_ids):
+        # 倒序后每行的第一个即原顺序的最后一个
+        lines, last = np.unique(line_ids[::-1], return_index=True)
+        column[lines] = values[::-1][last]
+    return column
+
+
+def tokenize_text(text, arc_words=False):
+    """
+    将整个工艺信息文件分词为列数组
+
+    G 代码内容与 tokenize_line 使用同一地址字语法：注释内的字不计，同一字母后出现的覆盖
+    先出现的，无法解析的数值不计；行号为行首的 N 字，运动指令与加工平面取本行最后一个。
+    即每行的结果与对该行 G 代码内容调用 tokenize_line 一致。
+
+    参数:
+        text: 文件全文（每行至少 7 个字段，第 4-6 个字段为 ap/ae/F，其余为 G 代码内容）
+        arc_words: 是否同时返回圆弧展开所需的 I/J/R 与加工平面
+
+    返回:
+        dict：ap/ae/F（原始字符串列表）、N_str（没有行号为 "N0"）、X/Y/Z/S（本行给出的值，
+        未给出为 NaN）、motion（本行最后一个 G0-G3 的编号，未给出为 -1）、
+        rapid/cutting（本行运动指令是否为 G0 / G1-G3）；arc_words 为 True 时另有
+        I/J/R（未给出为 NaN）、plane（17/18/19，未给出为 0）
+    """
+    rows = _PIT_LINE_PATTERN.findall(text)
+    num_lines = len(rows)
+    columns = {'ap': [row[0] for row in rows], 'ae': [row[1] for row in rows], 'F': [row[2] for row in rows]}
+    content = '\n'.join(row[3] for row in rows)
+    del rows
+
+    matches = _TEXT_WORD_PATTERN.findall(content)
+    del content
+    letters = np.array([match[0] for match in matches], dtype=object)
+    values = np.array([match[1] for match in matches], dtype=object)
+    line_ids = np.cumsum(np.array([match[2] == '\n' for match in matches], dtype=bool))
+    del matches
+    # 注释、换行与只有字母的地址字不计
+    words = np.flatnonzero(values != '')
+    letters, values, line_ids = letters[words], values[words], line_ids[words]
+
+    # 行号：每行第一个地址字为 N 且数值以数字开头
+    n_str = ["N0"] * num_lines
+    lines, first = np.unique(line_ids, return_index=True)
+    for line, letter, value in zip(lines.tolist(), letters[first].tolist(), values[first].tolist()):
+        if letter == 'N' and value[0].isdigit():
+            n_str[line] = 'N' + value
+    columns['N_str'] = n_str
+
+    for letter in ('XYZSIJR' if arc_words else 'XYZS'):
+        hits = np.flatnonzero(letters == letter)
+        numbers = np.array([_word_value(value) for value in values[hits].tolist()], dtype=np.float64)
+        valid = ~np.isnan(numbers)
+        columns[letter] = _last_per_line(line_ids[hits][valid], numbers[valid], num_lines, np.nan)
+
+    g_hits = np.flatnonzero(letters == 'G')
+    g_words = ['G' + value for value in values[g_hits].tolist()]
+    g_lines = line_ids[g_hits]
+    codes = np.array([MOTION_CODES.get(word, -1) for word in g_words], dtype=np.int64)
+    columns['motion'] = _last_per_line(g_lines[codes >= 0], codes[codes >= 0], num_lines, -1)
+    columns['rapid'] = columns['motion'] == 0
+    columns['cutting'] = columns['motion'] > 0
+    if arc_words:
+        codes = np.array([PLANE_CODES.get(word, 0) for word in g_words], dtype=np.int64)
+        columns['plane'] = _last_per_line(g_lines[codes > 0], codes[codes > 0], num_lines, 0)
+    return columns
+
+
+def tokenize_file(path, encoding=None, arc_words=False):
+    """读入工艺信息文件并分词（参数与返回值同 tokenize_text）"""
+    with open(path, 'r', encoding=encoding) as f:
+        text = f.read()
+    return tokenize_text(text, arc_words)
+
+
+def benchmark(path, repeat=3, encoding=None):
+    """
+    分词微基准
+
+    逐行分词（tokenize_line，细分工具的用法）对全部行计时；文件为工艺信息格式时
+    （至少一行有 7 个字段）同时对整文件分词（tokenize_text，含圆弧字段）计时。
+    每项取 repeat 次中最快的一次。
+
+    返回:
+        dict：lines、line_tokenizer_lines_per_s、bulk_tokenizer_lines_per_s（非工艺信息格式时为 None）
+    """
+    with open(path, 'r', encoding=encoding) as f:
+        text = f.read()
+    lines = text.splitlines()
+
+    def best_of(func):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def run_lines():
+        for line in lines:
+            tokenize_line(line)
+
+    result = {'lines': len(lines)}
+    elapsed = best_of(run_lines)
+    result['line_tokenizer_lines_per_s'] = len(lines) / elapsed if elapsed > 0 else 0.0
+    pit_lines = len(_PIT_LINE_PATTERN.findall(text))
+    result['bulk_tokenizer_lines_per_s'] = None
+    if pit_lines:
+        elapsed = best_of(lambda: tokenize_text(text, arc_words=True))
+        result['bulk_tokenizer_lines_per_s'] = pit_lines / elapsed if elapsed > 0 else 0.0
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="G 代码分词微基准")
+    parser.add_argument("file", help="G 代码或工艺信息文件")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最快一次）")
+    parser.add_argument("--encoding", default=None, help="文件编码")
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.file, args.repeat, args.encoding)
+    print(f"行数: {result['lines']}")
+    print(f"逐行分词:   {result['line_tokenizer_lines_per_s']:12.0f} 行/秒")
+    if result['bulk_tokenizer_lines_per_s'] is not None:
+        print(f"整文件分词: {result['bulk_tokenizer_lines_per_s']:12.0f} 行/秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+稳态区间的高亮色块与边界线（不依赖 tkinter / pyplot）
+
+每个区间一个 axvspan 加两条 axvline 时，几千个区间就是上万个艺术家，绘制、SVG 导出和
+点选都随之变慢。本模块把全部区间的色块画成一个 PolyCollection、全部边界画成一个
+LineCollection（颜色以数组给出），x 为数据坐标、y 为坐标轴坐标（0~1），与 axvspan/axvline 相同：
+
+    interval_x_ranges    - 区间下标 -> 起止 x 坐标（跳过越界区间）
+    span_collection      - 全部区间色块
+    boundary_collection  - 全部竖直边界线
+    interval_at          - 包含某个 x 坐标的区间（点选）
+    IntervalBoundaries   - 可拖动的区间边界：一个 LineCollection 加按 x 排序的边界索引，
+                           点选与拖动通过索引查找，不再遍历艺术家列表
+"""
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+
+
+def interval_x_ranges(intervals, x_positions):
+    """
+    把区间的数据点下标换算为 x 坐标
+
+    参数:
+        intervals: [(起始下标, 结束下标), ...]
+        x_positions: 各数据点的 x 坐标
+
+    返回:
+        (starts, ends, ids)：起止 x 坐标数组与对应的区间序号；下标越界的区间被跳过
+    """
+    count = len(x_positions)
+    if not intervals:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    bounds = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+    ids = np.flatnonzero((bounds[:, 0] >= 0) & (bounds[:, 1] >= 0) &
+                         (bounds[:, 0] < count) & (bounds[:, 1] < count))
+    x = np.asarray(x_positions, dtype=np.float64)
+    return x[bounds[ids, 0]], x[bounds[ids, 1]], ids
+
+
+def cycle_colors(palette, indices):
+    """按序号循环取调色板颜色（序号 i 取 palette[i % len(palette)]），返回 RGBA 数组"""
+    rgba = to_rgba_array(palette)
+    return rgba[np.asarray(indices, dtype=np.int64) % len(rgba)]
+
+
+def _add_vertical(ax, collection, xs):
+    """加入集合，并与 axvspan/axvline 一样把 xs 计入 x 方向的数据范围（y 方向不变）"""
+    ax.add_collection(collection, autolim=False)
+    xs = np.asarray(xs, dtype=np.float64)
+    if len(xs):
+        ax.update_datalim(np.column_stack([xs, np.zeros_like(xs)]), updatey=False)
+        ax.autoscale_view(scaley=False)
+    return collection
+
+
+def span_collection(ax, starts, ends, colors, alpha=None, linewidth=0.0, zorder=1, label=None):
+    """
+    画全部区间色块（等价于逐个 axvspan(start, end, color=颜色)）
+
+    参数:
+        starts, ends: 各区间起止 x 坐标
+        colors: 单个颜色或与区间一一对应的颜色数组；边框与填充同色
+        alpha, linewidth, zorder, label: 同 axvspan（label 在图例中只出现一次）
+
+    返回:
+        PolyCollection
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, :, 1] = (0.0, 1.0, 1.0, 0.0)
+    collection = PolyCollection(verts, facecolors=colors, edgecolors=colors, linewidths=linewidth,
+                                alpha=alpha, zorder=zorder, label=label,
+                                transform=ax.get_xaxis_transform())
+    return _add_vertical(ax, collection, np.concatenate([starts, ends]))
+
+
+def _boundary_segments(xs):
+    xs = np.asarray(xs, dtype=np.float64)
+    segments = np.empty((len(xs), 2, 2))
+    segments[:, :, 0] = xs[:, None]
+    segments[:, :, 1] = (0.0, 1.0)
+    return segments
+
+
+def boundary_collection(ax, xs, colors, linewidth=1.0, alpha=None, linestyle='-', zorder=2, label=None):
+    """
+    画全部竖直边界线（等价于逐条 axvline(x, color=颜色)）
+
+    参数:
+        xs: 各边界线的 x 坐标
+        colors: 单个颜色或与边界线一一对应的颜色数组
+
+    返回:
+        LineCollection
+    """
+    collection = LineCollection(_boundary_segments(xs), colors=colors, linewidths=linewidth, alpha=alpha,
+                                linestyles=linestyle, zorder=zorder, label=label,
+                                transform=ax.get_xaxis_transform())
+    return _add_vertical(ax, collection, xs)
+
+
+class IntervalBoundaries:
+    """可拖动的区间边界线：一个 LineCollection 加按 x 排序的边界索引"""
+
+    def __init__(self, ax, starts, ends, ids, start_color='red', end_color='blue', **line_kw):
+        """
+        ax: 坐标轴
+        starts, ends, ids: interval_x_ranges 的返回值
+        start_color, end_color: 起始 / 结束边界颜色
+        line_kw: 传给 boundary_collection 的其余参数（linewidth、alpha 等）
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        # 第 2k 条为第 k 个区间的起始边界，第 2k+1 条为结束边界
+        self.xs = np.empty(2 * len(self.ids))
+        self.xs[0::2] = starts
+        self.xs[1::2] = ends
+        colors = np.empty((len(self.xs), 4))
+        colors[0::2] = to_rgba_array(start_color)
+        colors[1::2] = to_rgba_array(end_color)
+        self.collection = boundary_collection(ax, self.xs, colors, **line_kw)
+        self._reindex()
+
+    def _reindex(self):
+        self._order = np.argsort(self.xs, kind='stable')
+        self._sorted = self.xs[self._order]
+
+    def hit(self, x, tolerance):
+        """
+        查找距离 x 不超过 tolerance 的最近边界
+
+        返回:
+            (区间序号, 'start' 或 'end')，没有时返回 None
+        """
+        if x is None or len(self._sorted) == 0:
+            return None
+        pos = int(np.searchsorted(self._sorted, x))
+        candidates = [p for p in (pos - 1, pos) if 0 <= p < len(self._sorted)]
+        best = min(candidates, key=lambda p: abs(self._sorted[p] - x))
+        if abs(self._sorted[best] - x) >= tolerance:
+            return None
+        line = int(self._order[best])
+        return int(self.ids[line // 2]), 'start' if line % 2 == 0 else 'end'
+
+    def move(self, interval_id, boundary, x):
+        """把区间 interval_id 的 boundary（'start' / 'end'）边界线移到 x"""
+        rows = np.flatnonzero(self.ids == interval_id)
+        if len(rows) == 0:
+            return
+        line = 2 * int(rows[0]) + (0 if boundary == 'start' else 1)
+        self.xs[line] = x
+        self.collection.set_segments(_boundary_segments(self.xs))
+        self._reindex()
+
+    def remove(self):
+        try:
+            self.collection.remove()
+        except (ValueError, AttributeError, NotImplementedError):
+            pass
+
+
+def interval_at(starts, ends, ids, x):
+    """包含 x 的第一个区间序号（按区间顺序），没有时返回 None"""
+    if x is None:
+        return None
+    hits = np.flatnonzero((np.asarray(starts) <= x) & (x <= np.asarray(ends)))
+    return int(ids[hits[0]]) if len(hits) else None
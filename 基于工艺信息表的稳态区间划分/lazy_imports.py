@@ -0,0 +1,58 @@
+"""
+重量级依赖的延迟导入（不依赖 tkinter / matplotlib）
+
+界面启动时只需要 tkinter 和 NumPy；matplotlib、pandas、scipy 等在车间电脑上各需
+数百毫秒到数秒导入，却往往要到用户打开文件、显示图表或滤波时才会用到。
+
+    pd = lazy_imports.lazy("pandas")
+
+返回模块代理，第一次访问属性（如 pd.read_csv）时才真正导入模块；导入失败时抛出
+原来的 ImportError，调用处已有的 ImportError 回退逻辑照常生效。
+每个模块的首次导入耗时记录在 IMPORT_TIMES 中，供 startup_benchmark.py 报告。
+"""
+import importlib
+import sys
+import time
+
+
+# {模块名: 首次导入耗时（秒）}，只记录由代理触发、导入前尚未加载的模块
+IMPORT_TIMES = {}
+
+
+class LazyModule:
+    """模块代理：首次访问属性时导入模块，可选地在导入后调用 on_import(module) 做一次性配置"""
+
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+
+    @property
+    def loaded(self):
+        """模块是否已导入（由本代理或其他代码导入均算）"""
+        return self._module is not None or self._name in sys.modules
+
+    def load(self):
+        """导入并返回模块"""
+        if self._module is None:
+            already_loaded = self._name in sys.modules
+            start = time.perf_counter()
+            module = importlib.import_module(self._name)
+            if not already_loaded:
+                IMPORT_TIMES[self._name] = time.perf_counter() - start
+            self._module = module
+            if self._on_import is not None:
+                self._on_import(module)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "已导入" if self._module is not None else "未导入"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy(name, on_import=None):
+    """返回模块 name 的延迟导入代理"""
+    return LazyModule(name, on_import)
@@ -0,0 +1,213 @@
+"""
+稳态区间划分参数扫描（不依赖 tkinter / matplotlib）
+
+对同一条曲线批量评估 最小区间长度 × 相对阈值 × 绝对阈值 的参数组合，
+输出每组参数的区间数、覆盖率和区间平均变异系数（CV），用于替代手动反复运行分析。
+
+与 analyze_actual_load_data 的非自适应模式（adaptive=False）结果一致，
+并利用以下事实减少重复计算：
+    - 贪心划分的断点只取决于 (相对阈值, 绝对阈值)，最小区间长度只用于筛选，
+      因此每个阈值对只扫描一次曲线，所有最小区间长度共享同一组候选区间
+    - 区间均值/标准差通过一次构建的 RangeQueryIndex（前缀和）以 O(1) 计算
+    - 不同阈值对分发到进程池并行计算，各工作进程通过共享内存读取曲线，
+      并在进程初始化时构建一次查询索引，之后所有任务复用
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import range_query
+import steady_state_engine
+
+
+SWEEP_COLUMNS = ["min_length", "relative_threshold", "absolute_threshold",
+                 "interval_count", "coverage", "mean_cv"]
+
+# 扫描结果中可用于热力图显示的指标及其中文名称
+SWEEP_METRICS = {
+    "interval_count": "区间数",
+    "coverage": "覆盖率",
+    "mean_cv": "平均变异系数",
+}
+
+# 工作进程内的共享数据（由 _init_worker 设置）
+_worker_state = {}
+
+
+def parse_grid(text, cast=float):
+    """
+    解析参数网格字符串
+
+    支持两种写法，可用逗号混合：
+        "50,100,200"         - 逐个列出
+        "0.05:0.30:0.05"     - 起点:终点:步长（包含终点）
+
+    返回:
+        去重并升序排列的参数值列表
+    """
+    values = []
+    for part in str(text).replace("，", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            start, stop, step = (float(v) for v in part.split(":"))
+            if step <= 0:
+                raise ValueError(f"步长必须大于0: {part}")
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            values.extend(cast(round(start + i * step, 10)) for i in range(max(0, count)))
+        else:
+            values.append(cast(float(part)))
+    if not values:
+        raise ValueError(f"参数网格为空: {text!r}")
+    return sorted(set(values))
+
+
+def scan_runs(data_array, relative_threshold, absolute_threshold):
+    """
+    对整条曲线做一次贪心划分，返回所有候选区间（不按最小长度筛选）
+
+    返回:
+        (starts, ends) 两个 int64 数组，区间为闭区间 [start, end]
+    """
+    n = len(data_array)
+    starts = []
+    ends = []
+    left = 0
+    while left < n:
+        right = steady_state_engine._extend_run_vectorized(
+            data_array, left, relative_threshold, absolute_threshold)
+        starts.append(left)
+        ends.append(right - 1)
+        left = right
+    return np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+
+
+def interval_metrics(index, starts, ends):
+    """
+    计算一组区间的评价指标
+
+    返回:
+        (区间数, 覆盖率, 平均变异系数)，无区间时平均变异系数为 NaN
+    """
+    count = len(starts)
+    if count == 0 or index.n == 0:
+        return 0, 0.0, float("nan")
+    coverage = float((ends - starts + 1).sum()) / index.n
+    means = index.means(starts, ends)
+    stds = index.stds(starts, ends)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cvs = np.where(means != 0, stds / np.abs(means), np.nan)
+    mean_cv = float(np.nanmean(cvs)) if np.isfinite(cvs).any() else float("nan")
+    return count, coverage, mean_cv
+
+
+def evaluate_threshold_pair(index, relative_threshold, absolute_threshold,
+                            min_lengths, reduce_interval=False):
+    """
+    评估一个 (相对阈值, 绝对阈值) 组合下所有最小区间长度的结果
+
+    参数:
+        index: 曲线的 RangeQueryIndex
+        min_lengths: 最小区间长度列表
+        reduce_interval: 是否像分析界面一样将区间两端各缩减一个点
+
+    返回:
+        结果行列表，每行顺序与 SWEEP_COLUMNS 一致
+    """
+    run_starts, run_ends = scan_runs(index.values, relative_threshold, absolute_threshold)
+    run_lengths = run_ends - run_starts + 1
+
+    rows = []
+    for min_length in min_lengths:
+        keep = run_lengths >= min_length
+        starts = run_starts[keep]
+        ends = run_ends[keep]
+        if reduce_interval:
+            shrink = (ends - starts) >= 2
+            starts = starts + shrink
+            ends = ends - shrink
+        count, coverage, mean_cv = interval_metrics(index, starts, ends)
+        rows.append((int(min_length), float(relative_threshold), float(absolute_threshold),
+                     count, coverage, mean_cv))
+    return rows
+
+
+def _init_worker(shm_name, length):
+    """工作进程初始化：挂载共享内存中的曲线并构建一次查询索引"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+    _worker_state["shm"] = shm
+    _worker_state["index"] = range_query.RangeQueryIndex(data)
+
+
+def _evaluate_in_worker(task):
+    """工作进程任务：task 为 (相对阈值, 绝对阈值, 最小区间长度列表, 是否缩减)"""
+    relative_threshold, absolute_threshold, min_lengths, reduce_interval = task
+    return evaluate_threshold_pair(_worker_state["index"], relative_threshold,
+                                   absolute_threshold, min_lengths, reduce_interval)
+
+
+def sweep_parameters(data, min_lengths, relative_thresholds, absolute_thresholds,
+                     reduce_interval=False, max_workers=None):
+    """
+    批量评估稳态区间划分参数组合
+
+    参数:
+        data: 待划分曲线（已按程序行号排序的分析数据）
+        min_lengths: 最小区间长度列表
+        relative_thresholds: 相对波动阈值列表
+        absolute_thresholds: 绝对波动阈值列表
+        reduce_interval: 是否将区间两端各缩减一个点（对应"缩减区间边界"选项）
+        max_workers: 并行进程数，默认 CPU 核数；为 1 时在当前进程内计算
+
+    返回:
+        pandas.DataFrame，列为 SWEEP_COLUMNS，每行对应一组参数
+    """
+    data_array = np.ascontiguousarray(data, dtype=np.float64)
+    min_lengths = sorted(int(v) for v in min_lengths)
+    pairs = list(itertools.product(relative_thresholds, absolute_thresholds))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(pairs)))
+
+    rows = []
+    if max_workers == 1 or len(data_array) == 0:
+        index = range_query.RangeQueryIndex(data_array)
+        for rel, abs_thr in pairs:
+            rows.extend(evaluate_threshold_pair(index, rel, abs_thr, min_lengths, reduce_interval))
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=data_array.nbytes)
+        try:
+            shared = np.ndarray(data_array.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = data_array
+            del shared
+            tasks = [(rel, abs_thr, min_lengths, reduce_interval) for rel, abs_thr in pairs]
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(shm.name, len(data_array))) as executor:
+                for pair_rows in executor.map(_evaluate_in_worker, tasks):
+                    rows.extend(pair_rows)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    import pandas as pd  # 只在汇总结果时导入，避免界面启动时加载 pandas
+
+    result = pd.DataFrame(rows, columns=SWEEP_COLUMNS)
+    return result.sort_values(["min_length", "relative_threshold", "absolute_threshold"],
+                              ignore_index=True)
+
+
+def heatmap_grid(result, metric, min_length):
+    """
+    取出某个最小区间长度下的指标矩阵，用于绘制热力图
+
+    返回:
+        (矩阵, 相对阈值列表, 绝对阈值列表)，矩阵行对应相对阈值，列对应绝对阈值
+    """
+    subset = result[result["min_length"] == min_length]
+    table = subset.pivot(index="relative_threshold", columns="absolute_threshold", values=metric)
+    return table.to_numpy(dtype=float), list(table.index), list(table.columns)
@@ -0,0 +1,286 @@
+"""
+工艺信息表（PIT）批量构建（不依赖 tkinter / matplotlib）
+
+与 MillingAnalysisTool.process_single_file 的逐行实现输出逐字节一致，区别在于：
+    - 整个文件一次性分词（gcode_tokenizer.tokenize_text）：每行的 ap/ae/F/G代码内容由
+      一个多行正则取出，地址字按与逐行分词（tokenize_line）相同的语法扫描全文，
+      再按换行标记映射回行号（注释内的字不计，同一字母取本行最后一个）
+    - 模态值（坐标、转速、进给、移动类型）用 NumPy 前向填充
+    - 行程 s、时间 t、dMRV、MRR、P 用 NumPy 数组运算
+    - 输出表一次性按行格式批量写出
+
+给出 arc_options 时，G2/G3 圆弧（R 或 I/J 格式，XY 平面）直接在此展开：按圆心与圆心角
+解析计算各段终点坐标与弧长，不再需要先用 G 代码细分工具写出中间文件再重新解析。
+展开后的各行通过 N_str（"N行号.序号"，与细分工具的命名一致）和 source_row 列
+关联到原始程序段。
+"""
+import math
+
+import numpy as np
+
+import arc_subdivider
+import gcode_tokenizer
+
+
+PIT_HEADER = ("ap\t\t ae\t\t F\t\t N\t\t X\t\t Y\t\t Z\t\t s(行程)\t\t t(时间)\t\t dMRV\t\t MRR\t\t "
+              "S(转速)\t\t K(扭矩系数)\t\t T(扭矩)\t\t P(功率)")
+
+# 每行输出格式：ap ae F N X Y Z s t dMRV MRR S K T P（K、T 为占位值 0）
+PIT_ROW_FORMAT = "\t\t".join(["%s", "%s", "%.1f", "%s", "%.4f", "%.4f", "%.4f",
+                              "%.6f", "%.6f", "%.6f", "%.6f", "%.1f", "0.000000", "0.000000", "%.6f"]) + "\n"
+
+MOVE_RAPID = 0
+MOVE_CUTTING = 1
+
+
+class PitTable:
+    """工艺信息表：按列存放，len() 为行数，迭代时逐行生成与原实现相同键的字典"""
+
+    RECORD_KEYS = ('s', 't', 'ap', 'ae', 'dMRV', 'MRR', 'S', 'Z', 'P', 'type', 'N_str')
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['s'])
+
+    def column(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        names = ['rapid' if code == MOVE_RAPID else 'cutting' for code in self.columns['move']]
+        values = [self.columns[key] for key in self.RECORD_KEYS if key not in ('type', 'N_str')]
+        for row in zip(*[np.asarray(v).tolist() for v in values], names, self.columns['N_str']):
+            yield dict(zip(self.RECORD_KEYS, row))
+
+
+def _forward_fill(values, present, initial):
+    """按 present 掩码前向填充：没有新值的行沿用上一行，首个值之前使用 initial"""
+    index = np.where(present, np.arange(len(values)), -1)
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+
+def _arc_geometry(tokens, coords, origin, arc_rows, clockwise):
+    """
+    计算圆弧行的圆心、半径、起始角与圆心角（与 ArcSubdivider 的几何约定一致）
+
+    参数:
+        arc_rows: 圆弧行的行号数组
+        clockwise: 与 arc_rows 对应的布尔数组，True 为 G2
+
+    返回:
+        (cx, cy, radius, start_angle, sweep, valid)，sweep 顺时针为负；
+        valid 为 False 的圆弧（R 格式弦长超过直径、起终点重合等）按直线处理
+    """
+    prev = [np.concatenate(([origin[i]], c[:-1]))[arc_rows] for i, c in enumerate(coords[:2])]
+    sx, sy = prev
+    ex, ey = coords[0][arc_rows], coords[1][arc_rows]
+    dx, dy = ex - sx, ey - sy
+    # 与细分工具相同：起终点在 1 微米内视为重合
+    coincident = (np.abs(dx) < 0.001) & (np.abs(dy) < 0.001)
+
+    i_off, j_off, r_word = (tokens[key][arc_rows] for key in 'IJR')
+    ij_form = ~np.isnan(i_off) | ~np.isnan(j_off)
+    i_off, j_off = np.nan_to_num(i_off), np.nan_to_num(j_off)
+
+    # R 格式：圆心在弦的垂直平分线上，G2 在右侧、G3 在左侧，负半径取大圆弧（圆心翻到另一侧）
+    chord = np.hypot(dx, dy)
+    r_abs = np.abs(r_word)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        height = np.sqrt(np.maximum(r_abs ** 2 - (chord / 2) ** 2, 0.0))
+        side = np.where(clockwise, 1.0, -1.0) * np.where(r_word < 0, -1.0, 1.0)
+        rx = (sx + ex) / 2 + height * side * dy / chord
+        ry = (sy + ey) / 2 - height * side * dx / chord
+    r_valid = ~coincident & (chord <= 2 * r_abs + 1e-9)
+
+    cx = np.where(ij_form, sx + i_off, rx)
+    cy = np.where(ij_form, sy + j_off, ry)
+    radius = np.where(ij_form, np.hypot(i_off, j_off), r_abs)
+    # I/J 格式起终点重合为整圆；R 格式无法确定圆心
+    valid = np.where(ij_form, True, r_valid) & (radius > 0) & np.isfinite(cx) & np.isfinite(cy)
+
+    start_angle = np.arctan2(sy - cy, sx - cx)
+    sweep = np.arctan2(ey - cy, ex - cx) - start_angle
+    sweep = np.where(clockwise, np.where(sweep > 0, sweep - 2 * np.pi, sweep),
+                     np.where(sweep < 0, sweep + 2 * np.pi, sweep))
+    sweep = np.where(ij_form & coincident, np.where(clockwise, -2 * np.pi, 2 * np.pi), sweep)
+    return cx, cy, radius, start_angle, sweep, valid
+
+
+def _arc_segment_counts(radius, sweep, arc_options):
+    """每个圆弧的分段数：固定角度模式与 ArcSubdivider 相同，弦高误差模式调用 chord_segment_count"""
+    chord_tolerance = arc_options.get('chord_tolerance')
+    total = np.abs(sweep)
+    if chord_tolerance is not None:
+        min_segment_length = arc_options.get('min_segment_length', 0.0)
+        return np.array([arc_subdivider.chord_segment_count(r, a, chord_tolerance, min_segment_length)
+                         for r, a in zip(radius.tolist(), total.tolist())], dtype=np.int64)
+    resolution = math.radians(arc_options.get('angular_resolution', 1.0))
+    counts = np.floor(total / resolution).astype(np.int64)
+    return np.where(total > resolution + 1e-9, np.maximum(counts, 1), 1)
+
+
+def _expand_arcs(tokens, coords, origin, arc_options):
+    """
+    把圆弧行展开为多段
+
+    返回:
+        (source_row, coords, arc_length, segment_index)：每个输出行对应的原始行号、
+        展开后的 X/Y/Z 坐标、圆弧段的解析弧长（非圆弧行为 NaN）、
+        段序号（从1开始，未展开的行为 0）
+    """
+    n = len(coords[0])
+    motion = _forward_fill(tokens['motion'], tokens['motion'] >= 0, -1)
+    plane = _forward_fill(tokens['plane'], tokens['plane'] > 0, 17)
+    has_words = ~np.isnan(tokens['I']) | ~np.isnan(tokens['J']) | ~np.isnan(tokens['R'])
+    arc_rows = np.flatnonzero(((motion == 2) | (motion == 3)) & (plane == 17) & has_words)
+
+    cx, cy, radius, start_angle, sweep, valid = _arc_geometry(
+        tokens, coords, origin, arc_rows, motion[arc_rows] == 2)
+    arc_rows, cx, cy, radius, start_angle, sweep = (
+        v[valid] for v in (arc_rows, cx, cy, radius, start_angle, sweep))
+    segments = _arc_segment_counts(radius, sweep, arc_options)
+
+    counts = np.ones(n, dtype=np.int64)
+    counts[arc_rows] = segments
+    source_row = np.repeat(np.arange(n), counts)
+    first_out = np.cumsum(counts) - counts
+    segment_index = np.arange(len(source_row)) - first_out[source_row] + 1
+
+    out_coords = [c[source_row] for c in coords]
+    arc_length = np.full(len(source_row), np.nan)
+    segment_index_out = np.zeros(len(source_row), dtype=np.int64)
+    if len(arc_rows):
+        # 圆弧行在输出中的位置，以及所属圆弧的编号
+        arc_of_row = np.full(n, -1)
+        arc_of_row[arc_rows] = np.arange(len(arc_rows))
+        out_arc = arc_of_row[source_row]
+        on_arc = np.flatnonzero(out_arc >= 0)
+        arc_id = out_arc[on_arc]
+        seg = segments[arc_id]
+        fraction = segment_index[on_arc] / seg
+
+        # 螺旋插补：Z 随圆心角线性变化；最后一段的终点即编程终点
+        z_end = coords[2][arc_rows]
+        z_start = np.concatenate(([origin[2]], coords[2][:-1]))[arc_rows]
+        angle = start_angle[arc_id] + sweep[arc_id] * fraction
+        last = fraction == 1
+        out_coords[0][on_arc] = np.where(last, out_coords[0][on_arc], cx[arc_id] + radius[arc_id] * np.cos(angle))
+        out_coords[1][on_arc] = np.where(last, out_coords[1][on_arc], cy[arc_id] + radius[arc_id] * np.sin(angle))
+        out_coords[2][on_arc] = np.where(last, out_coords[2][on_arc],
+                                         z_start[arc_id] + (z_end - z_start)[arc_id] * fraction)
+        # 各段弧长相等：sqrt((r·Δθ)² + Δz²)
+        arc_length[on_arc] = np.hypot(radius[arc_id] * np.abs(sweep[arc_id]), (z_end - z_start)[arc_id]) / seg
+        segment_index_out[on_arc] = np.where(seg > 1, segment_index[on_arc], 0)
+    return source_row, out_coords, arc_length, segment_index_out
+
+
+def build_pit(text, origin, rapid_speed_xy, rapid_speed_z, s_base, p_idle, z_impedance, arc_options=None):
+    """
+    由 G 代码全文构建工艺信息表
+
+    参数:
+        text: G 代码文件全文（每行至少 7 个字段，第 4-6 个字段为 ap/ae/F）
+        origin: 机床原点坐标 (x, y, z)，第一行的行程从原点起算
+        rapid_speed_xy, rapid_speed_z: 快速移动速度（mm/min）
+        s_base: 初始主轴转速
+        p_idle: 空载功率 P_idle
+        z_impedance: 阻抗系数 Z(s)
+        arc_options: 圆弧展开参数 {'angular_resolution', 'chord_tolerance', 'min_segment_length'}
+                     （含义同 ArcSubdivider），None 表示圆弧按起终点直线距离计算（原行为）
+
+    返回:
+        PitTable；source_row 列为每行对应的原始程序行序号
+    """
+    tokens = gcode_tokenizer.tokenize_text(text, arc_words=arc_options is not None)
+    n = len(tokens['ap'])
+
+    # 模态值前向填充
+    coords = [_forward_fill(tokens[axis], ~np.isnan(tokens[axis]), origin[i])
+              for i, axis in enumerate('XYZ')]
+    spindle = _forward_fill(tokens['S'], ~np.isnan(tokens['S']), s_base)
+    feed_values = np.array(tokens['F'], dtype=np.float64) if n else np.zeros(0)
+    feed = _forward_fill(feed_values, feed_values > 0, 0.0)
+    move_code = np.where(tokens['rapid'], MOVE_RAPID, np.where(tokens['cutting'], MOVE_CUTTING, -1))
+    move = _forward_fill(move_code, move_code >= 0, MOVE_RAPID)
+    ap = np.array(tokens['ap'], dtype=np.float64) if n else np.zeros(0)
+    ae = np.array(tokens['ae'], dtype=np.float64) if n else np.zeros(0)
+    n_str = tokens['N_str']
+    ap_str, ae_str = tokens['ap'], tokens['ae']
+
+    arc_length = None
+    source_row = np.arange(n)
+    if arc_options is not None and n:
+        source_row, coords, arc_length, segment_index = _expand_arcs(tokens, coords, origin, arc_options)
+        spindle, feed, move, ap, ae = (v[source_row] for v in (spindle, feed, move, ap, ae))
+        # 圆弧段按进给运动计算（G02/G03 的前导零写法也视为切削）
+        move = np.where(np.isnan(arc_length), move, MOVE_CUTTING)
+        rows = source_row.tolist()
+        ap_str = [ap_str[i] for i in rows]
+        ae_str = [ae_str[i] for i in rows]
+        # 展开的各段沿用细分工具的命名 "N行号.序号"，没有行号的仍为 N0
+        n_str = [n_str[i] if k == 0 or n_str[i] == "N0" else f"{n_str[i]}.{k}"
+                 for i, k in zip(rows, segment_index.tolist())]
+    cutting = move == MOVE_CUTTING
+
+    # 行程：与上一行坐标（第一行为原点）的距离
+    # 平方用 Python 的 ** 计算（libm pow），与逐行实现逐位一致；NumPy 的平方为 x*x，末位可能不同
+    dx, dy, dz = [np.diff(c, prepend=origin[i]) for i, c in enumerate(coords)]
+    dx2, dy2, dz2 = [np.array([v ** 2 for v in d.tolist()], dtype=np.float64) for d in (dx, dy, dz)]
+    s = np.sqrt(dx2 + dy2 + dz2)
+    if arc_length is not None:
+        s = np.where(np.isnan(arc_length), s, arc_length)
+
+    # 快速移动时间：XY 与 Z 分别按各自速度计算，同时移动时取较大者
+    dist_xy = np.sqrt(dx2 + dy2)
+    dist_z = np.abs(dz)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_xy = dist_xy / (rapid_speed_xy / 60.0)
+        t_z = dist_z / (rapid_speed_z / 60.0)
+        t_rapid = np.where(dist_xy > 0, np.where(dist_z > 0, np.maximum(t_xy, t_z), t_xy),
+                           np.where(dist_z > 0, t_z, 0.0))
+        t_cut = np.where(feed > 0, s / (feed / 60.0), 0.0)
+
+    # 切削参数：P_pred = P_idle + Z(s) * MRR，MRR = ap * ae * F/60
+    dmrv = ap * ae
+    mrr = dmrv * (feed / 60.0)
+    z_value = float(z_impedance)
+
+    return PitTable({
+        'ap_str': ap_str,
+        'ae_str': ae_str,
+        'N_str': n_str,
+        'X': coords[0],
+        'Y': coords[1],
+        'Z_coord': coords[2],
+        'F': feed,
+        's': s,
+        't': np.where(cutting, t_cut, t_rapid),
+        'ap': ap,
+        'ae': ae,
+        'dMRV': np.where(cutting, dmrv, 0.0),
+        'MRR': np.where(cutting, mrr, 0.0),
+        'S': spindle,
+        'Z': np.where(cutting, z_value, z_impedance),
+        'P': np.where(cutting, float(p_idle) + z_value * mrr, p_idle),
+        'move': move,
+        'source_row': source_row,
+    })
+
+
+def write_pit(outfile, table, tool_diameter, workpiece_material, blank_material):
+    """按原表头与行格式把工艺信息表写入已打开的文本文件"""
+    outfile.write(f"# 刀具直径(mm): {tool_diameter}\n")
+    outfile.write(f"# 刀具材料: {workpiece_material}\n")
+    outfile.write(f"# 毛坯材料: {blank_material}\n")
+    outfile.write(PIT_HEADER + "\n")
+
+    columns = table.columns
+    numeric = [np.asarray(columns[key]).tolist()
+               for key in ('F', 'X', 'Y', 'Z_coord', 's', 't', 'dMRV', 'MRR', 'S')]
+    feed, x, y, z, s, t, dmrv, mrr, spindle = numeric
+    power = np.asarray(columns['P']).tolist()
+    outfile.writelines(PIT_ROW_FORMAT % row for row in zip(
+        columns['ap_str'], columns['ae_str'], feed, columns['N_str'], x, y, z,
+        s, t, dmrv, mrr, spindle, power))
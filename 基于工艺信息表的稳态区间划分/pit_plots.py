@@ -0,0 +1,315 @@
+"""
+工艺信息表（PIT）图表（不依赖 tkinter / pyplot）
+
+图表直接由 matplotlib.figure.Figure 构建，不经过 pyplot 的全局图形管理器，
+因此既可以交给界面的 FigureCanvasTkAgg 显示，也可以在批量处理的工作进程中
+用 Agg 画布离屏绘制并保存。
+
+界面一次只显示一张图，LazyFigures 在首次查看时才构建图表，并只保留最近查看的几张。
+"""
+from collections import OrderedDict
+from functools import partial
+import os
+
+import matplotlib.font_manager as fm
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+import numpy as np
+
+import interval_artists
+
+
+# (保存文件名, 显示名称)，顺序即图表顺序
+PIT_FIGURES = [
+    ("ap_s", "切深变化 (ap-s)"),
+    ("ae_s", "切宽变化 (ae-s)"),
+    ("MRR_s", "材料去除率 (MRR-s)"),
+    ("P_s", "主轴功率预测 (P-s)"),
+]
+MRR_STEADY_FIGURE = ("MRR_steady_intervals", "MRR稳态区间划分")
+
+# LazyFigures 默认保留的已构建图表数
+DEFAULT_MAX_OPEN = 3
+
+# 各图表的纵轴标签与标题，与 PIT_FIGURES 一一对应
+_STEP_FIGURE_LABELS = [
+    ('ap', '切深 ap (mm)', '切深变化'),
+    ('ae', '切宽 ae (mm)', '切宽变化'),
+    ('MRR', '材料去除率 MRR (mm$^3$/s)', '材料去除率'),
+    ('P', '功率 P (W)', '主轴功率预测'),
+]
+
+
+def configure_fonts(font_path=None):
+    """注册中文字体（如 SimHei.ttf）并设置为默认无衬线字体；工作进程启动时调用"""
+    if font_path and os.path.exists(font_path):
+        fm.fontManager.addfont(font_path)
+        rcParams['font.family'] = 'sans-serif'
+    rcParams['font.sans-serif'] = ['SimHei']
+    rcParams['axes.unicode_minus'] = False
+
+
+def plot_series(table):
+    """
+    取出绘图所需的各列
+
+    返回:
+        dict：s/ap/ae/dMRV/MRR/P/N（列表）及 cumulative_s（累计行程数组）
+    """
+    series = {key: table.column(key).tolist() for key in ('s', 'ap', 'ae', 'dMRV', 'MRR', 'P')}
+    series['N'] = list(table.column('N_str'))
+    series['cumulative_s'] = np.cumsum(series['s'])
+    return series
+
+
+def partition_mrr_steady_intervals(MRR_values, s_values, cumulative_s, n_values, min_length):
+    """
+    划分MRR稳态区间：将MRR完全恒定的连续区域划分为稳态区间
+    :param MRR_values: MRR值列表
+    :param s_values: 各行的行程长度列表
+    :param cumulative_s: 累计行程列表
+    :param n_values: 指令行号列表
+    :param min_length: 最小行程长度 (mm)
+    :return: 稳态区间列表
+    """
+    intervals = []
+
+    if not MRR_values or len(MRR_values) == 0:
+        return intervals
+
+    # 将累计行程转换为列表（如果是numpy数组）
+    if isinstance(cumulative_s, np.ndarray):
+        cumulative_s = cumulative_s.tolist()
+
+    i = 0
+    while i < len(MRR_values):
+        current_mrr = MRR_values[i]
+        start_idx = i
+        start_s = cumulative_s[i] - s_values[i] if i > 0 else 0  # 该行起始位置
+
+        # 查找MRR完全相同的连续区域 - 使用浮点数近似比较，容差为 1e-5
+        j = i + 1
+        while j < len(MRR_values):
+            if abs(MRR_values[j] - current_mrr) < 1e-5:
+                j += 1
+            else:
+                break
+
+        end_idx = j - 1
+        end_s = cumulative_s[end_idx]  # 该区域结束位置
+        interval_length = end_s - start_s
+
+        # 如果区间长度大于等于最小长度，则保存该区间
+        if interval_length >= min_length:
+            intervals.append({
+                'start_idx': start_idx,
+                'end_idx': end_idx,
+                'start_s': start_s,
+                'end_s': end_s,
+                'length': interval_length,
+                'mrr': current_mrr,
+                'start_n': n_values[start_idx],
+                'end_n': n_values[end_idx]
+            })
+
+        i = j
+
+    return intervals
+
+
+def _new_figure():
+    """16:9 白色背景图表"""
+    fig = Figure(figsize=(16, 9), dpi=100)
+    ax = fig.add_subplot(111)
+    fig.patch.set_facecolor('white')
+    ax.set_facecolor('white')
+    return fig, ax
+
+
+def _add_n_axis(ax, x_values, n_values):
+    """在顶部添加N轴，与行程s对应"""
+    twin = ax.twiny()
+    twin.set_xlim(ax.get_xlim())
+    max_ticks = 12
+    step = max(1, len(n_values) // max_ticks)
+    tick_indices = list(range(0, len(n_values), step))
+    tick_positions = [x_values[i] for i in tick_indices]
+    twin.set_xticks(tick_positions)
+    twin.set_xticklabels([n_values[i] for i in tick_indices], rotation=45, ha='left', fontsize=8)
+    twin.set_xlabel('指令行号 N')
+    twin.grid(False)
+    return twin
+
+
+def build_step_figure(series, index):
+    """
+    构建第 index 张行程域阶梯图（ap/ae/MRR/P），每行在其行程区间内保持恒定
+
+    参数:
+        series: plot_series 的返回值
+        index: PIT_FIGURES 中的序号
+    """
+    key, ylabel, title = _STEP_FIGURE_LABELS[index]
+    cumulative_s = series['cumulative_s']
+    fig, ax = _new_figure()
+
+    # 使用step函数，where='post'表示在区间内保持值不变
+    ax.step(cumulative_s, series[key], color='black', linewidth=0.8, where='post', zorder=5)
+    ax.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
+    ax.set_ylabel(ylabel, fontsize=14, fontweight='bold', color='#333333')
+    ax.tick_params(labelsize=13, colors='#333333')
+
+    # 应用样式和调整范围
+    ax.set_title(title, fontsize=18, fontweight='bold', color='#333333', pad=15)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
+    x_min, x_max = ax.get_xlim()
+    y_min, y_max = ax.get_ylim()
+    x_range, y_range = x_max - x_min, y_max - y_min
+    ax.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
+    ax.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
+    _add_n_axis(ax, cumulative_s, series['N'])
+    fig.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
+    return fig
+
+
+def build_mrr_interval_figure(series, intervals):
+    """构建MRR稳态区间划分图：全部区间交替着色，MRR曲线画在区间上方"""
+    cumulative_s = series['cumulative_s']
+    MRR_values = series['MRR']
+    fig, ax = _new_figure()
+
+    # 显示全部区间：相邻区间交替高对比颜色（亮蓝/亮橙）
+    interval_colors = ['#00A3FF', '#FF6A00']
+    if intervals:
+        starts = np.array([interval['start_s'] for interval in intervals], dtype=np.float64)
+        ends = np.array([interval['end_s'] for interval in intervals], dtype=np.float64)
+        # 全部区间画成一个集合；关键：给极窄区间加边框线，避免“看不见”
+        interval_artists.span_collection(ax, starts, ends,
+                                         interval_artists.cycle_colors(interval_colors, np.arange(len(intervals))),
+                                         alpha=0.42, linewidth=0.35, zorder=0)
+
+    # 绘制MRR曲线（在区间上方）- 使用黑色细线，zorder=10 确保在最上层
+    ax.step(cumulative_s, MRR_values, color='black', linewidth=0.8,
+            where='post', label='MRR', zorder=10)
+
+    ax.set_xlabel('行程 s (mm)', fontsize=14, fontweight='bold', color='#333333')
+    ax.set_ylabel('材料去除率 MRR (mm$^3$/s)', fontsize=14, fontweight='bold', color='#333333')
+    ax.tick_params(labelsize=13, colors='#333333')
+
+    # 配置图例
+    legend = ax.legend(loc='upper right', fontsize=13, framealpha=0.9, shadow=True)
+    legend.get_frame().set_facecolor('white')
+    legend.get_frame().set_edgecolor('#333333')
+    legend.get_frame().set_linewidth(1.5)
+    for text in legend.get_texts():
+        text.set_color('#333333')
+
+    ax.set_title(f'MRR稳态区间划分 (共{len(intervals)}个区间)',
+                 fontsize=18, fontweight='bold', color='#333333', pad=15)
+    # 关键：网格设置为zorder=-1，确保在最底层
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.5, zorder=-1)
+
+    # 关键：强制设置Y轴范围，留出上下10%的余量，防止图形顶格
+    if MRR_values:
+        mrr_min = min(MRR_values)
+        mrr_max = max(MRR_values)
+        mrr_range = mrr_max - mrr_min if mrr_max > mrr_min else 1
+        ax.set_ylim(mrr_min - mrr_range * 0.1, mrr_max + mrr_range * 0.1)
+
+    # 调整X轴范围
+    x_min, x_max = ax.get_xlim()
+    x_range = x_max - x_min
+    ax.set_xlim(x_min - x_range * 0.05, x_max + x_range * 0.15)
+
+    _add_n_axis(ax, cumulative_s, series['N'])
+    fig.subplots_adjust(left=0.10, right=0.90, top=0.94, bottom=0.08)
+    return fig
+
+
+def save_figure(fig, save_dir, filename, dpi=600):
+    """同时保存高DPI的PNG（用于预览）和SVG矢量图（可无损缩放）"""
+    fig.savefig(os.path.join(save_dir, f"{filename}.png"), dpi=dpi, bbox_inches='tight', format='png')
+    fig.savefig(os.path.join(save_dir, f"{filename}.svg"), bbox_inches='tight', format='svg')
+
+
+def write_mrr_intervals(path, intervals, min_length):
+    """保存MRR稳态区间数据"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# MRR稳态区间划分结果\n")
+        f.write(f"# 最小行程长度: {min_length} mm\n")
+        f.write(f"# 总区间数: {len(intervals)}\n")
+        f.write("#" + "="*80 + "\n")
+        f.write("# 区间\t起始行号\t结束行号\t起始行程(mm)\t结束行程(mm)\t长度(mm)\tMRR(mm³/s)\n")
+        for i, interval in enumerate(intervals, 1):
+            f.write(f"{i}\t{interval['start_n']}\t{interval['end_n']}\t"
+                    f"{interval['start_s']:.3f}\t{interval['end_s']:.3f}\t"
+                    f"{interval['length']:.3f}\t{interval['mrr']:.6f}\n")
+
+
+class LazyFigures:
+    """按需构建的图表序列：首次访问时构建，按 LRU 保留最多 max_open 张，淘汰的图表随即清空"""
+
+    def __init__(self, builders=(), max_open=DEFAULT_MAX_OPEN):
+        """
+        builders: [(保存文件名, 显示名称, 构建函数), ...]，构建函数无参数、返回 Figure
+        max_open: 保留的已构建图表数（不少于 1）
+        """
+        self._builders = list(builders)
+        self.max_open = max(1, int(max_open))
+        self._open = OrderedDict()  # 序号 -> Figure，最近访问的在末尾
+
+    def __len__(self):
+        return len(self._builders)
+
+    @property
+    def names(self):
+        return [name for _, name, _ in self._builders]
+
+    @property
+    def filenames(self):
+        return [filename for filename, _, _ in self._builders]
+
+    @property
+    def sources(self):
+        """[(保存文件名, 构建函数), ...]：构建函数可 pickle，可交给 figure_export 在工作进程中构建并保存"""
+        return [(filename, build) for filename, _, build in self._builders]
+
+    def figure(self, index):
+        """第 index 张图表（未构建时先构建）"""
+        fig = self._open.get(index)
+        if fig is None:
+            fig = self._builders[index][2]()
+            self._open[index] = fig
+            while len(self._open) > self.max_open:
+                _, evicted = self._open.popitem(last=False)
+                evicted.clear()
+        self._open.move_to_end(index)
+        return fig
+
+    def open_figures(self):
+        """已构建并保留的图表"""
+        return list(self._open.values())
+
+    def close(self):
+        """清空全部已构建的图表"""
+        for fig in self._open.values():
+            fig.clear()
+        self._open.clear()
+
+
+def pit_figures(series, mrr_intervals=None, max_open=DEFAULT_MAX_OPEN):
+    """
+    工艺信息表的全部图表（按需构建）
+
+    参数:
+        series: plot_series 的返回值
+        mrr_intervals: MRR 稳态区间，None 表示不绘制 MRR 稳态区间划分图
+
+    返回:
+        LazyFigures
+    """
+    builders = [(filename, name, partial(build_step_figure, series, i))
+                for i, (filename, name) in enumerate(PIT_FIGURES)]
+    if mrr_intervals is not None:
+        builders.append((*MRR_STEADY_FIGURE, partial(build_mrr_interval_figure, series, mrr_intervals)))
+    return LazyFigures(builders, max_open)
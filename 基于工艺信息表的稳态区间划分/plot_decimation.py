@@ -0,0 +1,179 @@
+"""
+曲线绘制降采样（不依赖 tkinter / pyplot）
+
+屏幕上的一条折线每个像素列只需要少量点：把样本按 x 均分为若干列，每列保留首点、末点、
+最小值点与最大值点（M4 降采样），峰谷和逐点绘制完全一致，点数却只与画布宽度有关，
+几百万点的曲线重绘也只需绘制几千个点。
+
+    decimate     - 对 (x, y) 降采样，返回保留的样本下标
+    plot         - 代替 ax.plot：只绘制降采样后的点，坐标轴 x 范围变化（缩放、平移）时
+                   对可见部分重新降采样，放大后仍能看到全部细节
+    export_view  - 上下文管理器：保存图片期间按导出分辨率重新降采样，或换回全部原始样本
+
+原始样本由降采样曲线自己保存（line.decimation.x / .y），导出完整分辨率时不需要重新绘图。
+"""
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# 像素列数下限：图形尚未显示（画布宽度未知）时按此列数降采样
+DEFAULT_COLUMNS = 1000
+# 每列保留的点数（首点、末点、最小值、最大值）
+POINTS_PER_COLUMN = 4
+
+
+def _is_monotonic(x):
+    return len(x) < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+
+def _axes_columns(ax):
+    """坐标轴在屏幕上的像素列数（不少于 DEFAULT_COLUMNS）"""
+    return max(DEFAULT_COLUMNS, int(ax.bbox.width))
+
+
+def decimate(x, y, columns, monotonic=None):
+    """
+    按像素列做最小/最大值降采样
+
+    参数:
+        x, y: 一维数组（长度相同）
+        columns: 像素列数
+        monotonic: x 是否单调不减，None 表示自动判断；非单调时按样本下标均分各列
+
+    返回:
+        保留的样本下标（升序）；样本数不超过 columns * POINTS_PER_COLUMN 时返回全部下标
+    """
+    n = len(y)
+    columns = max(1, int(columns))
+    if n <= columns * POINTS_PER_COLUMN:
+        return np.arange(n)
+
+    if monotonic is None:
+        monotonic = _is_monotonic(x)
+    span = float(x[-1] - x[0]) if monotonic else 0.0
+    if monotonic and np.isfinite(span) and span > 0:
+        # 各列左边界处的首个样本；没有样本的列被 unique 合并
+        edges = x[0] + span * np.arange(columns) / columns
+        starts = np.unique(np.searchsorted(x, edges, 'left'))
+    else:
+        starts = np.unique(np.arange(columns, dtype=np.int64) * n // columns)
+    lengths = np.diff(np.append(starts, n))
+    ends = starts + lengths - 1
+
+    # 每列第一个等于列最小值（最大值）的样本；fmin/fmax 忽略 NaN，整列均为 NaN 时取首点
+    picks = [starts, ends]
+    for reduce in (np.fmin, np.fmax):
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, starts), lengths))
+        if len(hits) == 0:
+            continue
+        first = hits[np.minimum(np.searchsorted(hits, starts), len(hits) - 1)]
+        picks.append(np.where(first <= ends, first, starts))
+    return np.unique(np.concatenate(picks))
+
+
+class DecimatedLine:
+    """保存原始样本的降采样曲线，随坐标轴 x 范围变化重新降采样"""
+
+    def __init__(self, line, x, y, columns=None, monotonic=None):
+        """
+        line: ax.plot 返回的 Line2D
+        x, y: 原始样本（数组）
+        columns: 像素列数，None 表示按坐标轴当前宽度（不少于 DEFAULT_COLUMNS）
+        monotonic: x 是否单调不减，None 表示自动判断
+        """
+        self.line = line
+        self.x = x
+        self.y = y
+        self.columns = columns
+        self.monotonic = _is_monotonic(x) if monotonic is None else monotonic
+
+    def screen_columns(self):
+        """屏幕显示使用的像素列数"""
+        if self.columns is not None:
+            return self.columns
+        return _axes_columns(self.line.axes)
+
+    def update(self, xlim=None, columns=None):
+        """
+        按 x 范围 xlim 内（两侧各多取一个点，使折线延伸到边界外）的样本重新降采样
+
+        参数:
+            xlim: (xmin, xmax)，None 表示全部样本
+            columns: 像素列数，None 表示 screen_columns()
+        """
+        columns = columns or self.screen_columns()
+        lo, hi = 0, len(self.y)
+        if xlim is not None and self.monotonic:
+            xmin, xmax = sorted(xlim)
+            lo = max(0, int(np.searchsorted(self.x, xmin, 'left')) - 1)
+            hi = min(len(self.y), int(np.searchsorted(self.x, xmax, 'right')) + 1)
+        x = self.x[lo:hi]
+        y = self.y[lo:hi]
+        keep = decimate(x, y, columns, self.monotonic)
+        self.line.set_data(x[keep], y[keep])
+
+    def show_full(self):
+        """换回全部原始样本"""
+        self.line.set_data(self.x, self.y)
+
+    def _on_xlim_changed(self, ax):
+        self.update(ax.get_xlim())
+
+
+def plot(ax, x, y, *args, columns=None, **kwargs):
+    """
+    代替 ax.plot(x, y, ...) 绘制一条曲线（其余参数原样传给 ax.plot）
+
+    样本数不超过像素列数的 POINTS_PER_COLUMN 倍时与 ax.plot 完全相同；否则只绘制降采样后的点，
+    并在坐标轴 x 范围变化时对可见部分重新降采样。ax.clear() 后回调随坐标轴一起清除。
+
+    参数:
+        columns: 像素列数，None 表示按坐标轴宽度
+
+    返回:
+        Line2D（降采样时 line.decimation 为对应的 DecimatedLine）
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= (columns or _axes_columns(ax)) * POINTS_PER_COLUMN:
+        return ax.plot(x, y, *args, **kwargs)[0]
+
+    # 最小/最大值点与首末点都保留，自动缩放得到的坐标范围与原始样本一致
+    monotonic = _is_monotonic(x)
+    keep = decimate(x, y, columns or _axes_columns(ax), monotonic)
+    line, = ax.plot(x[keep], y[keep], *args, **kwargs)
+    line.decimation = DecimatedLine(line, x, y, columns, monotonic)
+    ax.callbacks.connect('xlim_changed', line.decimation._on_xlim_changed)
+    return line
+
+
+def decimated_lines(fig):
+    """图形中所有降采样曲线的 DecimatedLine"""
+    return [line.decimation for ax in fig.axes for line in ax.lines if hasattr(line, 'decimation')]
+
+
+@contextmanager
+def export_view(fig, dpi, full_resolution=False):
+    """
+    保存图片期间使用导出分辨率的曲线
+
+    参数:
+        fig: Figure
+        dpi: 导出分辨率；像素列数按坐标轴宽度（英寸）乘以 dpi 计算
+        full_resolution: 为 True 时换回全部原始样本
+
+    退出时按屏幕宽度与当前 x 范围恢复降采样。
+    """
+    lines = decimated_lines(fig)
+    for decimated in lines:
+        if full_resolution:
+            decimated.show_full()
+        else:
+            axes = decimated.line.axes
+            decimated.update(axes.get_xlim(), int(axes.bbox.width / fig.dpi * dpi))
+    try:
+        yield
+    finally:
+        for decimated in lines:
+            decimated.update(decimated.line.axes.get_xlim())
@@ -0,0 +1,148 @@
+"""
+按文件分发到进程池的批量任务运行器（不依赖 tkinter，也不导入 matplotlib 等重量级依赖）
+
+FilePoolRunner 把文件列表逐个提交给 ProcessPoolExecutor，每个文件一个任务；结果通过
+队列逐个返回，界面用 root.after 轮询队列更新进度。出错的文件追加到输出目录的
+batch_errors.log，不影响其他文件。
+
+取消时尚未开始的文件不再处理；正在处理的任务可在工作进程中调用 cancel_requested()
+检查取消标志，并抛出 TaskCancelled 提前结束（清理半成品由任务自己负责）。
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+ERROR_LOG_NAME = "batch_errors.log"
+
+# 工作进程中的取消标志（由 _init_worker 设置）
+_cancel_event = None
+
+
+class TaskCancelled(Exception):
+    """任务在工作进程中检测到取消请求后提前结束"""
+
+
+def cancel_requested():
+    """在工作进程中调用：批量处理是否已被取消"""
+    return _cancel_event is not None and _cancel_event.is_set()
+
+
+def _init_worker(cancel_event, initializer, initargs):
+    """工作进程初始化：保存取消标志，再调用使用者提供的初始化函数"""
+    global _cancel_event
+    _cancel_event = cancel_event
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class FilePoolRunner:
+    """在进程池中并行处理多个文件
+
+    每完成一个文件就向 results 队列放入一条消息：
+        ('done', 文件路径, task 的返回值)
+        ('error', 文件路径, 错误信息)     —— 同时追加到 error_log_dir 下的 batch_errors.log
+        ('cancelled', 文件路径)            —— 任务在处理中途因取消而结束
+        ('finished', 是否已取消)          —— 所有任务结束后的最后一条消息
+    """
+
+    def __init__(self, files, task, task_args=(), max_workers=None, initializer=None, initargs=(),
+                 error_log_dir=None):
+        """
+        files: 文件路径列表
+        task: 工作进程中执行的模块级函数 task(文件路径, *task_args)
+        task_args: 传给 task 的其余参数（需可 pickle）
+        max_workers: 工作进程数，None 表示使用 CPU 核数
+        initializer, initargs: 工作进程初始化函数及其参数
+        error_log_dir: batch_errors.log 所在目录，None 表示不写错误日志
+        """
+        self.files = list(files)
+        self.task = task
+        self.task_args = tuple(task_args)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self.error_log_dir = error_log_dir
+        self.results = queue.Queue()
+        self.cancelled = False
+        self._cancel_event = multiprocessing.Event()
+        self._executor = None
+        self._futures = []
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def error_log_path(self):
+        if self.error_log_dir is None:
+            return None
+        return os.path.join(self.error_log_dir, ERROR_LOG_NAME)
+
+    @property
+    def worker_count(self):
+        """实际使用的工作进程数"""
+        return max(1, min(self.max_workers, len(self.files)))
+
+    def task_args_for(self, input_file):
+        """传给 task 的其余参数；子类可按文件给出不同参数（如各自的输出目录）"""
+        return self.task_args
+
+    def error_message(self, input_file, error):
+        """出错文件的提示信息；子类可按任务对象改写（如任务不是文件路径时）"""
+        return f"文件 {os.path.basename(input_file)} 处理失败: {str(error)}"
+
+    def start(self):
+        """提交全部文件（立即返回）"""
+        if not self.files:
+            self._finish()
+            return
+
+        if self.error_log_dir is not None:
+            os.makedirs(self.error_log_dir, exist_ok=True)
+        self._pending = len(self.files)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.worker_count,
+            initializer=_init_worker,
+            initargs=(self._cancel_event, self.initializer, self.initargs)
+        )
+        for input_file in self.files:
+            future = self._executor.submit(self.task, input_file, *self.task_args_for(input_file))
+            future.input_file = input_file
+            self._futures.append(future)
+            future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        if not future.cancelled():
+            try:
+                self.results.put(('done', future.input_file, future.result()))
+            except TaskCancelled:
+                self.results.put(('cancelled', future.input_file))
+            except Exception as e:
+                error_msg = self.error_message(future.input_file, e)
+                if self.error_log_path is not None:
+                    with self._lock:
+                        with open(self.error_log_path, "a") as log:
+                            log.write(f"{datetime.now()}: {error_msg}\n")
+                self.results.put(('error', future.input_file, error_msg))
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.results.put(('finished', self.cancelled))
+
+    def cancel(self):
+        """取消尚未开始的文件，并通知正在处理的任务尽快结束，随后发出 finished 消息"""
+        self.cancelled = True
+        self._cancel_event.set()
+        for future in self._futures:
+            future.cancel()
@@ -0,0 +1,142 @@
+"""
+负载曲线区间查询索引（不依赖 tkinter / matplotlib）
+
+对一条采样曲线做一次 O(n) 预处理后，可在常数时间内回答任意闭区间
+[start, end] 的最小值、最大值、均值、方差查询，供区间显示、区间合并、
+理想值计算、边界缩减/扩展等频繁查询区间统计量的场景使用。
+
+实现方式：
+    最小/最大值 - 按固定块长分块，对块极值建立稀疏表（Sparse Table），
+                  区间两端不足整块的部分直接归约（最多 2 个块长的点）
+    均值/方差   - 前缀和与平方前缀和（先减去全局均值以减小相消误差）
+"""
+import copy
+
+import numpy as np
+
+
+class RangeQueryIndex:
+    """单条曲线的区间最小值/最大值/均值/方差查询索引，区间均为闭区间 [start, end]"""
+
+    def __init__(self, data, block_size=16):
+        values = np.asarray(data, dtype=np.float64)
+        self.source = data  # 构建索引所用的原始数据对象，用于判断索引是否过期
+        self.values = values
+        self.n = len(values)
+        self.block_size = block_size
+
+        # 前缀和 / 平方前缀和（以全局均值为偏移）
+        self.offset = float(values.mean()) if self.n else 0.0
+        shifted = values - self.offset
+        self.prefix = np.concatenate(([0.0], np.cumsum(shifted)))
+        self.prefix_sq = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+
+        # 块极值稀疏表
+        num_blocks = -(-self.n // block_size)
+        padded_len = num_blocks * block_size
+        if padded_len > self.n:
+            pad = padded_len - self.n
+            padded_min = np.concatenate((values, np.full(pad, np.inf)))
+            padded_max = np.concatenate((values, np.full(pad, -np.inf)))
+        else:
+            padded_min = padded_max = values
+        self.min_table = [padded_min.reshape(num_blocks, block_size).min(axis=1)]
+        self.max_table = [padded_max.reshape(num_blocks, block_size).max(axis=1)]
+        span = 1
+        while 2 * span <= num_blocks:
+            prev_min = self.min_table[-1]
+            prev_max = self.max_table[-1]
+            self.min_table.append(np.minimum(prev_min[:-span], prev_min[span:]))
+            self.max_table.append(np.maximum(prev_max[:-span], prev_max[span:]))
+            span *= 2
+
+    def __len__(self):
+        return self.n
+
+    def bound_to(self, data):
+        """返回与 data 绑定的同一索引（data 须与构建索引的数据内容相同，如其列表副本）"""
+        index = copy.copy(self)
+        index.source = data
+        return index
+
+    def _check(self, start, end):
+        if start < 0 or end >= self.n or start > end:
+            raise IndexError(f"区间 [{start}, {end}] 超出数据范围 [0, {self.n - 1}]")
+
+    def _block_query(self, table, reduce, first_block, last_block):
+        """在块稀疏表上查询 [first_block, last_block] 的极值"""
+        level = (last_block - first_block + 1).bit_length() - 1
+        row = table[level]
+        return reduce(row[first_block], row[last_block - (1 << level) + 1])
+
+    def _extreme(self, start, end, table, reduce, reduce_slice):
+        self._check(start, end)
+        first_block = start // self.block_size
+        last_block = end // self.block_size
+        if last_block - first_block <= 1:
+            return float(reduce_slice(self.values[start:end + 1]))
+        head = reduce_slice(self.values[start:(first_block + 1) * self.block_size])
+        tail = reduce_slice(self.values[last_block * self.block_size:end + 1])
+        inner = self._block_query(table, reduce, first_block + 1, last_block - 1)
+        return float(reduce(reduce(head, tail), inner))
+
+    def min(self, start, end):
+        """区间最小值"""
+        return self._extreme(start, end, self.min_table, min, np.min)
+
+    def max(self, start, end):
+        """区间最大值"""
+        return self._extreme(start, end, self.max_table, max, np.max)
+
+    def range(self, start, end):
+        """区间极差（最大值 - 最小值）"""
+        return self.max(start, end) - self.min(start, end)
+
+    def sum(self, start, end):
+        """区间和"""
+        self._check(start, end)
+        length = end - start + 1
+        return float(self.prefix[end + 1] - self.prefix[start]) + self.offset * length
+
+    def mean(self, start, end):
+        """区间均值"""
+        self._check(start, end)
+        length = end - start + 1
+        return float(self.prefix[end + 1] - self.prefix[start]) / length + self.offset
+
+    def var(self, start, end):
+        """区间总体方差（ddof=0，与 np.var 一致）"""
+        self._check(start, end)
+        length = end - start + 1
+        s = self.prefix[end + 1] - self.prefix[start]
+        sq = self.prefix_sq[end + 1] - self.prefix_sq[start]
+        return max(0.0, float(sq / length - (s / length) ** 2))
+
+    def std(self, start, end):
+        """区间总体标准差"""
+        return self.var(start, end) ** 0.5
+
+    def means(self, starts, ends):
+        """批量计算多个区间的均值，starts/ends 为等长的闭区间端点序列"""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        lengths = ends - starts + 1
+        return (self.prefix[ends + 1] - self.prefix[starts]) / lengths + self.offset
+
+    def stds(self, starts, ends):
+        """批量计算多个区间的总体标准差"""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        lengths = ends - starts + 1
+        s = self.prefix[ends + 1] - self.prefix[starts]
+        sq = self.prefix_sq[ends + 1] - self.prefix_sq[starts]
+        return np.sqrt(np.maximum(0.0, sq / lengths - (s / lengths) ** 2))
+
+
+def index_for(data, cached=None):
+    """返回 data 对应的查询索引：cached 仍对应同一数据对象时直接复用，否则重新构建"""
+    if data is None:
+        return None
+    if cached is not None and cached.source is data:
+        return cached
+    return RangeQueryIndex(data)
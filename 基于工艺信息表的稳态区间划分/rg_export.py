@@ -0,0 +1,288 @@
+"""
+实际负载稳态区间结果（SampleData.rg）的读入与导出（不依赖 tkinter / matplotlib）
+
+    parse_program_mapping  - 解析程序映射 TXT（程序名:程序号:刀具号:起始行-终止行;）
+    load_tool_data         - 读取 5 列采集 CSV，按程序号和刀具行号范围切分为各刀具数组
+    tool_rg_intervals      - 把一个刀具的区间（数据索引）转换为 .rg 区间条目与理想值
+    ordered_rg_results     - 按映射文件中的程序/刀具顺序整理结果，同一理想值的区间合为一行
+    write_rg               - 写出 SampleData.rg
+
+实际负载分析界面与命令行入口共用这些函数，保证两者导出的文件格式一致。
+"""
+import numpy as np
+
+
+RG_FILENAME = "SampleData.rg"
+
+# .rg 文件首行的数据源标识
+DATA_SOURCE_IDS = {'电流': 0, 'vgpro功率': 1, '边缘模块功率': 2}
+# 数据源对应的刀具数据数组
+DATA_SOURCE_KEYS = {'电流': 'current_data', 'vgpro功率': 'vgpro_power_data', '边缘模块功率': 'edge_power_data'}
+
+
+def parse_program_mapping(txt_file, program_mapping=None):
+    """解析TXT文件获取程序映射关系（支持刀具信息）
+    新格式每行一个刀具: 程序名:程序号:刀具号:起始行-终止行;
+    例如: O999:384000036:T3:18-64;
+    注意: tools_list 保持txt文件顺序,允许重复的刀具号
+
+    返回:
+        {程序号: {'name': 程序名, 'tools_list': [{'tool_id', 'start', 'end'}, ...]}}
+    """
+    if program_mapping is None:
+        program_mapping = {}
+    with open(txt_file, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    for line in lines:
+        line = line.strip()
+        # 移除末尾的分号
+        if line.endswith(';'):
+            line = line[:-1]
+
+        if not line or ':' not in line:
+            continue
+
+        # 分割行获取信息: 程序名:程序号:刀具号:行号范围
+        parts = line.split(':')
+        if len(parts) < 4:
+            continue
+
+        program_name = parts[0].strip()
+        program_id = parts[1].strip()
+        tool_id = parts[2].strip()
+        range_str = parts[3].strip()
+
+        # 解析行号范围
+        if '-' not in range_str:
+            continue
+
+        range_parts = range_str.split('-')
+        try:
+            start_line = int(range_parts[0].strip())
+            end_line = int(range_parts[1].strip())
+        except ValueError:
+            continue
+
+        # 添加到映射中
+        if program_id not in program_mapping:
+            program_mapping[program_id] = {
+                'name': program_name,
+                'tools_list': []  # 使用列表保持顺序,允许重复
+            }
+
+        # 添加刀具信息到列表(按txt顺序,允许重复)
+        program_mapping[program_id]['tools_list'].append({
+            'tool_id': tool_id,
+            'start': start_line,
+            'end': end_line
+        })
+    return program_mapping
+
+
+def load_tool_data(csv_file, program_mapping):
+    """解析CSV文件并按程序号和刀具分组数据
+    CSV格式：第1列=电流，第2列=vgpro功率，第3列=边缘模块功率，第4列=行号，第5列=程序号
+
+    返回:
+        {程序号: {刀具键: 刀具数据字典}}，刀具键为 "刀具号_序号"（序号为该刀具在
+        tools_list 中的位置）；刀具数据字典含三种数据源数组、行号、行内点索引与横轴位置
+    """
+    import pandas as pd  # 只在读取 CSV 时导入，避免界面启动时加载 pandas
+
+    # 读取CSV文件（5列数据）
+    df = pd.read_csv(csv_file, header=None,
+                     dtype={0: 'float32', 1: 'float32', 2: 'float32', 3: 'int32', 4: str},
+                     engine='c')
+
+    # 取绝对值（电流、两种功率）
+    df[0] = np.abs(df[0].values)
+    df[1] = np.abs(df[1].values)
+    df[2] = np.abs(df[2].values)
+
+    # 按程序号分组
+    grouped = df.groupby(4, sort=False)
+
+    programs_data = {}
+    for program_id, program_info in program_mapping.items():
+        if program_id not in grouped.groups:
+            continue
+
+        program_data = grouped.get_group(program_id)
+        program_name = program_info['name']
+        tools = programs_data.setdefault(program_id, {})
+
+        # 遍历tools_list,使用索引区分相同刀具的不同出现
+        for idx, tool_info in enumerate(program_info.get('tools_list', [])):
+            tool_id = tool_info['tool_id']
+            start_line = tool_info['start']
+            end_line = tool_info['end']
+
+            # 生成唯一的工具键: tool_id + 索引
+            tool_key = f"{tool_id}_{idx}"
+
+            # 筛选该刀具的行号范围
+            mask = (program_data[3] >= start_line) & (program_data[3] <= end_line)
+            tool_data = program_data[mask]
+
+            if len(tool_data) == 0:
+                continue
+
+            line_numbers_array = tool_data[3].values.astype('float32')
+
+            # 计算点索引
+            point_indices = tool_data.groupby(3, sort=False).cumcount().values
+
+            unique_line_numbers, counts = np.unique(line_numbers_array, return_counts=True)
+
+            # 计算X轴位置
+            if len(unique_line_numbers) == 1:
+                n = float(unique_line_numbers[0])
+                total_points = len(line_numbers_array)
+                x_positions = n + np.arange(total_points, dtype='float32') / total_points
+            else:
+                line_point_counts_dict = dict(zip(unique_line_numbers, counts))
+                point_counts_array = np.array([line_point_counts_dict[ln] for ln in line_numbers_array], dtype='float32')
+                x_positions = line_numbers_array + point_indices / point_counts_array
+
+            tools[tool_key] = {
+                'name': program_name,
+                'tool_id': tool_id,
+                'tool_key': tool_key,
+                'start_line': start_line,
+                'end_line': end_line,
+                'current_data': tool_data[0].values.astype('float64'),
+                'vgpro_power_data': tool_data[1].values.astype('float64'),
+                'edge_power_data': tool_data[2].values.astype('float64'),
+                'line_numbers': line_numbers_array,
+                'point_indices': point_indices,
+                'x_positions': x_positions,
+                'unique_line_numbers': np.sort(unique_line_numbers),
+            }
+    return programs_data
+
+
+def merge_adjacent_intervals(intervals):
+    """按起点排序后合并相邻且连续的区间（允许1个点的间隙）"""
+    if not intervals:
+        return []
+    intervals = sorted(intervals, key=lambda x: x[0])
+    merged = []
+    current_start, current_end = intervals[0]
+    for next_start, next_end in intervals[1:]:
+        if next_start <= current_end + 1:
+            current_end = max(current_end, next_end)
+        else:
+            merged.append((current_start, current_end))
+            current_start, current_end = next_start, next_end
+    merged.append((current_start, current_end))
+    return merged
+
+
+def tool_rg_intervals(data, intervals, x_positions, point_indices, ratio, fallback_average=0):
+    """
+    把一个刀具的稳态区间转换为 .rg 区间条目
+
+    参数:
+        data: 分析所用的数据数组（可为滤波后数据），为 None 时区间均值记为 0
+        intervals: 区间列表 [(start_index, end_index), ...]，会先合并相邻区间
+        x_positions, point_indices: 每个数据点的横轴位置与行内点索引
+        ratio: 调整倍率，理想值 = 全部区间内数据点的均值 × ratio
+        fallback_average: 没有区间数据点时用于计算理想值的整体均值
+
+    返回:
+        [(起始 "行号.点索引", 结束 "行号.点索引", 理想值, 区间均值), ...]
+    """
+    merged_intervals = merge_adjacent_intervals(intervals)
+
+    # 计算区间平均值和动态理想值（与界面显示的 calculate_interval_average 一致）
+    interval_averages = []
+    all_interval_data_points = []
+    if data is not None:
+        for start_idx, end_idx in merged_intervals:
+            if start_idx < len(data) and end_idx < len(data):
+                # 切片包含end_idx
+                slice_data = data[start_idx:end_idx + 1]
+                if len(slice_data) > 0:
+                    interval_averages.append(np.mean(slice_data))
+                    all_interval_data_points.extend(slice_data)
+                else:
+                    interval_averages.append(0)
+            else:
+                interval_averages.append(0)
+
+    if all_interval_data_points:
+        ideal_value = np.mean(all_interval_data_points) * ratio
+    else:
+        # 回退到整体平均值
+        ideal_value = fallback_average * ratio
+
+    # 转换为行号.点索引格式（行号取横轴位置的整数部分）
+    intervals_list = []
+    for i, (start_idx, end_idx) in enumerate(merged_intervals):
+        if start_idx < len(x_positions) and end_idx < len(x_positions):
+            this_interval_avg = interval_averages[i] if i < len(interval_averages) else 0
+            intervals_list.append((f"{int(x_positions[start_idx])}.{point_indices[start_idx]}",
+                                   f"{int(x_positions[end_idx])}.{point_indices[end_idx]}",
+                                   ideal_value,
+                                   this_interval_avg))
+    return intervals_list
+
+
+def ordered_rg_results(program_mapping, analyzed_results):
+    """
+    按照txt文件中的程序/刀具顺序整理结果
+
+    参数:
+        analyzed_results: {(程序号, 刀具键): {'program_name', 'intervals'}}，
+                          intervals 为 tool_rg_intervals 的返回值
+
+    返回:
+        [{'program_name', 'tool_id', 'ideal_value'（保留3位小数的字符串）, 'intervals'}, ...]，
+        同一刀具中理想值相同的区间合为一项，区间格式为 "起始-终止:区间均值"
+    """
+    ordered_results = []
+    for program_id, program_info in program_mapping.items():
+        # 遍历每个刀具(按txt顺序,包括重复的刀具)
+        for tool_index, tool_info in enumerate(program_info.get('tools_list', [])):
+            tool_id = tool_info['tool_id']
+            result_data = analyzed_results.get((program_id, f"{tool_id}_{tool_index}"))
+            if result_data is None:
+                continue
+
+            # 按理想值分组该刀具的区间
+            ideal_groups = {}
+            for start_str, end_str, ideal_value, interval_avg in result_data['intervals']:
+                ideal_groups.setdefault(f"{ideal_value:.3f}", []).append(
+                    f"{start_str}-{end_str}:{interval_avg:.3f}")
+
+            for ideal_key, intervals in ideal_groups.items():
+                ordered_results.append({
+                    'program_name': result_data['program_name'],
+                    'tool_id': tool_id,
+                    'ideal_value': ideal_key,
+                    'intervals': intervals
+                })
+    return ordered_results
+
+
+def _interval_start_position(interval_str):
+    """解析 "起始行号.点索引-结束行号.点索引:均值" 的起始位置，用于排序"""
+    parts = interval_str.split('-')[0].split('.')
+    line_num = float(parts[0])
+    point_idx = float(parts[1]) if len(parts) > 1 else 0
+    return line_num + point_idx / 10000.0  # 使用足够小的权重
+
+
+def write_rg(path, data_source_id, ordered_results):
+    """
+    写入 SampleData.rg
+
+    第一行为数据源标识，之后每项一行：程序名;理想值;区间1,区间2,...;
+    （每行内的区间按起始行号排序）
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"{data_source_id}\n")
+        for result in ordered_results:
+            intervals_str = ','.join(sorted(result['intervals'], key=_interval_start_position))
+            f.write(f"{result['program_name']};{result['ideal_value']};{intervals_str};\n")
@@ -0,0 +1,324 @@
+"""
+无界面命令行入口：在没有显示器的计算节点或调度脚本中调用与界面相同的计算模块
+
+子命令：
+    pit        G 代码 → 工艺信息表（pit_builder），可选 --plots 输出行程域图表
+    steady     采集文件 → 稳态区间（channel_cache + steady_state_engine），输出 TSV
+    rg         程序映射 TXT + 采集 CSV → 自动划分（auto_partition）→ SampleData.rg（rg_export）
+    subdivide  G 代码圆弧细分（arc_subdivider）
+
+参数名与默认值与界面输入框一致；每个子命令把结果文件写入磁盘，并在标准输出打印
+一行 JSON 摘要，便于调度脚本解析。
+
+各子命令只在运行时导入所需模块；不导入 tkinter，只有 pit --plots 才导入 matplotlib，
+因此启动开销主要是 NumPy 的导入。
+
+用法示例：
+    python smif_cli.py pit part.nc -o out --z-impedance 120
+    python smif_cli.py steady capture.txt --data-source current --min-length 100
+    python smif_cli.py rg --mapping programs.txt --csv data.csv -o out
+    python smif_cli.py subdivide part.nc --resolution 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+if getattr(sys, 'frozen', False):
+    base_dir = getattr(sys, '_MEIPASS', os.path.abspath(os.path.dirname(__file__)))
+else:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _print_summary(summary):
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+def run_pit(args):
+    """G 代码 → 工艺信息表（与界面单文件处理的输出目录与文件名一致）"""
+    import numpy as np
+    import pit_builder
+
+    input_file = args.input
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    save_dir = os.path.join(args.output_dir or os.path.dirname(os.path.abspath(input_file)), "processed_" + stem)
+    os.makedirs(save_dir, exist_ok=True)
+    output_file = os.path.join(save_dir, f"processed_{os.path.basename(input_file)}")
+
+    start = time.perf_counter()
+    with open(input_file, 'r') as infile:
+        text = infile.read()
+    arc_options = None
+    if args.arc_resolution is not None or args.arc_chord_tolerance is not None:
+        arc_options = {'angular_resolution': args.arc_resolution or 5.0,
+                       'chord_tolerance': args.arc_chord_tolerance}
+    table = pit_builder.build_pit(text, tuple(args.origin), args.rapid_speed_xy, args.rapid_speed_z,
+                                  args.s_base, args.p_idle, args.z_impedance, arc_options)
+    del text
+    with open(output_file, 'w') as outfile:
+        pit_builder.write_pit(outfile, table, args.tool_diameter, args.workpiece_material, args.blank_material)
+
+    summary = {
+        "command": "pit",
+        "input": input_file,
+        "output": output_file,
+        "rows": len(table),
+        "total_length_mm": float(np.sum(table.column('s'))),
+        "total_time_s": float(np.sum(table.column('t'))),
+        "max_power_w": float(np.max(table.column('P'))) if len(table) else 0.0,
+    }
+
+    if args.plots and len(table):
+        # 只有需要图表时才导入 matplotlib
+        import matplotlib
+        matplotlib.use("Agg")
+        import pit_plots
+
+        pit_plots.configure_fonts(os.path.join(base_dir, 'SimHei.ttf'))
+        series = pit_plots.plot_series(table)
+        for i, (filename, _) in enumerate(pit_plots.PIT_FIGURES):
+            pit_plots.save_figure(pit_plots.build_step_figure(series, i), save_dir, filename, args.dpi)
+        mrr_intervals = pit_plots.partition_mrr_steady_intervals(
+            series['MRR'], series['s'], series['cumulative_s'], series['N'], args.mrr_min_length)
+        pit_plots.save_figure(pit_plots.build_mrr_interval_figure(series, mrr_intervals),
+                              save_dir, pit_plots.MRR_STEADY_FIGURE[0], args.dpi)
+        if mrr_intervals:
+            pit_plots.write_mrr_intervals(os.path.join(save_dir, "MRR_steady_intervals.txt"),
+                                          mrr_intervals, args.mrr_min_length)
+        summary["mrr_intervals"] = len(mrr_intervals)
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    _print_summary(summary)
+    return 0
+
+
+def run_steady(args):
+    """采集文件 → 按程序行号顺序的稳态区间（与"实际负载稳态区间划分"页的运行分析一致）"""
+    import numpy as np
+    import channel_cache
+    import steady_state_engine
+
+    start = time.perf_counter()
+    capture = channel_cache.read_capture(args.input, args.encoding)
+    if not capture.channel_info or capture.num_samples == 0:
+        raise ValueError("文件格式不正确，缺少必要的标签")
+    target_col, line_number_col = capture.find_columns(args.data_source)
+    if target_col == -1 or line_number_col == -1:
+        raise ValueError(f"文件中未找到数据源 {args.data_source} 或程序行号信息")
+
+    values, line_numbers = channel_cache.select_channels(capture, target_col, line_number_col)
+    if len(values) == 0:
+        raise ValueError("未能提取有效数据")
+    point_indices, _ = channel_cache.line_positions(line_numbers)
+    intervals = steady_state_engine.line_ordered_intervals(
+        values, line_numbers, args.min_length, args.threshold, args.absolute_threshold,
+        reduce_interval=not args.no_reduce, engine=args.engine)
+
+    output_file = args.output or os.path.splitext(args.input)[0] + "_steady_intervals.tsv"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("start_index\tend_index\tstart\tend\tlength\tmean\n")
+        for start_idx, end_idx in intervals:
+            f.write(f"{start_idx}\t{end_idx}\t"
+                    f"{line_numbers[start_idx]:.0f}.{point_indices[start_idx]}\t"
+                    f"{line_numbers[end_idx]:.0f}.{point_indices[end_idx]}\t"
+                    f"{end_idx - start_idx + 1}\t{np.mean(values[start_idx:end_idx + 1]):.6f}\n")
+
+    _print_summary({
+        "command": "steady",
+        "input": args.input,
+        "output": output_file,
+        "encoding": capture.encoding,
+        "from_cache": capture.from_cache,
+        "samples": int(len(values)),
+        "intervals": len(intervals),
+        "covered_samples": int(sum(end - start + 1 for start, end in intervals)),
+        "seconds": round(time.perf_counter() - start, 3),
+    })
+    return 0
+
+
+def run_rg(args):
+    """程序映射 + 采集 CSV → 各刀具自动划分 → SampleData.rg"""
+    import numpy as np
+    import auto_partition
+    import rg_export
+
+    start = time.perf_counter()
+    program_mapping = rg_export.parse_program_mapping(args.mapping)
+    programs_data = rg_export.load_tool_data(args.csv, program_mapping)
+    data_key = rg_export.DATA_SOURCE_KEYS[args.data_source]
+    tool_arrays = {(program_id, tool_key): np.asarray(tool[data_key], dtype=np.float64)
+                   for program_id, tools in programs_data.items() for tool_key, tool in tools.items()}
+
+    partitioner = auto_partition.AutoIntervalPartitioner(
+        auto_sensitivity=args.sensitivity,
+        interval_mode=args.interval_mode,
+        target_coverage=args.target_coverage,
+    )
+    runner = auto_partition.BatchPartitionRunner(tool_arrays, partitioner.settings(), max_workers=args.workers)
+    runner.start()
+
+    analyzed_results = {}
+    failed = []
+    while True:
+        message = runner.results.get()
+        if message[0] == 'finished':
+            break
+        program_id, tool_key = message[1]
+        if message[0] == 'error' or not message[2]:
+            failed.append(f"{program_id}:{tool_key}")
+            continue
+        tool = programs_data[program_id][tool_key]
+        data = tool_arrays[(program_id, tool_key)]
+        intervals_list = rg_export.tool_rg_intervals(
+            data, message[2], tool['x_positions'], tool['point_indices'], args.ratio, float(data.mean()))
+        if intervals_list:
+            analyzed_results[(program_id, tool_key)] = {
+                'program_name': tool['name'],
+                'intervals': intervals_list,
+            }
+
+    output_dir = args.output_dir or os.getcwd()
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, rg_export.RG_FILENAME)
+    ordered_results = rg_export.ordered_rg_results(program_mapping, analyzed_results)
+    rg_export.write_rg(output_file, rg_export.DATA_SOURCE_IDS[args.data_source], ordered_results)
+
+    _print_summary({
+        "command": "rg",
+        "output": output_file,
+        "programs": len(program_mapping),
+        "tools": len(tool_arrays),
+        "analyzed_tools": len(analyzed_results),
+        "failed_tools": sorted(failed),
+        "intervals": sum(len(result['intervals']) for result in ordered_results),
+        "seconds": round(time.perf_counter() - start, 3),
+    })
+    return 0
+
+
+def run_subdivide(args):
+    """G 代码圆弧细分（与"G代码细分"工具的输出文件名一致）"""
+    import arc_subdivider
+
+    cache = None
+    if args.cache or args.cache_dir:
+        import subdivision_cache
+        cache = subdivision_cache.SubdivisionCache(args.cache_dir)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    outputs = []
+    points = points_fixed_angle = cache_hits = 0
+    start = time.perf_counter()
+    for input_file in args.inputs:
+        output_file = arc_subdivider.get_output_filename(input_file, args.resolution, args.output_dir,
+                                                         args.chord_tolerance)
+        subdivider = arc_subdivider.ArcSubdivider(
+            angular_resolution=args.resolution,
+            log_message=(lambda msg: print(msg, file=sys.stderr)) if args.verbose else None,
+            log_level=arc_subdivider.LOG_DEBUG if args.verbose > 1 else arc_subdivider.LOG_INFO,
+            chord_tolerance=args.chord_tolerance, min_segment_length=args.min_segment, cache=cache)
+        subdivider.process_gcode_path(input_file, output_file)
+        outputs.append(str(output_file))
+        cache_hits += subdivider.cache_hit
+        points += subdivider.stats['points']
+        points_fixed_angle += subdivider.stats['points_fixed_angle']
+
+    summary = {
+        "command": "subdivide",
+        "outputs": outputs,
+        "resolution": args.resolution,
+        "points": points,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if cache is not None:
+        summary["cache_hits"] = cache_hits
+    if args.chord_tolerance is not None:
+        summary["chord_tolerance"] = args.chord_tolerance
+        summary["points_saved_vs_fixed_angle"] = points_fixed_angle - points
+    _print_summary(summary)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="smif_cli", description="工艺信息表与稳态区间划分命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pit = subparsers.add_parser("pit", help="由 G 代码生成工艺信息表")
+    pit.add_argument("input", help="G 代码文件")
+    pit.add_argument("-o", "--output-dir", help="输出根目录，结果写入其下的 processed_<文件名>（默认与输入文件同目录）")
+    pit.add_argument("--origin", type=float, nargs=3, default=[349.765, -10.205, -459.070],
+                     metavar=("X", "Y", "Z"), help="机床原点坐标")
+    pit.add_argument("--rapid-speed-xy", type=float, default=4800.0, help="XY平面快速移动速度 (mm/min)")
+    pit.add_argument("--rapid-speed-z", type=float, default=3600.0, help="Z方向快速移动速度 (mm/min)")
+    pit.add_argument("--s-base", type=float, default=5000.0, help="基准转速 (rpm)")
+    pit.add_argument("--p-idle", type=float, default=0.0, help="空载功率 P_idle (W)")
+    pit.add_argument("--z-impedance", type=float, default=120.0, help="阻抗系数 Z(s) (W/(mm³/s))")
+    pit.add_argument("--tool-diameter", type=float, default=10.0, help="刀具直径 (mm)")
+    pit.add_argument("--workpiece-material", default="硬质合金铝用铣刀", help="刀具材料")
+    pit.add_argument("--blank-material", default="AL6061", help="毛坯材料")
+    pit.add_argument("--arc-resolution", type=float,
+                     help="直接展开 G2/G3 圆弧并按解析弧长计算行程，每段角度（度）；默认圆弧按直线距离计算")
+    pit.add_argument("--arc-chord-tolerance", type=float,
+                     help="直接展开圆弧时按弦高误差 (mm) 分段（代替 --arc-resolution 的固定角度）")
+    pit.add_argument("--plots", action="store_true", help="同时输出行程域图表与MRR稳态区间（需要 matplotlib）")
+    pit.add_argument("--mrr-min-length", type=float, default=10.0, help="MRR稳态区间最小行程长度 (mm)")
+    pit.add_argument("--dpi", type=int, default=600, help="PNG 图表分辨率")
+    pit.set_defaults(func=run_pit)
+
+    steady = subparsers.add_parser("steady", help="对采集文件划分稳态区间")
+    steady.add_argument("input", help="ChannelInfo/ChannelData 采集文件（文本或 CSV）")
+    steady.add_argument("-o", "--output", help="区间 TSV 文件（默认 <输入文件名>_steady_intervals.tsv）")
+    steady.add_argument("--data-source", default="current", choices=["current", "vgpro_power", "huazhong_power"],
+                        help="数据源")
+    steady.add_argument("--encoding", default="auto", help="文件编码，auto 表示自动检测")
+    steady.add_argument("--min-length", type=int, default=100, help="最小区间长度（点）")
+    steady.add_argument("--threshold", type=float, default=0.2, help="相对波动阈值")
+    steady.add_argument("--absolute-threshold", type=float, default=0.05, help="绝对波动阈值")
+    steady.add_argument("--no-reduce", action="store_true", help="不缩减区间边界")
+    steady.add_argument("--engine", default="vectorized", choices=["loop", "vectorized"], help="计算引擎")
+    steady.set_defaults(func=run_steady)
+
+    rg = subparsers.add_parser("rg", help="自动划分各刀具稳态区间并导出 SampleData.rg")
+    rg.add_argument("--mapping", required=True, help="程序映射 TXT（程序名:程序号:刀具号:起始行-终止行;）")
+    rg.add_argument("--csv", required=True, help="采集 CSV（电流, vgpro功率, 边缘模块功率, 行号, 程序号）")
+    rg.add_argument("-o", "--output-dir", help="输出目录（默认当前目录）")
+    rg.add_argument("--data-source", default="电流", choices=["电流", "vgpro功率", "边缘模块功率"], help="数据源")
+    rg.add_argument("--ratio", type=float, default=1.2, help="理想值调整倍率")
+    rg.add_argument("--sensitivity", type=float, default=1.0, help="自动划分灵敏度")
+    rg.add_argument("--interval-mode", default="large_coverage", help="区间模式")
+    rg.add_argument("--target-coverage", type=float, default=0.90, help="目标覆盖率")
+    rg.add_argument("--workers", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    rg.set_defaults(func=run_rg)
+
+    subdivide = subparsers.add_parser("subdivide", help="G 代码圆弧细分")
+    subdivide.add_argument("inputs", nargs="+", help="G 代码文件")
+    subdivide.add_argument("-o", "--output-dir", help="输出目录（默认与输入文件同目录）")
+    subdivide.add_argument("--resolution", type=float, default=5.0,
+                           help="角度分辨率（度）；弦高误差模式下为统计对比的基准")
+    subdivide.add_argument("--chord-tolerance", type=float,
+                           help="按最大弦高误差（mm）细分，每段角度由半径决定")
+    subdivide.add_argument("--min-segment", type=float, default=0.0,
+                           help="弦高误差模式的最短段长（mm），默认不限制")
+    subdivide.add_argument("--cache", action="store_true",
+                           help="使用细分结果缓存（默认目录 ~/.smif_cache/subdivided）")
+    subdivide.add_argument("--cache-dir", help="细分结果缓存目录（同时启用缓存）")
+    subdivide.add_argument("-v", "--verbose", action="count", default=0,
+                           help="把处理日志输出到标准错误（-vv 同时输出逐行的调试信息）")
+    subdivide.set_defaults(func=run_subdivide)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+界面启动基准：报告各工具的首个窗口显示时间与各模块导入耗时
+
+每个工具在独立的 Python 子进程中启动（python -X importtime），测量：
+    - 导入工具模块的耗时
+    - 首个窗口显示时间：从子进程开始导入工具模块到主窗口完成首次绘制（root.update() 返回）
+    - 图表就绪时间：延迟创建的图表完成创建（matplotlib 在此时才导入）
+    - 模块导入耗时：由 -X importtime 统计的各顶层模块累计导入时间，
+      以及 lazy_imports 记录的延迟导入耗时
+
+用法：
+    python startup_benchmark.py                 # 全部工具
+    python startup_benchmark.py academic gcode  # 指定工具
+    python startup_benchmark.py --top 15 --json
+
+没有显示器时无法创建窗口，此时只报告模块导入耗时。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+# 工具名: (模块名, 主界面类名)
+APPS = {
+    "academic": ("academic_smif_zs_v2", "MillingAnalysisTool"),
+    "actual": ("实际负载稳态区间划分", "ActualLoadAnalysis"),
+    "gcode": ("G代码细分", "GCodeSubdividerApp"),
+}
+
+# 图表就绪的最长等待时间（秒）
+_FIGURE_TIMEOUT = 30.0
+
+
+def _child(app_name):
+    """子进程：导入并启动工具，逐行输出 JSON 事件"""
+    def emit(event, **fields):
+        print(json.dumps(dict(event=event, t=time.perf_counter(), **fields), ensure_ascii=False), flush=True)
+
+    import importlib
+    import lazy_imports
+
+    module_name, class_name = APPS[app_name]
+    # 基准脚本自身已导入的模块不计入工具的导入耗时
+    emit("start", preloaded=sorted(sys.modules))
+    module = importlib.import_module(module_name)
+    emit("imported")
+
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        emit("no_display", error=str(e), lazy=lazy_imports.IMPORT_TIMES)
+        return
+    app = getattr(module, class_name)(root)
+    root.update()
+    emit("window")
+
+    # 继续处理事件，直到延迟创建的图表就绪（没有图表的工具立即结束）
+    figure_attrs = ("canvas_data", "fig_actual_load")
+    deadline = time.perf_counter() + _FIGURE_TIMEOUT
+    has_figures = app_name != "gcode"
+    while has_figures and time.perf_counter() < deadline:
+        if any(getattr(app, attr, None) is not None for attr in figure_attrs):
+            emit("figures")
+            break
+        root.update()
+        time.sleep(0.005)
+    emit("done", lazy=dict(lazy_imports.IMPORT_TIMES))
+    root.destroy()
+
+
+def parse_importtime(stderr_text, exclude=()):
+    """解析 -X importtime 输出，返回 {顶层模块名: 累计导入耗时（秒）}，exclude 中的模块不计入"""
+    exclude = set(exclude)
+    totals = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        # 缩进表示由其他模块间接导入，只统计顶层导入
+        if name.startswith("  "):
+            continue
+        name = name.strip()
+        if name in exclude:
+            continue
+        totals[name] = totals.get(name, 0.0) + int(parts[1]) / 1e6
+    return totals
+
+
+def run_app(app_name):
+    """在子进程中启动一个工具并收集计时"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    launched = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", app_name],
+        cwd=here, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8")
+    stdout, stderr = proc.communicate()
+
+    events = {}
+    for line in stdout.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        events[record["event"]] = record
+
+    result = {"app": app_name, "returncode": proc.returncode}
+    if "start" in events and "imported" in events:
+        result["module_import_s"] = events["imported"]["t"] - events["start"]["t"]
+    if "window" in events:
+        result["first_window_s"] = events["window"]["t"] - events["start"]["t"]
+    if "figures" in events:
+        result["figures_ready_s"] = events["figures"]["t"] - events["start"]["t"]
+    if "no_display" in events:
+        result["no_display"] = events["no_display"]["error"]
+    final = events.get("done") or events.get("no_display") or {}
+    result["lazy_imports_s"] = final.get("lazy", {})
+    result["imports_s"] = parse_importtime(stderr, events.get("start", {}).get("preloaded", ()))
+    result["wall_s"] = time.perf_counter() - launched
+    if proc.returncode != 0:
+        result["error"] = "\n".join(line for line in stderr.splitlines() if not line.startswith("import time:"))[-2000:]
+    return result
+
+
+def print_report(result, top):
+    print(f"== {result['app']}")
+    if "error" in result:
+        print(f"  启动失败:\n{result['error']}")
+        return
+    if "module_import_s" in result:
+        print(f"  导入工具模块:   {result['module_import_s'] * 1000:8.1f} ms")
+    if "first_window_s" in result:
+        print(f"  首个窗口显示:   {result['first_window_s'] * 1000:8.1f} ms（自解释器就绪起）")
+    if "figures_ready_s" in result:
+        print(f"  图表就绪:       {result['figures_ready_s'] * 1000:8.1f} ms")
+    if "no_display" in result:
+        print(f"  无法创建窗口（{result['no_display']}），只报告导入耗时")
+    print(f"  子进程总耗时:   {result['wall_s'] * 1000:8.1f} ms")
+    print(f"  启动时导入的顶层模块（前 {top} 个，累计耗时）:")
+    for name, seconds in sorted(result["imports_s"].items(), key=lambda item: -item[1])[:top]:
+        print(f"    {seconds * 1000:8.1f} ms  {name}")
+    if result["lazy_imports_s"]:
+        print("  延迟导入（首次使用时）:")
+        for name, seconds in sorted(result["lazy_imports_s"].items(), key=lambda item: -item[1]):
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="界面启动基准")
+    parser.add_argument("apps", nargs="*", help=f"要测量的工具：{', '.join(APPS)}（默认全部）")
+    parser.add_argument("--top", type=int, default=10, help="列出导入耗时最多的前 N 个模块")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出全部结果")
+    parser.add_argument("--child", choices=list(APPS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child)
+        return 0
+
+    unknown = [app_name for app_name in args.apps if app_name not in APPS]
+    if unknown:
+        parser.error(f"未知的工具: {', '.join(unknown)}")
+    results = [run_app(app_name) for app_name in (args.apps or list(APPS))]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for result in results:
+            print_report(result, args.top)
+    return 0 if all(result["returncode"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+"""
+稳态区间划分核心算法（不依赖 tkinter / matplotlib）
+
+提供与 MillingAnalysisTool.find_steady_state_intervals 相同签名的纯函数实现，
+支持两种计算引擎：
+    loop       - 逐点扩展右指针，单调双端队列维护窗口极值（原始实现）
+    vectorized - 基于 NumPy 的分块实现，逐块计算累积和与累积极值，
+                 一次性定位贪心区间的断点，输出与 loop 完全一致
+"""
+import collections
+from typing import List, Tuple, Union
+
+import numpy as np
+
+
+ENGINES = ("loop", "vectorized")
+
+# 分块扩展的初始块长与最大块长：稳态区间通常只有几十到几千点，
+# 先用小块试探，区间越长块越大，避免短区间上浪费计算
+_MIN_BLOCK = 64
+_MAX_BLOCK = 1 << 16
+
+# 分块前先逐点试探的点数：阈值较严时大量区间只有几个点，
+# 逐点判断比调用 NumPy 的固定开销更快
+_PROBE_LENGTH = 16
+
+
+def estimate_noise_level(data):
+    """估计数据的噪声水平，使用相邻点差值的标准差"""
+    if len(data) < 3:
+        return 0
+
+    # 计算相邻点差值
+    diffs = np.abs(np.diff(data))
+
+    # 使用相邻差值的标准差作为噪声估计
+    return np.std(diffs)
+
+
+def merge_close_intervals(intervals, max_gap):
+    """合并间隔小于或等于max_gap的相邻区间"""
+    if not intervals or len(intervals) < 2:
+        return intervals
+
+    # 按起始位置排序
+    intervals.sort(key=lambda x: x[0])
+
+    merged = []
+    current_start, current_end = intervals[0]
+
+    for next_start, next_end in intervals[1:]:
+        if next_start - current_end <= max_gap + 1:
+            # 合并区间
+            current_end = max(current_end, next_end)
+        else:
+            # 保存当前区间，开始新区间
+            merged.append((current_start, current_end))
+            current_start, current_end = next_start, next_end
+
+    # 添加最后一个区间
+    merged.append((current_start, current_end))
+
+    return merged
+
+
+def adjust_overlapping_intervals(intervals, overlap_tolerance=10):
+    """
+    调整重叠的区间边界，消除重叠
+    前一个区间终点前移overlap_tolerance点，后一个区间起点后移overlap_tolerance点
+    """
+    if not intervals or len(intervals) < 2:
+        return intervals
+
+    adjusted = []
+    adjusted.append(intervals[0])
+
+    for i in range(1, len(intervals)):
+        prev_start, prev_end = adjusted[-1]
+        curr_start, curr_end = intervals[i]
+
+        # 检查是否存在重叠
+        if prev_end >= curr_start:
+            # 计算重叠长度
+            overlap_length = prev_end - curr_start + 1
+
+            # 调整前一个区间的终点
+            adjust_amount = min(overlap_tolerance, overlap_length)
+            new_prev_end = max(prev_start, prev_end - adjust_amount)
+
+            # 调整当前区间的起点
+            new_curr_start = min(curr_end, curr_start + adjust_amount)
+
+            # 确保调整后的区间仍然有效
+            if new_prev_end >= prev_start and new_curr_start <= curr_end:
+                adjusted[-1] = (prev_start, new_prev_end)
+                adjusted.append((new_curr_start, curr_end))
+            else:
+                # 如果调整无效，保持原区间
+                adjusted.append((curr_start, curr_end))
+        else:
+            adjusted.append((curr_start, curr_end))
+
+    return adjusted
+
+
+def _extend_run_loop(currents, left, rel_threshold, abs_threshold):
+    """从 left 开始逐点扩展，返回第一个不满足波动条件的位置（原始实现）"""
+    n = len(currents)
+    current_sum = 0.0
+    min_deque = collections.deque()
+    max_deque = collections.deque()
+    right = left
+
+    while right < n:
+        c = currents[right]
+        current_sum += c
+
+        # 维护最小值双端队列（单调递增）
+        while min_deque and min_deque[-1] > c:
+            min_deque.pop()
+        min_deque.append(c)
+
+        # 维护最大值双端队列（单调递减）
+        while max_deque and max_deque[-1] < c:
+            max_deque.pop()
+        max_deque.append(c)
+
+        length = right - left + 1
+        mean = current_sum / length
+
+        min_val = min_deque[0]
+        max_val = max_deque[0]
+
+        # 条件1: 相对波动不超过阈值
+        condition1 = (min_val >= (1 - rel_threshold) * mean and
+                      max_val <= (1 + rel_threshold) * mean)
+
+        # 条件2: 绝对波动不超过阈值
+        condition2 = (max_val <= abs_threshold)
+
+        # 满足任一条件即可
+        if condition1 or condition2:
+            right += 1
+        else:
+            break
+
+    return right
+
+
+def scan_run_block(block, carry_sum, carry_min, carry_max, run_length,
+                   rel_threshold, abs_threshold):
+    """
+    判断一个贪心区间延伸到 block 中各点时是否仍满足波动条件
+
+    参数:
+        block: 紧接当前区间末尾的一段数据（float64 数组）
+        carry_sum, carry_min, carry_max: 当前区间已有点的累加和、最小值、最大值
+        run_length: 当前区间已有点数（新区间为 0，对应 0.0 / inf / -inf 的初值）
+        rel_threshold, abs_threshold: 相对/绝对波动阈值
+
+    返回:
+        (break_offset, carry)：break_offset 为 block 内第一个不满足条件的位置，
+        全部满足时为 None，此时 carry 为延伸后的 (累加和, 最小值, 最大值)
+
+    累积和把进位值放在块首一起累加，保证浮点加法顺序与逐点实现相同，
+    从而断点位置逐位一致。
+    """
+    sums = np.cumsum(np.concatenate(([carry_sum], block)))[1:]
+    mins = np.minimum(np.minimum.accumulate(block), carry_min)
+    maxs = np.maximum(np.maximum.accumulate(block), carry_max)
+    means = sums / np.arange(run_length + 1, run_length + len(block) + 1)
+
+    ok = (((mins >= (1 - rel_threshold) * means) & (maxs <= (1 + rel_threshold) * means))
+          | (maxs <= abs_threshold))
+    broken = np.flatnonzero(~ok)
+    if broken.size:
+        return int(broken[0]), None
+    return None, (sums[-1], mins[-1], maxs[-1])
+
+
+def _extend_run_vectorized(data_array, left, rel_threshold, abs_threshold):
+    """
+    从 left 开始分块扩展，返回第一个不满足波动条件的位置
+
+    先逐点试探前 _PROBE_LENGTH 个点，区间更长时再分块：每块通过 scan_run_block
+    计算以 left 为起点的前缀和与前缀极值，块间通过进位值衔接。
+    """
+    n = len(data_array)
+    current_sum = 0.0
+    min_val = np.inf
+    max_val = -np.inf
+    length = 0
+    for c in data_array[left:left + _PROBE_LENGTH].tolist():
+        current_sum += c
+        if c < min_val:
+            min_val = c
+        if c > max_val:
+            max_val = c
+        length += 1
+        mean = current_sum / length
+        if not ((min_val >= (1 - rel_threshold) * mean and max_val <= (1 + rel_threshold) * mean)
+                or max_val <= abs_threshold):
+            return left + length - 1
+    carry = (current_sum, min_val, max_val)
+
+    pos = left + length
+    block = _MIN_BLOCK
+    while pos < n:
+        end = min(n, pos + block)
+        broken, carry = scan_run_block(data_array[pos:end], *carry, pos - left,
+                                       rel_threshold, abs_threshold)
+        if broken is not None:
+            return pos + broken
+        pos = end
+        block = min(block * 4, _MAX_BLOCK)
+
+    return n
+
+
+def compute_local_thresholds(data_array, left, relative_threshold, absolute_threshold,
+                             respect_user_thresholds=True):
+    """根据 left 之后最多 100 个点的局部特性调整相对/绝对阈值（分段阈值模式）"""
+    n = len(data_array)
+    local_relative_threshold = relative_threshold
+    local_absolute_threshold = absolute_threshold
+
+    local_window = min(100, n - left)
+    if local_window <= 10:  # 点数不足时不调整
+        return local_relative_threshold, local_absolute_threshold
+
+    local_data = data_array[left:left + local_window]
+    local_mean = np.mean(local_data)
+    local_std = np.std(local_data)
+    local_noise = estimate_noise_level(local_data)
+
+    # 1. 局部噪声较高时增加阈值
+    if local_noise > 0.05 * local_mean:
+        noise_factor = min(2.0, 1.0 + local_noise / local_mean)
+        local_relative_threshold *= noise_factor
+        if respect_user_thresholds:
+            # 如果尊重用户阈值，只允许增加绝对阈值，不能减小
+            local_absolute_threshold = max(absolute_threshold, local_absolute_threshold * noise_factor)
+        else:
+            local_absolute_threshold *= noise_factor
+
+    # 2. 局部标准差较小时减小阈值
+    if local_std < 0.1 * local_mean:
+        local_relative_threshold = max(0.05, local_relative_threshold * 0.7)
+        if respect_user_thresholds:
+            # 如果尊重用户阈值，不减小绝对阈值
+            local_absolute_threshold = max(absolute_threshold, local_absolute_threshold * 0.7)
+        else:
+            local_absolute_threshold = max(0.01, local_absolute_threshold * 0.7)
+
+    # 3. 确保阈值在合理范围内
+    local_relative_threshold = min(0.4, max(0.05, local_relative_threshold))
+    if respect_user_thresholds:
+        # 如果尊重用户阈值，确保不小于用户设置的原始值
+        local_absolute_threshold = max(absolute_threshold, local_absolute_threshold)
+    else:
+        # 原来的限制逻辑
+        local_absolute_threshold = min(0.5, max(0.01, local_absolute_threshold))
+
+    return local_relative_threshold, local_absolute_threshold
+
+
+def find_steady_state_intervals(currents: Union[List[float], np.ndarray],
+                                min_length: int = 1,
+                                relative_threshold: float = 0.2,
+                                absolute_threshold: float = 0.05,
+                                adaptive: bool = True,
+                                respect_user_thresholds: bool = True,
+                                engine: str = "loop") -> List[Tuple[int, int]]:
+    """
+    从电流序列中提取稳态区间（使用自适应阈值和局部数据特性分析）
+
+    参数:
+        currents: 电流值列表（浮点数）
+        min_length: 最小区间长度
+        relative_threshold: 相对波动阈值（百分比）基准值
+        absolute_threshold: 绝对阈值（窗口内所有值都必须小于此值）
+        adaptive: 是否启用自适应算法
+        respect_user_thresholds: 是否尊重用户设置的阈值（True时不对绝对阈值设上限）
+        engine: 计算引擎，"loop"（逐点）或 "vectorized"（NumPy 分块），结果一致
+
+    返回:
+        稳态区间列表，每个区间为元组(start_index, end_index)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的计算引擎: {engine}，可选值为 {ENGINES}")
+
+    n = len(currents)
+    if n == 0:
+        return []
+
+    # 数据预分析 - 计算整体统计特征
+    data_array = np.asarray(currents)
+    global_mean = np.mean(data_array)
+    global_range = np.max(data_array) - np.min(data_array)
+    noise_level = estimate_noise_level(data_array)
+
+    # 如果启用自适应模式，基于数据特性调整阈值参数
+    if adaptive:
+        # 针对噪声水平较高的数据，适当放宽阈值
+        if noise_level > 0.1 * global_mean:
+            relative_threshold = min(0.3, relative_threshold * 1.5)
+            if respect_user_thresholds:
+                # 如果尊重用户阈值，不设上限
+                absolute_threshold = absolute_threshold * 1.5
+            else:
+                absolute_threshold = min(0.2, absolute_threshold * 1.5)
+
+        # 针对数据范围很小的情况，减小绝对阈值
+        if global_range < 0.2 * global_mean:
+            if respect_user_thresholds:
+                # 如果尊重用户阈值，不能小于用户设置的原始值
+                adjusted_threshold = min(absolute_threshold, global_range * 0.3)
+                absolute_threshold = max(absolute_threshold, adjusted_threshold)
+            else:
+                absolute_threshold = min(absolute_threshold, global_range * 0.3)
+
+        # 针对数据范围很大的情况，使用分段相对阈值
+        use_segmented_thresholds = (global_range > 0.5 * global_mean)
+    else:
+        use_segmented_thresholds = False
+
+    if engine == "vectorized":
+        scan_data = np.asarray(currents, dtype=np.float64)
+        extend_run = _extend_run_vectorized
+    else:
+        scan_data = currents
+        extend_run = _extend_run_loop
+
+    left = 0
+    intervals = []
+
+    while left < n:
+        if adaptive and use_segmented_thresholds:
+            local_relative_threshold, local_absolute_threshold = compute_local_thresholds(
+                data_array, left, relative_threshold, absolute_threshold, respect_user_thresholds)
+        else:
+            local_relative_threshold = relative_threshold
+            local_absolute_threshold = absolute_threshold
+
+        # 扩展右指针直到窗口不满足条件
+        right = extend_run(scan_data, left, local_relative_threshold, local_absolute_threshold)
+
+        # 记录有效区间（[left, right-1]）
+        if right - left >= min_length:
+            intervals.append((left, right - 1))
+
+        # 移动左指针到第一个不满足点的位置
+        left = right
+
+    # 后处理 - 合并接近的区间
+    if adaptive and intervals:
+        # 区间合并处理 - 根据数据特性调整合并距离
+        merge_distance = max(1, int(min_length * 0.2))  # 默认合并距离
+
+        # 如果噪声水平高，适当增加合并距离
+        if noise_level > 0.05 * global_mean:
+            merge_distance = max(2, int(min_length * 0.3))
+
+        intervals = merge_close_intervals(intervals, merge_distance)
+
+    # 处理区间重叠
+    intervals = adjust_overlapping_intervals(intervals, overlap_tolerance=10)
+    return intervals
+
+
+def line_ordered_intervals(values, line_numbers, min_length, relative_threshold, absolute_threshold,
+                           reduce_interval=True, engine="vectorized"):
+    """
+    按程序行号顺序划分稳态区间（"运行分析"的非自适应流程）
+
+    先按程序行号排序，在排序后的序列上严格按给定阈值划分，再把区间端点映射回
+    原始索引、按起点行号排序，并可选地将长度不小于 3 的区间两端各缩减一个点
+
+    参数:
+        values: 电流/功率序列
+        line_numbers: 每个点的程序行号（数值）
+        reduce_interval: 是否缩减区间边界
+
+    返回:
+        区间列表 [(start_index, end_index), ...]，索引指向原始序列
+    """
+    line_numbers = np.asarray(line_numbers)
+    sorted_indices = np.argsort(line_numbers)
+    raw_intervals = find_steady_state_intervals(
+        np.asarray(values)[sorted_indices],
+        min_length,
+        relative_threshold,
+        absolute_threshold,
+        adaptive=False,  # 禁用自适应，严格按照用户设置的阈值
+        respect_user_thresholds=True,
+        engine=engine
+    )
+    raw_intervals = adjust_overlapping_intervals(raw_intervals, overlap_tolerance=10)
+
+    intervals = [(int(sorted_indices[start]), int(sorted_indices[end])) for start, end in raw_intervals]
+    intervals.sort(key=lambda iv: line_numbers[iv[0]])
+    if reduce_interval:
+        intervals = [(start + 1, end - 1) if end - start >= 2 else (start, end) for start, end in intervals]
+    return intervals
+
+
+def compare_engines(currents, **kwargs):
+    """
+    用同一组参数分别运行 loop 与 vectorized 引擎并比较结果
+
+    返回:
+        (是否一致, loop 结果, vectorized 结果)
+    """
+    kwargs.pop("engine", None)
+    loop_result = find_steady_state_intervals(currents, engine="loop", **kwargs)
+    vectorized_result = find_steady_state_intervals(currents, engine="vectorized", **kwargs)
+    return loop_result == vectorized_result, loop_result, vectorized_result
@@ -0,0 +1,346 @@
+"""
+在线稳态区间检测（不依赖 tkinter / matplotlib）
+
+双循环方法的执行环需要在零件加工过程中就得到稳态区间，而不是等整份采集文件
+落盘后再调用 find_steady_state_intervals。本模块提供：
+
+    StreamingSteadyStateDetector - 逐点/逐批输入采样值，区间一旦不满足相对/绝对
+                                   波动条件立即输出已闭合的区间；内存占用为常数
+    ChannelDataStream            - 逐行输入 <ChannelInfo>/<ChannelData> 文本，
+                                   自动定位数据列与程序行号列后交给检测器
+    replay_channel_file          - 回放已录制的采集文件，可设置回放速率，
+                                   统计每个采样点从到达到处理完成的延迟
+
+在相同的采样顺序下，输出区间与
+steady_state_engine.find_steady_state_intervals(values, min_length,
+relative_threshold, absolute_threshold, adaptive=False) 完全一致。
+自适应模式依赖整条曲线的全局统计量，无法在线计算，因此不支持。
+
+命令行回放示例:
+    python streaming_detector.py capture.txt --rate 5000 --min-length 100
+"""
+import argparse
+import sys
+import time
+from array import array
+
+import numpy as np
+
+import steady_state_engine
+
+
+# ChannelInfo 中各数据源对应的通道名称 / 寄存器编号（与分析工具的数据源选项一致）
+DATA_SOURCE_CHANNELS = {
+    "current": ("负载电流", None),
+    "vgpro_power": (None, "432"),
+    "huazhong_power": (None, "108"),
+}
+
+
+class StreamingSteadyStateDetector:
+    """在线稳态区间检测器，只保存当前未闭合区间的起点、累加和与极值"""
+
+    def __init__(self, min_length=1, relative_threshold=0.2, absolute_threshold=0.05):
+        self.min_length = min_length
+        self.relative_threshold = relative_threshold
+        self.absolute_threshold = absolute_threshold
+        self.reset()
+
+    def reset(self):
+        """清空状态，从索引 0 重新开始"""
+        self.samples_seen = 0      # 已输入的采样点数（下一个点的全局索引）
+        self.run_start = 0         # 当前未闭合区间的起点索引
+        self._sum = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        self.intervals_emitted = 0
+
+    @property
+    def run_length(self):
+        """当前未闭合区间的点数"""
+        return self.samples_seen - self.run_start
+
+    def _close_run(self):
+        """以当前位置为断点闭合区间，返回满足最小长度的区间或 None"""
+        interval = None
+        if self.run_length >= self.min_length:
+            interval = (self.run_start, self.samples_seen - 1)
+            self.intervals_emitted += 1
+        self.run_start = self.samples_seen
+        self._sum = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        return interval
+
+    def _accepts(self, value):
+        """将 value 追加到当前区间后，是否仍满足波动条件"""
+        total = self._sum + value
+        min_val = min(self._min, value)
+        max_val = max(self._max, value)
+        mean = total / (self.run_length + 1)
+
+        # 条件1: 相对波动不超过阈值；条件2: 绝对波动不超过阈值
+        condition1 = (min_val >= (1 - self.relative_threshold) * mean and
+                      max_val <= (1 + self.relative_threshold) * mean)
+        condition2 = (max_val <= self.absolute_threshold)
+        if condition1 or condition2:
+            self._sum = total
+            self._min = min_val
+            self._max = max_val
+            return True
+        return False
+
+    def push(self, value):
+        """
+        输入单个采样值
+
+        返回:
+            因该点而闭合的稳态区间 (start_index, end_index)，没有时返回 None
+        """
+        value = float(value)
+        interval = None
+        if not self._accepts(value):
+            # 断点处闭合旧区间，断点本身作为新区间的第一个点重新判定
+            if self.run_length > 0:
+                interval = self._close_run()
+            if not self._accepts(value):
+                # 单点本身不满足条件（如 NaN），跳过该点
+                self.samples_seen += 1
+                self.run_start = self.samples_seen
+                return interval
+        self.samples_seen += 1
+        return interval
+
+    def extend(self, values):
+        """
+        批量输入采样值（NumPy 分块实现，与逐点 push 结果一致）
+
+        返回:
+            本批次内闭合的稳态区间列表
+        """
+        values = np.asarray(values, dtype=np.float64)
+        emitted = []
+        pos = 0
+        block = steady_state_engine._MIN_BLOCK
+        while pos < len(values):
+            end = min(len(values), pos + block)
+            broken, carry = steady_state_engine.scan_run_block(
+                values[pos:end], self._sum, self._min, self._max, self.run_length,
+                self.relative_threshold, self.absolute_threshold)
+            if broken is None:
+                self._sum, self._min, self._max = (float(v) for v in carry)
+                self.samples_seen += end - pos
+                pos = end
+                block = min(block * 4, steady_state_engine._MAX_BLOCK)
+                continue
+
+            # 断点之前的点全部属于当前区间，断点处闭合并重新开始
+            self.samples_seen += broken
+            if self.run_length > 0:
+                interval = self._close_run()
+                if interval is not None:
+                    emitted.append(interval)
+                pos += broken
+            else:
+                # 新区间的第一个点本身不满足条件（如 NaN），单独作为一个点跳过
+                self.samples_seen += 1
+                self._close_run()
+                pos += broken + 1
+            block = steady_state_engine._MIN_BLOCK
+        return emitted
+
+    def flush(self):
+        """数据流结束时闭合最后一个区间，返回满足最小长度的区间列表"""
+        if self.run_length == 0:
+            return []
+        interval = self._close_run()
+        return [interval] if interval is not None else []
+
+
+class ChannelDataStream:
+    """逐行解析 <ChannelInfo>/<ChannelData> 文本并送入在线检测器"""
+
+    def __init__(self, detector, data_source="current", separator="\t"):
+        if data_source not in DATA_SOURCE_CHANNELS:
+            raise ValueError(f"未知的数据源: {data_source}，可选值为 {tuple(DATA_SOURCE_CHANNELS)}")
+        self.detector = detector
+        self.data_source = data_source
+        self.separator = separator
+        self.channel_count = 0
+        self.target_col = -1
+        self.line_number_col = -1
+        self._run_start_line = None
+        self._last_line = None
+
+    def _parse_channel_info(self, line):
+        """根据 ChannelInfo 行定位数据列与程序行号列（第4个字段为通道名称，第7个字段为寄存器编号）"""
+        fields = line.split(self.separator)
+        col = self.channel_count
+        self.channel_count += 1
+        if len(fields) <= 5:
+            return
+        channel_name = fields[3].strip('<> ')
+        register_number = fields[6].strip('<> ') if len(fields) > 6 else ''
+        wanted_name, wanted_register = DATA_SOURCE_CHANNELS[self.data_source]
+        if (wanted_name and channel_name == wanted_name) or \
+                (wanted_register and register_number == wanted_register):
+            self.target_col = col
+        elif channel_name == '程序行号':
+            self.line_number_col = col
+
+    def parse_sample(self, line):
+        """解析 ChannelData 行，返回 (采样值, 程序行号)，无法解析时返回 None"""
+        if self.target_col < 0 or self.line_number_col < 0:
+            return None
+        values = line.split(self.separator)
+        try:
+            # ChannelData行的第一个字段是<ChannelData>标签，数据从第二个字段开始
+            return float(values[self.target_col + 1]), float(values[self.line_number_col + 1])
+        except (ValueError, IndexError):
+            return None
+
+    def push_sample(self, value, line_number):
+        """
+        输入一个已解析的采样点
+
+        返回:
+            闭合的区间 (start_index, end_index, 起始程序行号, 结束程序行号)，没有时返回 None
+        """
+        interval = self.detector.push(value)
+        result = None
+        if interval is not None:
+            result = (interval[0], interval[1], self._run_start_line, self._last_line)
+        if self.detector.run_length == 1:
+            self._run_start_line = line_number
+        self._last_line = line_number
+        return result
+
+    def feed_line(self, line):
+        """输入一行文本，返回闭合的区间（含程序行号）或 None"""
+        line = line.strip()
+        if line.startswith("<ChannelInfo>"):
+            self._parse_channel_info(line)
+        elif line.startswith("<ChannelData>"):
+            sample = self.parse_sample(line)
+            if sample is not None:
+                return self.push_sample(*sample)
+        return None
+
+    def feed_lines(self, lines):
+        """输入一批文本行，返回本批次闭合的区间列表"""
+        emitted = []
+        for line in lines:
+            interval = self.feed_line(line)
+            if interval is not None:
+                emitted.append(interval)
+        return emitted
+
+    def flush(self):
+        """数据流结束时闭合最后一个区间"""
+        return [(start, end, self._run_start_line, self._last_line)
+                for start, end in self.detector.flush()]
+
+
+def replay_channel_file(file_path, rate=None, min_length=100, relative_threshold=0.2,
+                        absolute_threshold=0.05, data_source="current", encoding="utf-8",
+                        on_interval=None):
+    """
+    按设定速率回放已录制的采集文件，模拟在线数据流
+
+    参数:
+        file_path: ChannelInfo/ChannelData 格式的采集文件
+        rate: 回放速率（采样点/秒），None 表示尽可能快
+        min_length, relative_threshold, absolute_threshold: 稳态区间划分参数
+        data_source: 数据源（current / vgpro_power / huazhong_power）
+        encoding: 文件编码
+        on_interval: 每闭合一个区间时的回调，参数为 (start, end, 起始行号, 结束行号)
+
+    返回:
+        回放统计字典：区间列表、采样点数、耗时以及每点延迟（微秒）的均值/分位数/最大值。
+        延迟为采样点计划到达时刻（或读入时刻）到检测器处理完成的时间。
+    """
+    separator = ',' if file_path.lower().endswith('.csv') else '\t'
+    detector = StreamingSteadyStateDetector(min_length, relative_threshold, absolute_threshold)
+    stream = ChannelDataStream(detector, data_source, separator)
+    intervals = []
+    latencies = array('d')
+
+    def emit(interval):
+        intervals.append(interval)
+        if on_interval is not None:
+            on_interval(interval)
+
+    period = 1.0 / rate if rate else 0.0
+    clock = time.perf_counter
+    start_time = clock()
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        for line in f:
+            if not line.startswith("<ChannelData>"):
+                stream.feed_line(line)
+                continue
+            sample = stream.parse_sample(line.strip())
+            if sample is None:
+                continue
+
+            if period:
+                # 按计划时刻到达，提前则等待
+                arrival = start_time + detector.samples_seen * period
+                wait = arrival - clock()
+                if wait > 0:
+                    time.sleep(wait)
+            else:
+                arrival = clock()
+
+            interval = stream.push_sample(*sample)
+            latencies.append(clock() - arrival)
+            if interval is not None:
+                emit(interval)
+
+    for interval in stream.flush():
+        emit(interval)
+    elapsed = clock() - start_time
+
+    latency_us = np.frombuffer(latencies, dtype=np.float64) * 1e6
+    stats = {
+        'intervals': intervals,
+        'samples': detector.samples_seen,
+        'elapsed_s': elapsed,
+        'samples_per_s': detector.samples_seen / elapsed if elapsed > 0 else 0.0,
+    }
+    if latency_us.size:
+        stats.update({
+            'latency_mean_us': float(latency_us.mean()),
+            'latency_p50_us': float(np.percentile(latency_us, 50)),
+            'latency_p99_us': float(np.percentile(latency_us, 99)),
+            'latency_max_us': float(latency_us.max()),
+        })
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回放采集文件并在线划分稳态区间")
+    parser.add_argument("file", help="ChannelInfo/ChannelData 格式的采集文件")
+    parser.add_argument("--rate", type=float, default=None, help="回放速率（采样点/秒），默认尽可能快")
+    parser.add_argument("--min-length", type=int, default=100, help="最小区间长度（点）")
+    parser.add_argument("--threshold", type=float, default=0.2, help="相对波动阈值")
+    parser.add_argument("--abs-threshold", type=float, default=0.05, help="绝对波动阈值")
+    parser.add_argument("--source", default="current", choices=tuple(DATA_SOURCE_CHANNELS), help="数据源")
+    parser.add_argument("--encoding", default="utf-8", help="文件编码")
+    args = parser.parse_args(argv)
+
+    def report(interval):
+        start, end, start_line, end_line = interval
+        print(f"[{start}, {end}]\tN{start_line:.0f} - N{end_line:.0f}\t{end - start + 1}")
+
+    stats = replay_channel_file(args.file, args.rate, args.min_length, args.threshold,
+                                args.abs_threshold, args.source, args.encoding, on_interval=report)
+    print(f"采样点数: {stats['samples']}, 稳态区间: {len(stats['intervals'])}, "
+          f"耗时: {stats['elapsed_s']:.3f} s ({stats['samples_per_s']:.0f} 点/秒)")
+    if 'latency_mean_us' in stats:
+        print(f"单点延迟(us): 平均 {stats['latency_mean_us']:.1f}, P50 {stats['latency_p50_us']:.1f}, "
+              f"P99 {stats['latency_p99_us']:.1f}, 最大 {stats['latency_max_us']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
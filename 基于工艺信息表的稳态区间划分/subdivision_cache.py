@@ -0,0 +1,180 @@
+"""
+G 代码细分结果的内容寻址缓存（不依赖 tkinter）
+
+反复为同一程序、同一分辨率重新生成工艺信息表时，细分结果可直接从缓存取出，
+不再重新细分。缓存目录中每个条目两个文件：
+    <键>.nc    - 细分输出
+    <键>.json  - 处理计数（stats）与条目元数据；文件存在即表示条目完整
+
+缓存键 = 输入文件完整内容的 blake2b 摘要 + 细分参数（角度分辨率、弦高误差、最短段长）
+         + 细分工具的输出格式版本（arc_subdivider.SUBDIVIDER_VERSION）
+
+写入与命中时条目和输出文件之间优先用硬链接（同一文件系统时为毫秒级），不能硬链接时复制。
+条目的 .json 修改时间即最近使用时间：命中时更新，写入新条目后按总大小上限
+从最久未使用的条目开始删除（LRU）。条目记录输出文件的大小与修改时间，
+硬链接出去的文件被就地改写时条目随之失效。
+
+缓存只是加速手段：读写失败（目录不可写、磁盘已满等）时静默跳过，不影响细分本身。
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+
+# 默认缓存目录，可由环境变量 SMIF_SUBDIVISION_CACHE 指定
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SMIF_SUBDIVISION_CACHE", os.path.join(os.path.expanduser("~"), ".smif_cache", "subdivided"))
+DEFAULT_MAX_BYTES = 2 << 30
+
+# 计算内容摘要的读取块大小
+_HASH_CHUNK = 4 << 20
+
+
+def file_digest(path):
+    """输入文件完整内容的 blake2b 摘要（十六进制）"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SubdivisionCache:
+    """细分结果缓存（可 pickle，批量处理的工作进程可直接使用）"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        cache_dir: 缓存目录，None 表示 DEFAULT_CACHE_DIR
+        max_bytes: 缓存中细分输出的总大小上限（字节）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def key(self, input_path, params, version):
+        """
+        计算缓存键
+
+        参数:
+            params: 影响输出的细分参数字典（值需可 JSON 序列化）
+            version: 细分工具的输出格式版本
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(file_digest(input_path).encode())
+        digest.update(json.dumps({'params': params, 'version': version}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.nc', base + '.json'
+
+    def fetch(self, key, output_path):
+        """
+        命中时把缓存的细分输出放到 output_path（覆盖已有文件）
+
+        返回:
+            条目记录的处理计数 stats，未命中时返回 None
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            stat = os.stat(data_path)
+            if stat.st_size != meta['size'] or stat.st_mtime_ns != meta['mtime_ns']:
+                # 条目已被改动（例如硬链接出去的文件被就地改写）
+                self._remove(key)
+                return None
+            output_path = os.fspath(output_path)
+            # 输出文件已经是该条目的硬链接时无需再放置
+            if not (os.path.exists(output_path) and os.path.samefile(output_path, data_path)):
+                tmp_path = f"{output_path}.{os.getpid()}.cache.tmp"
+                try:
+                    os.link(data_path, tmp_path)
+                except OSError:
+                    shutil.copyfile(data_path, tmp_path)
+                os.replace(tmp_path, output_path)
+            os.utime(meta_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta['stats']
+
+    def store(self, key, output_path, stats):
+        """
+        把刚写出的细分输出加入缓存，然后按大小上限淘汰旧条目
+
+        返回:
+            是否写入成功
+        """
+        data_path, meta_path = self._paths(key)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            try:
+                os.link(output_path, tmp_path)
+            except OSError:
+                shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, data_path)
+            stat = os.stat(data_path)
+            meta = {'stats': stats, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                    'source': os.path.basename(os.fspath(output_path)), 'created': time.time()}
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError:
+            for path in (tmp_path, meta_path + '.tmp'):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+        self.evict()
+        return True
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def entries(self):
+        """返回 [(最近使用时间, 键, 输出大小), ...]，按最近使用时间从旧到新排序"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            data_path, meta_path = self._paths(key)
+            try:
+                entries.append((os.stat(meta_path).st_mtime, key, os.stat(data_path).st_size))
+            except OSError:
+                continue
+        entries.sort()
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self):
+        """按 LRU 删除条目，直到总大小不超过上限；返回删除的条目数"""
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """删除全部条目"""
+        for _, key, _ in self.entries():
+            self._remove(key)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+G 代码分词一致性测试：整文件分词（tokenize_text）与逐行分词（tokenize_line）
+对每行 G 代码内容必须给出相同的行号、地址字数值、运动指令与加工平面。
+"""
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gcode_tokenizer  # noqa: E402
+
+# 工艺信息行的 G 代码内容：含注释、重复地址字、带符号的 S、无空格写法与无法解析的数值
+GCODE_LINES = [
+    "N10 G90 G17 G0 X0 Y0 Z50. S6000 M3",
+    "N20 G1 Z-1.5 F300",
+    "N30 X12.5 Y-3.25",
+    "N40 G02 X20. Y5 I3.75 J4.125",
+    "N50 G3 X10 Y10 R8.",
+    "N60 (ROUGH PASS X99 Y99) G1 X15",
+    "N10 G1 X5 (MOVE X9) X7 Y-2 S-100",
+    "(START) N70 G0 Z5",
+    "G1 N80 X1",
+    "N90G1X5Y6Z-.5",
+    "N100 X1-2 Y3",
+    "N110 X4 X1-2",
+    "N120 G0 G1 X3",
+    "N130 G1 G0 Y3",
+    "N3.1 G1 X-0.0001 Y+2 Z.5",
+    "N140 G18 G19 G17 G02 X1 Y1 R2",
+    "N150 G01 X2 (G0 RAPID) Y2",
+    "N160 M5 S0",
+    "N170 (UNCLOSED X8",
+    "N180 G4 X1.5",
+    "X- Y. Z5",
+    "S+1200 G1",
+]
+
+
+def _pit_text(lines):
+    """把 G 代码内容拼成工艺信息格式（前 6 个字段为序号、时间等与 ap/ae/F）"""
+    return "".join(f"{i} 0 0 1.{i % 3} 2.5 {300 + i}  {line}  \n" for i, line in enumerate(lines))
+
+
+def _same(a, b):
+    return (a is None and math.isnan(b)) or (a is not None and a == b)
+
+
+@pytest.mark.parametrize("arc_words", [False, True])
+def test_bulk_and_line_tokenizers_agree(arc_words):
+    columns = gcode_tokenizer.tokenize_text(_pit_text(GCODE_LINES), arc_words=arc_words)
+    assert len(columns['ap']) == len(GCODE_LINES)
+    for row, line in enumerate(GCODE_LINES):
+        line_number, commands, params, _ = gcode_tokenizer.tokenize_line(line)
+        assert columns['N_str'][row] == (line_number or "N0"), line
+        for letter in ('XYZSIJR' if arc_words else 'XYZS'):
+            assert _same(params.get(letter), columns[letter][row]), (line, letter)
+        motions = [gcode_tokenizer.MOTION_CODES[c] for c in commands if c in gcode_tokenizer.MOTION_CODES]
+        assert columns['motion'][row] == (motions[-1] if motions else -1), line
+        assert columns['rapid'][row] == (bool(motions) and motions[-1] == 0), line
+        assert columns['cutting'][row] == (bool(motions) and motions[-1] > 0), line
+        if arc_words:
+            planes = [gcode_tokenizer.PLANE_CODES[c] for c in commands if c in gcode_tokenizer.PLANE_CODES]
+            assert columns['plane'][row] == (planes[-1] if planes else 0), line
+
+
+def test_comments_and_repeated_words():
+    columns = gcode_tokenizer.tokenize_text(_pit_text(["N10 G1 X5 (MOVE X9) X7 Y-2 S-100"]))
+    assert columns['X'][0] == 7.0
+    assert columns['Y'][0] == -2.0
+    assert columns['S'][0] == -100.0
+    assert columns['N_str'] == ["N10"]
+    line_number, commands, params, invalid = gcode_tokenizer.tokenize_line("N10 G1 X5 (MOVE X9) X7 Y-2 S-100")
+    assert (line_number, commands, params, invalid) == ("N10", ["G1"], {'X': 7.0, 'Y': -2.0, 'S': -100.0}, [])
+
+
+def test_pit_fields_and_empty_text():
+    columns = gcode_tokenizer.tokenize_text(_pit_text(GCODE_LINES[:3]))
+    assert columns['ap'] == ["1.0", "1.1", "1.2"]
+    assert columns['ae'] == ["2.5"] * 3
+    assert columns['F'] == ["300", "301", "302"]
+    empty = gcode_tokenizer.tokenize_text("", arc_words=True)
+    assert empty['N_str'] == [] and len(empty['X']) == 0 and len(empty['motion']) == 0
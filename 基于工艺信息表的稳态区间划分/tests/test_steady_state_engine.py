@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+稳态区间提取引擎一致性测试：逐点引擎（loop）与 NumPy 分块引擎（vectorized）
+在各类数据与参数组合下必须给出完全相同的区间列表。
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import steady_state_engine  # noqa: E402
+
+# 覆盖 16 点探测窗口与分块边界（64 及以上）附近的长度
+LENGTHS = [1, 2, 3, 15, 16, 17, 31, 63, 64, 65, 127, 128, 129, 200, 1000, 5000]
+
+
+def _stepped_trace(n, seed):
+    """分段平台 + 噪声的典型电流序列"""
+    rng = np.random.default_rng(seed)
+    levels = rng.uniform(2.0, 10.0, size=max(1, n // 40 + 1))
+    trace = np.repeat(levels, 40)[:n]
+    return trace + rng.normal(0.0, 0.05, size=n)
+
+
+def _quantized_trace(n, seed):
+    """量化到 0.1 的序列，存在大量相等值与恰好落在阈值上的差值"""
+    return np.round(_stepped_trace(n, seed), 1)
+
+
+def _zero_spike_trace(n, seed):
+    """含零值尖峰（掉电/采样丢失）的序列"""
+    rng = np.random.default_rng(seed + 1)
+    trace = _stepped_trace(n, seed)
+    if n:
+        trace[rng.random(n) < 0.05] = 0.0
+    return trace
+
+
+TRACES = {
+    "stepped": _stepped_trace,
+    "quantized": _quantized_trace,
+    "zero_spikes": _zero_spike_trace,
+}
+
+
+def _assert_engines_equal(currents, **kwargs):
+    equal, loop_result, vectorized_result = steady_state_engine.compare_engines(currents, **kwargs)
+    assert equal, (loop_result, vectorized_result)
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+@pytest.mark.parametrize("kind", sorted(TRACES))
+@pytest.mark.parametrize("n", LENGTHS)
+def test_engines_agree_across_lengths(n, kind, adaptive):
+    currents = TRACES[kind](n, seed=n)
+    _assert_engines_equal(currents, adaptive=adaptive)
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+@pytest.mark.parametrize("relative_threshold, absolute_threshold",
+                         [(1e-9, 1e-9), (0.0, 0.0), (1e-6, 0.05), (0.2, 1e-6)])
+@pytest.mark.parametrize("kind", sorted(TRACES))
+@pytest.mark.parametrize("n", [16, 17, 64, 65, 1000])
+def test_engines_agree_near_zero_thresholds(n, kind, relative_threshold, absolute_threshold, adaptive):
+    currents = TRACES[kind](n, seed=7 * n)
+    _assert_engines_equal(currents, relative_threshold=relative_threshold,
+                          absolute_threshold=absolute_threshold, adaptive=adaptive)
+
+
+@pytest.mark.parametrize("respect_user_thresholds", [True, False])
+@pytest.mark.parametrize("min_length", [1, 5, 50])
+@pytest.mark.parametrize("n", [63, 64, 65, 2000])
+def test_engines_agree_with_options(n, min_length, respect_user_thresholds):
+    currents = _zero_spike_trace(n, seed=3 * n)
+    _assert_engines_equal(currents, min_length=min_length,
+                          respect_user_thresholds=respect_user_thresholds)
+
+
+def test_constant_and_all_zero_traces():
+    for n in (1, 16, 64, 65, 300):
+        _assert_engines_equal(np.full(n, 5.0))
+        _assert_engines_equal(np.zeros(n))
+        _assert_engines_equal(np.zeros(n), adaptive=False)
+
+
+def test_empty_input_and_unknown_engine():
+    assert steady_state_engine.find_steady_state_intervals([], engine="vectorized") == []
+    with pytest.raises(ValueError):
+        steady_state_engine.find_steady_state_intervals([1.0, 2.0], engine="gpu")
@@ -4,20 +4,21 @@ from tkinter import filedialog, messagebox, ttk
 import math
 import re
 import os
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
 import numpy as np
-import matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import collections
-import pandas as pd
 from typing import List, Tuple, Union
 from datetime import datetime
 import sys
 import gc
-from scipy.signal import butter, filtfilt
-import chardet
 import copy
+import queue
+import multiprocessing
+import lazy_imports
+import range_query
+import auto_partition
+import rg_export
+import plot_decimation
+import chart_interaction
+import background_tasks
 
 # 判断是否在打包环境中运行
 if getattr(sys, 'frozen', False):
@@ -30,22 +31,27 @@ else:
 # 设置黑体字体路径
 simhei_path = os.path.join(base_dir, 'SimHei.ttf')
 
-# 检查字体文件是否存在
-if os.path.exists(simhei_path):
-    # 添加字体到matplotlib
-    import matplotlib.font_manager as fm
-    fm.fontManager.addfont(simhei_path)
-    
+
+def _configure_matplotlib(pyplot):
+    """首次导入 pyplot 时设置中文字体"""
+    # 检查字体文件是否存在
+    if os.path.exists(simhei_path):
+        # 添加字体到matplotlib
+        import matplotlib.font_manager as fm
+        fm.fontManager.addfont(simhei_path)
+        pyplot.rcParams['font.family'] = 'sans-serif'
+    else:
+        print(f"警告: 字体文件 {simhei_path} 未找到，将使用系统默认字体")
     # 设置matplotlib使用中文字体
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['font.sans-serif'] = ['SimHei']
-    plt.rcParams['axes.unicode_minus'] = False
-else:
-    print(f"警告: 字体文件 {simhei_path} 未找到，将使用系统默认字体")
+    pyplot.rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体
+    pyplot.rcParams['axes.unicode_minus'] = False    # 解决负号显示问题
 
-# 设置matplotlib使用中文字体
-matplotlib.rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体
-matplotlib.rcParams['axes.unicode_minus'] = False    # 解决负号显示问题
+
+# 重量级依赖延迟到首次使用时导入：matplotlib 在图表首次显示时，scipy 只用于低通滤波
+plt = lazy_imports.lazy("matplotlib.pyplot", _configure_matplotlib)
+backend_tkagg = lazy_imports.lazy("matplotlib.backends.backend_tkagg")
+interval_artists = lazy_imports.lazy("interval_artists")
+scipy_signal = lazy_imports.lazy("scipy.signal")
 
 class ActualLoadAnalysis:
     def __init__(self, root, csv_file=None, txt_file=None):
@@ -87,6 +93,8 @@ class ActualLoadAnalysis:
         self.filter_order = tk.IntVar(value=4)
         self.filtered_data = None
         self.is_filtered = False
+        self.actual_load_range_index = None  # 当前原始数据的区间查询索引
+        self.filtered_range_index = None  # 当前滤波数据的区间查询索引
         self.original_xlim = None
         self.original_ylim = None
         self.scroll_cid = None
@@ -109,7 +117,7 @@ class ActualLoadAnalysis:
         self.adjustment_mode = False
         self.selected_intervals = []
         self.dragging_boundary = None
-        self.interval_boundary_lines = []
+        self.interval_boundaries = None
         self.adjustment_cid = None
         self.adjustment_motion_cid = None
         self.adjustment_release_cid = None
@@ -127,9 +135,12 @@ class ActualLoadAnalysis:
         # 在激进扩展阶段，每个区块允许向外扩展的最大比例（相对于 min_len）
         # 提高到 1.0，允许按照平均区间长度向外扩展，能更快提升覆盖率
         self.expand_ratio_for_coverage = 1.0
+        # 批量自动划分的并行进程数
+        self.batch_workers = tk.IntVar(value=os.cpu_count() or 1)
         
         self.create_interface()
-        self.init_figure()
+        # 图表在图表区首次显示时才创建（届时才导入 matplotlib），窗口可以先显示出来
+        self.create_when_shown(self.actual_load_figure_frame, self.create_figure)
         self.root.bind("<Configure>", self.on_window_resize)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.after(100, self.adjust_figure_size)
@@ -140,54 +151,93 @@ class ActualLoadAnalysis:
             self.status_var_actual_load.set("⚠️ 未传入数据文件，请手动加载")
     
     def load_external_files(self):
-        """加载外部传入的CSV和TXT文件（带进度窗口）"""
-        try:
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("加载数据")
-            progress_window.geometry("400x120")
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            progress_window.update_idletasks()
-            x = (progress_window.winfo_screenwidth() // 2) - 200
-            y = (progress_window.winfo_screenheight() // 2) - 60
-            progress_window.geometry(f"400x120+{x}+{y}")
-            status_label = tk.Label(progress_window, text="正在加载数据，请稍候...", font=('Microsoft YaHei', 12))
-            status_label.pack(pady=20)
-            progress_bar = ttk.Progressbar(progress_window, mode='indeterminate', length=350)
-            progress_bar.pack(pady=10)
-            progress_bar.start(10)
-            self.status_var_actual_load.set("正在加载数据...")
-            progress_window.update()
-            status_label.config(text="正在解析程序映射文件...")
-            progress_window.update()
-            self.parse_program_mapping(self.external_txt_file)
-            status_label.config(text="正在解析CSV数据文件（可能需要几秒钟）...")
-            progress_window.update()
-            self.parse_csv_data(self.external_csv_file)
-            status_label.config(text="正在更新界面...")
-            progress_window.update()
-            self.update_program_selector()
-            if self.program_mapping:
-                first_program_id = list(self.program_mapping.keys())[0]
-                program_info = self.program_mapping[first_program_id]
-                program_name = program_info['name'] if isinstance(program_info, dict) else program_info
-                self.program_selector.set(f"{program_name} ({first_program_id})")
-                self.on_program_selected(None)
+        """加载外部传入的CSV和TXT文件（在后台线程中解析，进度窗口显示当前步骤并可取消）"""
+        self.create_figure()
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("加载数据")
+        progress_window.geometry("400x150")
+        progress_window.transient(self.root)
+        progress_window.grab_set()
+        progress_window.update_idletasks()
+        x = (progress_window.winfo_screenwidth() // 2) - 200
+        y = (progress_window.winfo_screenheight() // 2) - 75
+        progress_window.geometry(f"400x150+{x}+{y}")
+        status_label = tk.Label(progress_window, text="正在加载数据，请稍候...", font=('Microsoft YaHei', 12))
+        status_label.pack(pady=20)
+        progress_bar = ttk.Progressbar(progress_window, mode='indeterminate', length=350)
+        progress_bar.pack(pady=10)
+        progress_bar.start(10)
+        cancel_btn = ttk.Button(progress_window, text="取消")
+        cancel_btn.pack()
+        self.status_var_actual_load.set("正在加载数据...")
+        
+        def close_window():
             progress_bar.stop()
             progress_window.destroy()
-            self.status_var_actual_load.set(f"✅ 成功加载 {len(self.program_mapping)} 个程序")
-            
-            # 显示所有已划分的区间汇总
-            self.update_all_intervals_summary()
-        except Exception as e:
-            # 确保进度窗口被关闭
-            if 'progress_window' in locals():
-                try:
-                    progress_window.destroy()
-                except:
-                    pass
-            messagebox.showerror("加载错误", f"加载外部文件时发生错误:\n{str(e)}")
+        
+        def on_progress(fraction, text):
+            if text:
+                status_label.config(text=text)
+        
+        def on_done(result):
+            close_window()
+            try:
+                program_mapping, programs_data = result
+                self.program_mapping = program_mapping
+                for program_id, tools in programs_data.items():
+                    self.programs_data.setdefault(program_id, {}).update(tools)
+                del result, programs_data
+                gc.collect()
+                self.update_program_selector()
+                if self.program_mapping:
+                    first_program_id = list(self.program_mapping.keys())[0]
+                    program_info = self.program_mapping[first_program_id]
+                    program_name = program_info['name'] if isinstance(program_info, dict) else program_info
+                    self.program_selector.set(f"{program_name} ({first_program_id})")
+                    self.on_program_selected(None)
+                self.status_var_actual_load.set(f"✅ 成功加载 {len(self.program_mapping)} 个程序")
+                
+                # 显示所有已划分的区间汇总
+                self.update_all_intervals_summary()
+            except Exception as e:
+                messagebox.showerror("加载错误", f"加载外部文件时发生错误:\n{str(e)}")
+                self.status_var_actual_load.set("❌ 加载失败")
+        
+        def on_error(message, details):
+            close_window()
+            messagebox.showerror("加载错误", f"加载外部文件时发生错误:\n{message}")
             self.status_var_actual_load.set("❌ 加载失败")
+        
+        def on_cancelled():
+            close_window()
+            self.status_var_actual_load.set("⚠️ 已取消加载，请手动加载")
+        
+        def request_cancel():
+            task.cancel()
+            status_label.config(text="正在取消...")
+        
+        # 映射文件解析到副本中，加载完成后才替换界面使用的映射
+        task = background_tasks.run_in_background(
+            self.root, self.external_files_task, self.external_txt_file, self.external_csv_file,
+            copy.deepcopy(self.program_mapping), on_done=on_done, on_error=on_error,
+            on_progress=on_progress, on_cancelled=on_cancelled)
+        cancel_btn.config(command=request_cancel)
+        progress_window.protocol("WM_DELETE_WINDOW", request_cancel)
+    
+    def external_files_task(self, context, txt_file, csv_file, program_mapping):
+        """
+        后台解析外部传入的映射文件与CSV文件（不访问界面控件）
+
+        返回:
+            (程序映射, {程序号: {刀具键: 刀具数据字典}})
+        """
+        context.progress(None, "正在解析程序映射文件...")
+        rg_export.parse_program_mapping(txt_file, program_mapping)
+        context.check_cancelled()
+        context.progress(None, "正在解析CSV数据文件（可能需要几秒钟）...")
+        programs_data = self.load_program_data(csv_file, program_mapping, context)
+        context.progress(None, "正在更新界面...")
+        return program_mapping, programs_data
     
     def parse_program_mapping(self, txt_file):
         """解析TXT文件获取程序映射关系（支持刀具信息）
@@ -195,137 +245,39 @@ class ActualLoadAnalysis:
         例如: O999:384000036:T3:18-64;
         注意: tools_list 保持txt文件顺序,允许重复的刀具号
         """
-        with open(txt_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        for line in lines:
-            line = line.strip()
-            # 移除末尾的分号
-            if line.endswith(';'):
-                line = line[:-1]
-            
-            if not line or ':' not in line:
-                continue
-            
-            # 分割行获取信息: 程序名:程序号:刀具号:行号范围
-            parts = line.split(':')
-            if len(parts) < 4:
-                continue
-            
-            program_name = parts[0].strip()
-            program_id = parts[1].strip()
-            tool_id = parts[2].strip()
-            range_str = parts[3].strip()
-            
-            # 解析行号范围
-            if '-' not in range_str:
-                continue
-            
-            range_parts = range_str.split('-')
-            try:
-                start_line = int(range_parts[0].strip())
-                end_line = int(range_parts[1].strip())
-            except ValueError:
-                continue
-            
-            # 添加到映射中
-            if program_id not in self.program_mapping:
-                self.program_mapping[program_id] = {
-                    'name': program_name,
-                    'tools_list': []  # 使用列表保持顺序,允许重复
-                }
-            
-            # 添加刀具信息到列表(按txt顺序,允许重复)
-            self.program_mapping[program_id]['tools_list'].append({
-                'tool_id': tool_id,
-                'start': start_line,
-                'end': end_line
-            })
+        rg_export.parse_program_mapping(txt_file, self.program_mapping)
     
     def parse_csv_data(self, csv_file):
         """解析CSV文件并按程序号和刀具分组数据
         CSV格式：第1列=电流，第2列=vgpro功率，第3列=边缘模块功率，第4列=行号，第5列=程序号
         """
-        # 读取CSV文件（5列数据）
-        df = pd.read_csv(csv_file, header=None, 
-                        dtype={0: 'float32', 1: 'float32', 2: 'float32', 3: 'int32', 4: str},
-                        engine='c')
+        loaded = self.load_program_data(csv_file, self.program_mapping)
         
-        # 取绝对值（电流、两种功率）
-        df[0] = np.abs(df[0].values)
-        df[1] = np.abs(df[1].values)
-        df[2] = np.abs(df[2].values)
+        for program_id, tools in loaded.items():
+            self.programs_data.setdefault(program_id, {}).update(tools)
         
-        # 按程序号分组
-        grouped = df.groupby(4, sort=False)
+        del loaded
+        gc.collect()
+    
+    def load_program_data(self, csv_file, program_mapping, context=None):
+        """读取CSV文件中各刀具的数据并补充界面状态（不访问界面控件，可在后台线程中调用）
         
-        processed_count = 0
-        for program_id, program_info in self.program_mapping.items():
-            if program_id not in grouped.groups:
-                continue
-            
-            program_data = grouped.get_group(program_id)
-            program_name = program_info['name']
-            tools_list = program_info.get('tools_list', [])
-            
-            # 为每个刀具创建数据
-            if program_id not in self.programs_data:
-                self.programs_data[program_id] = {}
-            
-            # 遍历tools_list,使用索引区分相同刀具的不同出现
-            for idx, tool_info in enumerate(tools_list):
-                tool_id = tool_info['tool_id']
-                start_line = tool_info['start']
-                end_line = tool_info['end']
-                
-                # 生成唯一的工具键: tool_id + 索引
-                tool_key = f"{tool_id}_{idx}"
-                
-                # 筛选该刀具的行号范围
-                mask = (program_data[3] >= start_line) & (program_data[3] <= end_line)
-                tool_data = program_data[mask]
-                
-                if len(tool_data) == 0:
-                    continue
-                
-                # 提取三种数据源
-                current_data = tool_data[0].values.astype('float64')
-                vgpro_power_data = tool_data[1].values.astype('float64')
-                edge_power_data = tool_data[2].values.astype('float64')
-                line_numbers_array = tool_data[3].values.astype('float32')
-                
-                # 计算点索引
-                point_indices = tool_data.groupby(3, sort=False).cumcount().values
-                
-                unique_line_numbers, counts = np.unique(line_numbers_array, return_counts=True)
-                unique_line_numbers_sorted = np.sort(unique_line_numbers)
-                
-                # 计算X轴位置
-                if len(unique_line_numbers) == 1:
-                    n = float(unique_line_numbers[0])
-                    total_points = len(line_numbers_array)
-                    x_positions = n + np.arange(total_points, dtype='float32') / total_points
-                else:
-                    line_point_counts_dict = dict(zip(unique_line_numbers, counts))
-                    point_counts_array = np.array([line_point_counts_dict[ln] for ln in line_numbers_array], dtype='float32')
-                    x_positions = line_numbers_array + point_indices / point_counts_array
-                
-                # 存储数据（包含三种数据源）
-                self.programs_data[program_id][tool_key] = {
-                    'name': program_name,
-                    'tool_id': tool_id,
-                    'tool_key': tool_key,
-                    'start_line': start_line,
-                    'end_line': end_line,
-                    'current_data': current_data,
-                    'vgpro_power_data': vgpro_power_data,
-                    'edge_power_data': edge_power_data,
-                    'data': current_data,  # 默认使用电流数据
+        context 不为 None 时（后台任务上下文）在各刀具之间检查取消请求
+        返回:
+            {程序号: {刀具键: 刀具数据字典}}
+        """
+        loaded = rg_export.load_tool_data(csv_file, program_mapping)
+        
+        for program_id, tools in loaded.items():
+            for tool_key, tool_data in tools.items():
+                if context is not None:
+                    context.check_cancelled()
+                current_data = tool_data['current_data']
+                # 补充界面状态（默认使用电流数据）
+                tool_data.update({
+                    'data': current_data,
+                    'range_index': range_query.RangeQueryIndex(current_data),  # 区间统计查询索引
                     'average': float(current_data.mean()),
-                    'line_numbers': line_numbers_array,
-                    'point_indices': point_indices,
-                    'x_positions': x_positions,
-                    'unique_line_numbers': unique_line_numbers_sorted,
                     'intervals': [],
                     'interval_values': [],
                     'filtered_data': None,
@@ -334,12 +286,8 @@ class ActualLoadAnalysis:
                     'auto_sensitivity': 1.0,  # 每个刀具独立的灵敏度
                     'cutoff_freq': 0.1,
                     'filter_order': 4,
-                }
-                processed_count += 1
-        
-        del df
-        del grouped
-        gc.collect()
+                })
+        return loaded
     
     def update_program_selector(self):
         """更新程序选择下拉框"""
@@ -550,6 +498,7 @@ class ActualLoadAnalysis:
     def load_program_data_to_ui(self, prog_data):
         """将程序数据加载到UI"""
         self.actual_load_data = prog_data['data'] if isinstance(prog_data['data'], list) else prog_data['data'].tolist()
+        self.bind_range_index(prog_data)
         self.actual_load_line_numbers = prog_data['line_numbers'] if isinstance(prog_data['line_numbers'], list) else prog_data['line_numbers'].tolist()
         self.actual_load_point_indices = prog_data['point_indices'] if isinstance(prog_data['point_indices'], list) else prog_data['point_indices'].tolist()
         self.actual_load_x_positions = prog_data['x_positions'] if isinstance(prog_data['x_positions'], list) else prog_data['x_positions'].tolist()
@@ -605,7 +554,7 @@ class ActualLoadAnalysis:
             self.ax_actual_load.clear()
             
             if self.actual_load_data:
-                self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data, color='#2196F3', linewidth=1.8, alpha=0.9)
+                plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data, color='#2196F3', linewidth=1.8, alpha=0.9)
             
             if self.actual_load_data:
                 self.set_xticks_for_line_numbers()
@@ -627,6 +576,7 @@ class ActualLoadAnalysis:
         prog_data = self.programs_data[program_id]
         
         self.actual_load_data = prog_data['data'] if isinstance(prog_data['data'], list) else prog_data['data'].tolist()
+        self.bind_range_index(prog_data)
         self.actual_load_line_numbers = prog_data['line_numbers'] if isinstance(prog_data['line_numbers'], list) else prog_data['line_numbers'].tolist()
         self.actual_load_point_indices = prog_data['point_indices'] if isinstance(prog_data['point_indices'], list) else prog_data['point_indices'].tolist()
         self.actual_load_x_positions = prog_data['x_positions'] if isinstance(prog_data['x_positions'], list) else prog_data['x_positions'].tolist()
@@ -662,7 +612,7 @@ class ActualLoadAnalysis:
         self.ax_actual_load.clear()
         
         if self.actual_load_data:
-            self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data, color='#2196F3', linewidth=1.8, alpha=0.9)
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data, color='#2196F3', linewidth=1.8, alpha=0.9)
         
         if self.actual_load_data:
             self.set_xticks_for_line_numbers()
@@ -741,15 +691,18 @@ class ActualLoadAnalysis:
         if data is None or len(data) == 0:
             return prog_data.get('average', 0)
         
-        # 收集所有区间内的数据点
-        interval_data_points = []
+        # 累加所有区间内数据点的总和与点数（通过区间查询索引，无需拼接数据）
+        index = self.get_range_index(prog_data)
+        total_sum = 0.0
+        total_points = 0
         for start_idx, end_idx in intervals:
-            if 0 <= start_idx < len(data) and 0 <= end_idx < len(data):
-                interval_data_points.extend(data[start_idx:end_idx+1])
+            if 0 <= start_idx < len(data) and 0 <= end_idx < len(data) and start_idx <= end_idx:
+                total_sum += index.sum(start_idx, end_idx)
+                total_points += end_idx - start_idx + 1
         
         # 计算区间数据的平均值
-        if interval_data_points:
-            return float(np.mean(interval_data_points))
+        if total_points:
+            return total_sum / total_points
         else:
             return prog_data.get('average', 0)
     
@@ -1257,6 +1210,11 @@ class ActualLoadAnalysis:
         
         ttk.Button(button_frame, text="全选/取消", command=toggle_all, width=12).pack(side=tk.LEFT, padx=5)
         
+        # 并行进程数
+        ttk.Label(button_frame, text="并行进程数:").pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Spinbox(button_frame, from_=1, to=max(1, os.cpu_count() or 1), 
+                    textvariable=self.batch_workers, width=5).pack(side=tk.LEFT)
+        
         # 开始批量划分按钮
         def start_batch_analyze():
             # 收集选中的刀具 (program_id, tool_key)
@@ -1277,160 +1235,155 @@ class ActualLoadAnalysis:
                   width=10).pack(side=tk.RIGHT, padx=5)
     
     def execute_batch_analyze(self, selected_tools):
-        """执行批量自动划分
+        """执行批量自动划分（进程池并行，界面通过 root.after 轮询结果队列）
         
         Args:
             selected_tools: List[(program_id, tool_key)]
         """
-        # 保存当前程序和刀具
-        saved_program_id = self.current_program_id
-        saved_tool_key = self.current_tool_key
+        # 收集各刀具的分析数据（优先使用滤波数据）
+        tool_arrays = {}
+        for program_id, tool_key in selected_tools:
+            prog_data = self.programs_data.get(program_id, {}).get(tool_key)
+            if prog_data is None:
+                continue
+            if prog_data.get('is_filtered') and prog_data.get('filtered_data') is not None:
+                analysis_data = prog_data['filtered_data']
+            else:
+                analysis_data = prog_data['data']
+            tool_arrays[(program_id, tool_key)] = np.asarray(analysis_data, dtype=np.float64)
+        
+        try:
+            max_workers = max(1, int(self.batch_workers.get()))
+        except (tk.TclError, ValueError):
+            max_workers = None
+        runner = auto_partition.BatchPartitionRunner(
+            tool_arrays, self.get_partitioner().settings(), max_workers=max_workers)
         
         # 创建进度窗口
         progress_window = tk.Toplevel(self.root)
         progress_window.title("批量自动划分")
-        progress_window.geometry("500x200")
+        progress_window.geometry("500x230")
         progress_window.transient(self.root)
         progress_window.grab_set()
         
         # 居中显示
         progress_window.update_idletasks()
         x = (progress_window.winfo_screenwidth() // 2) - 250
-        y = (progress_window.winfo_screenheight() // 2) - 100
-        progress_window.geometry(f"500x200+{x}+{y}")
+        y = (progress_window.winfo_screenheight() // 2) - 115
+        progress_window.geometry(f"500x230+{x}+{y}")
         
         # 进度信息
         info_frame = ttk.Frame(progress_window, padding="20")
         info_frame.pack(fill=tk.BOTH, expand=True)
         
-        status_label = tk.Label(info_frame, text=f"正在批量划分，共 {len(selected_tools)} 个刀具...", 
+        status_label = tk.Label(info_frame, 
+                               text=f"正在批量划分，共 {len(tool_arrays)} 个刀具（{runner.worker_count} 个进程）...", 
                                font=('Microsoft YaHei', 11))
         status_label.pack(pady=10)
         
-        progress_bar = ttk.Progressbar(info_frame, mode='determinate', length=400, maximum=len(selected_tools))
+        progress_bar = ttk.Progressbar(info_frame, mode='determinate', length=400, maximum=max(1, len(tool_arrays)))
         progress_bar.pack(pady=10)
         
         detail_label = tk.Label(info_frame, text="", font=('Microsoft YaHei', 9), fg='gray')
         detail_label.pack(pady=5)
         
+        def cancel_batch():
+            runner.cancel()
+            cancel_button.config(state=tk.DISABLED)
+            status_label.config(text="正在取消，等待运行中的刀具完成...")
+        
+        cancel_button = ttk.Button(info_frame, text="取消", command=cancel_batch, width=10)
+        cancel_button.pack(pady=5)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel_batch)
+        
         # 统计信息
-        success_count = 0
-        fail_count = 0
+        stats = {'success': 0, 'fail': 0, 'done': 0}
         fail_list = []
         
-        # 逐个处理
-        for idx, (program_id, tool_key) in enumerate(selected_tools):
-            try:
-                # 更新显示
-                program_name = self.program_mapping[program_id]['name']
-                # 从tool_key中提取tool_id用于显示
-                tool_id_display = tool_key.rsplit('_', 1)[0] if '_' in tool_key else tool_key
-                detail_label.config(text=f"正在处理: {program_name} - {tool_id_display} ({idx+1}/{len(selected_tools)})")
-                progress_window.update()
-                
-                # 切换到该刀具
-                self.current_program_id = program_id
-                self.current_tool_key = tool_key
-                
-                # 加载数据
-                prog_data = self.programs_data[program_id][tool_key]
-                self.actual_load_data = prog_data['data'] if isinstance(prog_data['data'], list) else prog_data['data'].tolist()
-                self.actual_load_line_numbers = prog_data['line_numbers'] if isinstance(prog_data['line_numbers'], list) else prog_data['line_numbers'].tolist()
-                self.actual_load_point_indices = prog_data['point_indices'] if isinstance(prog_data['point_indices'], list) else prog_data['point_indices'].tolist()
-                self.actual_load_x_positions = prog_data['x_positions'] if isinstance(prog_data['x_positions'], list) else prog_data['x_positions'].tolist()
-                self.actual_load_unique_line_numbers = prog_data['unique_line_numbers'] if isinstance(prog_data['unique_line_numbers'], list) else prog_data['unique_line_numbers'].tolist()
-                self.filtered_data = prog_data.get('filtered_data')
-                self.is_filtered = prog_data.get('is_filtered', False)
-                
-                # 确定使用原始数据还是滤波数据
-                if self.is_filtered and self.filtered_data is not None:
-                    analysis_data = self.filtered_data
-                else:
-                    analysis_data = self.actual_load_data
-                
-                # 自动标定参数
-                params = self.auto_calibrate_params(analysis_data)
-                
-                # 生成候选区间
-                ivs = self.propose_intervals_auto(
-                    analysis_data,
-                    params['abs_thr'],
-                    params['rel_thr'],
-                    params['min_len'],
-                    params['slope_thr']
-                )
+        def tool_display_name(key):
+            program_id, tool_key = key
+            program_name = self.program_mapping[program_id]['name']
+            # 从tool_key中提取tool_id用于显示
+            tool_id_display = tool_key.rsplit('_', 1)[0] if '_' in tool_key else tool_key
+            return f"{program_name} - {tool_id_display}"
+        
+        def poll_results():
+            finished = None
+            while True:
+                try:
+                    message = runner.results.get_nowait()
+                except queue.Empty:
+                    break
                 
-                # 如果没有找到区间，尝试降低灵敏度再试一次
-                if not ivs:
-                    original_sensitivity = self.auto_sensitivity.get()
-                    self.auto_sensitivity.set(original_sensitivity * 0.8)
-                    params = self.auto_calibrate_params(analysis_data)
-                    ivs = self.propose_intervals_auto(
-                        analysis_data,
-                        params['abs_thr'],
-                        params['rel_thr'],
-                        params['min_len'],
-                        params['slope_thr']
-                    )
-                    self.auto_sensitivity.set(original_sensitivity)
+                if message[0] == 'finished':
+                    finished = message
+                    break
                 
-                if ivs:
-                    # 保存区间结果
-                    prog_data['intervals'] = ivs
-                    prog_data['interval_values'] = []
-                    
-                    # 计算区间均值
-                    for start_idx, end_idx in ivs:
-                        if start_idx < len(analysis_data) and end_idx < len(analysis_data):
-                            interval_data = analysis_data[start_idx:end_idx+1]
-                            interval_avg = np.mean(interval_data)
-                            prog_data['interval_values'].append(interval_avg)
-                    
-                    success_count += 1
+                key = message[1]
+                stats['done'] += 1
+                if message[0] == 'done' and message[2][0]:
+                    # 保存区间结果与区间均值
+                    prog_data = self.programs_data[key[0]][key[1]]
+                    prog_data['intervals'], prog_data['interval_values'] = message[2]
+                    stats['success'] += 1
+                elif message[0] == 'done':
+                    stats['fail'] += 1
+                    fail_list.append(tool_display_name(key))
                 else:
-                    fail_count += 1
-                    fail_list.append(f"{program_name} - {tool_id_display}")
+                    stats['fail'] += 1
+                    fail_list.append(f"{tool_display_name(key)} (错误: {message[2]})")
                 
-            except Exception as e:
-                fail_count += 1
-                fail_list.append(f"{program_name} - {tool_id_display} (错误: {str(e)})")
+                progress_bar['value'] = stats['done']
+                detail_label.config(text=f"已完成: {tool_display_name(key)} ({stats['done']}/{len(tool_arrays)})")
             
-            # 更新进度条
-            progress_bar['value'] = idx + 1
-            progress_window.update()
-        
-        # 恢复原来的程序和刀具
-        if saved_program_id and saved_tool_key:
-            self.current_program_id = saved_program_id
-            self.current_tool_key = saved_tool_key
-            # 重新加载界面
-            if saved_program_id in self.programs_data and saved_tool_key in self.programs_data[saved_program_id]:
-                prog_data = self.programs_data[saved_program_id][saved_tool_key]
-                self.load_program_data_to_ui(prog_data)
-        
-        # 关闭进度窗口
-        progress_window.destroy()
-        
-        # 更新所有刀具选择器的显示（显示✓标记）
-        for program_id in self.program_mapping.keys():
-            self.update_tool_selector(program_id, preserve_selection=True)
-        
-        # 显示结果
-        result_msg = f"✓ 批量自动划分完成！\n\n"
-        result_msg += f"成功: {success_count} 个刀具\n"
-        if fail_count > 0:
-            result_msg += f"失败: {fail_count} 个刀具\n\n"
-            result_msg += "失败的刀具：\n"
-            for fail_item in fail_list[:10]:  # 最多显示10个
-                result_msg += f"  • {fail_item}\n"
-            if len(fail_list) > 10:
-                result_msg += f"  ... 还有 {len(fail_list) - 10} 个\n"
-        
-        messagebox.showinfo("批量划分完成", result_msg)
-        self.status_var_actual_load.set(f"✓ 批量划分完成：成功 {success_count} 个，失败 {fail_count} 个")
-        
-        # 刷新稳态区间汇总显示
-        self.update_all_intervals_summary()
+            if finished is None:
+                self.root.after(50, poll_results)
+            else:
+                finish_batch(finished[1])
+        
+        def finish_batch(cancelled):
+            # 刷新当前刀具的界面（其区间可能已更新）
+            if self.current_program_id and self.current_tool_key:
+                if self.current_program_id in self.programs_data and self.current_tool_key in self.programs_data[self.current_program_id]:
+                    prog_data = self.programs_data[self.current_program_id][self.current_tool_key]
+                    self.load_program_data_to_ui(prog_data)
+            
+            # 关闭进度窗口
+            progress_window.destroy()
+            
+            # 更新所有刀具选择器的显示（显示✓标记）
+            for program_id in self.program_mapping.keys():
+                self.update_tool_selector(program_id, preserve_selection=True)
+            
+            success_count = stats['success']
+            fail_count = stats['fail']
+            
+            # 显示结果
+            result_msg = "批量自动划分已取消。\n\n" if cancelled else "✓ 批量自动划分完成！\n\n"
+            result_msg += f"成功: {success_count} 个刀具\n"
+            if cancelled:
+                result_msg += f"未处理: {len(tool_arrays) - stats['done']} 个刀具\n"
+            if fail_count > 0:
+                result_msg += f"失败: {fail_count} 个刀具\n\n"
+                result_msg += "失败的刀具：\n"
+                for fail_item in fail_list[:10]:  # 最多显示10个
+                    result_msg += f"  • {fail_item}\n"
+                if len(fail_list) > 10:
+                    result_msg += f"  ... 还有 {len(fail_list) - 10} 个\n"
+            
+            messagebox.showinfo("批量划分完成", result_msg)
+            self.status_var_actual_load.set(f"✓ 批量划分完成：成功 {success_count} 个，失败 {fail_count} 个")
+            
+            # 刷新稳态区间汇总显示
+            self.update_all_intervals_summary()
+        
+        try:
+            runner.start()
+        except Exception as e:
+            progress_window.destroy()
+            messagebox.showerror("批量划分错误", f"启动并行划分失败:\n{str(e)}")
+            return
+        self.root.after(50, poll_results)
     
     def show_adjustment_help(self):
         """显示微调功能帮助"""
@@ -1629,6 +1582,21 @@ class ActualLoadAnalysis:
         canvas.bind("<Shift-Button-4>", _on_shift_mousewheel)
         canvas.bind("<Shift-Button-5>", _on_shift_mousewheel)
 
+    def create_when_shown(self, widget, create):
+        """widget 首次显示（<Map>）后在空闲时调用 create"""
+        def on_map(event):
+            if event.widget is widget:
+                widget.unbind('<Map>', bind_id)
+                self.root.after_idle(create)
+        bind_id = widget.bind('<Map>', on_map, add='+')
+
+    def create_figure(self):
+        """创建图表（只执行一次）；加载数据前也会调用，保证图表已存在"""
+        if hasattr(self, 'fig_actual_load'):
+            return
+        self.init_figure()
+        self.adjust_figure_size()
+
     def init_figure(self):
         """初始化图表 - 清新浅色主题"""
         # 设置matplotlib默认样式
@@ -1672,7 +1640,7 @@ class ActualLoadAnalysis:
         canvas_container.pack(fill=tk.BOTH, expand=True)
         
         # 创建画布
-        self.canvas_actual_load = FigureCanvasTkAgg(self.fig_actual_load, master=canvas_container)
+        self.canvas_actual_load = backend_tkagg.FigureCanvasTkAgg(self.fig_actual_load, master=canvas_container)
         canvas_widget = self.canvas_actual_load.get_tk_widget()
         canvas_widget.pack(fill=tk.BOTH, expand=True, padx=0, pady=0)
         
@@ -1728,7 +1696,7 @@ class ActualLoadAnalysis:
         self.add_interval_button.pack(side=tk.LEFT, padx=3, pady=3)
         
         # 添加导航工具栏到右上角
-        self.toolbar_actual_load = NavigationToolbar2Tk(self.canvas_actual_load, toolbar_frame)
+        self.toolbar_actual_load = backend_tkagg.NavigationToolbar2Tk(self.canvas_actual_load, toolbar_frame)
         self.toolbar_actual_load.update()
         # 调整工具栏样式使其更紧凑
         self.toolbar_actual_load.config(bg='#ffffff')
@@ -1785,8 +1753,8 @@ class ActualLoadAnalysis:
         try:
             nyq = 0.5 * fs
             normal_cutoff = cutoff / nyq
-            b, a = butter(order, normal_cutoff, btype='low', analog=False)
-            y = filtfilt(b, a, data)
+            b, a = scipy_signal.butter(order, normal_cutoff, btype='low', analog=False)
+            y = scipy_signal.filtfilt(b, a, data)
             return y
         except ImportError:
             messagebox.showwarning("警告", "未找到SciPy库，使用简单的移动平均滤波")
@@ -1867,10 +1835,10 @@ class ActualLoadAnalysis:
             
             # 绘制最终结果
             self.ax_actual_load.clear()
-            self.ax_actual_load.plot(self.actual_load_x_positions, data_array, 
-                                    color='#90caf9', linewidth=1.0, alpha=0.6, label='原始数据')
-            self.ax_actual_load.plot(self.actual_load_x_positions, filtered_data, 
-                                    color='#f44336', linewidth=2.0, label='滤波后数据', alpha=0.85)
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, data_array, 
+                                                     color='#90caf9', linewidth=1.0, alpha=0.6, label='原始数据')
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, filtered_data, 
+                                                     color='#f44336', linewidth=2.0, label='滤波后数据', alpha=0.85)
             self.ax_actual_load.set_title('负载电流数据 (智能滤波)')
             self.ax_actual_load.set_xlabel('程序行号位置')
             self.ax_actual_load.set_ylabel('电流值')
@@ -1920,293 +1888,61 @@ class ActualLoadAnalysis:
         else:
             return self.actual_load_data
     
+    def get_range_index(self, prog_data):
+        """获取程序/刀具当前分析数据（滤波优先）的区间查询索引
+        
+        索引与数据对象绑定，切换数据源或重新滤波后会自动重建并缓存到 prog_data 中
+        """
+        if prog_data.get('is_filtered') and prog_data.get('filtered_data') is not None:
+            key, data = 'filtered_range_index', prog_data['filtered_data']
+        else:
+            key, data = 'range_index', prog_data['data']
+        prog_data[key] = range_query.index_for(data, prog_data.get(key))
+        return prog_data[key]
+    
+    def bind_range_index(self, prog_data):
+        """actual_load_data 取自 prog_data['data'] 后调用：复用该数据已构建的区间查询索引，
+        并与 actual_load_data 绑定（actual_load_data 被替换后按对象判断自动重建）"""
+        prog_data['range_index'] = range_query.index_for(prog_data['data'], prog_data.get('range_index'))
+        self.actual_load_range_index = prog_data['range_index'].bound_to(self.actual_load_data)
+    
+    def get_current_range_index(self):
+        """获取当前使用数据（原始或滤波后）的区间查询索引"""
+        if self.is_filtered and self.filtered_data is not None:
+            self.filtered_range_index = range_query.index_for(self.filtered_data, self.filtered_range_index)
+            return self.filtered_range_index
+        
+        self.actual_load_range_index = range_query.index_for(self.actual_load_data, self.actual_load_range_index)
+        return self.actual_load_range_index
+    
+    def get_partitioner(self):
+        """根据当前界面设置（灵敏度、区间模式、覆盖率等）构建自动划分器"""
+        try:
+            sensitivity = float(self.auto_sensitivity.get())
+        except Exception:
+            sensitivity = 1.0
+        return auto_partition.AutoIntervalPartitioner(
+            auto_sensitivity=sensitivity,
+            interval_mode=self.interval_mode,
+            target_coverage=self.target_coverage,
+            max_merge_gap_ratio=self.max_merge_gap_ratio,
+            aggressive_merge_gap_ratio=self.aggressive_merge_gap_ratio,
+            expand_ratio_for_coverage=self.expand_ratio_for_coverage
+        )
+    
     def estimate_noise_level(self, data):
         """估计数据的噪声水平，使用相邻点差值的标准差"""
-        if len(data) < 3:
-            return 0
-        diffs = np.abs(np.diff(data))
-        return np.std(diffs)
+        return self.get_partitioner().estimate_noise_level(data)
     
     # ========== 自动参数标定与自动分析方法 ==========
     
     def auto_calibrate_params(self, data):
-        """自动参数标定 - 从数据自身估计合适的阈值和最小区间长度（改进版）
-        
-        参数:
-            data: 数据序列（列表或numpy数组）
-        
-        返回:
-            dict: 包含 abs_thr, rel_thr, min_len, slope_thr 的字典
-        """
-        y = np.asarray(data)
-        if len(y) < 10:
-            # 数据太少，返回默认值
-            return dict(abs_thr=0.05, rel_thr=0.05, min_len=min(100, len(y)//2), slope_thr=0.01)
-        
-        # 改进的噪声估计：使用分位数方法更鲁棒
-        dy = np.diff(y)
-        if len(dy) > 4:
-            # 使用第10和第90百分位数之间的差值估计噪声范围
-            p10, p90 = np.percentile(np.abs(dy), [10, 90])
-            # 使用MAD方法
-            mad_dy = np.median(np.abs(dy - np.median(dy)))
-            # 综合两种方法
-            sigma_d = max(1.4826 * mad_dy, (p90 - p10) / 2.56) if mad_dy > 1e-9 else np.std(dy)
-        else:
-            sigma_d = np.std(dy)
-        
-        if sigma_d < 1e-9:
-            sigma_d = 1e-9
-        
-        # 使用数据的中位数而非绝对值的中位数，更准确反映信号强度
-        med_y = np.median(y)
-        if abs(med_y) < 1e-9:
-            med_y = np.mean(np.abs(y))
-            if med_y < 1e-9:
-                med_y = 1e-9
-        
-        # 获取灵敏度参数（用户可通过UI调整）
-        # 为了让滑块标度为1时不显得过于灵敏，使用对原始灵敏度的平滑映射：
-        # effective_s = 1 + 0.5*(s_raw - 1)
-        # 这样滑块偏离1时对阈值的影响减弱一半，用户仍可通过扩大滑块范围进行调节
-        s_raw = self.auto_sensitivity.get()
-        try:
-            s_raw = float(s_raw)
-        except Exception:
-            s_raw = 1.0
-        # 新映射：使得滑块为1时的实际灵敏度为0.5
-        # effective_s = 0.5 * s_raw
-        effective_s = 0.5 * s_raw
-        # 防止过小或为0
-        s = max(0.1, effective_s)
-        
-        # 自适应阈值系数：根据数据的变异系数(CV)调整
-        cv = sigma_d / (abs(med_y) + 1e-9)
-        # CV越大，说明数据波动越大，需要放宽阈值
-        k_abs_adaptive = 3.0 + min(2.0, cv * 10)  # 3.0-5.0之间自适应
-        k_rel_adaptive = 4.0 + min(3.0, cv * 15)  # 4.0-7.0之间自适应
-        
-        # 计算绝对阈值
-        abs_thr = (k_abs_adaptive / s) * sigma_d
-        
-        # 计算相对阈值
-        rel_thr = np.clip((k_rel_adaptive / s) * (sigma_d / abs(med_y)), 0.015, 0.35)
-        
-        # 改进的最小区间长度估计
-        run_mask = np.abs(dy) <= sigma_d * 1.5  # 使用稍宽松的阈值统计run-length
-        runs = []
-        cnt = 1
-        for i in range(len(run_mask)):
-            if run_mask[i]:
-                cnt += 1
-            else:
-                if cnt > 1:  # 只记录有效的run
-                    runs.append(cnt)
-                cnt = 1
-        if cnt > 1:
-            runs.append(cnt)
-        
-        program_length = len(y)
-        
-        # 更智能的最小区间长度计算
-        if len(runs) > 10:
-            # 使用run-length的统计信息
-            stat_min_len = int(np.percentile(runs, 60))  # 降低到P60
-            # 根据程序长度和run统计动态调整
-            adaptive_factor = np.clip(0.8 + (program_length / 100000), 0.8, 2.0)
-            min_len_base = int(stat_min_len * adaptive_factor)
-        else:
-            # 如果run统计不够，使用基于程序长度的估计
-            # 短程序用更小的比例，长程序用更大的比例
-            if program_length < 10000:
-                percentage = 0.01  # 1%
-            elif program_length < 50000:
-                percentage = 0.012  # 1.2%
-            else:
-                percentage = 0.015  # 1.5%
-            min_len_base = int(program_length * percentage)
-        
-        # 动态边界：根据程序长度设置
-        if program_length < 5000:
-            min_bound = 50
-            max_bound = 500
-        elif program_length < 20000:
-            min_bound = 100
-            max_bound = 800
-        elif program_length < 100000:
-            min_bound = 200
-            max_bound = 1200
-        else:
-            min_bound = 300
-            max_bound = 2000
-        
-        min_len = int(np.clip(min_len_base, min_bound, max_bound))
-        
-        # 斜率阈值：也需要根据数据特征自适应
-        slope_thr = (1.5 * k_abs_adaptive / s) * sigma_d
-        
-        return dict(abs_thr=abs_thr, rel_thr=rel_thr, min_len=min_len, slope_thr=slope_thr)
+        """自动参数标定 - 从数据自身估计合适的阈值和最小区间长度（见 auto_partition）"""
+        return self.get_partitioner().auto_calibrate_params(data)
     
     def propose_intervals_auto(self, data, abs_thr, rel_thr, min_len, slope_thr):
-        """候选生成 - 无依赖版本，基于滑窗平稳性判定 + 贪心扩张
-        
-        参数:
-            data: 数据序列
-            abs_thr: 绝对阈值
-            rel_thr: 相对阈值
-            min_len: 最小区间长度
-            slope_thr: 斜率阈值
-        
-        返回:
-            List[Tuple[int, int]]: 稳态区间列表
-        """
-        y = np.asarray(data)
-        n = len(y)
-        if n == 0:
-            return []
-        
-        intervals = []
-        left = 0
-        
-        while left < n:
-            min_deque = collections.deque()
-            max_deque = collections.deque()
-            right = left
-            sum_y = 0.0
-            # 线性回归增量统计
-            sum_x = sum_x2 = sum_xy = 0.0
-            
-            while right < n:
-                val = y[right]
-                sum_y += val
-                
-                # 更新队列
-                while min_deque and min_deque[-1] > val:
-                    min_deque.pop()
-                while max_deque and max_deque[-1] < val:
-                    max_deque.pop()
-                min_deque.append(val)
-                max_deque.append(val)
-                
-                # 增量回归（x用索引）
-                x = right - left + 1
-                sum_x += x
-                sum_x2 += x * x
-                sum_xy += x * val
-                
-                length = right - left + 1
-                mean = sum_y / length
-                rng = max_deque[0] - min_deque[0]
-                
-                # slope ~ (n*sum_xy - sum_x*sum_y)/(n*sum_x2 - sum_x^2)
-                denom = (length * sum_x2 - sum_x * sum_x)
-                if abs(denom) > 1e-9:
-                    slope = abs((length * sum_xy - sum_x * sum_y) / denom)
-                else:
-                    slope = 0.0
-                
-                cond_abs = rng <= abs_thr
-                cond_rel = rng <= rel_thr * max(1e-9, abs(mean))
-                cond_slp = slope <= slope_thr
-                
-                if (cond_abs or cond_rel) and cond_slp:
-                    right += 1
-                else:
-                    break
-            
-            if right - left >= min_len:
-                intervals.append((left, right - 1))
-            
-            left = max(right, left + 1)
-        
-        # 记录原始检测到的小区间（在任何后处理前）
-        raw_intervals = intervals.copy()
-
-        # 合并近邻 & 去重重叠（复用已有方法）
-        if intervals:
-            # 动态计算合并间隙：根据最小区间长度和数据特征
-            # 对于稳态区间，小间隙应该被合并
-            max_gap = max(1, int(0.15 * min_len))  # 从20%降至15%，更积极地合并
-            intervals = self.merge_close_intervals(intervals, max_gap, min_len)
-            intervals = self.adjust_overlapping_intervals(intervals, overlap_tolerance=10)
-
-            # 自动裁边（使用适中的阈值，避免过度裁剪）
-            trimmed = []
-            for s, e in intervals:
-                rs, re = self.reduce_interval_boundaries(
-                    data=y, start=s, end=e,
-                    threshold=rel_thr * 0.7,  # 从0.6提高到0.7，减少过度裁剪
-                    abs_threshold=abs_thr * 0.7  # 从0.6提高到0.7
-                )
-                if re - rs + 1 >= min_len:
-                    trimmed.append((rs, re))
-            intervals = trimmed
-
-        # 如果识别到很多短小区间，尝试按更大粒度分组并扩展区间边界
-        # 目的：当算法捕获到许多只覆盖波峰的小区间时，合并为更符合人工标注的大区块
-        try:
-            if intervals:
-                avg_len = np.mean([e - s + 1 for s, e in intervals])
-                # 条件：平均区间长度小于2倍最小长度且区间数量较多
-                if avg_len < 2 * min_len and len(intervals) >= 3:
-                    # 计算自适应分组间隙（受程序长度影响）
-                    group_gap = max(int(0.2 * min_len), int(0.005 * n), 50)
-                    # 进一步限制最大组间隙，避免全局合并
-                    group_gap = min(group_gap, int(0.5 * n))
-                    intervals = self.group_intervals_into_blocks(intervals, group_gap)
-
-                    # 对每个分组扩展边界，尝试包含低谷区域使平均功率更接近真实
-                    expanded = []
-                    for s, e in intervals:
-                        rs, re = self.expand_block_edges(y, s, e, max_expand=int(0.5 * min_len),
-                                                         rel_thr=rel_thr, abs_thr=abs_thr)
-                        # 保证扩展后仍满足最小长度要求
-                        if re - rs + 1 >= min_len:
-                            expanded.append((rs, re))
-                        else:
-                            expanded.append((s, e))
-                    intervals = expanded
-        except Exception:
-            # 若任何步骤异常，保留之前的 intervals
-            pass
-
-        # 计算有效灵敏度（与 auto_calibrate_params 保持一致的映射）
-        try:
-            s_raw = float(getattr(self, 'auto_sensitivity').get())
-        except Exception:
-            s_raw = 1.0
-        # 映射与 auto_calibrate_params 保持一致：滑块1对应effective_s=0.5
-        effective_s = 0.5 * s_raw
-
-        # 如果用户希望保留所有检测到的小区间（更敏感模式），直接返回 raw_intervals
-        mode = getattr(self, 'interval_mode', 'large_coverage')
-        if mode == 'all_small':
-            # 只保留满足最小长度的原始区间，并按起点排序
-            filtered = [iv for iv in raw_intervals if iv[1] - iv[0] + 1 >= min_len]
-            filtered.sort(key=lambda x: x[0])
-            return filtered
-
-        # large_coverage 模式：在已有处理的基础上，如果覆盖率仍然低，尝试按覆盖率合并
-        if mode == 'large_coverage':
-            total_cov = 0
-            if intervals:
-                total_cov = sum(e - s + 1 for s, e in intervals) / float(n)
-            # 如果覆盖率低于目标，逐步合并最近的区间直到达到目标或没有更多可合并的间隙
-            target = getattr(self, 'target_coverage', 0.65)
-            # 当灵敏度较高（effective_s >= 1），降低合并目标以避免过度合并
-            if effective_s >= 1.0:
-                # 高灵敏度时，只尝试达到较低的覆盖率上限
-                merge_target = max(0.2, target * 0.6)
-            else:
-                # 低灵敏度时，允许接近目标覆盖率
-                merge_target = target
-
-            if total_cov < merge_target and intervals:
-                # 传入灵敏度因子（倒数）以控制合并/扩展的激进程度
-                sensitivity_factor = max(0.2, 1.0 / effective_s)
-                intervals = self.merge_intervals_until_coverage(intervals, n, merge_target, getattr(self, 'max_merge_gap_ratio', 0.02), sensitivity_factor)
-
-        return intervals
+        """候选生成 - 基于滑窗平稳性判定 + 贪心扩张（见 auto_partition）"""
+        return self.get_partitioner().propose_intervals_auto(data, abs_thr, rel_thr, min_len, slope_thr)
     
     def analyze_auto(self):
         """一键全自动划分入口 - 零参数可用"""
@@ -2331,262 +2067,16 @@ class ActualLoadAnalysis:
         
     def merge_close_intervals(self, intervals, max_gap, min_length=1):
         """合并间隔小于或等于max_gap的相邻区间，并过滤掉小于min_length的区间"""
-        if not intervals or len(intervals) < 2:
-            # 过滤单个区间的长度
-            return [iv for iv in intervals if (iv[1] - iv[0] + 1) >= min_length]
-            
-        # 按起始位置排序
-        intervals.sort(key=lambda x: x[0])
-        
-        merged = []
-        current_start, current_end = intervals[0]
-        
-        for next_start, next_end in intervals[1:]:
-            if next_start - current_end <= max_gap + 1:
-                # 合并区间
-                current_end = max(current_end, next_end)
-            else:
-                # 保存当前区间（仅保存满足最小长度的区间）
-                if current_end - current_start + 1 >= min_length:
-                    merged.append((current_start, current_end))
-                current_start, current_end = next_start, next_end
-                
-        # 添加最后一个区间（仅当满足最小长度时）
-        if current_end - current_start + 1 >= min_length:
-            merged.append((current_start, current_end))
-        
-        return merged
+        return self.get_partitioner().merge_close_intervals(intervals, max_gap, min_length)
     
     def adjust_overlapping_intervals(self, intervals, overlap_tolerance=10):
         """调整重叠的区间边界，消除重叠"""
-        if not intervals or len(intervals) < 2:
-            return intervals
-        intervals.sort(key=lambda x: x[0])
-        adjusted = []
-        for interval in intervals:
-            curr_start, curr_end = interval
-            if not adjusted:
-                adjusted.append((curr_start, curr_end))
-                continue
-            prev_start, prev_end = adjusted[-1]
-            if curr_start <= prev_end:
-                overlap_midpoint = (prev_end + curr_start) // 2
-                new_prev_end = overlap_midpoint
-                new_curr_start = overlap_midpoint + 1
-                prev_valid = (new_prev_end >= prev_start)
-                curr_valid = (new_curr_start <= curr_end)
-                if prev_valid and curr_valid:
-                    adjusted[-1] = (prev_start, new_prev_end)
-                    adjusted.append((new_curr_start, curr_end))
-                elif prev_valid and not curr_valid:
-                    adjusted[-1] = (prev_start, new_prev_end)
-                elif not prev_valid and curr_valid:
-                    adjusted[-1] = (new_curr_start, curr_end)
-                else:
-                    prev_length = prev_end - prev_start + 1
-                    curr_length = curr_end - curr_start + 1
-                    if curr_length > prev_length:
-                        adjusted[-1] = (curr_start, curr_end)
-            else:
-                adjusted.append((curr_start, curr_end))
-        validated = []
-        for start, end in adjusted:
-            if start <= end:
-                validated.append((start, end))
-        return validated
-
-    def group_intervals_into_blocks(self, intervals, max_gap):
-        """将多个短小且彼此接近的区间分组为更大的区块。
-
-        intervals: 已排序或未排序的区间列表 [(s,e),...]
-        max_gap: 当两个区间之间的间隙 <= max_gap 时，将它们视为同一组
-        返回合并后的区块列表
-        """
-        if not intervals:
-            return []
-        intervals = sorted(intervals, key=lambda x: x[0])
-        grouped = []
-        cur_s, cur_e = intervals[0]
-        for s, e in intervals[1:]:
-            gap = s - cur_e - 1
-            if gap <= max_gap:
-                # 合并到当前区块
-                cur_e = max(cur_e, e)
-            else:
-                grouped.append((cur_s, cur_e))
-                cur_s, cur_e = s, e
-        grouped.append((cur_s, cur_e))
-        return grouped
-
-    def expand_block_edges(self, data, start, end, max_expand=100, rel_thr=0.05, abs_thr=0.05):
-        """在不显著增加波动范围的前提下向外扩展区块边界。
-
-        data: numpy array
-        start,end: 原区块索引
-        max_expand: 单侧最大扩展点数
-        rel_thr, abs_thr: 扩展时允许的相对/绝对波动阈值（与propose_intervals_auto传入的一致）
-        返回扩展后的 (new_start, new_end)
-        """
-        n = len(data)
-        new_s, new_e = start, end
-        baseline = np.mean(data[start:end+1])
-
-        # 向左扩展
-        left_expand = 0
-        for i in range(1, max_expand+1):
-            idx = start - i
-            if idx < 0:
-                break
-            seg = data[idx:new_e+1]
-            seg_mean = np.mean(seg)
-            seg_rng = np.max(seg) - np.min(seg)
-            cond_rel = (seg_rng <= rel_thr * max(1e-9, abs(seg_mean)))
-            cond_abs = (seg_rng <= abs_thr)
-            if cond_rel or cond_abs:
-                new_s = idx
-                left_expand += 1
-            else:
-                break
-
-        # 向右扩展
-        right_expand = 0
-        for i in range(1, max_expand+1):
-            idx = end + i
-            if idx >= n:
-                break
-            seg = data[new_s:idx+1]
-            seg_mean = np.mean(seg)
-            seg_rng = np.max(seg) - np.min(seg)
-            cond_rel = (seg_rng <= rel_thr * max(1e-9, abs(seg_mean)))
-            cond_abs = (seg_rng <= abs_thr)
-            if cond_rel or cond_abs:
-                new_e = idx
-                right_expand += 1
-            else:
-                break
-
-        return max(0, new_s), min(n-1, new_e)
-
-    def merge_intervals_until_coverage(self, intervals, data_len, target_coverage, max_merge_gap_ratio=0.02, sensitivity_factor=1.0):
-        """按覆盖率合并区间：优先合并间隙最小的相邻区间，直到达到目标覆盖率或无法继续合并。
-
-        intervals: List[(s,e)] 已排序或未排序
-        data_len: 数据总长度
-        target_coverage: 目标覆盖率，0-1
-        max_merge_gap_ratio: 允许合并的最大间隙比例（相对于数据长度），用于避免跨越巨大空白
-        返回合并后的区间列表
-        """
-        if not intervals:
-            return []
-
-        intervals = sorted(intervals, key=lambda x: x[0])
-
-        def coverage(iv_list):
-            return sum(e - s + 1 for s, e in iv_list) / float(max(1, data_len))
-
-        cur_cov = coverage(intervals)
-        # 根据灵敏度调整允许的合并间隙（灵敏度因子>1时更容易合并）
-        allowed_gap = max(1, int(max_merge_gap_ratio * data_len * sensitivity_factor))
-
-        # 防止过度跨域合并，设置一个硬限制（最大允许合并间隙倍数）
-        max_allowed_gap = max(allowed_gap, int(0.01 * data_len))
-        # 根据灵敏度缩放上限
-        max_allowed_gap = int(max(max_allowed_gap, allowed_gap * 10 * sensitivity_factor))
-
-        # 逐步合并最小间隙的相邻区间（第一阶段：保守合并）
-        while cur_cov < target_coverage and len(intervals) > 1:
-            # 计算相邻间隙
-            gaps = []  # (gap, idx)
-            for i in range(len(intervals) - 1):
-                s1, e1 = intervals[i]
-                s2, e2 = intervals[i + 1]
-                gap = s2 - e1 - 1
-                gaps.append((gap, i))
-
-            # 找到最小间隙对
-            gaps.sort(key=lambda x: x[0])
-            if not gaps:
-                break
-
-            smallest_gap, idx = gaps[0]
-
-            # 如果最小间隙太大（超过阈值的若干倍），停止合并以避免合并不相干区域
-            if smallest_gap > max_allowed_gap:
-                break
-
-            # 合并 idx 和 idx+1
-            s1, e1 = intervals[idx]
-            s2, e2 = intervals[idx + 1]
-            new_iv = (s1, e2)
-
-            # 重建列表
-            new_list = intervals[:idx] + [new_iv] + intervals[idx + 2:]
-            intervals = new_list
-
-            # 更新覆盖率
-            cur_cov = coverage(intervals)
-
-        # 如果第一阶段仍未达到目标，进入第二阶段：更激进的合并与扩展
-        if cur_cov < target_coverage:
-            # 允许更大的间隙进行合并（使用对象属性的aggressive比例作为建议）
-            try:
-                aggressive_ratio = getattr(self, 'aggressive_merge_gap_ratio', max_merge_gap_ratio * 2)
-            except Exception:
-                aggressive_ratio = max_merge_gap_ratio * 2
-            # 激进阶段也遵循灵敏度因子
-            max_allowed_gap = max(1, int(aggressive_ratio * data_len * sensitivity_factor))
-
-            # 继续合并最小间隙对，但不超过新的阈值
-            merged_flag = False
-            while cur_cov < target_coverage and len(intervals) > 1:
-                # 重新计算相邻间隙并选择最小的
-                gaps = []
-                for i in range(len(intervals) - 1):
-                    s1, e1 = intervals[i]
-                    s2, e2 = intervals[i + 1]
-                    gap = s2 - e1 - 1
-                    gaps.append((gap, i))
-
-                if not gaps:
-                    break
-                gaps.sort(key=lambda x: x[0])
-                smallest_gap, idx = gaps[0]
-                if smallest_gap > max_allowed_gap:
-                    break
-
-                # 合并邻区
-                s1, e1 = intervals[idx]
-                s2, e2 = intervals[idx + 1]
-                new_iv = (s1, e2)
-                intervals = intervals[:idx] + [new_iv] + intervals[idx + 2:]
-                cur_cov = coverage(intervals)
-                merged_flag = True
-
-            # 如果仍未满足覆盖率，尝试扩展每个区间的边界以包含更多点
-            if cur_cov < target_coverage:
-                try:
-                    expand_ratio = getattr(self, 'expand_ratio_for_coverage', 0.5)
-                except Exception:
-                    expand_ratio = 0.5
-
-                # 估计每侧最大扩展点数（基于平均区间长度或min_len），并按灵敏度放缩
-                avg_len = int(np.mean([e - s + 1 for s, e in intervals])) if intervals else 0
-                # 在低灵敏度时允许更大扩展；sensitivity_factor>1 表示更容易合并/扩展
-                max_expand = max(1, int(expand_ratio * max(avg_len, int(0.01 * data_len)) * sensitivity_factor))
-
-                expanded = []
-                for s, e in intervals:
-                    # 直接按最大扩展步数向外扩展（每侧扩展 max_expand 点），然后裁边到数据范围
-                    new_s = max(0, s - max_expand)
-                    new_e = min(data_len - 1, e + max_expand)
-                    expanded.append((new_s, new_e))
-
-                # 合并可能重叠的扩展区间
-                intervals = self.merge_close_intervals(expanded, max_gap=0, min_length=1)
-                cur_cov = coverage(intervals)
-
-        return intervals
-        
+        return self.get_partitioner().adjust_overlapping_intervals(intervals, overlap_tolerance)
+    
+    def reduce_interval_boundaries(self, data, start, end, threshold, abs_threshold, index=None):
+        """缩减区间边界以获得更紧密的稳态区间"""
+        return self.get_partitioner().reduce_interval_boundaries(data, start, end, threshold, abs_threshold, index)
+    
 
     def update_all_intervals_summary(self):
         """更新稳态区间详情，显示所有已划分的程序和刀具汇总信息"""
@@ -2745,6 +2235,7 @@ class ActualLoadAnalysis:
         data_len = len(analysis_data)
         line_len = len(self.actual_load_line_numbers)
         point_len = len(self.actual_load_point_indices)
+        index = self.get_current_range_index()
         
         valid_interval_count = 0  # 记录有效区间数量
         
@@ -2759,8 +2250,7 @@ class ActualLoadAnalysis:
             
             try:
                 # 计算区间平均值
-                interval_data = analysis_data[start_idx:end_idx+1]
-                interval_avg = np.mean(interval_data)
+                interval_avg = index.mean(start_idx, end_idx)
                 self.actual_load_interval_values.append(interval_avg)
                 
                 # 获取程序行号和行内索引
@@ -2809,27 +2299,23 @@ class ActualLoadAnalysis:
             return
         
         # 绘制所有数据点 - 使用鲜艳的蓝色
-        self.ax_actual_load.plot(self.actual_load_x_positions, self.actual_load_data,
-                                 color='#2196F3', linewidth=1.8, label='负载电流值', alpha=0.9)
+        plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.actual_load_data,
+                                                  color='#2196F3', linewidth=1.8, label='负载电流值', alpha=0.9)
         
         # 如果有滤波数据，也绘制滤波后的数据
         if self.is_filtered and self.filtered_data is not None:
-            self.ax_actual_load.plot(self.actual_load_x_positions, self.filtered_data,
-                                     color='#f44336', linewidth=2.0, label='滤波后数据', alpha=0.85)
+            plot_decimation.plot(self.ax_actual_load, self.actual_load_x_positions, self.filtered_data,
+                                                      color='#f44336', linewidth=2.0, label='滤波后数据', alpha=0.85)
         
         # 标记稳态区间
         if self.actual_load_intervals:
-            for start_idx, end_idx in self.actual_load_intervals:
-                if start_idx < 0 or end_idx >= len(self.actual_load_x_positions):
-                    continue
-                start_x = self.actual_load_x_positions[start_idx]
-                end_x = self.actual_load_x_positions[end_idx]
-                self.ax_actual_load.axvspan(start_x, end_x, alpha=0.25, color='#a5d6a7', 
-                                           edgecolor='#66bb6a', linewidth=1.5)
-                
-                # 添加纵向边界线
-                self.ax_actual_load.axvline(x=start_x, color='#43a047', linewidth=0.8, alpha=0.7)
-                self.ax_actual_load.axvline(x=end_x, color='#43a047', linewidth=0.8, alpha=0.7)
+            starts, ends, _ = interval_artists.interval_x_ranges(self.actual_load_intervals,
+                                                                 self.actual_load_x_positions)
+            interval_artists.span_collection(self.ax_actual_load, starts, ends, '#a5d6a7',
+                                             alpha=0.25, linewidth=1.5)
+            # 纵向边界线
+            interval_artists.boundary_collection(self.ax_actual_load, np.concatenate([starts, ends]),
+                                                 '#43a047', linewidth=0.8, alpha=0.7)
         
         # 已移除绝对阈值线的显示（基于输入参数）
         
@@ -2935,47 +2421,6 @@ class ActualLoadAnalysis:
         
         return intervals
 
-    def reduce_interval_boundaries(self, data, start, end, threshold, abs_threshold):
-        """缩减区间边界以获得更紧密的稳态区间 - 使用与copy3相同的算法"""
-        if end <= start:
-            return start, end
-        
-        window_data = data[start:end+1]
-        mean_val = np.mean(window_data)
-        
-        # 计算每个点到均值的偏差
-        deviations = []
-        for val in window_data:
-            if abs(mean_val) > 1e-10:
-                rel_dev = abs(val - mean_val) / abs(mean_val)
-            else:
-                rel_dev = 0
-            abs_dev = abs(val - mean_val)
-            deviations.append((rel_dev, abs_dev))
-        
-        # 从起点开始缩减 - 找到第一个偏差较小的点
-        new_start = start
-        for i in range(len(deviations)):
-            rel_dev, abs_dev = deviations[i]
-            if rel_dev <= threshold * 0.5 and abs_dev <= abs_threshold * 0.5:
-                new_start = start + i
-                break
-        
-        # 从终点开始缩减 - 找到最后一个偏差较小的点
-        new_end = end
-        for i in range(len(deviations) - 1, -1, -1):
-            rel_dev, abs_dev = deviations[i]
-            if rel_dev <= threshold * 0.5 and abs_dev <= abs_threshold * 0.5:
-                new_end = start + i
-                break
-        
-        # 确保起点不大于终点
-        if new_start > new_end:
-            new_start = start
-            new_end = end
-        
-        return new_start, new_end
-
     def plot_actual_load_data(self):
         """绘制实际负载数据和稳态区间"""
         # 先清除旧的分割点绘制对象（如果存在）
@@ -3009,10 +2454,10 @@ class ActualLoadAnalysis:
         # 绘制数据曲线
         if self.is_filtered and self.filtered_data is not None:
             original_data = self.actual_load_data
-            self.ax_actual_load.plot(x_values, original_data, color='#90caf9', alpha=0.5, linewidth=0.8, label='原始数据')
-            self.ax_actual_load.plot(x_values, current_data, color='#f44336', linewidth=2.0, label='滤波数据', alpha=0.85)
+            plot_decimation.plot(self.ax_actual_load, x_values, original_data, color='#90caf9', alpha=0.5, linewidth=0.8, label='原始数据')
+            plot_decimation.plot(self.ax_actual_load, x_values, current_data, color='#f44336', linewidth=2.0, label='滤波数据', alpha=0.85)
         else:
-            self.ax_actual_load.plot(x_values, current_data, color='#2196F3', linewidth=1.8, label='数据曲线', alpha=0.9)
+            plot_decimation.plot(self.ax_actual_load, x_values, current_data, color='#2196F3', linewidth=1.8, label='数据曲线', alpha=0.9)
         
         # 绘制稳态区间
         if self.current_intervals:
@@ -3020,7 +2465,7 @@ class ActualLoadAnalysis:
                 if start < len(current_data) and end < len(current_data):
                     interval_x = x_values[start:end+1]
                     interval_y = current_data[start:end+1] if isinstance(current_data, list) else current_data[start:end+1].tolist()
-                    self.ax_actual_load.plot(interval_x, interval_y, color='#66bb6a', linewidth=2.5, alpha=0.7)
+                    plot_decimation.plot(self.ax_actual_load, interval_x, interval_y, color='#66bb6a', linewidth=2.5, alpha=0.7)
         
         # 设置标题和标签
         ylabel = '电流 (A)'
@@ -3142,89 +2587,17 @@ class ActualLoadAnalysis:
         if not all_intervals_indices:
             return
         
-        # 按起始索引排序
-        all_intervals_indices.sort(key=lambda x: x[0])
-        
-        # 合并相邻且连续的区间
-        merged_intervals_indices = []
-        current_start, current_end = all_intervals_indices[0]
-        
-        for i in range(1, len(all_intervals_indices)):
-            next_start, next_end = all_intervals_indices[i]
-            
-            # 检查是否连续(允许1个点的间隙)
-            if next_start <= current_end + 1:
-                # 合并区间
-                current_end = max(current_end, next_end)
-            else:
-                # 保存当前区间,开始新区间
-                merged_intervals_indices.append((current_start, current_end))
-                current_start, current_end = next_start, next_end
-        
-        # 添加最后一个区间
-        merged_intervals_indices.append((current_start, current_end))
-        
-        # 计算区间平均值和动态理想值（使用与界面显示一致的方法）
-        interval_averages = []  # 每个区间的平均值（用于保存到rg文件的区间平均值字段）
-        all_interval_data_points = []  # 所有区间内的数据点（用于计算整体理想值）
-        
-        if current_data is not None:
-            for start_idx, end_idx in merged_intervals_indices:
-                if start_idx < len(current_data) and end_idx < len(current_data):
-                    # 切片包含end_idx
-                    slice_data = current_data[start_idx:end_idx+1]
-                    if len(slice_data) > 0:
-                        interval_averages.append(np.mean(slice_data))
-                        # 收集所有区间内的数据点
-                        all_interval_data_points.extend(slice_data)
-                    else:
-                        interval_averages.append(0)
-                else:
-                    interval_averages.append(0)
-        
-        # 计算动态理想值: (所有区间内数据点的平均值) * 调整倍率
-        # 这样与界面显示的 calculate_interval_average() 方法保持一致
         # 获取调整倍率
         try:
             ratio = prog_data.get('adjustment_ratio', 1.2)
         except:
             ratio = 1.2
         
-        if all_interval_data_points:
-            # 使用所有区间内数据点的平均值（与界面显示一致）
-            base_avg = np.mean(all_interval_data_points)
-            ideal_value = base_avg * ratio
-        else:
-            # 回退到整体平均值
-            ideal_value = prog_data.get('average', 0) * ratio
-
-        # 转换为行号.点索引格式
-        intervals_list = []
-        for i, (start_idx, end_idx) in enumerate(merged_intervals_indices):
-            if (start_idx < len(self.actual_load_x_positions) and
-                end_idx < len(self.actual_load_x_positions)):
-                
-                # 使用x_positions获取准确的位置（行号+点索引/该行总点数）
-                start_pos = self.actual_load_x_positions[start_idx]
-                end_pos = self.actual_load_x_positions[end_idx]
-                
-                # 分离整数部分（行号）和小数部分（相对位置）
-                start_ln = int(start_pos)
-                start_frac = start_pos - start_ln
-                end_ln = int(end_pos)
-                end_frac = end_pos - end_ln
-                
-                # 获取实际的点索引
-                start_point = self.actual_load_point_indices[start_idx]
-                end_point = self.actual_load_point_indices[end_idx]
-                
-                # 获取该区间的平均值
-                this_interval_avg = interval_averages[i] if i < len(interval_averages) else 0
-
-                intervals_list.append((f"{start_ln}.{start_point}", 
-                                     f"{end_ln}.{end_point}", 
-                                     ideal_value,
-                                     this_interval_avg))
+        # 合并相邻区间，计算区间平均值和动态理想值（与界面显示一致），转换为行号.点索引格式
+        intervals_list = rg_export.tool_rg_intervals(
+            current_data, all_intervals_indices,
+            self.actual_load_x_positions, self.actual_load_point_indices,
+            ratio, prog_data.get('average', 0))
         
         # 只有当有区间时才保存
         if intervals_list:
@@ -3303,97 +2676,14 @@ class ActualLoadAnalysis:
                 save_dir = os.path.dirname(os.path.abspath(__file__))
             
             # 保存汇总结果，修改为SampleData.rg
-            summary_path = os.path.join(save_dir, "SampleData.rg")
+            summary_path = os.path.join(save_dir, rg_export.RG_FILENAME)
             
             # 获取数据源标识（0=电流，1=vgpro功率，2=边缘模块功率）
-            data_source_map = {'电流': 0, 'vgpro功率': 1, '边缘模块功率': 2}
-            data_source_id = data_source_map.get(self.data_source.get(), 0)
-            
-            # 调试信息：打印analyzed_results的键
-            print(f"=== 调试信息 ===")
-            print(f"analyzed_results包含的键:")
-            for key in self.analyzed_results.keys():
-                print(f"  {key}")
-            print(f"program_mapping包含的程序:")
-            for prog_id, prog_info in self.program_mapping.items():
-                print(f"  程序ID: {prog_id}, 名称: {prog_info['name']}, 刀具数: {len(prog_info.get('tools_list', []))}")
+            data_source_id = rg_export.DATA_SOURCE_IDS.get(self.data_source.get(), 0)
             
-            # 按照txt文件顺序整理结果
-            # 格式: [(program_id, tool_key, program_name, tool_id, ideal_value, intervals), ...]
-            ordered_results = []
-            
-            # 遍历program_mapping以保持txt文件顺序
-            for program_id, program_info in self.program_mapping.items():
-                tools_list = program_info.get('tools_list', [])
-                
-                # 遍历每个刀具(按txt顺序,包括重复的刀具)
-                for tool_index, tool_info in enumerate(tools_list):
-                    tool_id = tool_info['tool_id']
-                    tool_key = f"{tool_id}_{tool_index}"
-                    result_key = (program_id, tool_key)
-                    
-                    # 检查是否有该刀具的分析结果
-                    if result_key in self.analyzed_results:
-                        print(f"找到结果: 程序ID={program_id}, 刀具key={tool_key}")
-                    else:
-                        print(f"未找到结果: 程序ID={program_id}, 刀具key={tool_key}")
-                    
-                    if result_key in self.analyzed_results:
-                        result_data = self.analyzed_results[result_key]
-                        intervals_list = result_data['intervals']
-                        program_name = result_data['program_name']
-                        
-                        # 按理想值分组该刀具的区间
-                        ideal_groups = {}  # {ideal_value: [intervals]}
-                        for start_str, end_str, ideal_value, interval_avg in intervals_list:
-                            ideal_key = f"{ideal_value:.3f}"
-                            if ideal_key not in ideal_groups:
-                                ideal_groups[ideal_key] = []
-                            # 修改格式：区间起始-区间终止:区间平均值
-                            interval_str = f"{start_str}-{end_str}:{interval_avg:.3f}"
-                            ideal_groups[ideal_key].append(interval_str)
-                        
-                        # 将该刀具的每个理想值组添加到结果列表
-                        for ideal_key, intervals in ideal_groups.items():
-                            print(f"添加到ordered_results: {program_name}, {tool_id}, 理想值={ideal_key}, 区间数={len(intervals)}")
-                            ordered_results.append({
-                                'program_name': program_name,
-                                'tool_id': tool_id,
-                                'ideal_value': ideal_key,
-                                'intervals': intervals
-                            })
-            
-            print(f"ordered_results总数: {len(ordered_results)}")
-            print(f"=== 调试信息结束 ===")
-            
-            # 写入文件
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                # 第一行：数据源标识
-                f.write(f"{data_source_id}\n")
-                
-                # 按照ordered_results的顺序写入(已按txt顺序排列)
-                for result in ordered_results:
-                    program_name = result['program_name']
-                    ideal_value_str = result['ideal_value']
-                    intervals = result['intervals']
-                    
-                    # 按起始行号排序区间
-                    def get_start_position(interval_str):
-                        # 解析 "起始行号.点索引-结束行号.点索引" 格式
-                        start_part = interval_str.split('-')[0]
-                        parts = start_part.split('.')
-                        line_num = float(parts[0])
-                        point_idx = float(parts[1]) if len(parts) > 1 else 0
-                        # 返回完整的位置值用于排序
-                        return line_num + point_idx / 10000.0  # 使用足够小的权重
-                    
-                    intervals_sorted = sorted(intervals, key=get_start_position)
-                    
-                    # 将区间用逗号连接
-                    intervals_str = ','.join(intervals_sorted)
-                    
-                    # 格式: 程序名;理想值;区间1起始-区间1终止,区间2起始-区间2终止;
-                    f.write(f"{program_name};{ideal_value_str};{intervals_str};\n")
+            # 按照txt文件顺序整理结果并写入文件
+            ordered_results = rg_export.ordered_rg_results(self.program_mapping, self.analyzed_results)
+            rg_export.write_rg(summary_path, data_source_id, ordered_results)
 
             # 同时生成一个只包含所有区间真实平均值的 CSV 文件（每行一个平均值）
             test_csv_path = os.path.join(save_dir, "test.csv")
@@ -3492,103 +2782,6 @@ class ActualLoadAnalysis:
         except Exception as e:
             messagebox.showerror("保存错误", f"保存结果时发生错误:\n{str(e)}")
 
-    def bind_scroll_zoom(self):
-        """绑定鼠标滚轮缩放功能"""
-        if self.scroll_cid:
-            self.canvas_actual_load.mpl_disconnect(self.scroll_cid)
-        
-        self.scroll_cid = self.canvas_actual_load.mpl_connect('scroll_event', self.on_scroll_zoom)
-
-    def on_scroll_zoom(self, event):
-        """处理鼠标滚轮缩放事件（仅横向缩放）"""
-        if event.inaxes != self.ax_actual_load:
-            return
-        
-        # 获取当前X轴和Y轴的范围
-        cur_xlim = self.ax_actual_load.get_xlim()
-        cur_ylim = self.ax_actual_load.get_ylim()
-        
-        # 获取鼠标在数据坐标中的位置
-        xdata = event.xdata
-        ydata = event.ydata
-        
-        if xdata is None or ydata is None:
-            return
-        
-        # 根据滚轮方向确定缩放方向
-        if event.button == 'up':
-            # 放大
-            scale_factor = 1 / self.zoom_factor
-        elif event.button == 'down':
-            # 缩小
-            scale_factor = self.zoom_factor
-        else:
-            return
-        
-        # 只计算横向（X轴）的新范围，以鼠标位置为中心缩放
-        new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-        
-        relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
-        
-        new_xlim = [xdata - new_width * (1 - relx), xdata + new_width * relx]
-        
-        # 应用新的X轴范围，Y轴保持不变
-        self.ax_actual_load.set_xlim(new_xlim)
-        self.ax_actual_load.set_ylim(cur_ylim)  # 保持Y轴范围不变
-        
-        # 重绘图表
-        self.canvas_actual_load.draw()
-
-    def reset_chart_view(self):
-        """重置图表视图到原始范围"""
-        if self.original_xlim is not None and self.original_ylim is not None:
-            self.ax_actual_load.set_xlim(self.original_xlim)
-            self.ax_actual_load.set_ylim(self.original_ylim)
-            self.canvas_actual_load.draw()
-            self.status_var_actual_load.set("图表视图已重置")
-    
-    def on_pan_press(self, event):
-        """处理鼠标按下事件（开始平移）"""
-        # 只响应鼠标左键，且在图表区域内
-        if event.button != 1 or event.inaxes != self.ax_actual_load:
-            return
-        
-        # 记录起始位置
-        self.is_panning = True
-        self.pan_start = (event.xdata, event.ydata)
-    
-    def on_pan_motion(self, event):
-        """处理鼠标移动事件（执行平移）- 只影响横轴"""
-        # 如果不在平移状态，或者鼠标不在图表区域内，则返回
-        if not self.is_panning or event.inaxes != self.ax_actual_load or self.pan_start is None:
-            return
-        
-        # 如果鼠标数据坐标为None，则返回
-        if event.xdata is None or event.ydata is None:
-            return
-        
-        # 计算鼠标在X轴方向的移动距离
-        dx = event.xdata - self.pan_start[0]
-        
-        # 获取当前坐标轴范围
-        cur_xlim = self.ax_actual_load.get_xlim()
-        cur_ylim = self.ax_actual_load.get_ylim()
-        
-        # 只更新X轴范围（反向移动，实现拖动效果），Y轴保持不变
-        new_xlim = [cur_xlim[0] - dx, cur_xlim[1] - dx]
-        
-        # 应用新的X轴范围，Y轴保持不变
-        self.ax_actual_load.set_xlim(new_xlim)
-        self.ax_actual_load.set_ylim(cur_ylim)
-        
-        # 重绘图表
-        self.canvas_actual_load.draw()
-
-    def on_pan_release(self, event):
-        """处理鼠标释放事件（结束平移）"""
-        self.is_panning = False
-        self.pan_start = None
-
     def on_window_resize(self, event):
         """窗口大小改变时的处理"""
         if event.widget == self.root:
@@ -3676,17 +2869,6 @@ class ActualLoadAnalysis:
         if event.inaxes != self.ax_actual_load:
             return
         
-        # 获取当前坐标轴范围
-        cur_xlim = self.ax_actual_load.get_xlim()
-        cur_ylim = self.ax_actual_load.get_ylim()
-        
-        # 获取鼠标在数据坐标中的位置
-        xdata = event.xdata
-        ydata = event.ydata
-        
-        if xdata is None or ydata is None:
-            return
-        
         # 根据滚轮方向确定缩放方向
         if event.button == 'up':
             # 放大
@@ -3697,26 +2879,16 @@ class ActualLoadAnalysis:
         else:
             return
         
-        # 只计算横向（X轴）的新范围，以鼠标位置为中心缩放
-        new_width = (cur_xlim[1] - cur_xlim[0]) * scale_factor
-        
-        relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0])
-        
-        new_xlim = [xdata - new_width * (1 - relx), xdata + new_width * relx]
-        
-        # 应用新的X轴范围，Y轴保持不变
-        self.ax_actual_load.set_xlim(new_xlim)
-        self.ax_actual_load.set_ylim(cur_ylim)  # 保持Y轴范围不变
-        
-        # 重绘图表
-        self.canvas_actual_load.draw()
+        # 以鼠标位置为中心只缩放X轴；连续滚动合并为每帧一次 blit 重绘
+        chart_interaction.view_for(self.canvas_actual_load).zoom(event, scale_factor)
 
     def reset_chart_view(self):
         """重置图表视图到原始范围"""
         if self.original_xlim is not None and self.original_ylim is not None:
-            self.ax_actual_load.set_xlim(self.original_xlim)
-            self.ax_actual_load.set_ylim(self.original_ylim)
-            self.canvas_actual_load.draw()
+            # 丢弃尚未应用的滚轮/拖动范围，立即完整重绘
+            view = chart_interaction.view_for(self.canvas_actual_load)
+            view.set_view(self.ax_actual_load, self.original_xlim, self.original_ylim)
+            view.flush()
             self.status_var_actual_load.set("图表视图已重置")
     
     def on_pan_press(self, event):
@@ -3747,19 +2919,11 @@ class ActualLoadAnalysis:
         # 计算鼠标在X轴方向的移动距离
         dx = event.xdata - self.pan_start[0]
         
-        # 获取当前坐标轴范围
+        # 只更新X轴范围（反向移动，实现拖动效果），Y轴保持不变。
+        # event.xdata 按已应用的范围计算，因此基于已应用的范围平移；同一帧内后到的事件覆盖先到的
         cur_xlim = self.ax_actual_load.get_xlim()
-        cur_ylim = self.ax_actual_load.get_ylim()
-        
-        # 只更新X轴范围（反向移动，实现拖动效果），Y轴保持不变
         new_xlim = [cur_xlim[0] - dx, cur_xlim[1] - dx]
-        
-        # 应用新的X轴范围，Y轴保持不变
-        self.ax_actual_load.set_xlim(new_xlim)
-        self.ax_actual_load.set_ylim(cur_ylim)
-        
-        # 重绘图表
-        self.canvas_actual_load.draw()
+        chart_interaction.view_for(self.canvas_actual_load).set_view(self.ax_actual_load, xlim=new_xlim)
 
     def on_window_resize(self, event):
         """窗口大小改变时的处理"""
@@ -3842,36 +3006,17 @@ class ActualLoadAnalysis:
         if not self.actual_load_intervals:
             return
 
-        for i, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
-            if start_idx >= len(self.actual_load_x_positions) or end_idx >= len(self.actual_load_x_positions):
-                continue
-
-            start_x = self.actual_load_x_positions[start_idx]
-            end_x = self.actual_load_x_positions[end_idx]
-
-            # 绘制起始边界线（红色）
-            start_line = self.ax_actual_load.axvline(
-                x=start_x,
-                color='red',
-                linewidth=2.5,
-                alpha=0.8,
-                linestyle='-',
-                picker=5,
-            )
-            start_line.interval_info = {'idx': i, 'boundary': 'start'}
-            self.interval_boundary_lines.append(start_line)
-
-            # 绘制结束边界线（蓝色）
-            end_line = self.ax_actual_load.axvline(
-                x=end_x,
-                color='blue',
-                linewidth=2.5,
-                alpha=0.8,
-                linestyle='-',
-                picker=5,
-            )
-            end_line.interval_info = {'idx': i, 'boundary': 'end'}
-            self.interval_boundary_lines.append(end_line)
+        # 起始边界线红色、结束边界线蓝色，全部边界为一个集合
+        starts, ends, ids = interval_artists.interval_x_ranges(self.actual_load_intervals,
+                                                               self.actual_load_x_positions)
+        self.interval_boundaries = interval_artists.IntervalBoundaries(
+            self.ax_actual_load, starts, ends, ids,
+            start_color='red',
+            end_color='blue',
+            linewidth=2.5,
+            alpha=0.8,
+            linestyle='-',
+        )
 
         # 恢复之前的视图范围
         self.ax_actual_load.set_xlim(current_xlim)
@@ -3881,12 +3026,9 @@ class ActualLoadAnalysis:
 
     def clear_interval_boundaries(self):
         """清除区间边界线"""
-        for line in self.interval_boundary_lines:
-            try:
-                line.remove()
-            except:
-                pass
-        self.interval_boundary_lines = []
+        if self.interval_boundaries is not None:
+            self.interval_boundaries.remove()
+        self.interval_boundaries = None
 
     def on_adjustment_press(self, event):
         """微调模式下的鼠标按下事件"""
@@ -3913,7 +3055,6 @@ class ActualLoadAnalysis:
             # 拖动边界线
             interval_idx = self.dragging_boundary['interval_idx']
             boundary = self.dragging_boundary['boundary']
-            line = self.dragging_boundary['line']
 
             # 找到最接近鼠标位置的数据点索引
             closest_idx = np.argmin(np.abs(np.array(self.actual_load_x_positions) - event.xdata))
@@ -3924,12 +3065,10 @@ class ActualLoadAnalysis:
             # 更新边界 - 移除限制，允许自由移动
             if boundary == 'start':
                 start_idx = closest_idx
-                new_x = self.actual_load_x_positions[closest_idx]
-                line.set_xdata([new_x, new_x])
             else:  # 'end'
                 end_idx = closest_idx
-                new_x = self.actual_load_x_positions[closest_idx]
-                line.set_xdata([new_x, new_x])
+            if self.interval_boundaries is not None:
+                self.interval_boundaries.move(interval_idx, boundary, self.actual_load_x_positions[closest_idx])
 
             # 更新区间数据（临时，释放鼠标时才确认）
             # 如果起始位置大于结束位置，交换它们
@@ -3990,38 +3129,18 @@ class ActualLoadAnalysis:
         xlim = self.ax_actual_load.get_xlim()
         tolerance = (xlim[1] - xlim[0]) * 0.01
 
-        for i, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
-            if start_idx >= len(self.actual_load_x_positions) or end_idx >= len(self.actual_load_x_positions):
-                continue
-
-            start_x = self.actual_load_x_positions[start_idx]
-            end_x = self.actual_load_x_positions[end_idx]
-
-            # 检查是否点击了起始边界
-            if abs(event.xdata - start_x) < tolerance:
-                # 找到对应的线对象
-                for line in self.interval_boundary_lines:
-                    if hasattr(line, 'interval_info') and line.interval_info['idx'] == i and line.interval_info['boundary'] == 'start':
-                        self.dragging_boundary = {
-                            'interval_idx': i,
-                            'boundary': 'start',
-                            'line': line,
-                        }
-                        self.status_var_actual_load.set(f"拖动区间{i+1}的起始边界")
-                        return
-
-            # 检查是否点击了结束边界
-            if abs(event.xdata - end_x) < tolerance:
-                # 找到对应的线对象
-                for line in self.interval_boundary_lines:
-                    if hasattr(line, 'interval_info') and line.interval_info['idx'] == i and line.interval_info['boundary'] == 'end':
-                        self.dragging_boundary = {
-                            'interval_idx': i,
-                            'boundary': 'end',
-                            'line': line,
-                        }
-                        self.status_var_actual_load.set(f"拖动区间{i+1}的结束边界")
-                        return
+        if self.interval_boundaries is None:
+            return
+        hit = self.interval_boundaries.hit(event.xdata, tolerance)
+        if hit is None:
+            return
+        i, boundary = hit
+        self.dragging_boundary = {
+            'interval_idx': i,
+            'boundary': boundary,
+        }
+        label = '起始' if boundary == 'start' else '结束'
+        self.status_var_actual_load.set(f"拖动区间{i+1}的{label}边界")
 
     def select_interval_at_position(self, x_pos):
         """在指定位置选择区间（用于多选）"""
@@ -4029,25 +3148,21 @@ class ActualLoadAnalysis:
             return
 
         # 找到包含该位置的区间
-        for i, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
-            if start_idx >= len(self.actual_load_x_positions) or end_idx >= len(self.actual_load_x_positions):
-                continue
-
-            start_x = self.actual_load_x_positions[start_idx]
-            end_x = self.actual_load_x_positions[end_idx]
-
-            if start_x <= x_pos <= end_x:
-                if i in self.selected_intervals:
-                    # 取消选择
-                    self.selected_intervals.remove(i)
-                else:
-                    # 添加选择
-                    self.selected_intervals.append(i)
+        starts, ends, ids = interval_artists.interval_x_ranges(self.actual_load_intervals,
+                                                               self.actual_load_x_positions)
+        i = interval_artists.interval_at(starts, ends, ids, x_pos)
+        if i is None:
+            return
+        if i in self.selected_intervals:
+            # 取消选择
+            self.selected_intervals.remove(i)
+        else:
+            # 添加选择
+            self.selected_intervals.append(i)
 
-                # 高亮显示选中的区间
-                self.highlight_selected_intervals()
-                self.status_var_actual_load.set(f"已选择 {len(self.selected_intervals)} 个区间")
-                return
+        # 高亮显示选中的区间
+        self.highlight_selected_intervals()
+        self.status_var_actual_load.set(f"已选择 {len(self.selected_intervals)} 个区间")
 
     def highlight_selected_intervals(self):
         """高亮显示选中的区间"""
@@ -4059,7 +3174,8 @@ class ActualLoadAnalysis:
         self.ax_actual_load.clear()
 
         # 绘制数据曲线
-        self.ax_actual_load.plot(
+        plot_decimation.plot(
+            self.ax_actual_load,
             self.actual_load_x_positions,
             self.actual_load_data,
             color='#2196F3',
@@ -4069,7 +3185,8 @@ class ActualLoadAnalysis:
         )
 
         if self.is_filtered and self.filtered_data is not None:
-            self.ax_actual_load.plot(
+            plot_decimation.plot(
+                self.ax_actual_load,
                 self.actual_load_x_positions,
                 self.filtered_data,
                 color='#f44336',
@@ -4078,37 +3195,16 @@ class ActualLoadAnalysis:
                 alpha=0.85
             )
 
-        # 绘制区间（选中的用不同颜色）
-        for i, (start_idx, end_idx) in enumerate(self.actual_load_intervals):
-            if start_idx >= len(self.actual_load_x_positions) or end_idx >= len(self.actual_load_x_positions):
-                continue
-
-            start_x = self.actual_load_x_positions[start_idx]
-            end_x = self.actual_load_x_positions[end_idx]
-
-            if i in self.selected_intervals:
-                # 选中的区间用黄色高亮
-                self.ax_actual_load.axvspan(
-                    start_x,
-                    end_x,
-                    alpha=0.4,
-                    color='yellow',
-                    edgecolor='orange',
-                    linewidth=2.0,
-                )
-            else:
-                # 未选中的区间用绿色
-                self.ax_actual_load.axvspan(
-                    start_x,
-                    end_x,
-                    alpha=0.3,
-                    color='lightgreen',
-                    edgecolor='darkgreen',
-                    linewidth=1.0,
-                )
-
-            self.ax_actual_load.axvline(x=start_x, color='black', linewidth=0.5, alpha=0.8)
-            self.ax_actual_load.axvline(x=end_x, color='black', linewidth=0.5, alpha=0.8)
+        # 绘制区间（选中的用黄色高亮，未选中的用绿色）
+        starts, ends, ids = interval_artists.interval_x_ranges(self.actual_load_intervals,
+                                                               self.actual_load_x_positions)
+        selected = np.isin(ids, self.selected_intervals)
+        interval_artists.span_collection(self.ax_actual_load, starts[selected], ends[selected],
+                                         'yellow', alpha=0.4, linewidth=2.0)
+        interval_artists.span_collection(self.ax_actual_load, starts[~selected], ends[~selected],
+                                         'lightgreen', alpha=0.3, linewidth=1.0)
+        interval_artists.boundary_collection(self.ax_actual_load, np.concatenate([starts, ends]),
+                                             'black', linewidth=0.5, alpha=0.8)
 
         # 重新绘制边界线
         self.draw_interval_boundaries()
@@ -4491,7 +3587,8 @@ class ActualLoadAnalysis:
                         pass
             
             # 关闭所有matplotlib图形
-            plt.close('all')
+            if plt.loaded:
+                plt.close('all')
             
             # 清理图表相关资源
             if hasattr(self, 'canvas_actual_load'):
@@ -4656,20 +3753,24 @@ def auto_find_data_files():
     
     return None, None
 
-# 检查命令行参数
-if len(sys.argv) >= 3:
-    # 从命令行接收文件路径
-    csv_file = sys.argv[1]
-    txt_file = sys.argv[2]
-    main(csv_file, txt_file)
-else:
-    # 自动查找数据文件
-    csv_file, txt_file = auto_find_data_files()
+if __name__ == "__main__":
+    # 打包后的程序启动进程池工作进程时需要
+    multiprocessing.freeze_support()
     
-    if csv_file and txt_file:
-        # 找到文件，自动加载
+    # 检查命令行参数
+    if len(sys.argv) >= 3:
+        # 从命令行接收文件路径
+        csv_file = sys.argv[1]
+        txt_file = sys.argv[2]
         main(csv_file, txt_file)
     else:
-        # 无参数模式，启动空白界面
-        main()
+        # 自动查找数据文件
+        csv_file, txt_file = auto_find_data_files()
+    
+        if csv_file and txt_file:
+            # 找到文件，自动加载
+            main(csv_file, txt_file)
+        else:
+            # 无参数模式，启动空白界面
+            main()
 